@@ -38,6 +38,12 @@ case "${RUN_MODE:-cron}" in
     
     exec /usr/local/bin/supercronic -passthrough-logs /tmp/crontab
     ;;
+"daemon")
+    # 常驻进程内调度，避免每次触发的冷启动
+    echo "🕒 常驻模式: ${CRON_SCHEDULE:-*/30 * * * *}"
+    echo "🎯 TrendRadar 将作为 PID 1 运行"
+    exec /usr/local/bin/python main.py --daemon --schedule "${CRON_SCHEDULE:-*/30 * * * *}"
+    ;;
 *)
     exec "$@"
     ;;
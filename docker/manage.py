@@ -4,10 +4,13 @@
 新闻爬虫容器管理工具 - supercronic
 """
 
+import json
+import math
 import os
 import sys
 import subprocess
 import time
+import unicodedata
 from pathlib import Path
 
 
@@ -133,6 +136,8 @@ def show_status():
         if "supercronic" in pid1_cmdline.lower():
             print("  ✅ supercronic 正确运行为 PID 1")
             supercronic_is_pid1 = True
+        elif "main.py --daemon" in pid1_cmdline:
+            print("  ✅ TrendRadar 常驻模式运行为 PID 1")
         else:
             print("  ❌ PID 1 不是 supercronic")
             print(f"  📋 实际的 PID 1: {pid1_cmdline}")
@@ -370,6 +375,129 @@ def show_logs():
         print("💡 建议使用: docker logs trend-radar")
 
 
+def percentile(values, pct):
+    """计算百分位数（最近秩法）"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+def load_metrics_runs(metrics_dir, limit):
+    """读取最近 limit 次运行的指标记录"""
+    runs = []
+    for file_path in sorted(metrics_dir.glob("*.jsonl")):
+        with open(file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    runs.append(json.loads(line))
+                except ValueError:
+                    continue
+    return runs[-limit:]
+
+
+def pad_display(text, width, align="<"):
+    """按显示宽度补齐文本，中文等宽字符按 2 计算"""
+    display_width = sum(
+        2 if unicodedata.east_asian_width(char) in ("W", "F") else 1
+        for char in text
+    )
+    padding = " " * max(0, width - display_width)
+    return text + padding if align == "<" else padding + text
+
+
+def show_metrics():
+    """汇总最近运行的各阶段耗时"""
+    limit = 50
+    if len(sys.argv) > 2:
+        try:
+            limit = max(1, int(sys.argv[2]))
+        except ValueError:
+            print(f"❌ 运行次数必须为整数: {sys.argv[2]}")
+            return
+
+    metrics_dir = Path("/app/output/metrics")
+    if not metrics_dir.exists():
+        print("  📭 指标目录不存在，尚未记录任何运行")
+        return
+
+    runs = load_metrics_runs(metrics_dir, limit)
+    if not runs:
+        print("  📭 没有运行指标记录")
+        return
+
+    # 按阶段收集样本，每个 span 为一个样本（如每个平台的抓取）
+    stage_order = []
+    wall_samples = {}
+    cpu_samples = {}
+    for run in runs:
+        run_record = {"name": "run", "wall": run.get("wall"), "cpu": run.get("cpu")}
+        for record in [run_record] + run.get("spans", []):
+            name = record.get("name")
+            if name not in wall_samples:
+                stage_order.append(name)
+                wall_samples[name] = []
+                cpu_samples[name] = []
+            if record.get("wall") is not None:
+                wall_samples[name].append(record["wall"])
+            if record.get("cpu") is not None:
+                cpu_samples[name].append(record["cpu"])
+
+    failed_runs = sum(1 for run in runs if run.get("status") != "ok")
+    print(f"📈 最近 {len(runs)} 次运行的阶段指标 (失败 {failed_runs} 次):")
+    header = [("阶段", 18, "<"), ("样本", 6, ">")] + [
+        (title, 10, ">") for title in ("耗时p50", "耗时p95", "CPU p50", "CPU p95")
+    ]
+    print("  " + "".join(pad_display(*column) for column in header))
+
+    def fmt(value):
+        return f"{value:.3f}s" if value is not None else "-"
+
+    for name in stage_order:
+        walls = wall_samples[name]
+        cpus = cpu_samples[name]
+        print(
+            f"  {pad_display(str(name), 18)}{len(walls):>6}"
+            f"{fmt(percentile(walls, 50)):>10}{fmt(percentile(walls, 95)):>10}"
+            f"{fmt(percentile(cpus, 50)):>10}{fmt(percentile(cpus, 95)):>10}"
+        )
+
+    # 进程启动以来的峰值，常驻模式下多次运行累积；旧记录的字段名为 peak_rss_kb
+    rss_values = [run.get("process_peak_rss_kb") or run.get("peak_rss_kb") for run in runs]
+    rss_values = [value for value in rss_values if value]
+    if rss_values:
+        print(
+            f"  💾 进程内存峰值: p50 {percentile(rss_values, 50) / 1024:.1f}MB, "
+            f"p95 {percentile(rss_values, 95) / 1024:.1f}MB, "
+            f"最近一次 {rss_values[-1] / 1024:.1f}MB"
+        )
+
+    breaker_runs = [
+        run["extra"]["circuit_breaker"]
+        for run in runs
+        if "circuit_breaker" in run.get("extra", {})
+    ]
+    if breaker_runs:
+        tripped = sum(len(item.get("tripped", [])) for item in breaker_runs)
+        skipped = sum(len(item.get("skipped", [])) for item in breaker_runs)
+        platforms = breaker_runs[-1].get("platforms", {})
+        open_ids = [pid for pid, entry in platforms.items() if entry["state"] != "closed"]
+        print(
+            f"  🔌 熔断: 触发 {tripped} 次, 跳过 {skipped} 次抓取, "
+            f"当前熔断 {len(open_ids)} 个平台"
+        )
+        for pid in open_ids:
+            entry = platforms[pid]
+            print(
+                f"     {pid}: {entry['state']}, 累计熔断 {entry['trips']} 次, "
+                f"{entry['retry_after']:.0f}秒后探测"
+            )
+
+
 def restart_supercronic():
     """重启supercronic进程"""
     print("🔄 重启supercronic...")
@@ -405,6 +533,7 @@ def show_help():
   config      - 显示当前配置
   files       - 显示输出文件
   logs        - 实时查看日志
+  metrics [N] - 汇总最近 N 次运行的阶段耗时 (默认 50)
   restart     - 重启说明
   help        - 显示此帮助
 
@@ -452,6 +581,7 @@ def main():
         "config": show_config,
         "files": show_files,
         "logs": show_logs,
+        "metrics": show_metrics,
         "restart": restart_supercronic,
         "help": show_help,
     }
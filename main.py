@@ -6,8 +6,11 @@ TrendRadar v4.0 - 全网热点聚合与智能推送系统
 主程序入口，集成所有重构后的模块
 """
 
+import argparse
 import os
+import signal
 import sys
+import time
 import webbrowser
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
@@ -17,21 +20,27 @@ sys.path.insert(0, str(Path(__file__).parent))
 
 # 导入核心模块
 from trendradar.core import (
+    CircuitBreaker,
     DataFetcher,
+    DayAggregate,
+    EndpointPool,
+    HedgePolicy,
+    HttpValidatorCache,
+    LastGoodCache,
+    SeenTitleIndex,
+    ShardRun,
+    SnapshotStore,
+    WordGroupMatcher,
     save_titles_to_file,
     read_all_today_titles,
     detect_latest_new_titles,
     count_word_frequency,
     generate_html_report,
+    select_shard,
 )
 
 # 导入推送模块
-from trendradar.notifiers import (
-    FeishuNotifier,
-    DingTalkNotifier,
-    WeWorkNotifier,
-    TelegramNotifier,
-)
+from trendradar.notifiers import NotificationDispatcher
 
 # 导入工具模块
 from trendradar.utils import (
@@ -41,8 +50,12 @@ from trendradar.utils import (
     get_beijing_time,
     format_date_folder,
     ConfigValidator,
+    CronScheduler,
+    ProxyPool,
+    RateLimiter,
 )
 from trendradar.utils.exceptions import ConfigError, FetchError
+from trendradar.utils.metrics import RunMetrics, span
 
 # 版本信息
 VERSION = "4.0.0"
@@ -54,13 +67,40 @@ logger = init_app_logger(log_level="INFO")
 class TrendRadarApp:
     """TrendRadar 主应用类"""
 
-    def __init__(self):
-        """初始化应用"""
+    # 运行结束时在日志中汇总的阶段
+    SUMMARY_STAGES = (
+        "fetch",
+        "merge_shards",
+        "save",
+        "aggregate",
+        "detect_new",
+        "trends",
+        "match",
+        "render",
+        "notify",
+    )
+
+    def __init__(self, merge_shards: bool = False):
+        """初始化应用
+
+        Args:
+            merge_shards: 是否作为分片汇总步骤运行，合并各工作节点的分片输出而不抓取
+        """
         self.config = None
+        self.merge_shards = merge_shards
+        # 分片工作节点负责的分片序号，不分片或汇总时为 None
+        self.shard_index = None
         self.validator = ConfigValidator()
         self.fetcher = None
+        # SQLite 快照存储，txt 存储时为 None
+        self.store = None
         self.word_groups = []
         self.filter_words = []
+        self.matcher = None
+        # 当日聚合状态，常驻模式下跨运行复用
+        self.day_aggregate = None
+        # 当日已见标题索引，常驻模式下跨运行复用
+        self.seen_index = None
 
         # 环境检测
         self.is_github_actions = os.environ.get("GITHUB_ACTIONS") == "true"
@@ -101,7 +141,12 @@ class TrendRadarApp:
                 self.word_groups = word_data if isinstance(word_data, list) else []
                 self.filter_words = []
 
-            logger.info(f"✅ 关键词配置加载完成: {len(self.word_groups)} 个词组")
+            # 预编译词组匹配器，整个运行期间复用
+            self.matcher = WordGroupMatcher(self.word_groups, self.filter_words)
+            logger.info(
+                f"✅ 关键词配置加载完成: {len(self.word_groups)} 个词组, "
+                f"{self.matcher.keyword_count} 个关键词"
+            )
 
             # 详细显示词组配置
             if self.word_groups:
@@ -133,20 +178,75 @@ class TrendRadarApp:
 
     def _setup_components(self):
         """设置核心组件"""
-        # 设置代理
-        proxy_url = None
-        if not self.is_github_actions and self.config.get("USE_PROXY"):
-            proxy_url = self.config.get("DEFAULT_PROXY")
-            logger.info(f"🌐 使用代理: {proxy_url}")
+        # 分片工作节点只抓取哈希分配给本节点的平台
+        sharding = self.config.get("SHARDING", {})
+        shard_count = sharding.get("COUNT", 1)
+        if shard_count > 1 and not self.merge_shards:
+            self.shard_index = sharding.get("INDEX", 0)
+            self.config["PLATFORMS"] = select_shard(
+                self.config["PLATFORMS"], self.shard_index, shard_count
+            )
+            logger.info(
+                f"🧩 分片工作节点 {self.shard_index}/{shard_count}: "
+                f"负责 {len(self.config['PLATFORMS'])} 个平台"
+            )
+
+        # 代理池，抓取和推送共享
+        self.proxy_pool = None
+        if not self.is_github_actions:
+            self.proxy_pool = ProxyPool.from_config(self.config)
+        if self.proxy_pool is not None:
+            logger.info(f"🌐 使用代理: {', '.join(self.proxy_pool.proxies)}")
+
+        # 自适应限流器，从上次运行保存的速率和并发开始
+        rate_limiter = RateLimiter.from_config(self.config)
+        rate_limiter.load()
+
+        # 平台熔断器，长期失败的平台跨运行保持熔断
+        circuit_breaker = CircuitBreaker.from_config(self.config)
+        if circuit_breaker is not None:
+            circuit_breaker.load()
+
+        # API 端点池，从上次运行保存的得分中选择最健康的端点
+        endpoints = EndpointPool.from_config(self.config)
+        if endpoints is not None:
+            endpoints.load()
+
+        # 对冲策略，按各平台历史延迟决定何时发出对冲请求
+        hedge_policy = HedgePolicy.from_config(self.config)
+        if hedge_policy is not None:
+            hedge_policy.load()
+
+        # 最近成功数据缓存，平台抓取失败时用缓存数据代替
+        last_good = LastGoodCache.from_config(self.config)
+        if last_good is not None:
+            last_good.load()
 
         # 创建数据抓取器
         self.fetcher = DataFetcher(
             config=self.config,
+            rate_limiter=rate_limiter,
+            circuit_breaker=circuit_breaker,
+            hedge_policy=hedge_policy,
+            endpoints=endpoints,
+            proxy_pool=self.proxy_pool,
+            last_good=last_good,
         )
         logger.info("✅ 数据抓取器初始化完成")
 
-    def _fetch_data(self) -> Tuple[Dict, Dict, List]:
-        """抓取数据"""
+        # 快照存储
+        if self.config.get("STORAGE_BACKEND") == "sqlite":
+            self.store = SnapshotStore()
+            export_note = "，同时导出 txt" if self.config.get("STORAGE_EXPORT_TXT") else ""
+            logger.info(f"🗄️  快照存储: SQLite ({self.store.db_path}){export_note}")
+
+    def _fetch_data(self) -> Tuple[Dict, Dict, List, List, List, Dict]:
+        """抓取数据
+
+        Returns:
+            (标题结果, id_to_name, 失败平台, 内容未变化平台, 因时限被取消的平台,
+            使用缓存数据的平台 {平台ID: 缓存数据距今秒数})
+        """
         logger.info("=" * 70)
         logger.info("开始数据抓取...")
         logger.info("=" * 70)
@@ -154,80 +254,228 @@ class TrendRadarApp:
         # 检查是否启用异步
         enable_async = self.config.get("crawler", {}).get("enable_async", True)
 
-        if enable_async:
-            logger.info("⚡ 使用异步并发抓取")
-            # fetch_all 返回 (results_list, failed_list)
-            # results_list 是 List[Dict]，每个Dict包含 platform_id 和 data 字段
-            results_list, failed = self.fetcher.fetch_all(use_async=True)
-        else:
-            logger.info("🐌 使用同步顺序抓取")
-            results_list, failed = self.fetcher.fetch_all(use_async=False)
+        # 每次运行从状态文件重新加载，未写入快照的校验信息不会被下次运行使用；
+        # 分片工作节点不写快照，无法确认“未变化”能沿用到已保存的标题，总是完整下载
+        validator_cache = None
+        if self.shard_index is None:
+            validator_cache = HttpValidatorCache()
+            validator_cache.load()
+        self.fetcher.validator_cache = validator_cache
 
-        # 将列表转换为字典，并提取正确的数据
         results = {}
-        for item in results_list:
-            if isinstance(item, dict) and "platform_id" in item:
-                platform_id = item["platform_id"]
-                # 从 API 响应中提取标题数据
-                api_data = item.get("data", {})
-
-                # API 返回格式: {"status": "success", "items": [...]}
-                # 需要将 items 数组转换为字典格式 {title: {ranks: [idx], url: ...}}
-                items = api_data.get("items", [])
-                titles_dict = {}
-
-                for idx, news_item in enumerate(items):
-                    title = news_item.get("title", "")
-                    url = news_item.get("url", "")
-                    mobile_url = news_item.get("mobileUrl", "")
-
-                    if title:
-                        titles_dict[title] = {
-                            "ranks": [idx + 1],  # 排名从 1 开始
-                            "url": url,
-                            "mobileUrl": mobile_url,
-                        }
-
-                results[platform_id] = titles_dict
-            elif isinstance(item, tuple) and len(item) == 2:
-                # 兼容元组格式 (platform_id, titles_dict)
-                platform_id, titles_dict = item
-                results[platform_id] = titles_dict
+        failed = []
+        unchanged = []
+        stale = {}
+        primed_count = 0
+
+        def handle_platform(platform: Dict, result: Optional[Dict]) -> None:
+            """整理单个平台的标题并预匹配关键词"""
+            nonlocal primed_count
+            if result is None:
+                failed.append(platform["id"])
+                return
+            if result.get("status") == "unchanged":
+                # 内容与上次相同，跳过解析、匹配和快照写入
+                unchanged.append(platform["id"])
+                return
+            if result.get("status") == "stale":
+                # 抓取失败，标题为最近一次成功的缓存数据
+                stale[platform["id"]] = result["age"]
+
+            titles_dict = result["titles"]
+            primed_count += self.matcher.prime(titles_dict)
+            results[platform["id"]] = titles_dict
+
+        with span("fetch"):
+            if enable_async:
+                logger.info("⚡ 使用异步并发抓取（逐平台流式处理）")
+                # 平台完成即处理，慢平台仍在重试时已完成的平台同步整理和匹配
+                self.fetcher.fetch_all_streaming(handle_platform)
+            else:
+                logger.info("🐌 使用同步顺序抓取")
+                results_list, failed = self.fetcher.fetch_all(use_async=False)
+                for item in results_list:
+                    handle_platform(
+                        {"id": item["platform_id"], "name": item["platform_name"]},
+                        item,
+                    )
+        self.fetcher.rate_limiter.save()
+        if self.fetcher.circuit_breaker is not None:
+            self.fetcher.circuit_breaker.save()
+        if self.fetcher.hedge_policy is not None:
+            self.fetcher.hedge_policy.save()
+        if self.fetcher.endpoints is not None:
+            self.fetcher.endpoints.save()
+        if self.fetcher.last_good is not None:
+            self.fetcher.last_good.save()
+
+        # 到达抓取时限时未完成的平台单独列出，不计为失败
+        cancelled = list(self.fetcher.last_cancelled)
+
+        # 按平台配置顺序整理结果，保证快照文件内容稳定
+        platform_order = [p["id"] for p in self.config["PLATFORMS"]]
+        results = {pid: results[pid] for pid in platform_order if pid in results}
+        failed = [pid for pid in platform_order if pid in failed]
+        unchanged = [pid for pid in platform_order if pid in unchanged]
+        stale = {pid: stale[pid] for pid in platform_order if pid in stale}
 
         # 准备 id_to_name 映射
         id_to_name = {p["id"]: p["name"] for p in self.config["PLATFORMS"]}
 
         logger.info(
-            f"✅ 抓取完成: 成功 {len(results)}/{len(self.config['PLATFORMS'])}, 失败 {len(failed)}"
+            f"✅ 抓取完成: 成功 {len(results) - len(stale) + len(unchanged)}/{len(self.config['PLATFORMS'])}, 失败 {len(failed)}, 使用缓存数据 {len(stale)}, 内容未变化 {len(unchanged)}"
+        )
+        logger.info(f"🔍 抓取期间预匹配: {primed_count} 条标题命中关键词")
+
+        if cancelled:
+            logger.warning(
+                f"⏱️  超过抓取时限，未完成 {len(cancelled)} 个平台: {', '.join(cancelled)}"
+            )
+
+        return results, id_to_name, failed, unchanged, cancelled, stale
+
+    def _shard_base_dir(self) -> Optional[str]:
+        """分片输出根目录，未配置时使用默认目录"""
+        return self.config.get("SHARDING", {}).get("DIR") or None
+
+    def _write_shard(
+        self,
+        results: Dict,
+        failed: List,
+        unchanged: List,
+        cancelled: List,
+        stale: Dict,
+    ) -> None:
+        """分片工作节点写入分片输出，保存、匹配和推送由汇总步骤完成"""
+        sharding = self.config.get("SHARDING", {})
+        # 未指定运行ID时按北京时间生成，同一分钟内启动的节点写入同一次运行
+        run_id = sharding.get("RUN_ID") or get_beijing_time().strftime("%Y%m%d-%H%M")
+        shard_run = ShardRun(run_id, sharding["COUNT"], self._shard_base_dir())
+        shard_path = shard_run.write(
+            self.shard_index,
+            [p["id"] for p in self.config["PLATFORMS"]],
+            results,
+            failed,
+            unchanged,
+            cancelled,
+            stale,
         )
+        logger.info(f"🧩 分片输出已写入: {shard_path}")
+
+    def _merge_shards(self) -> Tuple[Dict, Dict, List, List, List, Dict]:
+        """汇总各工作节点的分片输出
+
+        Returns:
+            与 _fetch_data 相同的抓取结果
+
+        Raises:
+            ConfigError: 未启用分片
+            FetchError: 找不到分片输出
+        """
+        sharding = self.config.get("SHARDING", {})
+        shard_count = sharding.get("COUNT", 1)
+        if shard_count <= 1:
+            raise ConfigError(
+                "汇总分片需要分片总数大于 1",
+                "请设置环境变量 SHARD_COUNT 或 config.yaml 中 crawler.sharding.count",
+            )
+
+        logger.info("=" * 70)
+        logger.info("开始汇总分片输出...")
+        logger.info("=" * 70)
+
+        base_dir = self._shard_base_dir()
+        if sharding.get("RUN_ID"):
+            shard_run = ShardRun(sharding["RUN_ID"], shard_count, base_dir)
+        else:
+            shard_run = ShardRun.latest(shard_count, base_dir)
+            if shard_run is None:
+                raise FetchError(f"没有找到分片输出: {base_dir or ShardRun.DEFAULT_BASE_DIR}")
+
+        with span("merge_shards"):
+            results, id_to_name, failed, unchanged, cancelled, stale = shard_run.merge(
+                self.config["PLATFORMS"]
+            )
 
-        return results, id_to_name, failed
+        report = shard_run.report
+        logger.info(
+            f"✅ 分片汇总完成: 运行 {shard_run.run_id}, "
+            f"分片 {len(report['merged'])}/{shard_count}, "
+            f"成功 {len(results) - len(stale) + len(unchanged)}/{len(self.config['PLATFORMS'])}, "
+            f"失败 {len(failed)}, 使用缓存数据 {len(stale)}, 内容未变化 {len(unchanged)}"
+        )
+        return results, id_to_name, failed, unchanged, cancelled, stale
 
     def _save_and_process_data(
-        self, results: Dict, id_to_name: Dict, failed: List
+        self,
+        results: Dict,
+        id_to_name: Dict,
+        failed: List,
+        unchanged: List,
+        stale: Dict,
     ) -> Tuple[Dict, Dict, Dict]:
         """保存并处理数据"""
         # 保存到文件
-        output_file = save_titles_to_file(results, id_to_name, failed)
+        with span("save"):
+            output_file = save_titles_to_file(
+                results,
+                id_to_name,
+                failed,
+                store=self.store,
+                export_txt=self.config.get("STORAGE_EXPORT_TXT", True),
+                seen_index=self._get_seen_index() if self.store is None else None,
+                unchanged_ids=unchanged,
+                stale_ids=list(stale),
+            )
+            # 快照写入成功后才保存校验信息，保证“未变化”总能沿用到已保存的标题
+            if self.fetcher.validator_cache is not None:
+                self.fetcher.validator_cache.save()
         logger.info(f"💾 数据已保存: {output_file}")
 
         # 读取当日所有数据
         current_platform_ids = [p["id"] for p in self.config["PLATFORMS"]]
-        all_results, final_id_to_name, title_info = read_all_today_titles(
-            current_platform_ids=current_platform_ids
-        )
+        with span("aggregate"):
+            all_results, final_id_to_name, title_info = read_all_today_titles(
+                current_platform_ids=current_platform_ids,
+                aggregate=self._get_day_aggregate(),
+            )
 
         logger.info(
             f"📚 读取当日数据: {len(all_results)} 个平台, {sum(len(titles) for titles in all_results.values())} 条标题"
         )
 
         # 检测新增
-        new_titles = detect_latest_new_titles(current_platform_ids)
+        with span("detect_new"):
+            new_titles = detect_latest_new_titles(
+                current_platform_ids,
+                store=self.store,
+                seen_index=self._get_seen_index() if self.store is None else None,
+            )
         new_count = sum(len(titles) for titles in new_titles.values())
         logger.info(f"🆕 检测到 {new_count} 条新增标题")
 
         return all_results, title_info, new_titles
 
+    def _get_day_aggregate(self) -> DayAggregate:
+        """获取当日聚合状态，跨天时切换到新的一天"""
+        date_folder = format_date_folder()
+        if self.day_aggregate is None or self.day_aggregate.date_folder != date_folder:
+            self.day_aggregate = DayAggregate(
+                date_folder,
+                store=self.store,
+                track_trends=self.config.get("TREND", {}).get("ENABLED", True),
+            )
+            self.day_aggregate.load()
+        return self.day_aggregate
+
+    def _get_seen_index(self) -> SeenTitleIndex:
+        """获取当日已见标题索引，跨天时切换到新的一天"""
+        date_folder = format_date_folder()
+        if self.seen_index is None or self.seen_index.date_folder != date_folder:
+            self.seen_index = SeenTitleIndex(date_folder)
+            self.seen_index.load()
+        return self.seen_index
+
     def _analyze_and_match(
         self, all_results: Dict, id_to_name: Dict, title_info: Dict, new_titles: Dict
     ) -> Tuple[List[Dict], int]:
@@ -248,15 +496,29 @@ class TrendRadarApp:
         else:
             weight_config = None  # 使用默认值
 
-        stats = count_word_frequency(
-            results=all_results,
-            word_groups=self.word_groups,
-            filter_words=self.filter_words,
-            id_to_name=id_to_name,
-            title_info=title_info,
-            rank_threshold=rank_threshold,
-            weight_config=weight_config,
-        )
+        # 排名走势（当日聚合状态中记录了各标题每次快照的排名时）
+        trends = None
+        aggregate = self.day_aggregate
+        if aggregate is not None and aggregate.trajectories is not None:
+            with span("trends"):
+                trends = aggregate.trajectories.analyze(
+                    top_n=self.config.get("TREND", {}).get("TOP_N", 10),
+                    platform_ids=list(all_results),
+                )
+
+        with span("match"):
+            stats = count_word_frequency(
+                results=all_results,
+                word_groups=self.word_groups,
+                filter_words=self.filter_words,
+                id_to_name=id_to_name,
+                title_info=title_info,
+                rank_threshold=rank_threshold,
+                weight_config=weight_config,
+                matcher=self.matcher,
+                trends=trends,
+                max_news=self.config.get("MAX_NEWS", 0),
+            )
 
         # count_word_frequency 返回的是扁平的新闻列表
         # 需要转换为词组格式以兼容报告生成
@@ -290,20 +552,26 @@ class TrendRadarApp:
         failed: List,
         new_titles: Dict,
         id_to_name: Dict,
+        cancelled: List,
+        stale: Dict,
     ) -> str:
         """生成 HTML 报告"""
         mode = self.config.get("REPORT_MODE", "daily")
 
         try:
-            html_file = generate_html_report(
-                stats=stats,
-                total_titles=total_titles,
-                failed_ids=failed,
-                new_titles=new_titles,
-                id_to_name=id_to_name,
-                mode=mode,
-                is_daily_summary=True,
-            )
+            with span("render"):
+                html_file = generate_html_report(
+                    stats=stats,
+                    total_titles=total_titles,
+                    failed_ids=failed,
+                    new_titles=new_titles,
+                    id_to_name=id_to_name,
+                    mode=mode,
+                    is_daily_summary=True,
+                    matcher=self.matcher,
+                    cancelled_ids=cancelled,
+                    stale_ages=stale,
+                )
 
             logger.info(f"📄 HTML报告已生成: {html_file}")
             return html_file
@@ -312,7 +580,13 @@ class TrendRadarApp:
             return None
 
     def _send_notifications(
-        self, stats: List[Dict], failed: List, new_titles: Dict, id_to_name: Dict
+        self,
+        stats: List[Dict],
+        failed: List,
+        new_titles: Dict,
+        id_to_name: Dict,
+        cancelled: List,
+        stale: Dict,
     ):
         """发送推送通知"""
         if not self.config.get("ENABLE_NOTIFICATION"):
@@ -327,7 +601,16 @@ class TrendRadarApp:
         from trendradar.core.reporter import prepare_report_data
 
         mode = self.config.get("REPORT_MODE", "daily")
-        report_data = prepare_report_data(stats, failed, new_titles, id_to_name, mode)
+        report_data = prepare_report_data(
+            stats,
+            failed,
+            new_titles,
+            id_to_name,
+            mode,
+            matcher=self.matcher,
+            cancelled_ids=cancelled,
+            stale_ages=stale,
+        )
         report_type = "每日汇总报告"
 
         # 检查是否有内容
@@ -335,72 +618,36 @@ class TrendRadarApp:
             logger.info("📭 没有匹配的新闻，跳过推送")
             return
 
-        # 获取代理设置
-        proxy_url = None
-        if not self.is_github_actions and self.config.get("USE_PROXY"):
-            proxy_url = self.config.get("DEFAULT_PROXY")
+        # 所有渠道在共享会话上并发推送，总耗时约等于最慢的渠道
+        dispatcher = NotificationDispatcher.from_config(
+            self.config, proxy_pool=self.proxy_pool
+        )
+        if not dispatcher.notifiers:
+            logger.warning("⚠️  未配置任何推送渠道")
+            return
 
-        success_count = 0
+        start_time = time.perf_counter()
+        with span("notify"):
+            channel_results = dispatcher.dispatch(report_data, report_type, mode=mode)
+        duration = time.perf_counter() - start_time
 
-        # 飞书推送
-        feishu_url = self.config.get("WEBHOOKS", {}).get("feishu_url")
-        if feishu_url:
-            try:
-                from trendradar.notifiers.feishu import FeishuNotifier
-
-                notifier = FeishuNotifier(webhook_url=feishu_url, proxy_url=proxy_url)
-                if notifier.send(report_data, report_type, mode=mode):
-                    success_count += 1
-            except Exception as e:
-                logger.error(f"飞书推送失败: {e}")
-
-        # 钉钉推送
-        dingtalk_url = self.config.get("WEBHOOKS", {}).get("dingtalk_url")
-        if dingtalk_url:
-            try:
-                from trendradar.notifiers.dingtalk import DingTalkNotifier
-
-                notifier = DingTalkNotifier(
-                    webhook_url=dingtalk_url, proxy_url=proxy_url
-                )
-                if notifier.send(report_data, report_type, mode=mode):
-                    success_count += 1
-            except Exception as e:
-                logger.error(f"钉钉推送失败: {e}")
-
-        # 企业微信推送
-        wework_url = self.config.get("WEBHOOKS", {}).get("wework_url")
-        if wework_url:
-            try:
-                from trendradar.notifiers.wework import WeWorkNotifier
-
-                notifier = WeWorkNotifier(webhook_url=wework_url, proxy_url=proxy_url)
-                if notifier.send(report_data, report_type, mode=mode):
-                    success_count += 1
-            except Exception as e:
-                logger.error(f"企业微信推送失败: {e}")
-
-        # Telegram推送
-        telegram_token = self.config.get("WEBHOOKS", {}).get("telegram_bot_token")
-        telegram_chat_id = self.config.get("WEBHOOKS", {}).get("telegram_chat_id")
-        if telegram_token and telegram_chat_id:
-            try:
-                from trendradar.notifiers.telegram import TelegramNotifier
-
-                notifier = TelegramNotifier(
-                    bot_token=telegram_token,
-                    chat_id=telegram_chat_id,
-                    proxy_url=proxy_url,
+        success_count = 0
+        for name, result in channel_results.items():
+            if result["success"]:
+                success_count += 1
+                logger.info(f"  ✅ {name}: {result['duration']:.2f}秒")
+            else:
+                logger.error(
+                    f"  ❌ {name}: {result['duration']:.2f}秒, {result['error']}"
                 )
-                if notifier.send(report_data, report_type, mode=mode):
-                    success_count += 1
-            except Exception as e:
-                logger.error(f"Telegram推送失败: {e}")
 
         if success_count > 0:
-            logger.info(f"✅ 推送完成: {success_count} 个渠道成功")
+            logger.info(
+                f"✅ 推送完成: {success_count}/{len(channel_results)} 个渠道成功, "
+                f"耗时 {duration:.2f}秒"
+            )
         else:
-            logger.warning("⚠️  所有推送渠道失败或未配置")
+            logger.warning("⚠️  所有推送渠道失败")
 
     def _open_browser(self, html_file: str):
         """打开浏览器查看报告"""
@@ -415,47 +662,79 @@ class TrendRadarApp:
         except Exception as e:
             logger.error(f"打开浏览器失败: {e}")
 
-    def run(self):
-        """运行主流程"""
+    def _run_pipeline(self):
+        """执行一次完整流程，并记录各阶段指标"""
+        metrics = RunMetrics()
         try:
-            # 显示环境信息
-            now = get_beijing_time()
-            logger.info(f"⏰ 北京时间: {now.strftime('%Y-%m-%d %H:%M:%S')}")
-            logger.info(f"📊 报告模式: {self.config.get('REPORT_MODE', 'daily')}")
-            logger.info(
-                f"🖥️  运行环境: {'GitHub Actions' if self.is_github_actions else 'Docker' if self.is_docker else '本地'}"
+            with metrics:
+                self._run_stages()
+        finally:
+            metrics_file = metrics.write()
+            stage_summary = " | ".join(
+                f"{name} {duration:.2f}s"
+                for name, duration in metrics.stage_totals().items()
+                if name in self.SUMMARY_STAGES
             )
+            logger.info(f"⏱️  总耗时 {metrics.wall:.2f}秒: {stage_summary}")
+            if metrics_file:
+                logger.debug(f"运行指标已写入: {metrics_file}")
+
+    def _run_stages(self):
+        """执行一次完整流程：抓取、保存、分析、报告、推送"""
+        # 显示环境信息
+        now = get_beijing_time()
+        logger.info(f"⏰ 北京时间: {now.strftime('%Y-%m-%d %H:%M:%S')}")
+        logger.info(f"📊 报告模式: {self.config.get('REPORT_MODE', 'daily')}")
+        logger.info(
+            f"🖥️  运行环境: {'GitHub Actions' if self.is_github_actions else 'Docker' if self.is_docker else '本地'}"
+        )
 
-            # 1. 抓取数据
-            results, id_to_name, failed = self._fetch_data()
+        # 1. 抓取数据，分片汇总步骤改为合并各工作节点的分片输出
+        if self.merge_shards:
+            fetched = self._merge_shards()
+        else:
+            fetched = self._fetch_data()
+        results, id_to_name, failed, unchanged, cancelled, stale = fetched
 
-            # 2. 保存并处理数据
-            all_results, title_info, new_titles = self._save_and_process_data(
-                results, id_to_name, failed
-            )
+        if self.shard_index is not None:
+            self._write_shard(results, failed, unchanged, cancelled, stale)
+            logger.info("✅ 分片抓取完成，等待汇总步骤（--merge-shards）保存和推送")
+            return
 
-            # 3. 分析并匹配
-            stats, total_matched = self._analyze_and_match(
-                all_results, id_to_name, title_info, new_titles
-            )
+        # 2. 保存并处理数据
+        all_results, title_info, new_titles = self._save_and_process_data(
+            results, id_to_name, failed, unchanged, stale
+        )
 
-            # 4. 生成 HTML 报告
-            total_titles = sum(len(titles) for titles in all_results.values())
-            html_file = self._generate_html_report(
-                stats, total_titles, failed, new_titles, id_to_name
-            )
+        # 3. 分析并匹配
+        stats, total_matched = self._analyze_and_match(
+            all_results, id_to_name, title_info, new_titles
+        )
+
+        # 4. 生成 HTML 报告
+        total_titles = sum(len(titles) for titles in all_results.values())
+        html_file = self._generate_html_report(
+            stats, total_titles, failed, new_titles, id_to_name, cancelled, stale
+        )
 
-            # 5. 发送推送通知
-            self._send_notifications(stats, failed, new_titles, id_to_name)
+        # 5. 发送推送通知
+        self._send_notifications(
+            stats, failed, new_titles, id_to_name, cancelled, stale
+        )
 
-            # 6. 打开浏览器
-            # if html_file:
-            #    self._open_browser(html_file)
+        # 6. 打开浏览器
+        # if html_file:
+        #    self._open_browser(html_file)
 
-            # 完成
-            logger.info("=" * 70)
-            logger.info("✅ TrendRadar 运行完成！")
-            logger.info("=" * 70)
+        # 完成
+        logger.info("=" * 70)
+        logger.info("✅ TrendRadar 运行完成！")
+        logger.info("=" * 70)
+
+    def run(self):
+        """运行主流程"""
+        try:
+            self._run_pipeline()
 
         except KeyboardInterrupt:
             logger.info("\n⚠️  用户中断")
@@ -464,12 +743,80 @@ class TrendRadarApp:
             logger.error(f"❌ 运行失败: {e}", exc_info=True)
             sys.exit(1)
 
+    def _run_scheduled(self):
+        """常驻模式下的单次运行
+
+        调度器在同一线程中串行执行任务并跳过运行期间错过的触发点，运行不会重叠
+        """
+        try:
+            self._run_pipeline()
+        except Exception as e:
+            # 单次失败不影响后续调度
+            logger.error(f"❌ 运行失败: {e}", exc_info=True)
+
+    def run_daemon(self, cron_schedule: str, run_immediately: bool = False):
+        """常驻模式：按 cron 表达式在进程内定时运行
+
+        抓取会话、关键词匹配器和当日聚合状态在多次运行之间保持常驻，
+        收到 SIGTERM/SIGINT 后等待当前运行结束再退出
+
+        Args:
+            cron_schedule: cron 表达式
+            run_immediately: 启动时是否立即运行一次
+        """
+        try:
+            scheduler = CronScheduler(cron_schedule, self._run_scheduled)
+        except ConfigError as e:
+            logger.error(f"❌ 配置错误: {e.message}")
+            if e.solution:
+                logger.error(f"💡 解决方案: {e.solution}")
+            sys.exit(1)
+
+        def handle_signal(signum, frame):
+            logger.info(f"收到信号 {signum}，当前运行结束后退出")
+            scheduler.stop()
+
+        signal.signal(signal.SIGTERM, handle_signal)
+        signal.signal(signal.SIGINT, handle_signal)
+
+        logger.info(f"🕒 常驻模式启动: {cron_schedule}")
+        self.fetcher.open()
+        try:
+            scheduler.run_forever(run_immediately=run_immediately)
+        finally:
+            self.fetcher.close()
+            if self.store is not None:
+                self.store.close()
+            logger.info("👋 TrendRadar 常驻模式已退出")
+
 
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="TrendRadar 热点聚合与推送")
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="常驻模式，按 CRON_SCHEDULE 在进程内定时运行",
+    )
+    parser.add_argument(
+        "--merge-shards",
+        action="store_true",
+        help="汇总分片抓取的输出后保存和推送（分片总数读取 SHARD_COUNT）",
+    )
+    parser.add_argument(
+        "--schedule",
+        default=os.environ.get("CRON_SCHEDULE", "*/30 * * * *"),
+        help="常驻模式的 cron 表达式，按北京时间计算（默认读取 CRON_SCHEDULE）",
+    )
+    args = parser.parse_args()
+
     try:
-        app = TrendRadarApp()
-        app.run()
+        app = TrendRadarApp(merge_shards=args.merge_shards)
+        if args.daemon:
+            run_immediately = os.environ.get("IMMEDIATE_RUN", "false") == "true"
+            app.run_daemon(args.schedule, run_immediately=run_immediately)
+        else:
+            app.run()
     except Exception as e:
         logger.error(f"❌ 程序异常: {e}", exc_info=True)
         sys.exit(1)
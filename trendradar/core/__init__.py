@@ -2,37 +2,90 @@
 核心业务逻辑模块
 """
 
+from .aggregate import DayAggregate
 from .analyzer import (
     calculate_statistics,
     detect_latest_new_titles,
     process_source_data,
 )
-from .fetcher import DataFetcher
+from .circuit_breaker import CircuitBreaker
+from .endpoints import EndpointPool
+from .fetcher import DataFetcher, parse_platform_titles
+from .hedging import HedgePolicy
+from .http_cache import HttpValidatorCache, hash_body
+from .last_good import LastGoodCache
 from .matcher import (
+    WordGroupMatcher,
     calculate_news_weight,
+    calculate_news_weights,
     count_word_frequency,
     format_rank_display,
     matches_word_groups,
 )
+from .records import MatchedTitle, TitleAccumulator, TitleRecord, TitleResult
 from .reporter import generate_html_report, prepare_report_data, render_html_content
-from .storage import parse_file_titles, read_all_today_titles, save_titles_to_file
+from .seen_index import SeenTitleIndex
+from .sharding import ShardRun, select_shard, shard_of
+from .snapshot_store import SnapshotStore, hash_title
+from .storage import (
+    parse_file_titles,
+    parse_snapshot_file,
+    read_all_today_titles,
+    save_titles_to_file,
+)
+from .trends import RankTrajectories, TitleTrend, format_trend_display
 
 __all__ = [
     # fetcher
     "DataFetcher",
+    "parse_platform_titles",
+    # circuit_breaker
+    "CircuitBreaker",
+    # endpoints
+    "EndpointPool",
+    # hedging
+    "HedgePolicy",
+    # http_cache
+    "HttpValidatorCache",
+    "hash_body",
+    # last_good
+    "LastGoodCache",
     # storage
     "save_titles_to_file",
     "parse_file_titles",
+    "parse_snapshot_file",
     "read_all_today_titles",
+    # aggregate
+    "DayAggregate",
+    # seen_index
+    "SeenTitleIndex",
+    # sharding
+    "ShardRun",
+    "select_shard",
+    "shard_of",
+    # snapshot_store
+    "SnapshotStore",
+    "hash_title",
     # analyzer
     "process_source_data",
     "detect_latest_new_titles",
     "calculate_statistics",
     # matcher
     "calculate_news_weight",
+    "calculate_news_weights",
     "matches_word_groups",
+    "WordGroupMatcher",
     "format_rank_display",
     "count_word_frequency",
+    # records
+    "TitleRecord",
+    "TitleAccumulator",
+    "TitleResult",
+    "MatchedTitle",
+    # trends
+    "RankTrajectories",
+    "TitleTrend",
+    "format_trend_display",
     # reporter
     "prepare_report_data",
     "generate_html_report",
@@ -0,0 +1,503 @@
+"""
+当日聚合状态模块
+
+持久化当日累计结果，每次运行只合并新增的快照（txt 文件或数据库快照）。
+状态分为基础状态文件和增量日志：每次运行只把新合并的快照内容追加到日志，
+日志超过基础状态文件大小时才整体重写（合并），写入量与新增快照成正比
+"""
+
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from ..utils.file_utils import load_state, write_state_atomic
+from ..utils.logger import get_logger
+from ..utils.time_utils import format_date_folder
+from .analyzer import process_source_data
+from .records import TitleAccumulator, TitleResult
+from .storage import parse_snapshot_file
+from .trends import RankTrajectories
+
+if TYPE_CHECKING:
+    from .snapshot_store import SnapshotStore
+
+logger = get_logger(__name__)
+
+
+def file_signature(file_path: Path) -> List[int]:
+    """获取文件签名，用于判断已合并的文件是否被改写
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        [文件大小, 修改时间(ns)]
+    """
+    stat = file_path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def snapshots_consistent(
+    applied: Dict[str, List[int]], signatures: Dict[str, List[int]]
+) -> bool:
+    """检查已合并的快照是否仍与当前快照一致
+
+    Args:
+        applied: 已合并的快照签名 {名称: 签名}
+        signatures: 当日所有快照的签名
+
+    Returns:
+        是否可以在现有状态上增量合并
+    """
+    for name, signature in applied.items():
+        if signatures.get(name) != list(signature):
+            return False
+
+    # 新快照必须排在已合并快照之后，否则 first_time 等字段顺序会错乱
+    if applied:
+        last_applied = max(applied)
+        for name in signatures:
+            if name not in applied and name < last_applied:
+                return False
+
+    return True
+
+
+class DayAggregate:
+    """当日聚合状态
+
+    保存 all_results、title_info、各标题的排名走势和已合并的快照列表，
+    状态文件缺失、损坏或与快照不一致时自动从快照重建。
+    新合并的快照以一行 JSON 追加到增量日志，加载时在基础状态上按顺序重放；
+    合并日志时先原子替换基础状态文件再清空日志，
+    日志中已包含在基础状态中的快照在重放时跳过。
+    快照来源为当日 txt 文件，或传入 store 时为数据库中的当日快照。
+    快照中标记为内容未变化的平台沿用该平台上一次的标题
+    """
+
+    # 状态文件格式版本，格式变化时递增以触发重建
+    # 3: title_info 中的标题记录保存为字段列表
+    # 4: all_results 改为读取 title_info 中累计记录的视图，不再单独保存
+    # 5: 增加各标题每次快照的排名（trajectories）
+    STATE_VERSION = 5
+
+    STATE_FILENAME = "day_aggregate.json"
+
+    LOG_FILENAME = "day_aggregate.log"
+
+    # 日志超过基础状态文件大小且不小于该值时合并，重写的总量摊到每次追加上为常数倍
+    COMPACT_MIN_BYTES = 1 << 20
+
+    def __init__(
+        self,
+        date_folder: Optional[str] = None,
+        output_dir: str = "output",
+        store: Optional["SnapshotStore"] = None,
+        track_trends: bool = True,
+    ):
+        """初始化当日聚合状态
+
+        Args:
+            date_folder: 日期文件夹名称，默认为北京时间当天
+            output_dir: 输出根目录
+            store: SQLite 快照存储，None 表示从 txt 文件读取
+            track_trends: 是否记录各标题每次快照的排名，用于计算排名走势
+        """
+        self.date_folder = date_folder or format_date_folder()
+        self.output_dir = output_dir
+        self.store = store
+        self.track_trends = track_trends
+        self.backend = "sqlite" if store is not None else "txt"
+        day_dir = Path(output_dir) / self.date_folder
+        self.txt_dir = day_dir / "txt"
+        self.state_path = day_dir / "state" / self.STATE_FILENAME
+        self.log_path = self.state_path.with_name(self.LOG_FILENAME)
+        self._reset()
+
+    def for_date(self, date_folder: Optional[str] = None) -> "DayAggregate":
+        """创建另一天的空聚合状态，沿用输出目录、快照存储和走势记录设置
+
+        Args:
+            date_folder: 日期文件夹名称，默认为北京时间当天
+
+        Returns:
+            新的聚合状态（未加载）
+        """
+        return DayAggregate(
+            date_folder,
+            output_dir=self.output_dir,
+            store=self.store,
+            track_trends=self.track_trends,
+        )
+
+    def _reset(self) -> None:
+        """清空内存中的聚合数据"""
+        self.all_results: Dict = {}
+        self.id_to_name: Dict = {}
+        self.title_info: Dict = {}
+        # 各平台最近一次的标题，供内容未变化的平台沿用
+        self.last_titles: Dict = {}
+        # 各标题每次快照的排名，不记录时为 None
+        self.trajectories: Optional[RankTrajectories] = (
+            RankTrajectories() if self.track_trends else None
+        )
+        # 已合并的快照 {名称: 签名}
+        # txt: {文件名: [文件大小, 修改时间(ns)]}；sqlite: {时间: [快照 ID]}
+        self.applied_files: Dict[str, List[int]] = {}
+        # 已合并但尚未写入日志的快照内容
+        self._pending: List[Tuple] = []
+        self._base_bytes = 0
+        self._log_bytes = 0
+        # 内存中的状态与磁盘上的基础状态 + 日志不再对应，下次保存时整体重写
+        self._compact = True
+
+    # ========== 持久化 ==========
+
+    def load(self) -> bool:
+        """从状态文件加载聚合数据
+
+        Returns:
+            是否加载成功，失败时聚合数据为空
+        """
+        if not self.state_path.exists():
+            return False
+
+        try:
+            state = load_state(self.state_path, self.STATE_VERSION)
+            if state.get("date_folder") != self.date_folder:
+                raise ValueError(f"状态日期不匹配: {state.get('date_folder')}")
+            if state.get("backend", "txt") != self.backend:
+                raise ValueError(f"存储后端不匹配: {state.get('backend', 'txt')}")
+
+            id_to_name = state["id_to_name"]
+            title_info = {
+                source_id: {
+                    title: TitleAccumulator.from_list(values)
+                    for title, values in titles.items()
+                }
+                for source_id, titles in state["title_info"].items()
+            }
+            last_titles = state["last_titles"]
+            applied_files = state["applied_files"]
+            if self.track_trends:
+                if state.get("trajectories") is None:
+                    raise ValueError("状态中没有排名走势")
+                trajectories = RankTrajectories.from_state(state["trajectories"])
+            else:
+                trajectories = None
+            if not all(
+                isinstance(value, dict)
+                for value in (id_to_name, last_titles, applied_files)
+            ):
+                raise ValueError("状态字段类型错误")
+            all_results = {
+                source_id: {
+                    title: TitleResult(record) for title, record in records.items()
+                }
+                for source_id, records in title_info.items()
+            }
+
+            base_bytes = self.state_path.stat().st_size
+
+        except Exception as e:
+            logger.warning(f"聚合状态文件无效，将从快照文件重建: {e}")
+            self._reset()
+            return False
+
+        self.all_results = all_results
+        self.id_to_name = id_to_name
+        self.title_info = title_info
+        self.last_titles = last_titles
+        self.trajectories = trajectories
+        self.applied_files = applied_files
+        self._base_bytes = base_bytes
+        self._compact = False
+        replayed = self._replay_log()
+        logger.debug(f"加载聚合状态: 已合并 {len(self.applied_files)} 个文件，日志重放 {replayed} 个")
+        return True
+
+    def _replay_log(self) -> int:
+        """在基础状态上重放增量日志
+
+        日志末尾不完整或格式错误的行及其后的内容不再使用，
+        缺少的快照由 refresh 从快照重新合并，下次保存时整体重写
+
+        Returns:
+            重放的快照数
+        """
+        if not self.log_path.exists():
+            return 0
+
+        replayed = 0
+        try:
+            with open(self.log_path, "rb") as f:
+                for line in f:
+                    try:
+                        entry = self._decode_entry(line)
+                    except ValueError as e:
+                        logger.warning(f"聚合状态日志损坏，忽略后续内容: {e}")
+                        self._compact = True
+                        break
+                    if entry[0] in self.applied_files:
+                        # 合并日志时在清空前中断，这些快照已包含在基础状态中
+                        continue
+                    self._merge(*entry)
+                    replayed += 1
+            self._log_bytes = self.log_path.stat().st_size
+        except OSError as e:
+            logger.warning(f"读取聚合状态日志失败: {e}")
+            self._compact = True
+        return replayed
+
+    @staticmethod
+    def _encode_entry(
+        name: str,
+        signature: List[int],
+        time_info: str,
+        titles_by_id: Dict,
+        id_to_name: Dict,
+        unchanged_ids: List[str],
+        stale_ids: List[str],
+    ) -> bytes:
+        """把一个快照的内容编码为一行日志，标题数据保存为 [排名, 链接, 移动端链接]"""
+        entry = {
+            "name": name,
+            "signature": signature,
+            "time": time_info,
+            "id_to_name": id_to_name,
+            "titles": {
+                source_id: {
+                    title: [
+                        data.get("ranks", []),
+                        data.get("url", ""),
+                        data.get("mobileUrl", ""),
+                    ]
+                    for title, data in title_data.items()
+                }
+                for source_id, title_data in titles_by_id.items()
+            },
+            "unchanged": unchanged_ids,
+            "stale": stale_ids,
+        }
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+        return line.encode("utf-8") + b"\n"
+
+    @staticmethod
+    def _decode_entry(line: bytes) -> Tuple:
+        """解析一行日志，返回 _merge 的参数
+
+        Raises:
+            ValueError: 格式错误（包括写入中断导致的不完整行）
+        """
+        if not line.endswith(b"\n"):
+            raise ValueError("日志行不完整")
+        try:
+            entry = json.loads(line)
+            titles_by_id = {
+                source_id: {
+                    title: {"ranks": ranks, "url": url, "mobileUrl": mobile_url}
+                    for title, (ranks, url, mobile_url) in titles.items()
+                }
+                for source_id, titles in entry["titles"].items()
+            }
+            return (
+                entry["name"],
+                list(entry["signature"]),
+                entry["time"],
+                titles_by_id,
+                dict(entry["id_to_name"]),
+                list(entry["unchanged"]),
+                list(entry["stale"]),
+            )
+        except (TypeError, KeyError, AttributeError, ValueError) as e:
+            raise ValueError(f"日志行格式错误: {e}") from e
+
+    def save(self) -> None:
+        """保存新合并的快照
+
+        通常只把上次保存后新合并的快照追加到日志；
+        状态重建过或日志超过基础状态文件大小时改为整体重写基础状态文件并清空日志
+        """
+        if not self._compact and not self._pending:
+            return
+
+        lines = [self._encode_entry(*entry) for entry in self._pending]
+        log_bytes = self._log_bytes + sum(len(line) for line in lines)
+        if self._compact or log_bytes > max(self._base_bytes, self.COMPACT_MIN_BYTES):
+            self._write_base()
+            return
+
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            with open(self.log_path, "ab") as f:
+                f.write(b"".join(lines))
+        except Exception as e:
+            # 可能留下不完整的行，下次保存时整体重写
+            logger.warning(f"追加聚合状态日志失败: {e}")
+            self._compact = True
+            return
+        self._pending = []
+        self._log_bytes = log_bytes
+
+    def _write_base(self) -> None:
+        """原子写入基础状态文件并清空日志"""
+        state = {
+            "version": self.STATE_VERSION,
+            "date_folder": self.date_folder,
+            "backend": self.backend,
+            "applied_files": self.applied_files,
+            "id_to_name": self.id_to_name,
+            "title_info": {
+                source_id: {title: record.to_list() for title, record in titles.items()}
+                for source_id, titles in self.title_info.items()
+            },
+            "last_titles": self.last_titles,
+            "trajectories": (
+                self.trajectories.to_state() if self.trajectories is not None else None
+            ),
+        }
+
+        # 状态文件只是缓存，写入失败不影响本次结果，下次保存时再整体重写
+        if not write_state_atomic(self.state_path, state):
+            self._compact = True
+            return
+        try:
+            # 基础状态已包含日志中的全部快照，清空前中断时重放会跳过这些快照
+            open(self.log_path, "wb").close()
+            self._base_bytes = self.state_path.stat().st_size
+        except OSError as e:
+            logger.warning(f"清空聚合状态日志失败: {e}")
+            self._compact = True
+            return
+        self._pending = []
+        self._log_bytes = 0
+        self._compact = False
+
+    # ========== 合并 ==========
+
+    def _list_snapshots(self) -> Dict[str, List[int]]:
+        """列出当日全部快照及其签名（按时间排序）"""
+        if self.store is not None:
+            return {
+                time_info: [snapshot_id]
+                for snapshot_id, time_info in self.store.list_snapshots(
+                    self.date_folder
+                )
+            }
+
+        if not self.txt_dir.exists():
+            return {}
+        files = sorted(f for f in self.txt_dir.iterdir() if f.suffix == ".txt")
+        return {f.name: file_signature(f) for f in files}
+
+    def has_snapshots(self) -> bool:
+        """当日是否已有快照"""
+        if self.store is not None:
+            return bool(self.store.list_snapshots(self.date_folder))
+        return self.txt_dir.exists()
+
+    def _apply_snapshot(self, name: str, signature: List[int]) -> None:
+        """读取并合并单个快照，记入待写入日志的快照"""
+        if self.store is not None:
+            titles_by_id, snapshot_id_to_name = self.store.load_snapshot(signature[0])
+            unchanged_ids = self.store.unchanged_platforms(signature[0])
+            stale_ids = self.store.stale_platforms(signature[0])
+            time_info = name
+        else:
+            file_path = self.txt_dir / name
+            (
+                titles_by_id,
+                snapshot_id_to_name,
+                unchanged_ids,
+                stale_ids,
+            ) = parse_snapshot_file(file_path)
+            time_info = file_path.stem
+
+        entry = (
+            name,
+            signature,
+            time_info,
+            titles_by_id,
+            snapshot_id_to_name,
+            unchanged_ids,
+            stale_ids,
+        )
+        self._merge(*entry)
+        self._pending.append(entry)
+
+    def _merge(
+        self,
+        name: str,
+        signature: List[int],
+        time_info: str,
+        titles_by_id: Dict,
+        snapshot_id_to_name: Dict,
+        unchanged_ids: List[str],
+        stale_ids: List[str],
+    ) -> None:
+        """合并单个快照的内容，titles_by_id 不会被修改"""
+        titles_by_id = dict(titles_by_id)
+        for source_id in unchanged_ids:
+            if source_id in titles_by_id:
+                continue
+            if source_id not in self.last_titles:
+                logger.warning(f"平台 {source_id} 标记为未变化，但当日没有可沿用的标题")
+                continue
+            titles_by_id[source_id] = self.last_titles[source_id]
+
+        self.id_to_name.update(snapshot_id_to_name)
+        for source_id, title_data in titles_by_id.items():
+            # 缓存数据只保证平台不缺失，不计入出现次数
+            process_source_data(
+                source_id,
+                title_data,
+                time_info,
+                self.all_results,
+                self.title_info,
+                is_stale=source_id in stale_ids,
+            )
+            # process_source_data 不修改传入的标题数据，可以直接保存
+            self.last_titles[source_id] = title_data
+            if self.trajectories is not None and source_id not in stale_ids:
+                self.trajectories.observe(source_id, time_info, title_data)
+
+        self.applied_files[name] = signature
+
+    def refresh(self) -> int:
+        """合并尚未处理的快照
+
+        Returns:
+            本次新合并的快照数
+        """
+        signatures = self._list_snapshots()
+
+        if not snapshots_consistent(self.applied_files, signatures):
+            logger.info("聚合状态与快照不一致，从快照重建")
+            self._reset()
+
+        pending = [name for name in signatures if name not in self.applied_files]
+        for name in pending:
+            self._apply_snapshot(name, signatures[name])
+
+        logger.info(f"读取当日快照: {len(signatures)} 个, 本次合并 {len(pending)} 个")
+        return len(pending)
+
+    def view(
+        self, current_platform_ids: Optional[List[str]] = None
+    ) -> Tuple[Dict, Dict, Dict]:
+        """按平台过滤后的聚合结果
+
+        Args:
+            current_platform_ids: 当前监控的平台ID列表，None表示不过滤
+
+        Returns:
+            (all_results, id_to_name, title_info) 元组
+        """
+        if current_platform_ids is None:
+            return dict(self.all_results), dict(self.id_to_name), dict(self.title_info)
+
+        platform_ids = set(current_platform_ids)
+        all_results = {k: v for k, v in self.all_results.items() if k in platform_ids}
+        id_to_name = {k: v for k, v in self.id_to_name.items() if k in platform_ids}
+        title_info = {k: v for k, v in self.title_info.items() if k in platform_ids}
+        return all_results, id_to_name, title_info
@@ -4,11 +4,15 @@
 负责数据的处理、分析和统计
 """
 
-from pathlib import Path
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 from ..utils.logger import get_logger
 from ..utils.time_utils import format_date_folder
+from .records import TitleAccumulator, TitleResult
+
+if TYPE_CHECKING:
+    from .seen_index import SeenTitleIndex
+    from .snapshot_store import SnapshotStore
 
 logger = get_logger(__name__)
 
@@ -19,157 +23,88 @@ def process_source_data(
     time_info: str,
     all_results: Dict,
     title_info: Dict,
+    is_stale: bool = False,
 ) -> None:
     """处理来源数据，合并重复标题
 
+    每条标题对应一个 TitleAccumulator，all_results 中为读取它的 TitleResult 视图，
+    再次出现时原地更新，不复制排名列表，也不重建字典
+
     Args:
         source_id: 平台ID
         title_data: 标题数据
         time_info: 时间信息
-        all_results: 累计结果（会被修改）
-        title_info: 标题详细信息（会被修改）
+        all_results: 累计结果 {平台ID: {标题: TitleResult}}（会被修改）
+        title_info: 标题详细信息 {平台ID: {标题: TitleAccumulator}}（会被修改）
+        is_stale: 是否为抓取失败时代替的缓存数据；缓存数据不是新的一次出现，
+            已有标题的次数、最后出现时间和排名保持不变，只补入当日尚未出现的标题
     """
-    if source_id not in all_results:
-        # 首次出现的平台
-        all_results[source_id] = title_data
-
-        if source_id not in title_info:
-            title_info[source_id] = {}
-
-        for title, data in title_data.items():
-            ranks = data.get("ranks", [])
-            url = data.get("url", "")
-            mobile_url = data.get("mobileUrl", "")
-
-            title_info[source_id][title] = {
-                "first_time": time_info,
-                "last_time": time_info,
-                "count": 1,
-                "ranks": ranks,
-                "url": url,
-                "mobileUrl": mobile_url,
-            }
-    else:
-        # 已存在的平台，合并数据
-        for title, data in title_data.items():
-            ranks = data.get("ranks", [])
-            url = data.get("url", "")
-            mobile_url = data.get("mobileUrl", "")
-
-            if title not in all_results[source_id]:
-                # 新标题
-                all_results[source_id][title] = {
-                    "ranks": ranks,
-                    "url": url,
-                    "mobileUrl": mobile_url,
-                }
-                title_info[source_id][title] = {
-                    "first_time": time_info,
-                    "last_time": time_info,
-                    "count": 1,
-                    "ranks": ranks,
-                    "url": url,
-                    "mobileUrl": mobile_url,
-                }
-            else:
-                # 已存在的标题，合并排名
-                existing_data = all_results[source_id][title]
-                existing_ranks = existing_data.get("ranks", [])
-                existing_url = existing_data.get("url", "")
-                existing_mobile_url = existing_data.get("mobileUrl", "")
-
-                # 合并排名
-                merged_ranks = existing_ranks.copy()
-                for rank in ranks:
-                    if rank not in merged_ranks:
-                        merged_ranks.append(rank)
-
-                all_results[source_id][title] = {
-                    "ranks": merged_ranks,
-                    "url": existing_url or url,
-                    "mobileUrl": existing_mobile_url or mobile_url,
-                }
-
-                # 更新标题信息
-                title_info[source_id][title]["last_time"] = time_info
-                title_info[source_id][title]["ranks"] = merged_ranks
-                title_info[source_id][title]["count"] += 1
-                if not title_info[source_id][title].get("url"):
-                    title_info[source_id][title]["url"] = url
-                if not title_info[source_id][title].get("mobileUrl"):
-                    title_info[source_id][title]["mobileUrl"] = mobile_url
-
-
-def detect_latest_new_titles(current_platform_ids: Optional[List[str]] = None) -> Dict:
+    results = all_results.setdefault(source_id, {})
+    records = title_info.setdefault(source_id, {})
+
+    for title, data in title_data.items():
+        ranks = data.get("ranks", [])
+        url = data.get("url", "")
+        mobile_url = data.get("mobileUrl", "")
+
+        record = records.get(title)
+        if record is None:
+            # 新标题
+            record = TitleAccumulator(time_info, ranks, url, mobile_url)
+            records[title] = record
+            results[title] = TitleResult(record)
+        elif not is_stale:
+            # 已存在的标题，合并排名并更新次数和最后出现时间
+            record.observe(time_info, ranks, url, mobile_url)
+
+
+def detect_latest_new_titles(
+    current_platform_ids: Optional[List[str]] = None,
+    store: Optional["SnapshotStore"] = None,
+    seen_index: Optional["SeenTitleIndex"] = None,
+) -> Dict:
     """检测当日最新批次的新增标题
 
+    txt 存储时基于持久化的已见标题索引，只索引上次运行之后新增的快照文件，
+    最新快照中的每条标题只需一次查找
+
     Args:
         current_platform_ids: 当前监控的平台ID列表，None表示不过滤
+        store: SQLite 快照存储，None 表示从 txt 文件读取
+        seen_index: 复用的已见标题索引，None 表示从状态文件加载
 
     Returns:
         新增标题字典 {platform_id: {title: data}}
     """
-    from .storage import parse_file_titles  # 避免循环导入
+    from .seen_index import SeenTitleIndex  # 避免循环导入
 
     date_folder = format_date_folder()
-    txt_dir = Path("output") / date_folder / "txt"
 
-    if not txt_dir.exists():
-        logger.warning(f"当日目录不存在: {txt_dir}")
+    if store is not None:
+        new_titles = store.detect_new_titles(date_folder, current_platform_ids)
+        total_new = sum(len(titles) for titles in new_titles.values())
+        logger.info(f"检测到 {total_new} 条新增标题")
+        return new_titles
+
+    if seen_index is None or seen_index.date_folder != date_folder:
+        seen_index = SeenTitleIndex(date_folder)
+        seen_index.load()
+
+    if not seen_index.txt_dir.exists():
+        logger.warning(f"当日目录不存在: {seen_index.txt_dir}")
         return {}
 
-    files = sorted([f for f in txt_dir.iterdir() if f.suffix == ".txt"])
-    if len(files) < 2:
+    if seen_index.refresh():
+        seen_index.save()
+
+    if len(seen_index.applied_files) < 2:
         logger.info("文件数量不足，无法检测新增")
         return {}
 
-    # 解析最新文件
-    latest_file = files[-1]
-    logger.info(f"检测新增: 最新文件 {latest_file.name}")
-    latest_titles, _ = parse_file_titles(latest_file)
-
-    # 如果指定了当前平台列表，过滤最新文件数据
-    if current_platform_ids is not None:
-        filtered_latest_titles = {}
-        for source_id, title_data in latest_titles.items():
-            if source_id in current_platform_ids:
-                filtered_latest_titles[source_id] = title_data
-        latest_titles = filtered_latest_titles
-
-    # 汇总历史标题（按平台过滤）
-    historical_titles = {}
-    for file_path in files[:-1]:
-        historical_data, _ = parse_file_titles(file_path)
-
-        # 过滤历史数据
-        if current_platform_ids is not None:
-            filtered_historical_data = {}
-            for source_id, title_data in historical_data.items():
-                if source_id in current_platform_ids:
-                    filtered_historical_data[source_id] = title_data
-            historical_data = filtered_historical_data
-
-        for source_id, titles_data in historical_data.items():
-            if source_id not in historical_titles:
-                historical_titles[source_id] = set()
-            for title in titles_data.keys():
-                historical_titles[source_id].add(title)
-
-    # 找出新增标题
-    new_titles = {}
-    total_new = 0
-    for source_id, latest_source_titles in latest_titles.items():
-        historical_set = historical_titles.get(source_id, set())
-        source_new_titles = {}
-
-        for title, title_data in latest_source_titles.items():
-            if title not in historical_set:
-                source_new_titles[title] = title_data
-
-        if source_new_titles:
-            new_titles[source_id] = source_new_titles
-            total_new += len(source_new_titles)
+    logger.info(f"检测新增: 最新文件 {seen_index.latest_snapshot}")
+    new_titles = seen_index.new_titles(current_platform_ids)
 
+    total_new = sum(len(titles) for titles in new_titles.values())
     logger.info(f"检测到 {total_new} 条新增标题")
     return new_titles
 
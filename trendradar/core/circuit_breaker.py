@@ -0,0 +1,198 @@
+"""
+平台熔断模块
+
+按平台 ID 记录连续失败次数：连续失败达到阈值后熔断（open），
+冷却期内直接跳过该平台；冷却期结束后放行一次探测（half_open），
+探测成功恢复正常（closed），失败则重新熔断并把冷却期加倍
+"""
+
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from ..utils.file_utils import load_state, write_state_atomic
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """按平台熔断器
+
+    状态跨天保存在 output/state/circuit_breakers.json，
+    长期失效的平台不会在每天第一次运行时重新消耗重试
+    """
+
+    # 状态文件格式版本，格式变化时递增以丢弃旧状态
+    STATE_VERSION = 1
+
+    DEFAULT_STATE_PATH = "output/state/circuit_breakers.json"
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        cooldown: float = 600.0,
+        max_cooldown: float = 6 * 3600.0,
+        state_path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """初始化熔断器
+
+        Args:
+            failure_threshold: 连续失败多少次后熔断
+            cooldown: 第一次熔断的冷却时间（秒）
+            max_cooldown: 冷却时间上限（秒）
+            state_path: 状态文件路径，默认为 output/state/circuit_breakers.json
+            clock: 返回 Unix 时间戳的时钟，状态跨进程保存，不能使用单调时钟
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.max_cooldown = max(cooldown, max_cooldown)
+        self.state_path = Path(state_path or self.DEFAULT_STATE_PATH)
+        self._clock = clock
+        # {platform_id: {"state": str, "failures": int, "trips": int, "opened_at": float}}
+        self.entries: Dict[str, Dict] = {}
+
+    @classmethod
+    def from_config(
+        cls, config: Dict, state_path: Optional[str] = None
+    ) -> Optional["CircuitBreaker"]:
+        """根据配置字典创建熔断器
+
+        Args:
+            config: 配置字典，读取其中的 CIRCUIT_BREAKER 部分
+            state_path: 状态文件路径
+
+        Returns:
+            熔断器实例，未启用时返回 None
+        """
+        breaker_config = config.get("CIRCUIT_BREAKER", {})
+        if not breaker_config.get("ENABLED", True):
+            return None
+        return cls(
+            failure_threshold=breaker_config.get("FAILURE_THRESHOLD", 3),
+            cooldown=breaker_config.get("COOLDOWN", 600),
+            max_cooldown=breaker_config.get("MAX_COOLDOWN", 6 * 3600),
+            state_path=state_path,
+        )
+
+    def load(self) -> bool:
+        """从状态文件加载各平台的熔断状态
+
+        Returns:
+            是否加载成功，失败时所有平台从正常状态开始
+        """
+        if not self.state_path.exists():
+            return False
+
+        try:
+            state = load_state(self.state_path, self.STATE_VERSION)
+            entries = state["platforms"]
+            if not isinstance(entries, dict):
+                raise ValueError("状态字段类型错误")
+            for entry in entries.values():
+                if entry["state"] not in (CLOSED, OPEN, HALF_OPEN):
+                    raise ValueError(f"未知熔断状态: {entry['state']}")
+
+        except Exception as e:
+            logger.warning(f"熔断状态无效，所有平台恢复正常: {e}")
+            self.entries = {}
+            return False
+
+        self.entries = entries
+        return True
+
+    def save(self) -> None:
+        """原子写入状态文件"""
+        state = {"version": self.STATE_VERSION, "platforms": self.entries}
+
+        # 写入失败只会让下次运行重新探测熔断中的平台
+        write_state_atomic(self.state_path, state)
+
+    def _entry(self, platform_id: str) -> Dict:
+        entry = self.entries.get(platform_id)
+        if entry is None:
+            entry = {"state": CLOSED, "failures": 0, "trips": 0, "opened_at": 0.0}
+            self.entries[platform_id] = entry
+        return entry
+
+    def state(self, platform_id: str) -> str:
+        """平台当前的熔断状态"""
+        entry = self.entries.get(platform_id)
+        return entry["state"] if entry else CLOSED
+
+    def retry_after(self, platform_id: str) -> float:
+        """距离下一次探测的秒数，未熔断时为 0"""
+        entry = self.entries.get(platform_id)
+        if not entry or entry["state"] != OPEN:
+            return 0.0
+        cooldown = min(self.max_cooldown, self.cooldown * 2 ** (entry["trips"] - 1))
+        return max(0.0, entry["opened_at"] + cooldown - self._clock())
+
+    def allow(self, platform_id: str) -> bool:
+        """是否允许抓取该平台
+
+        冷却期已过的熔断平台转为 half_open 并放行一次探测
+
+        Args:
+            platform_id: 平台 ID
+
+        Returns:
+            是否允许抓取
+        """
+        state = self.state(platform_id)
+        if state != OPEN:
+            return True
+        if self.retry_after(platform_id) > 0:
+            return False
+
+        self.entries[platform_id]["state"] = HALF_OPEN
+        logger.info(f"平台 {platform_id} 熔断冷却结束，发送探测请求")
+        return True
+
+    def record_success(self, platform_id: str) -> None:
+        """记录一次抓取成功，平台恢复正常"""
+        entry = self.entries.get(platform_id)
+        if entry is None:
+            return
+        if entry["state"] != CLOSED:
+            logger.info(f"平台 {platform_id} 探测成功，解除熔断")
+        del self.entries[platform_id]
+
+    def record_failure(self, platform_id: str) -> bool:
+        """记录一次抓取失败（已用完重试），达到阈值或探测失败时熔断
+
+        Args:
+            platform_id: 平台 ID
+
+        Returns:
+            本次失败是否触发熔断
+        """
+        entry = self._entry(platform_id)
+        entry["failures"] += 1
+        if entry["state"] == HALF_OPEN or entry["failures"] >= self.failure_threshold:
+            entry["state"] = OPEN
+            entry["trips"] += 1
+            entry["opened_at"] = self._clock()
+            logger.warning(
+                f"平台 {platform_id} 连续失败 {entry['failures']} 次，熔断 "
+                f"{self.retry_after(platform_id):.0f} 秒"
+            )
+            return True
+        return False
+
+    def summary(self) -> Dict[str, Dict]:
+        """非正常平台的熔断状态，写入运行指标"""
+        return {
+            platform_id: {
+                "state": entry["state"],
+                "failures": entry["failures"],
+                "trips": entry["trips"],
+                "retry_after": round(self.retry_after(platform_id), 1),
+            }
+            for platform_id, entry in self.entries.items()
+        }
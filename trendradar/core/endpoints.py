@@ -0,0 +1,192 @@
+"""
+API 端点选择模块
+
+在多个等价的 newsnow API 端点（如自建实例）之间按延迟和错误率打分，
+每次请求发往当前得分最好的端点，失败的端点分数变差后自动切换到其他端点
+"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from ..utils.file_utils import load_state, write_state_atomic
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class EndpointPool:
+    """API 端点池
+
+    每个端点记录成功请求延迟的指数滑动平均和错误率，
+    得分 = 平均延迟 + failure_penalty × 错误率，越小越好。
+    错误率随时间按 error_half_life 半衰，故障端点过一段时间后重新获得尝试机会；
+    没有记录的端点得分为 0，会被优先尝试一次。
+    得分跨运行保存在 output/state/endpoints.json，
+    每次运行的第一个请求就发往上次最健康的端点
+    """
+
+    # 状态文件格式版本，格式变化时递增以丢弃旧状态
+    STATE_VERSION = 1
+
+    DEFAULT_STATE_PATH = "output/state/endpoints.json"
+
+    def __init__(
+        self,
+        urls: List[str],
+        alpha: float = 0.3,
+        failure_penalty: float = 10.0,
+        error_half_life: float = 600.0,
+        state_path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """初始化端点池
+
+        Args:
+            urls: 端点地址列表，得分相同时按列表顺序选择
+            alpha: 滑动平均中最新一次请求的权重
+            failure_penalty: 错误率为 1 时增加的得分（秒）
+            error_half_life: 错误率的半衰期（秒）
+            state_path: 状态文件路径，默认为 output/state/endpoints.json
+            clock: 返回 Unix 时间戳的时钟，状态跨进程保存，不能使用单调时钟
+        """
+        if not urls:
+            raise ValueError("端点列表不能为空")
+        self.urls = list(urls)
+        self.alpha = alpha
+        self.failure_penalty = failure_penalty
+        self.error_half_life = error_half_life
+        self.state_path = Path(state_path or self.DEFAULT_STATE_PATH)
+        self._clock = clock
+        # {url: {"latency": 秒或 None, "errors": 错误率, "updated_at": 时间戳}}
+        self.stats: Dict[str, Dict] = {}
+        # 同步抓取的多个线程会同时更新得分
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(
+        cls, config: Dict, state_path: Optional[str] = None
+    ) -> Optional["EndpointPool"]:
+        """根据配置字典创建端点池
+
+        Args:
+            config: 配置字典，读取其中的 API_ENDPOINTS
+            state_path: 状态文件路径
+
+        Returns:
+            端点池实例，未配置端点时返回 None（使用默认地址）
+        """
+        urls = config.get("API_ENDPOINTS") or []
+        if not urls:
+            return None
+        return cls(urls, state_path=state_path)
+
+    def load(self) -> bool:
+        """从状态文件加载各端点上次的得分
+
+        Returns:
+            是否加载成功，失败时所有端点从头开始打分
+        """
+        if not self.state_path.exists():
+            return False
+
+        try:
+            state = load_state(self.state_path, self.STATE_VERSION)
+            stats = {}
+            for url, entry in state["endpoints"].items():
+                # 已从配置中移除的端点不再保留
+                if url not in self.urls:
+                    continue
+                latency = entry["latency"]
+                stats[url] = {
+                    "latency": None if latency is None else float(latency),
+                    "errors": float(entry["errors"]),
+                    "updated_at": float(entry["updated_at"]),
+                }
+
+        except Exception as e:
+            logger.warning(f"端点得分无效，重新打分: {e}")
+            self.stats = {}
+            return False
+
+        self.stats = stats
+        return True
+
+    def save(self) -> None:
+        """原子写入状态文件"""
+        with self._lock:
+            state = {"version": self.STATE_VERSION, "endpoints": dict(self.stats)}
+
+        # 写入失败只会让下次运行重新打分
+        write_state_atomic(self.state_path, state)
+
+    def _errors(self, entry: Dict, now: float) -> float:
+        """按半衰期衰减后的错误率"""
+        elapsed = max(0.0, now - entry["updated_at"])
+        return entry["errors"] * 0.5 ** (elapsed / self.error_half_life)
+
+    def score(self, url: str) -> float:
+        """端点当前得分（秒），越小越好"""
+        entry = self.stats.get(url)
+        if entry is None:
+            return 0.0
+        latency = entry["latency"] or 0.0
+        return latency + self.failure_penalty * self._errors(entry, self._clock())
+
+    def select(self, exclude: Optional[List[str]] = None) -> str:
+        """选择得分最好的端点
+
+        Args:
+            exclude: 优先排除的端点（如本次已失败的），全部被排除时忽略
+
+        Returns:
+            端点地址
+        """
+        candidates = [url for url in self.urls if url not in (exclude or [])]
+        # min 在得分相同时返回靠前的端点
+        return min(candidates or self.urls, key=self.score)
+
+    def record_success(self, url: str, latency: float) -> None:
+        """记录一次成功请求的延迟"""
+        self._update(url, latency)
+
+    def record_failure(self, url: str) -> None:
+        """记录一次失败请求"""
+        self._update(url, None)
+
+    def _update(self, url: str, latency: Optional[float]) -> None:
+        if url not in self.urls:
+            return
+        with self._lock:
+            now = self._clock()
+            entry = self.stats.get(url)
+            if entry is None:
+                entry = {"latency": None, "errors": 0.0, "updated_at": now}
+                self.stats[url] = entry
+
+            errors = self._errors(entry, now) * (1 - self.alpha)
+            if latency is None:
+                errors += self.alpha
+            elif entry["latency"] is None:
+                entry["latency"] = latency
+            else:
+                entry["latency"] += self.alpha * (latency - entry["latency"])
+            entry["errors"] = errors
+            entry["updated_at"] = now
+
+    def summary(self) -> Dict[str, Dict]:
+        """各端点的延迟、错误率和得分，写入运行指标"""
+        now = self._clock()
+        result = {}
+        for url in self.urls:
+            entry = self.stats.get(url)
+            if entry is None:
+                continue
+            latency = entry["latency"]
+            result[url] = {
+                "latency": None if latency is None else round(latency, 3),
+                "errors": round(self._errors(entry, now), 3),
+                "score": round(self.score(url), 3),
+            }
+        return result
@@ -5,19 +5,97 @@
 """
 
 import asyncio
+import contextvars
 import json
 import random
+import threading
 import time
-from typing import Dict, List, Optional, Tuple, Union
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，未安装时使用标准库 json
+    orjson = None
 
 from ..utils.logger import get_logger
+from ..utils.metrics import record, span
+from ..utils.proxy_pool import ProxyPool
+from ..utils.rate_limiter import RateLimiter, is_throttle_status
+from .circuit_breaker import HALF_OPEN, CircuitBreaker
+from .endpoints import EndpointPool
+from .hedging import HedgePolicy
+from .http_cache import HttpValidatorCache, hash_body
+from .last_good import LastGoodCache
 
 logger = get_logger(__name__)
 
 
+def decode_json(body: bytes) -> Any:
+    """解析 JSON 响应体
+
+    直接解析原始字节，不先解码为字符串；安装了 orjson 时使用 orjson
+
+    Args:
+        body: 响应体字节
+
+    Returns:
+        解析后的对象
+    """
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def parse_platform_titles(api_data: Dict) -> Dict[str, Dict]:
+    """将 API 响应整理为标题字典
+
+    API 返回格式: {"status": "success", "items": [...]}，
+    整理为 {title: {"ranks": [排名], "url": ..., "mobileUrl": ...}}。
+    结构异常的条目和空标题会被跳过，重复标题以最后一次出现为准
+
+    Args:
+        api_data: 平台 API 响应
+
+    Returns:
+        标题字典
+    """
+    items = api_data.get("items") if isinstance(api_data, dict) else None
+    if not isinstance(items, list):
+        return {}
+
+    titles: Dict[str, Dict] = {}
+    for idx, news_item in enumerate(items):
+        if not isinstance(news_item, dict):
+            continue
+
+        title = news_item.get("title")
+        if not isinstance(title, str) or not title:
+            continue
+
+        titles[title] = {
+            "ranks": [idx + 1],  # 排名从 1 开始
+            "url": news_item.get("url", "") or "",
+            "mobileUrl": news_item.get("mobileUrl", "") or "",
+        }
+
+    return titles
+
+
 class DataFetcher:
     """数据抓取器
 
@@ -42,6 +120,13 @@ class DataFetcher:
         proxy_url: Optional[str] = None,
         max_retries: int = 3,
         timeout: int = 10,
+        validator_cache: Optional[HttpValidatorCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
+        endpoints: Optional[EndpointPool] = None,
+        proxy_pool: Optional[ProxyPool] = None,
+        last_good: Optional[LastGoodCache] = None,
     ):
         """初始化数据抓取器
 
@@ -50,86 +135,464 @@ class DataFetcher:
             proxy_url: 代理地址
             max_retries: 最大重试次数
             timeout: 请求超时时间（秒）
+            validator_cache: HTTP 校验信息缓存，None 表示总是完整下载
+            rate_limiter: 异步抓取使用的限流器，默认按配置中的 RATE_LIMIT 创建
+            circuit_breaker: 平台熔断器，None 表示不熔断
+            hedge_policy: 异步抓取的对冲策略，None 表示不发对冲请求
+            endpoints: 多个等价 API 端点组成的端点池，None 表示只使用 API_BASE_URL
+            proxy_pool: 代理池，设置后代替 proxy_url
+            last_good: 最近成功数据缓存，平台抓取失败时返回缓存的标题
         """
         self.config = config
         self.proxy_url = proxy_url
         self.max_retries = max_retries
         self.timeout = timeout
         self.platforms = config.get("PLATFORMS", [])
+        self.validator_cache = validator_cache
+        self.rate_limiter = rate_limiter or RateLimiter.from_config(config)
+        self.circuit_breaker = circuit_breaker
+        self.hedge_policy = hedge_policy
+        self.endpoints = endpoints
+        self.proxy_pool = proxy_pool
+        self.last_good = last_good
+        # 整体抓取时限（秒），0 表示不限时
+        self.deadline = config.get("FETCH_DEADLINE", 0)
+        # 最近一次抓取中因到达时限被取消的平台
+        self.last_cancelled: List[str] = []
+        # 最近一次抓取中使用缓存数据的平台 {平台ID: 缓存数据距今秒数}
+        self.last_stale: Dict[str, float] = {}
+        # 最近一次抓取中因熔断跳过和新触发熔断的平台
+        self.breaker_skipped: List[str] = []
+        self.breaker_tripped: List[str] = []
+
+        # 常驻模式下复用的事件循环和会话（见 open/close）
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        # 同步抓取期间线程池共享的 requests 会话
+        self._http: Optional[requests.Session] = None
+        # 同步抓取到达时限时置位，让仍在运行的线程不再发起请求和重试，线程退出后换新
+        self._sync_stop = threading.Event()
+
+    # ========== 会话管理 ==========
+
+    def open(self) -> None:
+        """进入常驻模式
+
+        之后的异步抓取在同一个事件循环上执行并复用 HTTP 会话，
+        同步抓取复用 requests 会话，连接池和 DNS 缓存在多次抓取之间保持有效
+        """
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            logger.debug("抓取器已进入常驻模式")
+
+    def close(self) -> None:
+        """关闭常驻会话和事件循环"""
+        if self._loop is None:
+            return
+
+        if self._session is not None and not self._session.closed:
+            self._loop.run_until_complete(self._session.close())
+        self._session = None
+        if self._http is not None:
+            self._http.close()
+            self._http = None
+        self._loop.close()
+        self._loop = None
+        logger.debug("抓取器常驻会话已关闭")
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """创建 aiohttp 会话"""
+        # 每个主机的实际并发由限流器的窗口控制，连接池只需容纳窗口上限
+        connector = aiohttp.TCPConnector(
+            limit_per_host=int(self.rate_limiter.max_concurrency)
+        )
+        return aiohttp.ClientSession(headers=self.DEFAULT_HEADERS, connector=connector)
 
-    def _build_url(self, platform_id: str) -> str:
+    def _create_http_session(self) -> requests.Session:
+        """创建同步抓取使用的 requests 会话"""
+        session = requests.Session()
+        # 连接池与异步模式一致，按限流器的并发上限容纳每个主机的连接
+        adapter = HTTPAdapter(pool_maxsize=int(self.rate_limiter.max_concurrency))
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _get_persistent_session(self) -> Optional[aiohttp.ClientSession]:
+        """获取常驻会话，仅在常驻事件循环中运行时可用"""
+        if self._loop is None:
+            return None
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        if running_loop is not self._loop:
+            return None
+
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+        return self._session
+
+    def _build_url(self, platform_id: str, base_url: Optional[str] = None) -> str:
         """构建 API URL
 
         Args:
             platform_id: 平台 ID
+            base_url: API 端点地址，默认为 API_BASE_URL
 
         Returns:
             完整的 API URL
         """
-        return f"{self.API_BASE_URL}?id={platform_id}&latest"
+        return f"{base_url or self.API_BASE_URL}?id={platform_id}&latest"
+
+    def _select_endpoint(self, tried: Optional[List[str]] = None) -> str:
+        """选择本次请求的 API 端点
+
+        Args:
+            tried: 本平台已失败过的端点，优先选择其他端点
+
+        Returns:
+            端点地址
+        """
+        if self.endpoints is None:
+            return self.API_BASE_URL
+        return self.endpoints.select(tried)
+
+    def _retry_wait(self, attempt: int, tried: List[str]) -> float:
+        """重试前的等待时间
+
+        还有未失败过的端点时立即切换过去重试，否则随机退避
+
+        Args:
+            attempt: 已失败的次数减 1
+            tried: 本平台已失败过的端点
+
+        Returns:
+            等待秒数
+        """
+        if self._select_endpoint(tried) not in tried:
+            return 0.0
+        return random.uniform(2, 5) + attempt * random.uniform(1, 2)
+
+    def _record_latency(self, platform_id: str, url: str, start_time: float) -> None:
+        """记录成功请求的延迟，供对冲策略和端点打分使用"""
+        elapsed = time.monotonic() - start_time
+        if self.hedge_policy is not None:
+            self.hedge_policy.record_latency(platform_id, elapsed)
+        if self.endpoints is not None:
+            self.endpoints.record_success(url.partition("?")[0], elapsed)
+
+    def _record_endpoint_failure(self, url: str) -> None:
+        """记录一次失败请求，降低所用端点的得分"""
+        if self.endpoints is not None:
+            self.endpoints.record_failure(url.partition("?")[0])
+
+    def _report_endpoints(self) -> None:
+        """输出各端点的得分和代理池状态并写入运行指标"""
+        if self.endpoints is not None:
+            summary = self.endpoints.summary()
+            scores = [f"{url}: {entry['score']:.2f}" for url, entry in summary.items()]
+            logger.info(f"端点得分: {', '.join(scores)}")
+            record("endpoints", summary)
+        if self.proxy_pool is not None:
+            record("proxy_pool", self.proxy_pool.summary())
+
+    def scheduled_platforms(self) -> List[Dict]:
+        """按优先级从高到低排列的平台列表，同优先级保持配置顺序"""
+        return sorted(self.platforms, key=lambda p: -p.get("priority", 0))
+
+    def _conditional_headers(self, platform_id: str) -> Dict[str, str]:
+        """获取条件请求头，没有校验信息缓存时为空"""
+        if self.validator_cache is None:
+            return {}
+        return self.validator_cache.conditional_headers(platform_id)
+
+    def _check_unchanged(
+        self, platform_id: str, platform_name: str, status_code: int, body_hash: str
+    ) -> Optional[Dict]:
+        """判断响应内容是否未变化
+
+        304 或响应体哈希与上次相同时跳过 JSON 解析，返回 unchanged 结果
+
+        Args:
+            platform_id: 平台 ID
+            platform_name: 平台名称
+            status_code: HTTP 状态码
+            body_hash: 响应体哈希
 
-    def _get_proxies(self) -> Optional[Dict]:
+        Returns:
+            unchanged 结果字典，内容有变化时返回 None
+        """
+        if status_code != 304 and not self.validator_cache.is_unchanged(
+            platform_id, body_hash
+        ):
+            return None
+
+        reason = "304" if status_code == 304 else "内容哈希相同"
+        logger.info(f"内容未变化: {platform_name} ({reason})")
+        return {
+            "platform_id": platform_id,
+            "platform_name": platform_name,
+            "data": None,
+            "status": "unchanged",
+        }
+
+    def _record_validators(self, platform_id: str, body_hash: str, headers) -> None:
+        """记录成功响应的 ETag、Last-Modified 和响应体哈希"""
+        self.validator_cache.update(
+            platform_id,
+            body_hash,
+            etag=headers.get("ETag"),
+            last_modified=headers.get("Last-Modified"),
+        )
+
+    def _admit(self, platform_id: str) -> Optional[int]:
+        """熔断检查
+
+        Args:
+            platform_id: 平台 ID
+
+        Returns:
+            本次抓取的最大重试次数，熔断中返回 None；
+            half_open 探测只请求一次，避免对失效平台重试
+        """
+        breaker = self.circuit_breaker
+        if breaker is None:
+            return self.max_retries
+        if not breaker.allow(platform_id):
+            logger.warning(
+                f"平台 {platform_id} 熔断中，跳过抓取 "
+                f"({breaker.retry_after(platform_id):.0f}秒后探测)"
+            )
+            self.breaker_skipped.append(platform_id)
+            return None
+        if breaker.state(platform_id) == HALF_OPEN:
+            return 0
+        return self.max_retries
+
+    def _record_outcome(self, platform: Dict, result: Optional[Dict]) -> Optional[Dict]:
+        """把抓取结果计入熔断器和最近成功数据缓存
+
+        Args:
+            platform: 平台配置
+            result: 平台数据字典，None 表示抓取失败
+
+        Returns:
+            抓取结果；失败时为缓存数据（见 _stale_result）
+        """
+        platform_id = platform["id"]
+        if self.circuit_breaker is not None:
+            if result is not None:
+                self.circuit_breaker.record_success(platform_id)
+            elif self.circuit_breaker.record_failure(platform_id):
+                self.breaker_tripped.append(platform_id)
+
+        if result is None:
+            return self._stale_result(platform)
+        if self.last_good is not None:
+            if result.get("status") == "unchanged":
+                self.last_good.touch(platform_id)
+            else:
+                self.last_good.update(platform_id, result["titles"])
+        return result
+
+    def _stale_result(self, platform: Dict) -> Optional[Dict]:
+        """用最近一次成功的数据代替失败的平台
+
+        Args:
+            platform: 平台配置
+
+        Returns:
+            status 为 stale 的平台数据字典，age 为缓存数据距今秒数；
+            没有可用的缓存时返回 None
+        """
+        if self.last_good is None:
+            return None
+        cached = self.last_good.get(platform["id"])
+        if cached is None:
+            return None
+
+        titles, age = cached
+        self.last_stale[platform["id"]] = age
+        return {
+            "platform_id": platform["id"],
+            "platform_name": platform.get("name", platform["id"]),
+            "status": "stale",
+            "titles": titles,
+            "age": age,
+        }
+
+    def _report_stale(self) -> None:
+        """输出使用缓存数据的平台并写入运行指标"""
+        if not self.last_stale:
+            return
+        ages = [f"{pid}({age:.0f}秒前)" for pid, age in self.last_stale.items()]
+        logger.warning(f"{len(ages)} 个平台抓取失败，使用缓存数据: {', '.join(ages)}")
+        record("stale", {pid: round(age) for pid, age in self.last_stale.items()})
+
+    def _start_breaker_run(self) -> None:
+        """开始一次抓取，清空上次的熔断统计"""
+        self.breaker_skipped = []
+        self.breaker_tripped = []
+
+    def _finish_breaker_run(self) -> None:
+        """把熔断状态和本次的跳过、触发情况写入运行指标"""
+        if self.circuit_breaker is None:
+            return
+        if self.breaker_skipped or self.breaker_tripped:
+            logger.info(
+                f"熔断: 跳过 {len(self.breaker_skipped)} 个平台, "
+                f"新触发 {len(self.breaker_tripped)} 个"
+            )
+        record(
+            "circuit_breaker",
+            {
+                "skipped": list(self.breaker_skipped),
+                "tripped": list(self.breaker_tripped),
+                "platforms": self.circuit_breaker.summary(),
+            },
+        )
+
+    def _get_proxies(self, proxy_url: Optional[str] = None) -> Optional[Dict]:
         """获取代理配置
 
+        Args:
+            proxy_url: 代理地址，默认为初始化时的 proxy_url
+
         Returns:
             代理字典或 None
         """
-        if self.proxy_url:
-            return {"http": self.proxy_url, "https": self.proxy_url}
+        proxy_url = proxy_url or self.proxy_url
+        if proxy_url:
+            return {"http": proxy_url, "https": proxy_url}
         return None
 
+    async def _acquire_proxy(self, platform_id: str) -> Optional[str]:
+        """申请本次请求使用的代理，没有代理池时使用 proxy_url"""
+        if self.proxy_pool is None:
+            return self.proxy_url
+        return await self.proxy_pool.acquire(platform_id)
+
+    def _acquire_proxy_sync(self, platform_id: str) -> Optional[str]:
+        """在工作线程中申请代理，没有代理池时使用 proxy_url"""
+        if self.proxy_pool is None:
+            return self.proxy_url
+        return self.proxy_pool.acquire_sync(platform_id)
+
+    def _release_proxy(self, proxy: Optional[str], ok: Optional[bool]) -> None:
+        """归还代理池中的代理"""
+        if self.proxy_pool is not None and proxy is not None:
+            self.proxy_pool.release(proxy, ok)
+
+    def _get_sync(self, http, url: str, platform_id: str) -> requests.Response:
+        """发送一次同步请求，代理池中的代理只在请求期间占用
+
+        Args:
+            http: requests 会话或 requests 模块
+            url: 请求地址
+            platform_id: 平台 ID
+
+        Returns:
+            响应对象
+        """
+        proxy = self._acquire_proxy_sync(platform_id)
+        proxy_ok = None
+        try:
+            response = http.get(
+                url,
+                proxies=self._get_proxies(proxy),
+                headers={
+                    **self.DEFAULT_HEADERS,
+                    **self._conditional_headers(platform_id),
+                },
+                timeout=self.timeout,
+            )
+            proxy_ok = True
+            return response
+        except (requests.ConnectionError, requests.Timeout):
+            proxy_ok = False
+            raise
+        finally:
+            self._release_proxy(proxy, proxy_ok)
+
     # ========== 同步方法 ==========
 
     def fetch_platform_sync(
         self,
         platform: Dict,
+        max_retries: Optional[int] = None,
     ) -> Optional[Dict]:
         """同步抓取单个平台数据
 
         Args:
             platform: 平台配置字典，包含 id 和 name
+            max_retries: 本次的最大重试次数，默认使用初始化时的设置
 
         Returns:
             平台数据字典或 None
         """
         platform_id = platform["id"]
         platform_name = platform.get("name", platform_id)
-        url = self._build_url(platform_id)
+
+        if max_retries is None:
+            max_retries = self.max_retries
+        # 不在 fetch_all_sync 中调用时没有共享会话，直接发送请求
+        http = self._http if self._http is not None else requests
+        stop = self._sync_stop
+        # 本平台失败过的端点，重试时优先切换到其他端点
+        tried: List[str] = []
 
         logger.info(f"开始抓取: {platform_name} ({platform_id})")
 
-        for attempt in range(self.max_retries + 1):
+        for attempt in range(max_retries + 1):
+            base_url = self._select_endpoint(tried)
+            url = self._build_url(platform_id, base_url)
             try:
-                response = requests.get(
-                    url,
-                    proxies=self._get_proxies(),
-                    headers=self.DEFAULT_HEADERS,
-                    timeout=self.timeout,
-                )
+                self.rate_limiter.for_url(url).pace()
+                if stop.is_set():
+                    return None
+                start_time = time.monotonic()
+                response = self._get_sync(http, url, platform_id)
                 response.raise_for_status()
 
-                data = response.json()
+                body = response.content
+                if self.validator_cache is not None:
+                    body_hash = hash_body(body)
+                    unchanged = self._check_unchanged(
+                        platform_id, platform_name, response.status_code, body_hash
+                    )
+                    if unchanged is not None:
+                        self._record_latency(platform_id, url, start_time)
+                        return unchanged
+                data = decode_json(body)
+
                 status = data.get("status", "unknown")
 
                 if status not in ["success", "cache"]:
                     raise ValueError(f"响应状态异常: {status}")
 
+                if self.validator_cache is not None:
+                    self._record_validators(platform_id, body_hash, response.headers)
+                self._record_latency(platform_id, url, start_time)
                 logger.info(f"抓取成功: {platform_name} (状态: {status})")
                 return {
                     "platform_id": platform_id,
                     "platform_name": platform_name,
                     "data": data,
+                    "titles": parse_platform_titles(data),
                     "status": status,
                 }
 
             except Exception as e:
-                if attempt < self.max_retries:
-                    wait_time = random.uniform(2, 5) + attempt * random.uniform(1, 2)
+                self._record_endpoint_failure(url)
+                tried.append(base_url)
+                if attempt < max_retries:
+                    wait_time = self._retry_wait(attempt, tried)
                     logger.warning(
                         f"抓取失败: {platform_name}, 错误: {e}, "
-                        f"{wait_time:.2f}秒后重试 ({attempt + 1}/{self.max_retries})"
+                        f"{wait_time:.2f}秒后重试 ({attempt + 1}/{max_retries})"
                     )
-                    time.sleep(wait_time)
+                    if stop.wait(wait_time):
+                        return None
                 else:
                     logger.error(f"抓取失败: {platform_name}, 错误: {e}")
                     return None
@@ -137,39 +600,139 @@ class DataFetcher:
         return None
 
     def fetch_all_sync(
-        self, request_interval: int = 1000
+        self, request_interval: int = 1000, deadline: Optional[float] = None
     ) -> Tuple[List[Dict], List[str]]:
         """同步抓取所有平台数据
 
+        在线程池中并发抓取，各线程共享同一个 requests 会话的连接池。
+        线程数取限流器当前的并发窗口，请求速率由限流器的令牌桶控制；
+        高优先级平台先提交，到达时限后未完成的平台 ID 记录在 last_cancelled 中：
+        未开始的直接取消，进行中的请求无法中断，等其结束（最多一个请求超时）后丢弃结果，
+        返回前所有工作线程都已退出，不会再使用会话或更新限流器等共享状态
+
         Args:
-            request_interval: 请求间隔（毫秒）
+            request_interval: 已不再使用，请求间隔由限流器控制，保留以兼容旧调用
+            deadline: 整体抓取时限（秒），None 使用配置中的 FETCH_DEADLINE，
+                0 表示不限时
 
         Returns:
-            (成功的结果列表, 失败的平台ID列表)
+            (成功的结果列表, 失败的平台ID列表)，与 fetch_all_async 相同
         """
-        results = []
-        failed_platforms = []
+        if deadline is None:
+            deadline = self.deadline
 
         logger.info(f"开始同步抓取 {len(self.platforms)} 个平台")
         start_time = time.time()
+        expires_at = time.monotonic() + deadline if deadline else None
+        self.last_cancelled = []
+        self.last_stale = {}
+        self._start_breaker_run()
 
-        for i, platform in enumerate(self.platforms):
-            result = self.fetch_platform_sync(platform)
+        # 主机限流器在主线程中创建，工作线程只取令牌
+        if self.endpoints is not None:
+            for url in self.endpoints.urls:
+                self.rate_limiter.for_url(url)
+        host = self.rate_limiter.for_url(self._select_endpoint())
+        workers = max(1, min(len(self.platforms), int(host.concurrency)))
+        if self._http is None:
+            self._http = self._create_http_session()
 
-            if result:
-                results.append(result)
-            else:
-                failed_platforms.append(platform["id"])
+        collected: Dict[str, Optional[Dict]] = {}
+        futures: Dict[Future, Dict] = {}
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            for platform in self.scheduled_platforms():
+                max_retries = self._admit(platform["id"])
+                if max_retries is None:
+                    collected[platform["id"]] = self._stale_result(platform)
+                    continue
+                # 复制上下文，工作线程中的阶段耗时记入当前的运行指标
+                context = contextvars.copy_context()
+                future = executor.submit(
+                    context.run, self._fetch_platform_timed, platform, max_retries
+                )
+                futures[future] = platform
+
+            pending = set(futures)
+            while pending:
+                timeout = None
+                if expires_at is not None:
+                    timeout = expires_at - time.monotonic()
+                    if timeout <= 0:
+                        break
+                done, pending = wait(
+                    pending, timeout=timeout, return_when=FIRST_COMPLETED
+                )
+                for future in done:
+                    platform = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.error(f"平台 {platform['id']} 抓取异常: {e}")
+                        result = None
+                    collected[platform["id"]] = self._record_outcome(platform, result)
 
-            # 请求间隔
-            if i < len(self.platforms) - 1:
-                time.sleep(request_interval / 1000)
+            self.last_cancelled = [
+                platform["id"]
+                for future, platform in futures.items()
+                if future in pending
+            ]
+        finally:
+            # 未开始的平台直接取消，进行中的线程在当前请求结束后退出，其结果被丢弃
+            self._sync_stop.set()
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=True)
+            self._sync_stop = threading.Event()
+            if self._loop is None:
+                self._http.close()
+                self._http = None
 
         duration = time.time() - start_time
+        results, failed_platforms = self._split_results(collected)
         logger.info(
-            f"同步抓取完成: 成功 {len(results)}/{len(self.platforms)}, "
+            f"同步抓取完成: 成功 {len(results) - len(self.last_stale)}/{len(self.platforms)}, "
             f"耗时 {duration:.2f}秒"
         )
+        if self.last_cancelled:
+            logger.warning(
+                f"抓取超过时限 {deadline}秒，放弃 {len(self.last_cancelled)} 个"
+                f"未完成的平台: {', '.join(self.last_cancelled)}"
+            )
+        self._finish_breaker_run()
+        self._report_stale()
+        self._report_endpoints()
+
+        return results, failed_platforms
+
+    def _fetch_platform_timed(self, platform: Dict, max_retries: int) -> Optional[Dict]:
+        """在工作线程中抓取单个平台并记录耗时"""
+        # 多个线程共享进程 CPU 时间，只记录耗时
+        with span("fetch_platform", cpu=False, platform=platform["id"]):
+            return self.fetch_platform_sync(platform, max_retries)
+
+    def _split_results(
+        self, collected: Dict[str, Optional[Dict]]
+    ) -> Tuple[List[Dict], List[str]]:
+        """按平台配置顺序整理抓取结果
+
+        Args:
+            collected: {平台ID: 平台数据字典或 None}，未收集到的平台不在其中
+
+        Returns:
+            (成功的结果列表, 失败的平台ID列表)，
+            使用缓存数据的平台（status 为 stale）在结果列表中
+        """
+        results = []
+        failed_platforms = []
+        for platform in self.platforms:
+            if platform["id"] not in collected:
+                continue
+            result = collected[platform["id"]]
+            if result is None:
+                failed_platforms.append(platform["id"])
+            else:
+                results.append(result)
 
         return results, failed_platforms
 
@@ -179,50 +742,43 @@ class DataFetcher:
         self,
         session: aiohttp.ClientSession,
         platform: Dict,
+        max_retries: Optional[int] = None,
     ) -> Optional[Dict]:
         """异步抓取单个平台数据
 
         Args:
             session: aiohttp 会话
             platform: 平台配置字典
+            max_retries: 本次的最大重试次数，默认使用初始化时的设置
 
         Returns:
             平台数据字典或 None
         """
         platform_id = platform["id"]
         platform_name = platform.get("name", platform_id)
-        url = self._build_url(platform_id)
+
+        if max_retries is None:
+            max_retries = self.max_retries
+        # 本平台失败过的端点，重试时优先切换到其他端点
+        tried: List[str] = []
 
         logger.info(f"开始异步抓取: {platform_name} ({platform_id})")
 
-        for attempt in range(self.max_retries + 1):
+        for attempt in range(max_retries + 1):
+            base_url = self._select_endpoint(tried)
+            url = self._build_url(platform_id, base_url)
             try:
-                async with session.get(
-                    url,
-                    timeout=aiohttp.ClientTimeout(total=self.timeout),
-                    proxy=self.proxy_url,
-                ) as response:
-                    response.raise_for_status()
-                    data = await response.json()
-
-                    status = data.get("status", "unknown")
-                    if status not in ["success", "cache"]:
-                        raise ValueError(f"响应状态异常: {status}")
-
-                    logger.info(f"异步抓取成功: {platform_name} (状态: {status})")
-                    return {
-                        "platform_id": platform_id,
-                        "platform_name": platform_name,
-                        "data": data,
-                        "status": status,
-                    }
+                return await self._hedged_request_async(
+                    session, url, platform_id, platform_name
+                )
 
             except asyncio.TimeoutError:
-                if attempt < self.max_retries:
-                    wait_time = random.uniform(2, 5) + attempt * random.uniform(1, 2)
+                tried.append(base_url)
+                if attempt < max_retries:
+                    wait_time = self._retry_wait(attempt, tried)
                     logger.warning(
                         f"异步抓取超时: {platform_name}, "
-                        f"{wait_time:.2f}秒后重试 ({attempt + 1}/{self.max_retries})"
+                        f"{wait_time:.2f}秒后重试 ({attempt + 1}/{max_retries})"
                     )
                     await asyncio.sleep(wait_time)
                 else:
@@ -230,11 +786,12 @@ class DataFetcher:
                     return None
 
             except Exception as e:
-                if attempt < self.max_retries:
-                    wait_time = random.uniform(2, 5) + attempt * random.uniform(1, 2)
+                tried.append(base_url)
+                if attempt < max_retries:
+                    wait_time = self._retry_wait(attempt, tried)
                     logger.warning(
                         f"异步抓取失败: {platform_name}, 错误: {e}, "
-                        f"{wait_time:.2f}秒后重试 ({attempt + 1}/{self.max_retries})"
+                        f"{wait_time:.2f}秒后重试 ({attempt + 1}/{max_retries})"
                     )
                     await asyncio.sleep(wait_time)
                 else:
@@ -243,68 +800,344 @@ class DataFetcher:
 
         return None
 
-    async def fetch_all_async(self) -> Tuple[List[Dict], List[str]]:
-        """异步并发抓取所有平台数据
+    async def _request_async(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        platform_id: str,
+        platform_name: str,
+        started: Optional[asyncio.Event] = None,
+    ) -> Dict:
+        """在限流器许可下发送一次请求
+
+        并发名额只在请求期间占用，重试等待期间不占用
+
+        Args:
+            session: aiohttp 会话
+            url: 请求地址
+            platform_id: 平台 ID
+            platform_name: 平台名称
+            started: 获得并发名额、真正发出请求时置位的事件
 
         Returns:
-            (成功的结果列表, 失败的平台ID列表)
+            平台数据字典
+
+        Raises:
+            aiohttp.ClientError, asyncio.TimeoutError, ValueError: 请求失败
         """
-        logger.info(f"开始异步并发抓取 {len(self.platforms)} 个平台")
-        start_time = time.time()
+        limiter = self.rate_limiter.for_url(url)
+        epoch = await limiter.acquire()
+        if started is not None:
+            started.set()
+        start_time = time.monotonic()
+        throttled = False
+        proxy = None
+        # 经代理收到任何响应即说明代理可用，连接失败或超时才计为代理失败
+        proxy_ok = None
+        try:
+            proxy = await self._acquire_proxy(platform_id)
+            async with session.get(
+                url,
+                headers=self._conditional_headers(platform_id),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                proxy=proxy,
+            ) as response:
+                proxy_ok = True
+                throttled = is_throttle_status(response.status)
+                response.raise_for_status()
 
-        # 配置连接器，限制并发连接数
-        connector = aiohttp.TCPConnector(
-            limit=10, limit_per_host=5  # 最大并发连接数  # 每个主机的最大连接数
+                body = await response.read()
+                if self.validator_cache is not None:
+                    body_hash = hash_body(body)
+                    unchanged = self._check_unchanged(
+                        platform_id, platform_name, response.status, body_hash
+                    )
+                    if unchanged is not None:
+                        self._record_latency(platform_id, url, start_time)
+                        return unchanged
+                data = decode_json(body)
+
+                status = data.get("status", "unknown")
+                if status not in ["success", "cache"]:
+                    raise ValueError(f"响应状态异常: {status}")
+
+                if self.validator_cache is not None:
+                    self._record_validators(platform_id, body_hash, response.headers)
+
+                self._record_latency(platform_id, url, start_time)
+                logger.info(f"异步抓取成功: {platform_name} (状态: {status})")
+                return {
+                    "platform_id": platform_id,
+                    "platform_name": platform_name,
+                    "data": data,
+                    "titles": parse_platform_titles(data),
+                    "status": status,
+                }
+
+        except (asyncio.TimeoutError, aiohttp.ClientConnectionError):
+            throttled = True
+            proxy_ok = False
+            self._record_endpoint_failure(url)
+            raise
+
+        except asyncio.CancelledError:
+            # 被取消（如对冲落败）的请求不计入限流器的调整、端点得分和代理健康度
+            throttled = None
+            proxy_ok = None
+            raise
+
+        except Exception:
+            self._record_endpoint_failure(url)
+            raise
+
+        finally:
+            limiter.release(epoch, throttled)
+            self._release_proxy(proxy, proxy_ok)
+
+    async def _hedged_request_async(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        platform_id: str,
+        platform_name: str,
+    ) -> Dict:
+        """发送请求，超过历史延迟分位数仍未返回时再发一个对冲请求
+
+        对冲等待从首发请求获得并发名额时开始计时，排队时间不计入；
+        两个请求中先成功的胜出，另一个被取消；都失败时抛出首发请求的异常
+
+        Args:
+            session: aiohttp 会话
+            url: 请求地址
+            platform_id: 平台 ID
+            platform_name: 平台名称
+
+        Returns:
+            平台数据字典
+        """
+        policy = self.hedge_policy
+        delay = policy.hedge_delay(platform_id) if policy is not None else None
+        if policy is not None:
+            policy.on_request()
+        if delay is None:
+            return await self._request_async(session, url, platform_id, platform_name)
+
+        started = asyncio.Event()
+        primary = asyncio.ensure_future(
+            self._request_async(session, url, platform_id, platform_name, started)
         )
+        tasks = [primary]
+        try:
+            waiter = asyncio.ensure_future(started.wait())
+            await asyncio.wait({primary, waiter}, return_when=asyncio.FIRST_COMPLETED)
+            waiter.cancel()
+            if not primary.done():
+                await asyncio.wait({primary}, timeout=delay)
+            if primary.done() or not policy.try_hedge():
+                return await primary
 
-        async with aiohttp.ClientSession(
-            headers=self.DEFAULT_HEADERS, connector=connector
-        ) as session:
-            # 创建所有任务
-            tasks = [
-                self.fetch_platform_async(session, platform)
-                for platform in self.platforms
-            ]
+            logger.info(f"请求超过 {delay:.2f}秒未返回，发出对冲请求: {platform_name}")
+            # 配置了多个端点时对冲请求发往另一个端点
+            hedge_url = self._build_url(
+                platform_id, self._select_endpoint([url.partition("?")[0]])
+            )
+            hedge = asyncio.ensure_future(
+                self._request_async(session, hedge_url, platform_id, platform_name)
+            )
+            tasks.append(hedge)
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in [task for task in tasks if task in done]:
+                    if task.exception() is None:
+                        if task is hedge:
+                            policy.record_win()
+                        return task.result()
+            return primary.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
-            # 并发执行
-            results_raw = await asyncio.gather(*tasks, return_exceptions=True)
+    async def _fetch_platform_safe(
+        self, session: aiohttp.ClientSession, platform: Dict
+    ) -> Tuple[Dict, Optional[Dict]]:
+        """抓取单个平台，异常转为失败结果并附带平台配置
 
-        # 处理结果
-        results = []
-        failed_platforms = []
+        熔断中的平台不发送请求，直接作为失败返回；
+        失败的平台有可用的缓存数据时返回缓存数据
+        """
+        max_retries = self._admit(platform["id"])
+        if max_retries is None:
+            return platform, self._stale_result(platform)
 
-        for i, result in enumerate(results_raw):
-            if isinstance(result, Exception):
-                logger.error(f"平台 {self.platforms[i]['id']} 抓取异常: {result}")
-                failed_platforms.append(self.platforms[i]["id"])
-            elif result is None:
-                failed_platforms.append(self.platforms[i]["id"])
-            else:
-                results.append(result)
+        try:
+            # 并发任务共享进程 CPU 时间，只记录耗时
+            with span("fetch_platform", cpu=False, platform=platform["id"]):
+                result = await self.fetch_platform_async(session, platform, max_retries)
+        except Exception as e:
+            logger.error(f"平台 {platform['id']} 抓取异常: {e}")
+            result = None
+        return platform, self._record_outcome(platform, result)
+
+    async def iter_fetch_async(
+        self, deadline: Optional[float] = None
+    ) -> AsyncIterator[Tuple[Dict, Optional[Dict]]]:
+        """异步并发抓取所有平台，按完成顺序逐个产出结果
+
+        调用方可以在慢平台仍在重试时处理已完成的平台。
+        高优先级平台先发起请求；到达时限后取消未完成的平台，
+        其 ID 记录在 last_cancelled 中，不作为失败产出
+
+        Args:
+            deadline: 整体抓取时限（秒），None 使用配置中的 FETCH_DEADLINE，
+                0 表示不限时
+
+        Yields:
+            (平台配置, 平台数据字典或 None) 元组，None 表示抓取失败且没有可用的缓存，
+            使用缓存数据的平台 status 为 stale，见 last_stale
+        """
+        if deadline is None:
+            deadline = self.deadline
+        logger.info(f"开始异步并发抓取 {len(self.platforms)} 个平台")
+        start_time = time.time()
+        success_count = 0
+        self.last_cancelled = []
+        self.last_stale = {}
+        self._start_breaker_run()
+        if self.hedge_policy is not None:
+            self.hedge_policy.start_run()
+
+        session = self._get_persistent_session()
+        owns_session = session is None
+        if owns_session:
+            session = self._create_session()
+
+        # 按优先级创建任务，限流器的等待队列先进先出，高优先级平台先获得并发名额
+        tasks: Dict[asyncio.Future, Dict] = {}
+        for platform in self.scheduled_platforms():
+            task = asyncio.ensure_future(self._fetch_platform_safe(session, platform))
+            tasks[task] = platform
+        expires_at = time.monotonic() + deadline if deadline else None
+        pending = set(tasks)
+        try:
+            while pending:
+                timeout = None
+                if expires_at is not None:
+                    timeout = expires_at - time.monotonic()
+                    if timeout <= 0:
+                        break
+                done, pending = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in [task for task in tasks if task in done]:
+                    platform, result = task.result()
+                    if result is not None and result.get("status") != "stale":
+                        success_count += 1
+                    yield platform, result
+
+            self.last_cancelled = [
+                platform["id"] for task, platform in tasks.items() if task in pending
+            ]
+        finally:
+            # 到达时限或调用方提前退出时取消仍在进行的抓取
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if owns_session:
+                await session.close()
 
         duration = time.time() - start_time
         logger.info(
-            f"异步抓取完成: 成功 {len(results)}/{len(self.platforms)}, "
+            f"异步抓取完成: 成功 {success_count}/{len(self.platforms)}, "
             f"耗时 {duration:.2f}秒"
         )
+        if self.last_cancelled:
+            logger.warning(
+                f"抓取超过时限 {deadline}秒，取消 {len(self.last_cancelled)} 个"
+                f"未完成的平台: {', '.join(self.last_cancelled)}"
+            )
+        logger.info(f"限流状态: {self.rate_limiter.summary()}")
+        self._finish_breaker_run()
+        self._report_stale()
+        self._report_endpoints()
+        if self.hedge_policy is not None:
+            hedging = self.hedge_policy.summary()
+            logger.info(
+                f"对冲请求: {hedging['hedged']} 次, 胜出 {hedging['wins']} 次, "
+                f"预算不足 {hedging['denied']} 次"
+            )
+            record("hedging", hedging)
 
-        return results, failed_platforms
+    async def fetch_all_async(
+        self, deadline: Optional[float] = None
+    ) -> Tuple[List[Dict], List[str]]:
+        """异步并发抓取所有平台数据
+
+        Args:
+            deadline: 整体抓取时限（秒），见 iter_fetch_async
+
+        Returns:
+            (成功的结果列表, 失败的平台ID列表)，均按平台配置顺序排列，
+            因时限被取消的平台不在其中，见 last_cancelled
+        """
+        collected = {}
+        async for platform, result in self.iter_fetch_async(deadline):
+            collected[platform["id"]] = result
+
+        return self._split_results(collected)
 
     # ========== 统一接口 ==========
 
     def fetch_all(
-        self, use_async: bool = True, request_interval: int = 1000
+        self,
+        use_async: bool = True,
+        request_interval: int = 1000,
+        deadline: Optional[float] = None,
     ) -> Tuple[List[Dict], List[str]]:
         """抓取所有平台数据（自动选择同步或异步）
 
         Args:
             use_async: 是否使用异步模式
-            request_interval: 同步模式下的请求间隔（毫秒）
+            request_interval: 已不再使用，见 fetch_all_sync
+            deadline: 整体抓取时限（秒），None 使用配置中的 FETCH_DEADLINE，
+                0 表示不限时；被取消的平台记录在 last_cancelled 中
 
         Returns:
             (成功的结果列表, 失败的平台ID列表)
         """
         if use_async:
-            return asyncio.run(self.fetch_all_async())
+            return self._run(self.fetch_all_async(deadline))
         else:
-            return self.fetch_all_sync(request_interval)
+            return self.fetch_all_sync(request_interval, deadline)
+
+    def fetch_all_streaming(
+        self,
+        on_result: Callable[[Dict, Optional[Dict]], None],
+        deadline: Optional[float] = None,
+    ) -> None:
+        """异步并发抓取，每个平台完成后立即回调
+
+        回调在事件循环线程中执行，此时其他平台的请求仍在进行，
+        适合在等待慢平台期间完成标题整理和关键词预匹配
+
+        Args:
+            on_result: 回调函数，参数为 (平台配置, 平台数据字典或 None)
+            deadline: 整体抓取时限（秒），见 iter_fetch_async
+        """
+
+        async def consume() -> None:
+            async for platform, result in self.iter_fetch_async(deadline):
+                on_result(platform, result)
+
+        self._run(consume())
+
+    def _run(self, coro: Awaitable) -> Any:
+        """在常驻事件循环（如有）或新事件循环中运行协程"""
+        if self._loop is not None:
+            return self._loop.run_until_complete(coro)
+        return asyncio.run(coro)
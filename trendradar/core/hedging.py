@@ -0,0 +1,184 @@
+"""
+对冲请求模块
+
+记录各平台最近的请求延迟，请求耗时超过历史延迟的指定分位数时
+再发一个相同的请求，先返回的结果胜出，用于削减偶发卡住的连接造成的长尾
+"""
+
+import math
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..utils.file_utils import load_state, write_state_atomic
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """计算百分位数（最近秩法）
+
+    Args:
+        values: 非空样本列表
+        pct: 百分位（0-100）
+
+    Returns:
+        百分位数
+    """
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[min(max(rank, 1), len(ordered)) - 1]
+
+
+class HedgePolicy:
+    """对冲策略
+
+    延迟历史跨运行保存在 output/state/latency_history.json，
+    对冲预算按每次抓取计算：每个首发请求积累 budget_ratio 个额度，
+    每次对冲消耗 1 个，另有 1 个初始额度
+    """
+
+    # 状态文件格式版本，格式变化时递增以丢弃旧状态
+    STATE_VERSION = 1
+
+    DEFAULT_STATE_PATH = "output/state/latency_history.json"
+
+    def __init__(
+        self,
+        percentile: float = 95,
+        min_samples: int = 10,
+        min_delay: float = 0.2,
+        budget_ratio: float = 0.1,
+        window: int = 100,
+        state_path: Optional[str] = None,
+    ):
+        """初始化对冲策略
+
+        Args:
+            percentile: 超过历史延迟的该分位数时发出对冲请求
+            min_samples: 历史样本少于该数量时不对冲
+            min_delay: 对冲等待时间下限（秒）
+            budget_ratio: 对冲请求数占首发请求数的比例上限
+            window: 每个平台保留的延迟样本数
+            state_path: 状态文件路径，默认为 output/state/latency_history.json
+        """
+        self.percentile = percentile
+        self.min_samples = max(1, min_samples)
+        self.min_delay = min_delay
+        self.budget_ratio = budget_ratio
+        self.window = max(self.min_samples, window)
+        self.state_path = Path(state_path or self.DEFAULT_STATE_PATH)
+        # {platform_id: [最近的延迟（秒）, ...]}
+        self.history: Dict[str, List[float]] = {}
+        self.start_run()
+
+    @classmethod
+    def from_config(
+        cls, config: Dict, state_path: Optional[str] = None
+    ) -> Optional["HedgePolicy"]:
+        """根据配置字典创建对冲策略
+
+        Args:
+            config: 配置字典，读取其中的 HEDGING 部分
+            state_path: 状态文件路径
+
+        Returns:
+            对冲策略实例，未启用时返回 None
+        """
+        hedging = config.get("HEDGING", {})
+        if not hedging.get("ENABLED", False):
+            return None
+        return cls(
+            percentile=hedging.get("PERCENTILE", 95),
+            min_samples=hedging.get("MIN_SAMPLES", 10),
+            min_delay=hedging.get("MIN_DELAY", 0.2),
+            budget_ratio=hedging.get("BUDGET_RATIO", 0.1),
+            state_path=state_path,
+        )
+
+    def load(self) -> bool:
+        """从状态文件加载延迟历史
+
+        Returns:
+            是否加载成功，失败时历史为空
+        """
+        if not self.state_path.exists():
+            return False
+
+        try:
+            state = load_state(self.state_path, self.STATE_VERSION)
+            history = {
+                platform_id: [float(value) for value in values][-self.window :]
+                for platform_id, values in state["history"].items()
+            }
+
+        except Exception as e:
+            logger.warning(f"延迟历史无效，重新积累: {e}")
+            self.history = {}
+            return False
+
+        self.history = history
+        return True
+
+    def save(self) -> None:
+        """原子写入状态文件"""
+        state = {"version": self.STATE_VERSION, "history": self.history}
+
+        # 写入失败只会让下次运行的对冲延迟基于较旧的历史
+        write_state_atomic(self.state_path, state)
+
+    def start_run(self) -> None:
+        """开始一次抓取，重置预算和计数"""
+        self.credits = 1.0
+        self.requests = 0
+        self.hedged = 0
+        self.wins = 0
+        self.denied = 0
+
+    def record_latency(self, platform_id: str, seconds: float) -> None:
+        """记录一次成功请求的延迟"""
+        samples = self.history.setdefault(platform_id, [])
+        samples.append(round(seconds, 4))
+        if len(samples) > self.window:
+            del samples[: len(samples) - self.window]
+
+    def hedge_delay(self, platform_id: str) -> Optional[float]:
+        """发出对冲请求前的等待时间
+
+        Args:
+            platform_id: 平台 ID
+
+        Returns:
+            等待秒数，历史样本不足时返回 None 表示不对冲
+        """
+        samples = self.history.get(platform_id, [])
+        if len(samples) < self.min_samples:
+            return None
+        return max(self.min_delay, percentile(samples, self.percentile))
+
+    def on_request(self) -> None:
+        """记录一次首发请求，积累对冲额度"""
+        self.requests += 1
+        self.credits += self.budget_ratio
+
+    def try_hedge(self) -> bool:
+        """申请一次对冲，预算用完时拒绝"""
+        if self.credits < 1:
+            self.denied += 1
+            return False
+        self.credits -= 1
+        self.hedged += 1
+        return True
+
+    def record_win(self) -> None:
+        """记录一次对冲请求先于首发请求成功返回"""
+        self.wins += 1
+
+    def summary(self) -> Dict[str, int]:
+        """本次抓取的对冲统计，写入运行指标"""
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "wins": self.wins,
+            "denied": self.denied,
+        }
@@ -0,0 +1,128 @@
+"""
+HTTP 校验信息缓存模块
+
+按平台保存上次成功响应的 ETag、Last-Modified 和响应体哈希，
+用于发送条件请求并识别内容未变化的平台
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Dict, Optional
+
+from ..utils.file_utils import load_state, write_state_atomic
+from ..utils.logger import get_logger
+from ..utils.time_utils import format_date_folder
+
+logger = get_logger(__name__)
+
+
+def hash_body(body: bytes) -> str:
+    """计算响应体哈希
+
+    Args:
+        body: 原始响应体
+
+    Returns:
+        十六进制哈希字符串
+    """
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+class HttpValidatorCache:
+    """HTTP 校验信息缓存
+
+    按天保存在 output/<日期>/state/ 下：每天第一次抓取总是完整下载，
+    保证当日快照中至少有一份完整数据可供“未变化”的平台沿用
+    """
+
+    # 状态文件格式版本，格式变化时递增以丢弃旧缓存
+    STATE_VERSION = 1
+
+    STATE_FILENAME = "http_validators.json"
+
+    def __init__(self, date_folder: Optional[str] = None, output_dir: str = "output"):
+        """初始化校验信息缓存
+
+        Args:
+            date_folder: 日期文件夹名称，默认为北京时间当天
+            output_dir: 输出根目录
+        """
+        self.date_folder = date_folder or format_date_folder()
+        self.state_path = (
+            Path(output_dir) / self.date_folder / "state" / self.STATE_FILENAME
+        )
+        # {platform_id: {"etag": str, "last_modified": str, "body_hash": str}}
+        self.entries: Dict[str, Dict[str, str]] = {}
+
+    def load(self) -> bool:
+        """从状态文件加载缓存
+
+        Returns:
+            是否加载成功，失败时缓存为空
+        """
+        if not self.state_path.exists():
+            return False
+
+        try:
+            state = load_state(self.state_path, self.STATE_VERSION)
+            entries = state["entries"]
+            if not isinstance(entries, dict):
+                raise ValueError("状态字段类型错误")
+
+        except Exception as e:
+            logger.warning(f"HTTP 校验信息缓存无效，本次完整抓取: {e}")
+            self.entries = {}
+            return False
+
+        self.entries = entries
+        return True
+
+    def save(self) -> None:
+        """原子写入状态文件"""
+        state = {"version": self.STATE_VERSION, "entries": self.entries}
+
+        # 缓存写入失败只会让下次抓取变为完整下载
+        write_state_atomic(self.state_path, state)
+
+    def conditional_headers(self, platform_id: str) -> Dict[str, str]:
+        """构建条件请求头
+
+        Args:
+            platform_id: 平台 ID
+
+        Returns:
+            If-None-Match / If-Modified-Since 请求头，没有缓存时为空
+        """
+        entry = self.entries.get(platform_id, {})
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def is_unchanged(self, platform_id: str, body_hash: str) -> bool:
+        """响应体是否与上次成功响应相同"""
+        entry = self.entries.get(platform_id)
+        return entry is not None and entry.get("body_hash") == body_hash
+
+    def update(
+        self,
+        platform_id: str,
+        body_hash: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """记录一次成功响应的校验信息
+
+        Args:
+            platform_id: 平台 ID
+            body_hash: 响应体哈希
+            etag: ETag 响应头
+            last_modified: Last-Modified 响应头
+        """
+        self.entries[platform_id] = {
+            "etag": etag or "",
+            "last_modified": last_modified or "",
+            "body_hash": body_hash,
+        }
@@ -0,0 +1,134 @@
+"""
+最近成功数据缓存模块
+
+保存每个平台最近一次抓取成功的标题，平台抓取失败时用缓存数据代替，
+快照和报告中标记为陈旧数据，避免平台在本次运行中整体缺失
+"""
+
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from ..utils.file_utils import load_state, write_state_atomic
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class LastGoodCache:
+    """最近成功数据缓存
+
+    记录 {平台ID: {"fetched_at": 抓取时间戳, "titles": {标题: 信息}}}，
+    超过 max_staleness 秒的缓存不再使用。
+    缓存跨运行保存在 output/state/last_good.json
+    """
+
+    # 状态文件格式版本，格式变化时递增以丢弃旧状态
+    STATE_VERSION = 1
+
+    DEFAULT_STATE_PATH = "output/state/last_good.json"
+
+    def __init__(
+        self,
+        max_staleness: float = 3600.0,
+        state_path: Optional[str] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        """初始化缓存
+
+        Args:
+            max_staleness: 缓存数据的最长使用时间（秒）
+            state_path: 状态文件路径，默认为 output/state/last_good.json
+            clock: 返回 Unix 时间戳的时钟，状态跨进程保存，不能使用单调时钟
+        """
+        self.max_staleness = max_staleness
+        self.state_path = Path(state_path or self.DEFAULT_STATE_PATH)
+        self._clock = clock
+        self.platforms: Dict[str, Dict] = {}
+
+    @classmethod
+    def from_config(
+        cls, config: Dict, state_path: Optional[str] = None
+    ) -> Optional["LastGoodCache"]:
+        """根据配置字典创建缓存
+
+        Args:
+            config: 配置字典，读取其中的 STALE_FALLBACK
+            state_path: 状态文件路径
+
+        Returns:
+            缓存实例，未启用时返回 None
+        """
+        stale = config.get("STALE_FALLBACK", {})
+        max_staleness = stale.get("MAX_STALENESS", 3600)
+        if not stale.get("ENABLED", True) or max_staleness <= 0:
+            return None
+        return cls(max_staleness=max_staleness, state_path=state_path)
+
+    def load(self) -> bool:
+        """从状态文件加载缓存
+
+        Returns:
+            是否加载成功，失败时缓存为空
+        """
+        if not self.state_path.exists():
+            return False
+
+        try:
+            state = load_state(self.state_path, self.STATE_VERSION)
+            platforms = {}
+            for platform_id, entry in state["platforms"].items():
+                if not isinstance(entry["titles"], dict):
+                    raise ValueError(f"平台 {platform_id} 的标题格式错误")
+                platforms[platform_id] = {
+                    "fetched_at": float(entry["fetched_at"]),
+                    "titles": entry["titles"],
+                }
+
+        except Exception as e:
+            logger.warning(f"最近成功数据缓存无效，已忽略: {e}")
+            self.platforms = {}
+            return False
+
+        self.platforms = platforms
+        return True
+
+    def save(self) -> None:
+        """原子写入状态文件，已超过最长使用时间的缓存不再保存"""
+        now = self._clock()
+        platforms = {
+            platform_id: entry
+            for platform_id, entry in self.platforms.items()
+            if now - entry["fetched_at"] <= self.max_staleness
+        }
+        state = {"version": self.STATE_VERSION, "platforms": platforms}
+
+        # 写入失败只会让下次运行没有可用的缓存
+        write_state_atomic(self.state_path, state)
+
+    def update(self, platform_id: str, titles: Dict) -> None:
+        """记录一次成功抓取的标题"""
+        self.platforms[platform_id] = {"fetched_at": self._clock(), "titles": titles}
+
+    def touch(self, platform_id: str) -> None:
+        """内容未变化时刷新缓存时间，缓存的标题仍是最新内容"""
+        entry = self.platforms.get(platform_id)
+        if entry is not None:
+            entry["fetched_at"] = self._clock()
+
+    def get(self, platform_id: str) -> Optional[Tuple[Dict, float]]:
+        """读取平台的缓存数据
+
+        Args:
+            platform_id: 平台ID
+
+        Returns:
+            (标题字典, 距抓取时间的秒数)，没有缓存或已超过最长使用时间时返回 None
+        """
+        entry = self.platforms.get(platform_id)
+        if entry is None:
+            return None
+        age = max(0.0, self._clock() - entry["fetched_at"])
+        if age > self.max_staleness:
+            return None
+        return entry["titles"], age
@@ -4,32 +4,51 @@
 负责关键词匹配、权重计算和词频统计
 """
 
-from typing import Dict, List, Optional, Tuple
+import heapq
+from itertools import chain
+from operator import attrgetter
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
 
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，未安装时逐条计算权重
+    np = None
+
+from ..utils.aho_corasick import AhoCorasick
 from ..utils.logger import get_logger
+from .records import MatchedTitle, as_title_record
+from .trends import TitleTrend
 
 logger = get_logger(__name__)
 
+# 未传入权重配置时使用的默认权重（只读）
+DEFAULT_WEIGHT_CONFIG = {
+    "RANK_WEIGHT": 0.6,
+    "FREQUENCY_WEIGHT": 0.3,
+    "HOTNESS_WEIGHT": 0.1,
+}
+
 
 def calculate_news_weight(
-    title_data: Dict, rank_threshold: int = 5, weight_config: Optional[Dict] = None
+    title_data: Dict,
+    rank_threshold: int = 5,
+    weight_config: Optional[Dict] = None,
+    trend: Optional[TitleTrend] = None,
 ) -> float:
     """计算新闻权重，用于排序
 
     Args:
         title_data: 标题数据，包含 ranks, count 等
         rank_threshold: 排名高亮阈值
-        weight_config: 权重配置 {RANK_WEIGHT, FREQUENCY_WEIGHT, HOTNESS_WEIGHT}
+        weight_config: 权重配置 {RANK_WEIGHT, FREQUENCY_WEIGHT, HOTNESS_WEIGHT}，
+            可选 TREND_WEIGHT（默认 0）
+        trend: 排名走势，None 表示没有记录
 
     Returns:
         计算出的权重值
     """
     if weight_config is None:
-        weight_config = {
-            "RANK_WEIGHT": 0.6,
-            "FREQUENCY_WEIGHT": 0.3,
-            "HOTNESS_WEIGHT": 0.1,
-        }
+        weight_config = DEFAULT_WEIGHT_CONFIG
 
     ranks = title_data.get("ranks", [])
     if not ranks:
@@ -37,19 +56,29 @@ def calculate_news_weight(
 
     count = title_data.get("count", len(ranks))
 
+    # 累计记录（TitleAccumulator）维护了最小、最大排名和排名之和，
+    # 能确定结果时直接用计数器计算，整数运算与逐个累加的结果相同
+    min_rank = getattr(title_data, "min_rank", None)
+    max_rank = getattr(title_data, "max_rank", None)
+
     # 排名权重：Σ(11 - min(rank, 10)) / 出现次数
-    rank_scores = []
-    for rank in ranks:
-        score = 11 - min(rank, 10)
-        rank_scores.append(score)
+    if max_rank is not None and max_rank <= 10:
+        rank_score_sum = 11 * len(ranks) - title_data.rank_sum
+    else:
+        rank_score_sum = sum(11 - min(rank, 10) for rank in ranks)
 
-    rank_weight = sum(rank_scores) / len(ranks) if ranks else 0
+    rank_weight = rank_score_sum / len(ranks) if ranks else 0
 
     # 频次权重：min(出现次数, 10) × 10
     frequency_weight = min(count, 10) * 10
 
     # 热度加成：高排名次数 / 总出现次数 × 100
-    high_rank_count = sum(1 for rank in ranks if rank <= rank_threshold)
+    if max_rank is not None and max_rank <= rank_threshold:
+        high_rank_count = len(ranks)
+    elif min_rank is not None and min_rank > rank_threshold:
+        high_rank_count = 0
+    else:
+        high_rank_count = sum(1 for rank in ranks if rank <= rank_threshold)
     hotness_ratio = high_rank_count / len(ranks) if ranks else 0
     hotness_weight = hotness_ratio * 100
 
@@ -59,9 +88,92 @@ def calculate_news_weight(
         + hotness_weight * weight_config["HOTNESS_WEIGHT"]
     )
 
+    # 上升趋势加成：min(上升速度(名次/小时), 10) × 10，作为额外加分，默认不计入
+    trend_weight = weight_config.get("TREND_WEIGHT", 0)
+    if trend_weight and trend is not None:
+        rising_weight = min(max(trend.velocity, 0.0), 10.0) * 10
+        total_weight += rising_weight * trend_weight
+
     return total_weight
 
 
+def calculate_news_weights(
+    records: Sequence[Dict],
+    rank_threshold: int = 5,
+    weight_config: Optional[Dict] = None,
+    trends: Optional[Sequence[Optional[TitleTrend]]] = None,
+) -> List[float]:
+    """批量计算新闻权重
+
+    结果与逐条调用 calculate_news_weight 完全相同。安装了 numpy 时
+    把所有条目的排名展平为一个数组，排名、频次和热度三项按条目向量化计算，
+    浮点运算的顺序与逐条计算一致；未安装时逐条计算
+
+    Args:
+        records: 标题数据列表，每项包含 ranks, count 等
+        rank_threshold: 排名高亮阈值
+        weight_config: 权重配置，同 calculate_news_weight
+        trends: 与 records 一一对应的排名走势，None 表示都没有
+
+    Returns:
+        与 records 一一对应的权重
+    """
+    if weight_config is None:
+        weight_config = DEFAULT_WEIGHT_CONFIG
+    if trends is None:
+        trends = [None] * len(records)
+
+    if np is None or not records:
+        return [
+            calculate_news_weight(record, rank_threshold, weight_config, trend)
+            for record, trend in zip(records, trends)
+        ]
+
+    item_count = len(records)
+    rank_lists = [record.get("ranks", []) for record in records]
+    lengths = np.fromiter(map(len, rank_lists), dtype=np.int64, count=item_count)
+    counts = np.fromiter(
+        (record.get("count", len(ranks)) for record, ranks in zip(records, rank_lists)),
+        dtype=np.float64,
+        count=item_count,
+    )
+    flat = np.fromiter(
+        chain.from_iterable(rank_lists), dtype=np.int64, count=int(lengths.sum())
+    )
+    # 展平后的每个排名所属的条目
+    owners = np.repeat(np.arange(item_count), lengths)
+
+    # 排名分和高排名次数都是整数，按条目求和没有舍入误差
+    rank_score_sum = np.bincount(
+        owners, weights=11 - np.minimum(flat, 10), minlength=item_count
+    )
+    high_rank_count = np.bincount(
+        owners, weights=flat <= rank_threshold, minlength=item_count
+    )
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rank_weight = rank_score_sum / lengths
+        hotness_weight = high_rank_count / lengths * 100
+    frequency_weight = np.minimum(counts, 10) * 10
+
+    total_weight = (
+        rank_weight * weight_config["RANK_WEIGHT"]
+        + frequency_weight * weight_config["FREQUENCY_WEIGHT"]
+        + hotness_weight * weight_config["HOTNESS_WEIGHT"]
+    )
+
+    trend_weight = weight_config.get("TREND_WEIGHT", 0)
+    if trend_weight:
+        rising = [i for i, trend in enumerate(trends) if trend is not None]
+        if rising:
+            velocity = np.array([trends[i].velocity for i in rising])
+            rising_weight = np.minimum(np.maximum(velocity, 0.0), 10.0) * 10
+            total_weight[rising] += rising_weight * trend_weight
+
+    # 没有排名的条目权重为 0
+    total_weight[lengths == 0] = 0.0
+    return total_weight.tolist()
+
+
 def matches_word_groups(
     title: str, word_groups: List[Dict], filter_words: List[str]
 ) -> bool:
@@ -111,6 +223,106 @@ def matches_word_groups(
     return False
 
 
+class WordGroupMatcher:
+    """预编译的词组匹配器
+
+    将所有过滤词、必须词和普通词编译进一个 Aho-Corasick 自动机，
+    每个标题只扫描一次，再根据命中集合判断词组规则。
+    结果与 matches_word_groups 完全一致；匹配结果按标题缓存，
+    同一标题在抓取、统计和报告阶段只计算一次
+    """
+
+    # 缓存标题数上限，超出后清空重建
+    CACHE_LIMIT = 100000
+
+    def __init__(self, word_groups: List[Dict], filter_words: List[str]):
+        """编译词组规则
+
+        Args:
+            word_groups: 词组列表，每个词组包含 required, normal 字段
+            filter_words: 过滤词列表
+        """
+        self.word_groups = word_groups
+        self.filter_words = filter_words
+
+        pattern_ids: Dict[str, int] = {}
+
+        def to_ids(words: List[str]) -> FrozenSet[int]:
+            ids = set()
+            for word in words:
+                word_lower = word.lower()
+                if word_lower not in pattern_ids:
+                    pattern_ids[word_lower] = len(pattern_ids)
+                ids.add(pattern_ids[word_lower])
+            return frozenset(ids)
+
+        self._filter_ids = to_ids(filter_words)
+        self._groups: List[Tuple[FrozenSet[int], FrozenSet[int]]] = [
+            (to_ids(group.get("required", [])), to_ids(group.get("normal", [])))
+            for group in word_groups
+        ]
+        self._automaton = AhoCorasick(pattern_ids)
+        self._cache: Dict[str, bool] = {}
+
+    @property
+    def keyword_count(self) -> int:
+        """去重后的关键词数量"""
+        return self._automaton.pattern_count
+
+    def matches(self, title: str) -> bool:
+        """检查标题是否匹配词组规则
+
+        Args:
+            title: 标题文本
+
+        Returns:
+            是否匹配
+        """
+        # 如果没有配置词组，则匹配所有标题（支持显示全部新闻）
+        if not self._groups:
+            return True
+
+        cached = self._cache.get(title)
+        if cached is not None:
+            return cached
+
+        if len(self._cache) >= self.CACHE_LIMIT:
+            self._cache.clear()
+
+        matched = self._match_uncached(title)
+        self._cache[title] = matched
+        return matched
+
+    def prime(self, titles: Iterable[str]) -> int:
+        """预先匹配一批标题并缓存结果
+
+        Args:
+            titles: 标题列表
+
+        Returns:
+            匹配的标题数
+        """
+        return sum(1 for title in titles if self.matches(title))
+
+    def _match_uncached(self, title: str) -> bool:
+        """对单个标题执行自动机扫描和词组判断"""
+        hits = self._automaton.find_all(title.lower())
+
+        # 过滤词检查
+        if not self._filter_ids.isdisjoint(hits):
+            return False
+
+        # 词组匹配检查：必须词全部命中，普通词至少命中一个
+        for required_ids, normal_ids in self._groups:
+            if not required_ids <= hits:
+                continue
+            if normal_ids and normal_ids.isdisjoint(hits):
+                continue
+            return True
+
+        return False
+
+
 def format_rank_display(ranks: List[int], rank_threshold: int, format_type: str) -> str:
     """统一的排名格式化方法
 
@@ -170,6 +382,9 @@ def count_word_frequency(
     title_info: Optional[Dict] = None,
     rank_threshold: int = 5,
     weight_config: Optional[Dict] = None,
+    matcher: Optional[WordGroupMatcher] = None,
+    trends: Optional[Dict[str, Dict[str, TitleTrend]]] = None,
+    max_news: int = 0,
 ) -> List[Dict]:
     """统计词频并返回匹配的新闻列表
 
@@ -178,65 +393,72 @@ def count_word_frequency(
         word_groups: 词组列表
         filter_words: 过滤词列表
         id_to_name: 平台ID到名称的映射
-        title_info: 标题详细信息
+        title_info: 标题详细信息 {平台ID: {标题: TitleRecord}}
         rank_threshold: 排名高亮阈值
         weight_config: 权重配置
+        matcher: 预编译的词组匹配器，None 表示根据 word_groups 现场编译
+        trends: 排名走势 {平台ID: {标题: TitleTrend}}，None 表示不使用
+        max_news: 最多返回的条数（按权重取前 N 条），0 表示不限制
 
     Returns:
-        匹配的新闻列表，按权重排序
+        匹配的新闻列表（MatchedTitle，可按字典方式读取），按权重排序
     """
     if title_info is None:
         title_info = {}
+    if trends is None:
+        trends = {}
 
     # 如果没有配置词组，创建一个包含所有新闻的虚拟词组
     if not word_groups:
         logger.info("频率词配置为空，将显示所有新闻")
         word_groups = [{"required": [], "normal": [], "group_key": "全部新闻"}]
         filter_words = []  # 清空过滤词，显示所有新闻
+        matcher = None
+
+    if matcher is None:
+        matcher = WordGroupMatcher(word_groups, filter_words)
 
     matched_news = []
 
     for source_id, titles_data in results.items():
         source_name = id_to_name.get(source_id, source_id)
+        source_trends = trends.get(source_id, {})
 
         for title, data in titles_data.items():
             # 检查是否匹配词组
-            if matches_word_groups(title, word_groups, filter_words):
-                # 获取标题详细信息
-                info = {}
-                if source_id in title_info and title in title_info[source_id]:
-                    info = title_info[source_id][title]
-                else:
-                    # 使用基础数据
-                    info = {
-                        "ranks": data.get("ranks", []),
-                        "count": 1,
-                        "url": data.get("url", ""),
-                        "mobileUrl": data.get("mobileUrl", ""),
-                    }
-
-                # 计算权重
-                weight = calculate_news_weight(
-                    info, rank_threshold=rank_threshold, weight_config=weight_config
-                )
+            if matcher.matches(title):
+                # 获取标题详细信息，当日没有记录时使用基础数据
+                info = as_title_record(title_info.get(source_id, {}).get(title), data)
 
+                # 匹配结果引用标题记录，不再复制排名、时间和链接；权重在匹配完成后批量计算
                 matched_news.append(
-                    {
-                        "title": title,
-                        "source_id": source_id,
-                        "source_name": source_name,
-                        "ranks": info.get("ranks", []),
-                        "count": info.get("count", 1),
-                        "first_time": info.get("first_time", ""),
-                        "last_time": info.get("last_time", ""),
-                        "url": info.get("url", ""),
-                        "mobileUrl": info.get("mobileUrl", ""),
-                        "weight": weight,
-                    }
+                    MatchedTitle(
+                        title,
+                        source_id,
+                        source_name,
+                        info,
+                        0.0,
+                        source_trends.get(title),
+                    )
                 )
 
-    # 按权重排序（降序）
-    matched_news.sort(key=lambda x: x["weight"], reverse=True)
+    weights = calculate_news_weights(
+        [news.record for news in matched_news],
+        rank_threshold=rank_threshold,
+        weight_config=weight_config,
+        trends=[news.trend for news in matched_news],
+    )
+    for news, weight in zip(matched_news, weights):
+        news.weight = weight
 
     logger.info(f"匹配到 {len(matched_news)} 条新闻")
+
+    # 按权重排序（降序）；限制条数时用堆只取前 N 条，
+    # 顺序（包括权重相同的条目）与完整排序后截取相同
+    if max_news and len(matched_news) > max_news:
+        matched_news = heapq.nlargest(max_news, matched_news, key=attrgetter("weight"))
+        logger.info(f"按权重保留前 {max_news} 条")
+    else:
+        matched_news.sort(key=attrgetter("weight"), reverse=True)
+
     return matched_news
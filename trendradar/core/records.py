@@ -0,0 +1,390 @@
+"""
+标题记录模块
+
+当日聚合中每条标题的出现记录和关键词匹配结果数量很大，
+使用 __slots__ 记录代替字典以减少内存占用；
+记录支持按字段名读写（get、[]、keys、items、copy），
+原先按字典读取的报告生成和推送代码无需修改
+"""
+
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+
+class _SlotRecord:
+    """按字段名访问的 __slots__ 记录基类
+
+    子类在 FIELDS 中列出可按字段名访问的属性（可以包含只读 property）；
+    字段都可以按名读取，只读 property 字段按名写入时抛出 TypeError
+    """
+
+    __slots__ = ()
+
+    FIELDS: Tuple[str, ...] = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        attr = getattr(type(self), key, None)
+        if isinstance(attr, property) and attr.fset is None:
+            raise TypeError(f"{type(self).__name__} 的字段 {key} 是只读的")
+        setattr(self, key, value)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.FIELDS
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.FIELDS)
+
+    def __len__(self) -> int:
+        return len(self.FIELDS)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, _SlotRecord):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    # 记录可变，不能作为字典键
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """与 dict.get 相同"""
+        if key not in self.FIELDS:
+            return default
+        return getattr(self, key)
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.FIELDS
+
+    def values(self) -> List[Any]:
+        return [getattr(self, key) for key in self.FIELDS]
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(key, getattr(self, key)) for key in self.FIELDS]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为字典"""
+        return {key: getattr(self, key) for key in self.FIELDS}
+
+    def copy(self) -> Dict[str, Any]:
+        """与 dict.copy 相同，返回字典以便调用方添加字段"""
+        return self.to_dict()
+
+
+class TitleRecord(_SlotRecord):
+    """单条标题的出现记录，用于当日没有累计记录的标题
+
+    属性名与原字典的键相同（包括 mobileUrl）。
+    ranks 列表可能与快照数据共享，只能整体替换，不能原地修改
+    """
+
+    __slots__ = ("first_time", "last_time", "count", "ranks", "url", "mobileUrl")
+
+    FIELDS = __slots__
+
+    def __init__(
+        self,
+        first_time: str,
+        last_time: str,
+        count: int,
+        ranks: List[int],
+        url: str = "",
+        mobileUrl: str = "",
+    ):
+        """初始化标题记录
+
+        Args:
+            first_time: 首次出现时间
+            last_time: 最后出现时间
+            count: 出现次数
+            ranks: 出现过的排名
+            url: 链接
+            mobileUrl: 移动端链接
+        """
+        self.first_time = first_time
+        self.last_time = last_time
+        self.count = count
+        self.ranks = ranks
+        self.url = url
+        self.mobileUrl = mobileUrl
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TitleRecord":
+        """从字典创建记录，缺少的字段使用默认值"""
+        return cls(
+            data.get("first_time", ""),
+            data.get("last_time", ""),
+            data.get("count", 1),
+            data.get("ranks", []),
+            data.get("url", ""),
+            data.get("mobileUrl", ""),
+        )
+
+    def to_list(self) -> List[Any]:
+        """按字段顺序转换为列表，用于紧凑的状态文件"""
+        return [getattr(self, key) for key in self.FIELDS]
+
+    @classmethod
+    def from_list(cls, values: List[Any]) -> "TitleRecord":
+        """从 to_list 的结果创建记录
+
+        Raises:
+            ValueError: 字段数量或类型错误
+        """
+        if not isinstance(values, list) or len(values) != len(cls.FIELDS):
+            raise ValueError(f"标题记录格式错误: {values!r}")
+        first_time, last_time, count, ranks, url, mobile_url = values
+        if type(count) is not int or not isinstance(ranks, list):
+            raise ValueError(f"标题记录格式错误: {values!r}")
+        return cls(first_time, last_time, count, ranks, url, mobile_url)
+
+
+class TitleAccumulator(_SlotRecord):
+    """单条标题的当日累计记录
+
+    由 process_source_data 创建并保存在 title_info 中，
+    all_results 中保存它的 TitleResult 视图，每次出现原地更新次数、时间、排名和链接。
+    排名按首次出现顺序保存在自有列表中，另用一个整数位图记录已出现的排名，
+    两者构成有序集合，查重为 O(1)，比集合节省内存；
+    同时维护最小、最大排名和排名之和，供权重计算使用
+    """
+
+    __slots__ = (
+        "first_time",
+        "last_time",
+        "count",
+        "_ranks",
+        "_rank_bits",
+        "min_rank",
+        "max_rank",
+        "rank_sum",
+        "url",
+        "mobileUrl",
+    )
+
+    FIELDS = TitleRecord.FIELDS
+
+    # 位图只记录该范围内的排名，范围外的排名（实际不会出现）在列表中查重
+    RANK_BITS_LIMIT = 1024
+
+    def __init__(
+        self, time_info: str, ranks: List[int], url: str = "", mobileUrl: str = ""
+    ):
+        """记录标题的首次出现
+
+        Args:
+            time_info: 出现时间
+            ranks: 本次的排名
+            url: 链接
+            mobileUrl: 移动端链接
+        """
+        self.first_time = time_info
+        self.last_time = time_info
+        self.count = 1
+        self._ranks: List[int] = []
+        # 第 r 位为 1 表示排名 r 已出现
+        self._rank_bits = 0
+        self.min_rank: Optional[int] = None
+        self.max_rank: Optional[int] = None
+        self.rank_sum = 0
+        self.url = url
+        self.mobileUrl = mobileUrl
+        self.add_ranks(ranks)
+
+    @property
+    def ranks(self) -> List[int]:
+        """去重后的排名，按首次出现顺序；返回内部列表，调用方不能修改"""
+        return self._ranks
+
+    def add_ranks(self, ranks: List[int]) -> None:
+        """合并排名，已出现过的排名忽略"""
+        for rank in ranks:
+            if 0 <= rank < self.RANK_BITS_LIMIT:
+                bit = 1 << rank
+                if self._rank_bits & bit:
+                    continue
+                self._rank_bits |= bit
+            elif rank in self._ranks:
+                continue
+            self._ranks.append(rank)
+            if self.min_rank is None or rank < self.min_rank:
+                self.min_rank = rank
+            if self.max_rank is None or rank > self.max_rank:
+                self.max_rank = rank
+            self.rank_sum += rank
+
+    def observe(
+        self, time_info: str, ranks: List[int], url: str = "", mobileUrl: str = ""
+    ) -> None:
+        """记录标题的又一次出现，链接保留第一个非空值
+
+        Args:
+            time_info: 出现时间
+            ranks: 本次的排名
+            url: 链接
+            mobileUrl: 移动端链接
+        """
+        self.last_time = time_info
+        self.count += 1
+        self.add_ranks(ranks)
+        if not self.url:
+            self.url = url
+        if not self.mobileUrl:
+            self.mobileUrl = mobileUrl
+
+    def to_list(self) -> List[Any]:
+        """按字段顺序转换为列表，用于紧凑的状态文件"""
+        return [getattr(self, key) for key in self.FIELDS]
+
+    @classmethod
+    def from_list(cls, values: List[Any]) -> "TitleAccumulator":
+        """从 to_list 的结果恢复累计记录
+
+        Raises:
+            ValueError: 字段数量或类型错误
+        """
+        record = TitleRecord.from_list(values)
+        accumulator = cls(record.first_time, record.ranks, record.url, record.mobileUrl)
+        accumulator.last_time = record.last_time
+        accumulator.count = record.count
+        return accumulator
+
+
+class TitleResult(_SlotRecord):
+    """all_results[平台ID][标题] 的只读视图
+
+    字段与原来的 {"ranks", "url", "mobileUrl"} 字典相同，直接读取累计记录，
+    同一条标题不再在 all_results 和 title_info 中各保存一份
+    """
+
+    __slots__ = ("record",)
+
+    FIELDS = ("ranks", "url", "mobileUrl")
+
+    def __init__(self, record: TitleAccumulator):
+        """初始化视图
+
+        Args:
+            record: 标题的累计记录
+        """
+        self.record = record
+
+    @property
+    def ranks(self) -> List[int]:
+        return self.record.ranks
+
+    @property
+    def url(self) -> str:
+        return self.record.url
+
+    @property
+    def mobileUrl(self) -> str:
+        return self.record.mobileUrl
+
+
+class MatchedTitle(_SlotRecord):
+    """关键词匹配到的一条标题
+
+    排名、次数、时间和链接直接读取所引用的标题记录，不再复制；
+    trend 为排名走势（TitleTrend），不在字典字段中，没有记录时为 None
+    """
+
+    __slots__ = ("title", "source_id", "source_name", "record", "weight", "trend")
+
+    FIELDS = (
+        "title",
+        "source_id",
+        "source_name",
+        "ranks",
+        "count",
+        "first_time",
+        "last_time",
+        "url",
+        "mobileUrl",
+        "weight",
+    )
+
+    def __init__(
+        self,
+        title: str,
+        source_id: str,
+        source_name: str,
+        record: Union[TitleRecord, TitleAccumulator],
+        weight: float,
+        trend: Optional[Any] = None,
+    ):
+        """初始化匹配结果
+
+        Args:
+            title: 标题
+            source_id: 平台ID
+            source_name: 平台名称
+            record: 标题记录
+            weight: 排序权重
+            trend: 排名走势
+        """
+        self.title = title
+        self.source_id = source_id
+        self.source_name = source_name
+        self.record = record
+        self.weight = weight
+        self.trend = trend
+
+    @property
+    def ranks(self) -> List[int]:
+        return self.record.ranks
+
+    @property
+    def count(self) -> int:
+        return self.record.count
+
+    @property
+    def first_time(self) -> str:
+        return self.record.first_time
+
+    @property
+    def last_time(self) -> str:
+        return self.record.last_time
+
+    @property
+    def url(self) -> str:
+        return self.record.url
+
+    @property
+    def mobileUrl(self) -> str:
+        return self.record.mobileUrl
+
+
+def as_title_record(
+    info: Optional[Any], data: Dict
+) -> Union[TitleRecord, TitleAccumulator]:
+    """取得标题记录，兼容仍以字典保存的 title_info
+
+    Args:
+        info: title_info 中的累计记录或字典，None 表示当日没有记录
+        data: 标题数据 {"ranks", "url", "mobileUrl"}，没有记录时使用
+
+    Returns:
+        标题记录
+    """
+    if isinstance(info, (TitleRecord, TitleAccumulator)):
+        return info
+    if info is not None:
+        return TitleRecord.from_dict(info)
+    return TitleRecord(
+        "",
+        "",
+        1,
+        data.get("ranks", []),
+        data.get("url", ""),
+        data.get("mobileUrl", ""),
+    )
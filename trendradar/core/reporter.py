@@ -11,7 +11,8 @@ from ..utils.config import load_config, load_frequency_words
 from ..utils.file_utils import clean_title, get_output_path, html_escape
 from ..utils.logger import get_logger
 from ..utils.time_utils import format_time_filename, get_beijing_time
-from .matcher import format_rank_display, matches_word_groups
+from .matcher import WordGroupMatcher, format_rank_display
+from .trends import format_trend_display
 
 logger = get_logger(__name__)
 
@@ -25,6 +26,9 @@ def prepare_report_data(
     new_titles: Optional[Dict] = None,
     id_to_name: Optional[Dict] = None,
     mode: str = "daily",
+    matcher: Optional[WordGroupMatcher] = None,
+    cancelled_ids: Optional[List] = None,
+    stale_ages: Optional[Dict[str, float]] = None,
 ) -> Dict:
     """准备报告数据
 
@@ -34,6 +38,9 @@ def prepare_report_data(
         new_titles: 新增标题字典
         id_to_name: ID到名称的映射
         mode: 报告模式
+        matcher: 预编译的词组匹配器，None 表示从关键词文件加载
+        cancelled_ids: 因抓取时限被取消的平台ID列表
+        stale_ages: 抓取失败、使用缓存数据的平台 {平台ID: 缓存数据距今秒数}
 
     Returns:
         包含处理后数据的字典
@@ -47,11 +54,12 @@ def prepare_report_data(
     if not hide_new_section:
         filtered_new_titles = {}
         if new_titles and id_to_name:
-            word_groups, filter_words = load_frequency_words()
+            if matcher is None:
+                matcher = WordGroupMatcher(*load_frequency_words())
             for source_id, titles_data in new_titles.items():
                 filtered_titles = {}
                 for title, title_data in titles_data.items():
-                    if matches_word_groups(title, word_groups, filter_words):
+                    if matcher.matches(title):
                         filtered_titles[title] = title_data
                 if filtered_titles:
                     filtered_new_titles[source_id] = filtered_titles
@@ -107,6 +115,14 @@ def prepare_report_data(
             else:
                 time_display = ""
 
+            # 匹配结果（MatchedTitle）带有排名走势，字典形式的标题数据没有
+            trend = getattr(title_data, "trend", None)
+            if trend is not None:
+                top_n = _config.get("TREND", {}).get("TOP_N", 10)
+                trend_display = format_trend_display(trend, top_n)
+            else:
+                trend_display = ""
+
             processed_title = {
                 "title": title_data.get("title", ""),
                 "source_name": title_data.get(
@@ -119,6 +135,7 @@ def prepare_report_data(
                 "url": title_data.get("url", ""),
                 "mobile_url": title_data.get("mobileUrl", ""),
                 "is_new": title_data.get("is_new", False),
+                "trend_display": trend_display,
             }
             processed_titles.append(processed_title)
 
@@ -135,6 +152,8 @@ def prepare_report_data(
         "stats": processed_stats,
         "new_titles": processed_new_titles,
         "failed_ids": failed_ids or [],
+        "cancelled_ids": cancelled_ids or [],
+        "stale_ages": dict(stale_ages or {}),
         "total_new_count": sum(
             len(source["titles"]) for source in processed_new_titles
         ),
@@ -149,6 +168,9 @@ def generate_html_report(
     id_to_name: Optional[Dict] = None,
     mode: str = "daily",
     is_daily_summary: bool = False,
+    matcher: Optional[WordGroupMatcher] = None,
+    cancelled_ids: Optional[List] = None,
+    stale_ages: Optional[Dict[str, float]] = None,
 ) -> str:
     """生成HTML报告
 
@@ -160,6 +182,9 @@ def generate_html_report(
         id_to_name: ID到名称的映射
         mode: 报告模式
         is_daily_summary: 是否为当日汇总
+        matcher: 预编译的词组匹配器
+        cancelled_ids: 因抓取时限被取消的平台ID列表
+        stale_ages: 使用缓存数据的平台 {平台ID: 缓存数据距今秒数}
 
     Returns:
         HTML文件路径
@@ -178,7 +203,16 @@ def generate_html_report(
 
     file_path = get_output_path("html", filename)
 
-    report_data = prepare_report_data(stats, failed_ids, new_titles, id_to_name, mode)
+    report_data = prepare_report_data(
+        stats,
+        failed_ids,
+        new_titles,
+        id_to_name,
+        mode,
+        matcher=matcher,
+        cancelled_ids=cancelled_ids,
+        stale_ages=stale_ages,
+    )
 
     html_content = render_html_content(
         report_data, total_titles, is_daily_summary, mode
@@ -424,6 +458,11 @@ def render_html_content(
             color: #2563eb;
         }}
         
+        .badge.trend {{
+            background: #ecfdf5;
+            color: #059669;
+        }}
+        
         .source-group {{
             margin-bottom: 24px;
         }}
@@ -572,6 +611,7 @@ def render_html_content(
                 count = title_data.get("count", 1)
                 is_new = title_data.get("is_new", False)
                 rank_threshold = title_data.get("rank_threshold", 10)
+                trend_display = title_data.get("trend_display", "")
 
                 # 生成排名列表
                 rank_html = ""
@@ -606,6 +646,9 @@ def render_html_content(
                 if count > 1:
                     html += f'                        <span class="badge multiple">出现 {count} 次</span>\n'
 
+                if trend_display:
+                    html += f'                        <span class="badge trend">{trend_display}</span>\n'
+
                 if is_new:
                     html += (
                         '                        <span class="badge new">NEW</span>\n'
@@ -0,0 +1,237 @@
+"""
+当日已见标题索引模块
+
+按平台持久化当日已出现过的标题哈希及其首次出现的快照，
+新增检测只需对最新快照中的每条标题做一次查找，无需重新解析更早的快照。
+哈希命中后再与记录的原标题比较，哈希碰撞的标题单独按原文记录
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ..utils.file_utils import load_state, write_state_atomic
+from ..utils.logger import get_logger
+from ..utils.time_utils import format_date_folder
+from .aggregate import file_signature, snapshots_consistent
+from .snapshot_store import hash_title
+from .storage import parse_snapshot_file
+
+logger = get_logger(__name__)
+
+
+class SeenTitleIndex:
+    """当日已见标题索引
+
+    seen 记录 {platform_id: {标题哈希: [首次出现的快照序号, 标题]}}，
+    快照序号为该快照在 applied_files 中的位置；
+    与已记录标题哈希相同的其他标题记入 collisions {platform_id: {标题: 快照序号}}。
+    状态文件缺失、损坏或与 txt 快照不一致时自动从快照重建
+    """
+
+    # 状态文件格式版本，格式变化时递增以触发重建
+    # 2: 哈希旁保存原标题，碰撞的标题单独记录
+    STATE_VERSION = 2
+
+    STATE_FILENAME = "seen_titles.json"
+
+    def __init__(self, date_folder: Optional[str] = None, output_dir: str = "output"):
+        """初始化已见标题索引
+
+        Args:
+            date_folder: 日期文件夹名称，默认为北京时间当天
+            output_dir: 输出根目录
+        """
+        self.date_folder = date_folder or format_date_folder()
+        day_dir = Path(output_dir) / self.date_folder
+        self.txt_dir = day_dir / "txt"
+        self.state_path = day_dir / "state" / self.STATE_FILENAME
+        self._reset()
+
+    def _reset(self) -> None:
+        """清空内存中的索引"""
+        # 已索引的快照 {文件名: [文件大小, 修改时间(ns)]}，按时间排序
+        self.applied_files: Dict[str, List[int]] = {}
+        self.seen: Dict[str, Dict[int, List]] = {}
+        self.collisions: Dict[str, Dict[str, int]] = {}
+        # 最近一次索引的快照内容，避免检测新增时重复解析
+        self._latest: Optional[Tuple[str, Dict, List[str]]] = None
+
+    # ========== 持久化 ==========
+
+    def load(self) -> bool:
+        """从状态文件加载索引
+
+        Returns:
+            是否加载成功，失败时索引为空
+        """
+        if not self.state_path.exists():
+            return False
+
+        try:
+            state = load_state(self.state_path, self.STATE_VERSION)
+            if state.get("date_folder") != self.date_folder:
+                raise ValueError(f"状态日期不匹配: {state.get('date_folder')}")
+
+            applied_files = state["applied_files"]
+            if not isinstance(applied_files, dict):
+                raise ValueError("状态字段类型错误")
+            # JSON 的键只能是字符串，加载时还原为整数哈希
+            seen = {
+                source_id: {
+                    int(key): [int(position), str(title)]
+                    for key, (position, title) in hashes.items()
+                }
+                for source_id, hashes in state["seen"].items()
+            }
+            collisions = {
+                source_id: {
+                    str(title): int(position) for title, position in titles.items()
+                }
+                for source_id, titles in state["collisions"].items()
+            }
+
+        except Exception as e:
+            logger.warning(f"已见标题索引无效，将从快照文件重建: {e}")
+            self._reset()
+            return False
+
+        self.applied_files = applied_files
+        self.seen = seen
+        self.collisions = collisions
+        logger.debug(f"加载已见标题索引: 已索引 {len(self.applied_files)} 个文件")
+        return True
+
+    def save(self) -> None:
+        """原子写入状态文件"""
+        state = {
+            "version": self.STATE_VERSION,
+            "date_folder": self.date_folder,
+            "applied_files": self.applied_files,
+            "seen": {
+                source_id: {str(key): position for key, position in hashes.items()}
+                for source_id, hashes in self.seen.items()
+            },
+            "collisions": self.collisions,
+        }
+
+        # 索引只是缓存，写入失败不影响本次结果
+        write_state_atomic(self.state_path, state)
+
+    # ========== 更新 ==========
+
+    def _list_snapshots(self) -> Dict[str, List[int]]:
+        """列出当日全部 txt 快照及其签名（按时间排序）"""
+        if not self.txt_dir.exists():
+            return {}
+        files = sorted(f for f in self.txt_dir.iterdir() if f.suffix == ".txt")
+        return {f.name: file_signature(f) for f in files}
+
+    def _parse_snapshot(self, name: str) -> Tuple[Dict, List[str]]:
+        """解析快照，返回 (titles_by_id, 使用缓存数据的平台ID列表)"""
+        titles_by_id, _, _, stale_ids = parse_snapshot_file(self.txt_dir / name)
+        return titles_by_id, stale_ids
+
+    def _apply_snapshot(self, name: str, signature: List[int]) -> None:
+        """将单个快照中的标题加入索引
+
+        缓存数据中的标题同样记为已见，平台恢复后重新出现时不会被当作新增
+        """
+        titles_by_id, stale_ids = self._parse_snapshot(name)
+        position = len(self.applied_files)
+
+        for source_id, title_data in titles_by_id.items():
+            hashes = self.seen.setdefault(source_id, {})
+            for title in title_data:
+                key = hash_title(title)
+                entry = hashes.get(key)
+                if entry is None:
+                    hashes[key] = [position, title]
+                elif entry[1] != title:
+                    collided = self.collisions.setdefault(source_id, {})
+                    collided.setdefault(title, position)
+
+        self.applied_files[name] = signature
+        self._latest = (name, titles_by_id, stale_ids)
+
+    def refresh(self) -> int:
+        """索引尚未处理的快照
+
+        Returns:
+            本次新索引的快照数
+        """
+        signatures = self._list_snapshots()
+
+        if not snapshots_consistent(self.applied_files, signatures):
+            logger.info("已见标题索引与快照不一致，从快照重建")
+            self._reset()
+
+        pending = [name for name in signatures if name not in self.applied_files]
+        for name in pending:
+            self._apply_snapshot(name, signatures[name])
+
+        return len(pending)
+
+    # ========== 查询 ==========
+
+    def first_seen(self, source_id: str, title: str) -> Optional[int]:
+        """查询标题首次出现的快照序号
+
+        Args:
+            source_id: 平台ID
+            title: 标题
+
+        Returns:
+            快照序号，未出现过时为 None
+        """
+        entry = self.seen.get(source_id, {}).get(hash_title(title))
+        if entry is None:
+            return None
+        if entry[1] == title:
+            return entry[0]
+        # 哈希碰撞：按原标题查找
+        return self.collisions.get(source_id, {}).get(title)
+
+    @property
+    def latest_snapshot(self) -> Optional[str]:
+        """最新已索引快照的文件名"""
+        return next(reversed(list(self.applied_files)), None)
+
+    def new_titles(self, current_platform_ids: Optional[List[str]] = None) -> Dict:
+        """找出最新快照中此前从未出现过的标题
+
+        Args:
+            current_platform_ids: 当前监控的平台ID列表，None表示不过滤
+
+        Returns:
+            新增标题字典 {platform_id: {title: data}}，快照不足两个时为空；
+            最新快照中使用缓存数据的平台不参与检测
+        """
+        if len(self.applied_files) < 2:
+            return {}
+
+        latest_name = self.latest_snapshot
+        if self._latest is not None and self._latest[0] == latest_name:
+            _, latest_titles, stale_ids = self._latest
+        else:
+            latest_titles, stale_ids = self._parse_snapshot(latest_name)
+        latest_position = len(self.applied_files) - 1
+
+        new_titles = {}
+        for source_id, title_data in latest_titles.items():
+            if (
+                current_platform_ids is not None
+                and source_id not in current_platform_ids
+            ):
+                continue
+            if source_id in stale_ids:
+                continue
+
+            source_new_titles = {
+                title: data
+                for title, data in title_data.items()
+                if self.first_seen(source_id, title) == latest_position
+            }
+            if source_new_titles:
+                new_titles[source_id] = source_new_titles
+
+        return new_titles
@@ -0,0 +1,277 @@
+"""
+分片抓取模块
+
+多个工作节点按平台ID的哈希各负责一部分平台，抓取结果写入分片输出；
+汇总步骤读取同一次运行的全部分片，合并为与单节点抓取相同的结果，
+再继续保存快照、匹配和推送。重复或缺失的分片在合并时检测
+"""
+
+import json
+import os
+import socket
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ..utils.exceptions import FetchError
+from ..utils.file_utils import load_state
+from ..utils.logger import get_logger
+from ..utils.metrics import record
+
+logger = get_logger(__name__)
+
+
+def shard_of(platform_id: str, shard_count: int) -> int:
+    """计算平台所属的分片序号
+
+    使用 CRC32 而不是内置 hash()，后者在每个进程中随机加盐，
+    不同节点会得到不同的分配结果
+
+    Args:
+        platform_id: 平台ID
+        shard_count: 分片总数
+
+    Returns:
+        分片序号（0 到 shard_count-1）
+    """
+    return zlib.crc32(platform_id.encode("utf-8")) % shard_count
+
+
+def select_shard(
+    platforms: List[Dict], shard_index: int, shard_count: int
+) -> List[Dict]:
+    """选出分片负责的平台，保持配置顺序
+
+    Args:
+        platforms: 平台配置列表
+        shard_index: 分片序号
+        shard_count: 分片总数
+
+    Returns:
+        该分片负责的平台配置列表
+    """
+    return [p for p in platforms if shard_of(p["id"], shard_count) == shard_index]
+
+
+class ShardRun:
+    """一次分片运行的输出目录
+
+    每个工作节点写入 <base_dir>/<run_id>/shard-<序号>-of-<总数>.<主机>-<进程号>.json，
+    文件名包含节点标识，同一分片被多个节点执行时不会互相覆盖，合并时可以检测到
+    """
+
+    # 分片文件格式版本，格式变化时递增，旧版本文件在合并时被忽略
+    STATE_VERSION = 1
+
+    DEFAULT_BASE_DIR = "output/shards"
+
+    def __init__(self, run_id: str, shard_count: int, base_dir: Optional[str] = None):
+        """初始化分片运行
+
+        Args:
+            run_id: 运行ID，同一次运行的工作节点和汇总步骤必须相同
+            shard_count: 分片总数
+            base_dir: 分片输出根目录，多节点部署时应为共享存储
+        """
+        self.run_id = run_id
+        self.shard_count = shard_count
+        self.path = Path(base_dir or self.DEFAULT_BASE_DIR) / run_id
+        # 最近一次合并的分片情况，写入运行指标
+        self.report: Dict = {}
+
+    @classmethod
+    def latest(
+        cls, shard_count: int, base_dir: Optional[str] = None
+    ) -> Optional["ShardRun"]:
+        """找到最近一次分片运行（按运行ID排序）
+
+        Args:
+            shard_count: 分片总数
+            base_dir: 分片输出根目录
+
+        Returns:
+            分片运行，目录中没有任何运行时返回 None
+        """
+        root = Path(base_dir or cls.DEFAULT_BASE_DIR)
+        if not root.exists():
+            return None
+        run_ids = sorted(p.name for p in root.iterdir() if p.is_dir())
+        if not run_ids:
+            return None
+        return cls(run_ids[-1], shard_count, base_dir)
+
+    def write(
+        self,
+        shard_index: int,
+        platform_ids: List[str],
+        results: Dict,
+        failed: List,
+        unchanged: List,
+        cancelled: List,
+        stale: Dict,
+        written_at: Optional[float] = None,
+    ) -> Path:
+        """原子写入工作节点的分片输出
+
+        Args:
+            shard_index: 分片序号
+            platform_ids: 该分片负责的平台ID
+            results: {平台ID: 标题字典}
+            failed: 失败平台
+            unchanged: 内容未变化平台
+            cancelled: 因时限被取消的平台
+            stale: 使用缓存数据的平台 {平台ID: 缓存数据距今秒数}
+            written_at: 写入时间戳，默认为当前时间
+
+        Returns:
+            分片文件路径
+        """
+        shard = {
+            "version": self.STATE_VERSION,
+            "run_id": self.run_id,
+            "index": shard_index,
+            "count": self.shard_count,
+            "worker": f"{socket.gethostname()}-{os.getpid()}",
+            # 跨节点比较写入先后，使用 Unix 时间戳而不是单调时钟
+            "written_at": written_at if written_at is not None else time.time(),
+            "platform_ids": list(platform_ids),
+            "results": results,
+            "failed": list(failed),
+            "unchanged": list(unchanged),
+            "cancelled": list(cancelled),
+            "stale": stale,
+        }
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        name = f"shard-{shard_index}-of-{self.shard_count}.{shard['worker']}"
+        shard_path = self.path / f"{name}.json"
+        # 临时文件不匹配 shard-*.json，合并时不会读到写了一半的文件
+        tmp_path = self.path / f".{name}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(shard, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, shard_path)
+        return shard_path
+
+    def _load(self, shard_path: Path) -> Optional[Dict]:
+        """读取并检查分片文件
+
+        Returns:
+            分片内容，格式错误或分片总数不一致时返回 None
+        """
+        try:
+            shard = load_state(shard_path, self.STATE_VERSION)
+            if shard["count"] != self.shard_count:
+                raise ValueError(
+                    f"分片总数为 {shard['count']}，与当前配置的 {self.shard_count} 不一致"
+                )
+            if type(shard["index"]) is not int or not (
+                0 <= shard["index"] < self.shard_count
+            ):
+                raise ValueError(f"分片序号无效: {shard['index']}")
+            for key in ("platform_ids", "failed", "unchanged", "cancelled"):
+                if not isinstance(shard[key], list):
+                    raise ValueError(f"{key} 格式错误")
+            for key in ("results", "stale"):
+                if not isinstance(shard[key], dict):
+                    raise ValueError(f"{key} 格式错误")
+            float(shard["written_at"])
+
+        except Exception as e:
+            logger.warning(f"分片文件 {shard_path.name} 无效，已忽略: {e}")
+            return None
+
+        return shard
+
+    def merge(self, platforms: List[Dict]) -> Tuple[Dict, Dict, List, List, List, Dict]:
+        """合并全部分片输出
+
+        同一分片有多个输出时使用最后写入的一个；缺失分片负责的平台、
+        以及没有任何分片负责的平台按失败处理；
+        多个分片都包含同一平台时（各节点的平台配置不一致）优先使用哈希所属的分片
+
+        Args:
+            platforms: 平台配置列表
+
+        Returns:
+            与单节点抓取相同的 (标题结果, id_to_name, 失败平台, 内容未变化平台,
+            因时限被取消的平台, 使用缓存数据的平台)
+
+        Raises:
+            FetchError: 没有任何可用的分片输出
+        """
+        shards: Dict[int, Dict] = {}
+        duplicates: Dict[int, int] = {}
+        for shard_path in sorted(self.path.glob("shard-*.json")):
+            shard = self._load(shard_path)
+            if shard is None:
+                continue
+            index = shard["index"]
+            current = shards.get(index)
+            if current is not None:
+                duplicates[index] = duplicates.get(index, 1) + 1
+                if shard["written_at"] <= current["written_at"]:
+                    continue
+            shards[index] = shard
+
+        if not shards:
+            raise FetchError(f"运行 {self.run_id} 没有可用的分片输出: {self.path}")
+
+        missing = [i for i in range(self.shard_count) if i not in shards]
+        for index, copies in sorted(duplicates.items()):
+            logger.warning(
+                f"分片 {index} 有 {copies} 份输出，使用最后写入的一份" f"（{shards[index]['worker']}）"
+            )
+        if missing:
+            logger.warning(f"缺少分片 {', '.join(map(str, missing))}，这些分片负责的平台按失败处理")
+
+        results, failed, unchanged, cancelled, stale = {}, [], [], [], {}
+        uncovered, overlapping = [], []
+        for platform in platforms:
+            platform_id = platform["id"]
+            owners = [
+                index
+                for index, shard in sorted(shards.items())
+                if platform_id in shard["platform_ids"]
+            ]
+            if not owners:
+                if shard_of(platform_id, self.shard_count) not in missing:
+                    uncovered.append(platform_id)
+                failed.append(platform_id)
+                continue
+            if len(owners) > 1:
+                overlapping.append(platform_id)
+            owner = shard_of(platform_id, self.shard_count)
+            shard = shards[owner if owner in owners else owners[0]]
+
+            if platform_id in shard["results"]:
+                results[platform_id] = shard["results"][platform_id]
+                if platform_id in shard["stale"]:
+                    stale[platform_id] = shard["stale"][platform_id]
+            elif platform_id in shard["unchanged"]:
+                unchanged.append(platform_id)
+            elif platform_id in shard["cancelled"]:
+                cancelled.append(platform_id)
+            else:
+                failed.append(platform_id)
+
+        if uncovered:
+            logger.warning(
+                f"以下平台不在任何分片中，按失败处理（各节点的平台配置可能不一致）: " f"{', '.join(uncovered)}"
+            )
+        if overlapping:
+            logger.warning(f"以下平台出现在多个分片中: {', '.join(overlapping)}")
+
+        self.report = {
+            "run_id": self.run_id,
+            "count": self.shard_count,
+            "merged": sorted(shards),
+            "missing": missing,
+            "duplicates": {str(index): n for index, n in sorted(duplicates.items())},
+            "uncovered": uncovered,
+            "overlapping": overlapping,
+        }
+        record("shards", self.report)
+
+        id_to_name = {p["id"]: p["name"] for p in platforms}
+        return results, id_to_name, failed, unchanged, cancelled, stale
@@ -0,0 +1,367 @@
+"""
+SQLite 快照存储模块
+
+所有抓取快照保存在单个 SQLite 数据库（WAL 模式）中，
+替代逐行拼接、字符串切分解析的 txt 快照文件
+"""
+
+import hashlib
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ..utils.file_utils import clean_title
+from ..utils.logger import get_logger
+from ..utils.time_utils import (
+    format_date_folder,
+    format_time_filename,
+    get_beijing_time,
+)
+
+logger = get_logger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS platforms (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date_folder TEXT NOT NULL,
+    time_info TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    UNIQUE (date_folder, time_info)
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_created_at ON snapshots (created_at);
+
+CREATE TABLE IF NOT EXISTS snapshot_platforms (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id) ON DELETE CASCADE,
+    platform_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    PRIMARY KEY (snapshot_id, platform_id)
+);
+
+CREATE TABLE IF NOT EXISTS observations (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots (id) ON DELETE CASCADE,
+    platform_id TEXT NOT NULL,
+    title_hash INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    rank INTEGER NOT NULL,
+    url TEXT NOT NULL DEFAULT '',
+    mobile_url TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_observations_platform_title
+    ON observations (platform_id, title_hash);
+CREATE INDEX IF NOT EXISTS idx_observations_snapshot ON observations (snapshot_id);
+"""
+
+
+def hash_title(title: str) -> int:
+    """计算标题的 64 位哈希（有符号，可直接存入 SQLite INTEGER）
+
+    Args:
+        title: 标题文本
+
+    Returns:
+        64 位有符号整数
+    """
+    digest = hashlib.blake2b(title.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+class SnapshotStore:
+    """SQLite 快照存储
+
+    表结构：
+        platforms: 平台 ID 与名称
+        snapshots: 每次抓取一条记录（日期文件夹 + 时间）
+        snapshot_platforms: 每次抓取中各平台的状态（ok / failed / unchanged / stale）
+        observations: 每次抓取中每个平台的每条标题
+    """
+
+    # 数据库结构版本（PRAGMA user_version）
+    SCHEMA_VERSION = 1
+
+    DB_FILENAME = "trendradar.db"
+
+    def __init__(self, db_path: Optional[str] = None, output_dir: str = "output"):
+        """初始化快照存储
+
+        Args:
+            db_path: 数据库文件路径，默认为 output/trendradar.db
+            output_dir: 输出根目录
+        """
+        self.db_path = Path(db_path) if db_path else Path(output_dir) / self.DB_FILENAME
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """数据库连接（首次访问时打开并初始化表结构）"""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path))
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._migrate(conn)
+            self._conn = conn
+        return self._conn
+
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        """创建或升级表结构"""
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version > self.SCHEMA_VERSION:
+            raise RuntimeError(f"数据库版本 {version} 高于程序支持的版本 {self.SCHEMA_VERSION}")
+        if version < self.SCHEMA_VERSION:
+            conn.executescript(_SCHEMA)
+            conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+            conn.commit()
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # ========== 写入 ==========
+
+    def save_snapshot(
+        self,
+        results: Dict,
+        id_to_name: Dict,
+        failed_ids: List[str],
+        date_folder: Optional[str] = None,
+        time_info: Optional[str] = None,
+        unchanged_ids: Optional[List[str]] = None,
+        stale_ids: Optional[List[str]] = None,
+    ) -> int:
+        """在一个事务中保存一次抓取的全部数据
+
+        同一日期、同一时间的快照会被替换（与同名 txt 文件被覆盖一致）
+
+        Args:
+            results: 标题数据字典 {platform_id: {title: info}}
+            id_to_name: 平台ID到名称的映射
+            failed_ids: 失败的平台ID列表
+            date_folder: 日期文件夹名称，默认为北京时间当天
+            time_info: 时间信息，默认为当前时间（如 13时45分）
+            unchanged_ids: 内容未变化的平台ID列表，只记录状态不写标题
+            stale_ids: 抓取失败、results 中为缓存数据的平台ID列表，标题照常写入
+
+        Returns:
+            快照 ID
+        """
+        date_folder = date_folder or format_date_folder()
+        time_info = time_info or format_time_filename()
+
+        stale = set(stale_ids or [])
+        platforms = []
+        statuses = []
+        observations = []
+        for platform_id, title_data in results.items():
+            platforms.append((platform_id, id_to_name.get(platform_id) or platform_id))
+            statuses.append((platform_id, "stale" if platform_id in stale else "ok"))
+
+            # 按排名排序，与 txt 快照的写入顺序一致
+            rows = []
+            for title, info in title_data.items():
+                cleaned_title = clean_title(title)
+                if isinstance(info, dict):
+                    ranks = info.get("ranks", [])
+                    url = info.get("url", "") or ""
+                    mobile_url = info.get("mobileUrl", "") or ""
+                else:
+                    ranks = info if isinstance(info, list) else []
+                    url = ""
+                    mobile_url = ""
+
+                rank = ranks[0] if ranks else 1
+                rows.append((rank, cleaned_title, url, mobile_url))
+
+            rows.sort(key=lambda x: x[0])
+            observations.extend(
+                (platform_id, hash_title(title), title, rank, url, mobile_url)
+                for rank, title, url, mobile_url in rows
+            )
+
+        for platform_id in unchanged_ids or []:
+            if platform_id not in results:
+                statuses.append((platform_id, "unchanged"))
+        for platform_id in failed_ids:
+            if platform_id not in results:
+                statuses.append((platform_id, "failed"))
+
+        conn = self.conn
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO platforms (id, name) VALUES (?, ?)",
+                platforms,
+            )
+            conn.execute(
+                "DELETE FROM snapshots WHERE date_folder = ? AND time_info = ?",
+                (date_folder, time_info),
+            )
+            cursor = conn.execute(
+                "INSERT INTO snapshots (date_folder, time_info, created_at) "
+                "VALUES (?, ?, ?)",
+                (date_folder, time_info, get_beijing_time().isoformat()),
+            )
+            snapshot_id = cursor.lastrowid
+            conn.executemany(
+                "INSERT INTO snapshot_platforms (snapshot_id, platform_id, status) "
+                "VALUES (?, ?, ?)",
+                [(snapshot_id, pid, status) for pid, status in statuses],
+            )
+            conn.executemany(
+                "INSERT INTO observations "
+                "(snapshot_id, platform_id, title_hash, title, rank, url, mobile_url) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(snapshot_id,) + row for row in observations],
+            )
+
+        logger.info(
+            f"快照已写入数据库: {date_folder} {time_info}, "
+            f"{len(results)} 个平台, {len(observations)} 条标题"
+        )
+        return snapshot_id
+
+    # ========== 读取 ==========
+
+    def list_snapshots(self, date_folder: str) -> List[Tuple[int, str]]:
+        """列出某天的全部快照
+
+        Args:
+            date_folder: 日期文件夹名称
+
+        Returns:
+            [(快照 ID, 时间信息)]，按时间排序
+        """
+        return self.conn.execute(
+            "SELECT id, time_info FROM snapshots WHERE date_folder = ? "
+            "ORDER BY time_info, id",
+            (date_folder,),
+        ).fetchall()
+
+    def load_snapshot(self, snapshot_id: int) -> Tuple[Dict, Dict]:
+        """读取单个快照
+
+        Args:
+            snapshot_id: 快照 ID
+
+        Returns:
+            (titles_by_id, id_to_name) 元组，格式与 parse_file_titles 一致
+        """
+        titles_by_id: Dict[str, Dict] = {}
+        id_to_name: Dict[str, str] = {}
+
+        rows = self.conn.execute(
+            "SELECT o.platform_id, p.name, o.title, o.rank, o.url, o.mobile_url "
+            "FROM observations o LEFT JOIN platforms p ON p.id = o.platform_id "
+            "WHERE o.snapshot_id = ? ORDER BY o.rowid",
+            (snapshot_id,),
+        )
+        for platform_id, name, title, rank, url, mobile_url in rows:
+            if platform_id not in titles_by_id:
+                titles_by_id[platform_id] = {}
+                id_to_name[platform_id] = name or platform_id
+            titles_by_id[platform_id][title] = {
+                "ranks": [rank],
+                "url": url,
+                "mobileUrl": mobile_url,
+            }
+
+        return titles_by_id, id_to_name
+
+    def unchanged_platforms(self, snapshot_id: int) -> List[str]:
+        """列出某个快照中内容未变化的平台
+
+        Args:
+            snapshot_id: 快照 ID
+
+        Returns:
+            平台ID列表
+        """
+        return self._platforms_with_status(snapshot_id, "unchanged")
+
+    def stale_platforms(self, snapshot_id: int) -> List[str]:
+        """列出某个快照中使用缓存数据的平台
+
+        Args:
+            snapshot_id: 快照 ID
+
+        Returns:
+            平台ID列表
+        """
+        return self._platforms_with_status(snapshot_id, "stale")
+
+    def _platforms_with_status(self, snapshot_id: int, status: str) -> List[str]:
+        rows = self.conn.execute(
+            "SELECT platform_id FROM snapshot_platforms "
+            "WHERE snapshot_id = ? AND status = ? ORDER BY rowid",
+            (snapshot_id, status),
+        )
+        return [row[0] for row in rows]
+
+    def detect_new_titles(
+        self, date_folder: str, current_platform_ids: Optional[List[str]] = None
+    ) -> Dict:
+        """检测当日最新快照中此前从未出现过的标题
+
+        最新快照中使用缓存数据的平台不参与检测
+
+        Args:
+            date_folder: 日期文件夹名称
+            current_platform_ids: 当前监控的平台ID列表，None表示不过滤
+
+        Returns:
+            新增标题字典 {platform_id: {title: data}}
+        """
+        snapshots = self.list_snapshots(date_folder)
+        if len(snapshots) < 2:
+            logger.info("快照数量不足，无法检测新增")
+            return {}
+
+        latest_id, latest_time = snapshots[-1]
+        logger.info(f"检测新增: 最新快照 {latest_time}")
+
+        # 利用 (platform_id, title_hash) 索引查找当日更早的同名标题
+        rows = self.conn.execute(
+            """
+            SELECT o.platform_id, o.title, o.rank, o.url, o.mobile_url
+            FROM observations o
+            WHERE o.snapshot_id = :latest
+              AND NOT EXISTS (
+                SELECT 1 FROM snapshot_platforms sp
+                WHERE sp.snapshot_id = :latest
+                  AND sp.platform_id = o.platform_id
+                  AND sp.status = 'stale'
+              )
+              AND NOT EXISTS (
+                SELECT 1 FROM observations h
+                JOIN snapshots s ON s.id = h.snapshot_id
+                WHERE h.platform_id = o.platform_id
+                  AND h.title_hash = o.title_hash
+                  AND h.title = o.title
+                  AND s.date_folder = :date_folder
+                  AND h.snapshot_id != :latest
+              )
+            ORDER BY o.rowid
+            """,
+            {"latest": latest_id, "date_folder": date_folder},
+        )
+
+        platform_filter = (
+            set(current_platform_ids) if current_platform_ids is not None else None
+        )
+        new_titles: Dict[str, Dict] = {}
+        for platform_id, title, rank, url, mobile_url in rows:
+            if platform_filter is not None and platform_id not in platform_filter:
+                continue
+            new_titles.setdefault(platform_id, {})[title] = {
+                "ranks": [rank],
+                "url": url,
+                "mobileUrl": mobile_url,
+            }
+
+        return new_titles
@@ -5,22 +5,94 @@
 """
 
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 from ..utils.file_utils import clean_title, get_output_path
 from ..utils.logger import get_logger
 from ..utils.time_utils import format_date_folder, format_time_filename
 
-logger = get_logger(__name__)
+if TYPE_CHECKING:
+    from .aggregate import DayAggregate
+    from .seen_index import SeenTitleIndex
+    from .snapshot_store import SnapshotStore
 
+logger = get_logger(__name__)
 
-def save_titles_to_file(results: Dict, id_to_name: Dict, failed_ids: List[str]) -> str:
+# txt 快照中的区域标题
+FAILED_SECTION = "==== 以下ID请求失败 ===="
+UNCHANGED_SECTION = "==== 以下ID内容未变化 ===="
+STALE_SECTION = "==== 以下ID抓取失败，使用缓存数据 ===="
+
+
+def save_titles_to_file(
+    results: Dict,
+    id_to_name: Dict,
+    failed_ids: List[str],
+    store: Optional["SnapshotStore"] = None,
+    export_txt: bool = True,
+    seen_index: Optional["SeenTitleIndex"] = None,
+    unchanged_ids: Optional[List[str]] = None,
+    stale_ids: Optional[List[str]] = None,
+) -> str:
     """保存标题到文件
 
     Args:
         results: 标题数据字典 {platform_id: {title: info}}
         id_to_name: 平台ID到名称的映射
         failed_ids: 失败的平台ID列表
+        store: SQLite 快照存储，None 表示只写 txt 文件
+        export_txt: 使用数据库存储时是否同时导出 txt 文件
+        seen_index: 已见标题索引，写入 txt 快照后立即更新（仅 txt 存储时使用）
+        unchanged_ids: 内容与上次抓取相同的平台ID列表，只记录ID不写标题
+        stale_ids: 抓取失败、results 中为缓存数据的平台ID列表，标题照常写入并单独标记
+
+    Returns:
+        保存的文件路径（只写数据库时为数据库路径）
+    """
+    unchanged_ids = unchanged_ids or []
+    stale_ids = stale_ids or []
+
+    if store is not None:
+        store.save_snapshot(
+            results,
+            id_to_name,
+            failed_ids,
+            unchanged_ids=unchanged_ids,
+            stale_ids=stale_ids,
+        )
+        if not export_txt:
+            return str(store.db_path)
+        try:
+            return _write_txt_snapshot(
+                results, id_to_name, failed_ids, unchanged_ids, stale_ids
+            )
+        except Exception:
+            # txt 只是导出副本，数据已写入数据库
+            return str(store.db_path)
+
+    file_path = _write_txt_snapshot(
+        results, id_to_name, failed_ids, unchanged_ids, stale_ids
+    )
+    if seen_index is not None and seen_index.refresh():
+        seen_index.save()
+    return file_path
+
+
+def _write_txt_snapshot(
+    results: Dict,
+    id_to_name: Dict,
+    failed_ids: List[str],
+    unchanged_ids: Optional[List[str]] = None,
+    stale_ids: Optional[List[str]] = None,
+) -> str:
+    """将标题写入当日 txt 快照文件
+
+    Args:
+        results: 标题数据字典 {platform_id: {title: info}}
+        id_to_name: 平台ID到名称的映射
+        failed_ids: 失败的平台ID列表
+        unchanged_ids: 内容未变化的平台ID列表
+        stale_ids: 使用缓存数据的平台ID列表
 
     Returns:
         保存的文件路径
@@ -68,9 +140,23 @@ def save_titles_to_file(results: Dict, id_to_name: Dict, failed_ids: List[str])
 
                 f.write("\n")
 
+            # 写入内容未变化的ID，读取时沿用该平台上一次的标题
+            if unchanged_ids:
+                f.write(f"{UNCHANGED_SECTION}\n")
+                for id_value in unchanged_ids:
+                    f.write(f"{id_value}\n")
+                f.write("\n")
+
+            # 写入使用缓存数据的ID，其标题已写在上方
+            if stale_ids:
+                f.write(f"{STALE_SECTION}\n")
+                for id_value in stale_ids:
+                    f.write(f"{id_value}\n")
+                f.write("\n")
+
             # 写入失败的ID
             if failed_ids:
-                f.write("==== 以下ID请求失败 ====\n")
+                f.write(f"{FAILED_SECTION}\n")
                 for id_value in failed_ids:
                     f.write(f"{id_value}\n")
 
@@ -93,8 +179,27 @@ def parse_file_titles(file_path: Path) -> Tuple[Dict, Dict]:
         - titles_by_id: {platform_id: {title: info}}
         - id_to_name: {platform_id: name}
     """
+    titles_by_id, id_to_name, _, _ = parse_snapshot_file(file_path)
+    return titles_by_id, id_to_name
+
+
+def parse_snapshot_file(file_path: Path) -> Tuple[Dict, Dict, List[str], List[str]]:
+    """解析单个txt快照文件，包括内容未变化和使用缓存数据的平台
+
+    Args:
+        file_path: 文件路径
+
+    Returns:
+        (titles_by_id, id_to_name, unchanged_ids, stale_ids) 元组
+        - titles_by_id: {platform_id: {title: info}}
+        - id_to_name: {platform_id: name}
+        - unchanged_ids: 内容与上次抓取相同的平台ID列表
+        - stale_ids: 抓取失败、titles_by_id 中为缓存数据的平台ID列表
+    """
     titles_by_id = {}
     id_to_name = {}
+    unchanged_ids = []
+    stale_ids = []
 
     try:
         with open(file_path, "r", encoding="utf-8") as f:
@@ -102,7 +207,18 @@ def parse_file_titles(file_path: Path) -> Tuple[Dict, Dict]:
             sections = content.split("\n\n")
 
             for section in sections:
-                if not section.strip() or "==== 以下ID请求失败 ====" in section:
+                if UNCHANGED_SECTION in section:
+                    lines = section.strip().split("\n")
+                    unchanged_ids.extend(
+                        line.strip() for line in lines[1:] if line.strip()
+                    )
+                    continue
+                if STALE_SECTION in section:
+                    lines = section.strip().split("\n")
+                    stale_ids.extend(line.strip() for line in lines[1:] if line.strip())
+                    continue
+
+                if not section.strip() or FAILED_SECTION in section:
                     continue
 
                 lines = section.strip().split("\n")
@@ -166,20 +282,27 @@ def parse_file_titles(file_path: Path) -> Tuple[Dict, Dict]:
                             logger.warning(f"解析标题行出错: {line}, 错误: {e}")
 
         logger.debug(f"解析文件 {file_path.name}: {len(titles_by_id)} 个平台")
-        return titles_by_id, id_to_name
+        return titles_by_id, id_to_name, unchanged_ids, stale_ids
 
     except Exception as e:
         logger.error(f"读取文件失败: {file_path}, 错误: {e}")
-        return {}, {}
+        return {}, {}, [], []
 
 
 def read_all_today_titles(
     current_platform_ids: Optional[List[str]] = None,
+    aggregate: Optional["DayAggregate"] = None,
+    store: Optional["SnapshotStore"] = None,
 ) -> Tuple[Dict, Dict, Dict]:
     """读取当天所有标题文件
 
+    基于持久化的当日聚合状态，只合并上次运行之后新增的快照文件；
+    状态缺失或损坏时自动从 txt 文件重建
+
     Args:
         current_platform_ids: 当前监控的平台ID列表，None表示不过滤
+        aggregate: 复用的当日聚合状态，None 表示从状态文件加载
+        store: SQLite 快照存储，None 表示从 txt 文件读取（aggregate 为 None 时生效）
 
     Returns:
         (all_results, final_id_to_name, title_info) 元组
@@ -187,48 +310,24 @@ def read_all_today_titles(
         - final_id_to_name: 平台ID到名称的映射
         - title_info: 标题的详细信息（时间、来源等）
     """
-    from .analyzer import process_source_data  # 避免循环导入
-
-    date_folder = format_date_folder()
-    txt_dir = Path("output") / date_folder / "txt"
-
-    if not txt_dir.exists():
-        logger.warning(f"当日目录不存在: {txt_dir}")
+    from .aggregate import DayAggregate  # 避免循环导入
+
+    if aggregate is None:
+        aggregate = DayAggregate(store=store)
+        aggregate.load()
+    elif aggregate.date_folder != format_date_folder():
+        # 跨天时沿用原聚合状态的全部设置
+        aggregate = aggregate.for_date()
+        aggregate.load()
+
+    if not aggregate.has_snapshots():
+        logger.warning(f"当日没有快照数据: {aggregate.date_folder}")
         return {}, {}, {}
 
-    all_results = {}
-    final_id_to_name = {}
-    title_info = {}
-
-    files = sorted([f for f in txt_dir.iterdir() if f.suffix == ".txt"])
-    logger.info(f"读取当日文件: {len(files)} 个")
-
-    for file_path in files:
-        time_info = file_path.stem
-
-        titles_by_id, file_id_to_name = parse_file_titles(file_path)
+    if aggregate.refresh():
+        aggregate.save()
 
-        # 按平台ID过滤
-        if current_platform_ids is not None:
-            filtered_titles_by_id = {}
-            filtered_id_to_name = {}
-
-            for source_id, title_data in titles_by_id.items():
-                if source_id in current_platform_ids:
-                    filtered_titles_by_id[source_id] = title_data
-                    if source_id in file_id_to_name:
-                        filtered_id_to_name[source_id] = file_id_to_name[source_id]
-
-            titles_by_id = filtered_titles_by_id
-            file_id_to_name = filtered_id_to_name
-
-        final_id_to_name.update(file_id_to_name)
-
-        # 处理每个平台的数据
-        for source_id, title_data in titles_by_id.items():
-            process_source_data(
-                source_id, title_data, time_info, all_results, title_info
-            )
+    all_results, final_id_to_name, title_info = aggregate.view(current_platform_ids)
 
     logger.info(
         f"读取完成: {len(all_results)} 个平台, {sum(len(v) for v in all_results.values())} 条标题"
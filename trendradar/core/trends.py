@@ -0,0 +1,334 @@
+"""
+排名走势模块
+
+当日累计记录只保存去重后的排名，看不出标题是在上升还是下降。
+RankTrajectories 按平台记录每次快照中各标题的排名，分析时按平台构造
+（标题 × 快照）排名矩阵，未在榜为 NaN，计算峰值排名、在前 N 名的时长、
+排名速度和加速度、在榜时长和回榜次数。
+安装了 numpy 时按矩阵向量化计算，未安装时使用结果相同的纯 Python 实现
+"""
+
+import re
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy 为可选依赖，未安装时使用纯 Python 实现
+    np = None
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+_TIME_PATTERN = re.compile(r"(\d{1,2})时(\d{1,2})分")
+
+# 快照序号和排名以无符号 16 位整数保存
+_MAX_VALUE = 0xFFFF
+
+
+def parse_time_minutes(time_info: str) -> Optional[int]:
+    """快照时间转换为当日分钟数
+
+    Args:
+        time_info: 快照时间，如 13时45分
+
+    Returns:
+        分钟数，无法解析时返回 None
+    """
+    match = _TIME_PATTERN.match(time_info)
+    if match is None:
+        return None
+    return int(match.group(1)) * 60 + int(match.group(2))
+
+
+class TitleTrend(NamedTuple):
+    """单条标题的当日排名走势
+
+    时长单位为分钟，每次快照在榜计到下一次快照为止（最后一次快照按上一个间隔计）；
+    速度为最近一次相邻两次快照都在榜时的排名变化（名次/小时），正数表示排名上升；
+    加速度为最近两个速度之差除以两者的间隔（名次/小时²）；没有足够数据时为 0
+    """
+
+    peak_rank: int
+    top_minutes: float
+    dwell_minutes: float
+    velocity: float
+    acceleration: float
+    reentries: int
+
+
+def _column_durations(minutes: List[int]) -> List[float]:
+    """每次快照代表的时长（分钟）"""
+    if len(minutes) < 2:
+        return [0.0] * len(minutes)
+    durations = [float(end - start) for start, end in zip(minutes, minutes[1:])]
+    durations.append(durations[-1])
+    return durations
+
+
+def _numpy_trends(
+    titles: List[str], minutes: List[int], matrix: "np.ndarray", top_n: int
+) -> Dict[str, TitleTrend]:
+    """按排名矩阵向量化计算走势"""
+    title_count, column_count = matrix.shape
+    present = ~np.isnan(matrix)
+    ranks = np.where(present, matrix, np.inf)
+    durations = np.array(_column_durations(minutes))
+
+    peak = ranks.min(axis=1)
+    dwell = (present * durations).sum(axis=1)
+    top = ((ranks <= top_n) * durations).sum(axis=1)
+    runs = present[:, 0] + (present[:, 1:] & ~present[:, :-1]).sum(axis=1)
+
+    velocity = np.zeros(title_count)
+    acceleration = np.zeros(title_count)
+    if column_count > 1:
+        times = np.array(minutes, dtype=float)
+        steps = np.diff(times)
+        valid = present[:, :-1] & present[:, 1:] & (steps > 0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            speeds = (matrix[:, :-1] - matrix[:, 1:]) * 60.0 / steps
+
+        step_index = np.arange(column_count - 1)
+        last = np.where(valid, step_index, -1).max(axis=1)
+        rows = np.nonzero(last >= 0)[0]
+        velocity[rows] = speeds[rows, last[rows]]
+
+        valid[rows, last[rows]] = False
+        previous = np.where(valid, step_index, -1).max(axis=1)
+        rows = np.nonzero(previous >= 0)[0]
+        # 速度对应的时间取该步结束的快照时间
+        ends = times[1:]
+        acceleration[rows] = (
+            (speeds[rows, last[rows]] - speeds[rows, previous[rows]])
+            * 60.0
+            / (ends[last[rows]] - ends[previous[rows]])
+        )
+
+    return {
+        title: TitleTrend(
+            int(peak[i]),
+            float(top[i]),
+            float(dwell[i]),
+            float(velocity[i]),
+            float(acceleration[i]),
+            int(runs[i]) - 1,
+        )
+        for i, title in enumerate(titles)
+    }
+
+
+def _python_trends(
+    rows: Dict[str, "array[int]"], minutes: List[int], top_n: int
+) -> Dict[str, TitleTrend]:
+    """未安装 numpy 时逐条标题计算走势，结果与向量化计算相同"""
+    durations = _column_durations(minutes)
+    trends = {}
+    for title, row in rows.items():
+        columns = row[0::2]
+        ranks = row[1::2]
+
+        top = sum(durations[c] for c, rank in zip(columns, ranks) if rank <= top_n)
+        runs = 1
+        # (结束快照序号, 速度)
+        speeds: List[Tuple[int, float]] = []
+        for i in range(1, len(columns)):
+            start, end = columns[i - 1], columns[i]
+            if end != start + 1:
+                runs += 1
+            elif minutes[end] > minutes[start]:
+                speed = (
+                    (ranks[i - 1] - ranks[i]) * 60.0 / (minutes[end] - minutes[start])
+                )
+                speeds.append((end, speed))
+
+        velocity = acceleration = 0.0
+        if speeds:
+            velocity = speeds[-1][1]
+        if len(speeds) > 1:
+            (previous_end, previous_speed), (last_end, last_speed) = speeds[-2:]
+            acceleration = (
+                (last_speed - previous_speed)
+                * 60.0
+                / (minutes[last_end] - minutes[previous_end])
+            )
+
+        trends[title] = TitleTrend(
+            min(ranks),
+            float(top),
+            float(sum(durations[c] for c in columns)),
+            velocity,
+            acceleration,
+            runs - 1,
+        )
+    return trends
+
+
+class RankTrajectories:
+    """当日各平台每条标题在每次快照中的排名
+
+    每个平台保存参与记录的快照时间（分钟数）和 {标题: array('H')}，
+    数组中依次为（快照序号, 排名）对，只记录在榜的快照，内存占用与出现次数成正比
+    """
+
+    def __init__(self):
+        """初始化空记录"""
+        # {平台ID: {"minutes": [分钟数], "titles": {标题: array('H')}}}
+        self.platforms: Dict[str, Dict] = {}
+
+    def observe(self, source_id: str, time_info: str, title_data: Dict) -> None:
+        """记录平台的一次快照
+
+        同一标题在一次快照中出现多次时取最好的排名
+
+        Args:
+            source_id: 平台ID
+            time_info: 快照时间，如 13时45分
+            title_data: 标题数据 {标题: {"ranks", ...}}
+        """
+        minutes = parse_time_minutes(time_info)
+        if minutes is None:
+            logger.debug(f"快照时间无法解析，不记录排名走势: {time_info}")
+            return
+
+        platform = self.platforms.setdefault(source_id, {"minutes": [], "titles": {}})
+        column = len(platform["minutes"])
+        if column > _MAX_VALUE:
+            return
+        platform["minutes"].append(minutes)
+
+        rows = platform["titles"]
+        for title, data in title_data.items():
+            ranks = data.get("ranks")
+            if not ranks:
+                continue
+            rank = min(min(ranks), _MAX_VALUE)
+            row = rows.get(title)
+            if row is None:
+                rows[title] = array("H", (column, rank))
+            else:
+                row.append(column)
+                row.append(rank)
+
+    def to_state(self) -> Dict:
+        """转换为可写入状态文件的字典"""
+        return {
+            source_id: {
+                "minutes": platform["minutes"],
+                "titles": {
+                    title: row.tolist() for title, row in platform["titles"].items()
+                },
+            }
+            for source_id, platform in self.platforms.items()
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "RankTrajectories":
+        """从 to_state 的结果恢复
+
+        Raises:
+            ValueError: 格式错误
+        """
+        if not isinstance(state, dict):
+            raise ValueError("排名走势格式错误")
+        trajectories = cls()
+        for source_id, platform in state.items():
+            minutes = platform["minutes"]
+            titles = platform["titles"]
+            if not isinstance(minutes, list) or not isinstance(titles, dict):
+                raise ValueError(f"平台 {source_id} 的排名走势格式错误")
+            rows = {}
+            for title, values in titles.items():
+                # 超出范围或不是整数时 array 抛出 OverflowError / TypeError
+                row = array("H", values)
+                if not row or len(row) % 2 or max(row[0::2]) >= len(minutes):
+                    raise ValueError(f"标题 {title} 的排名走势格式错误")
+                rows[title] = row
+            trajectories.platforms[source_id] = {
+                "minutes": [int(m) for m in minutes],
+                "titles": rows,
+            }
+        return trajectories
+
+    def rank_matrix(self, source_id: str) -> Tuple[List[str], "np.ndarray"]:
+        """构造平台的（标题 × 快照）排名矩阵
+
+        Args:
+            source_id: 平台ID
+
+        Returns:
+            (标题列表, 矩阵)，矩阵的行与标题列表对应，列为该平台参与记录的快照，
+            未在榜为 NaN
+
+        Raises:
+            RuntimeError: 未安装 numpy
+        """
+        if np is None:
+            raise RuntimeError("构造排名矩阵需要安装 numpy")
+
+        platform = self.platforms[source_id]
+        titles = list(platform["titles"])
+        rows = list(platform["titles"].values())
+        matrix = np.full((len(rows), len(platform["minutes"])), np.nan)
+        if rows:
+            lengths = [len(row) // 2 for row in rows]
+            pairs = np.concatenate(
+                [np.frombuffer(row, dtype=np.uint16) for row in rows]
+            ).reshape(-1, 2)
+            row_index = np.repeat(np.arange(len(rows)), lengths)
+            matrix[row_index, pairs[:, 0]] = pairs[:, 1]
+        return titles, matrix
+
+    def analyze(
+        self, top_n: int = 10, platform_ids: Optional[Iterable[str]] = None
+    ) -> Dict[str, Dict[str, TitleTrend]]:
+        """计算各平台每条标题的排名走势
+
+        Args:
+            top_n: 统计在前 N 名的时长
+            platform_ids: 只计算这些平台，None 表示全部
+
+        Returns:
+            {平台ID: {标题: TitleTrend}}
+        """
+        selected = None if platform_ids is None else set(platform_ids)
+        trends = {}
+        for source_id, platform in self.platforms.items():
+            if selected is not None and source_id not in selected:
+                continue
+            if not platform["titles"]:
+                continue
+            if np is not None:
+                titles, matrix = self.rank_matrix(source_id)
+                trends[source_id] = _numpy_trends(
+                    titles, platform["minutes"], matrix, top_n
+                )
+            else:
+                trends[source_id] = _python_trends(
+                    platform["titles"], platform["minutes"], top_n
+                )
+        return trends
+
+
+def format_trend_display(trend: TitleTrend, top_n: int = 10) -> str:
+    """格式化排名走势，用于报告
+
+    Args:
+        trend: 排名走势
+        top_n: 统计时长使用的前 N 名
+
+    Returns:
+        如 "峰值第1名 · 前10名 45分钟 · 在榜 90分钟 · ↑6.0名/时 · 回榜 1 次"
+    """
+    parts = [f"峰值第{trend.peak_rank}名"]
+    if trend.top_minutes:
+        parts.append(f"前{top_n}名 {trend.top_minutes:.0f}分钟")
+    parts.append(f"在榜 {trend.dwell_minutes:.0f}分钟")
+    if trend.velocity > 0:
+        parts.append(f"↑{trend.velocity:.1f}名/时")
+    elif trend.velocity < 0:
+        parts.append(f"↓{-trend.velocity:.1f}名/时")
+    if trend.reentries:
+        parts.append(f"回榜 {trend.reentries} 次")
+    return " · ".join(parts)
@@ -6,6 +6,7 @@
 
 from .base import BaseNotifier
 from .dingtalk import DingTalkNotifier
+from .dispatcher import NotificationDispatcher
 from .feishu import FeishuNotifier
 from .telegram import TelegramNotifier
 from .wework import WeWorkNotifier
@@ -16,4 +17,5 @@ __all__ = [
     "DingTalkNotifier",
     "WeWorkNotifier",
     "TelegramNotifier",
+    "NotificationDispatcher",
 ]
@@ -4,16 +4,33 @@
 定义统一的推送接口
 """
 
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+import requests
 
 from ..utils.logger import get_logger
+from ..utils.metrics import span
+from ..utils.proxy_pool import ProxyPool
 
 logger = get_logger(__name__)
 
 
 class BaseNotifier(ABC):
-    """消息推送基类"""
+    """消息推送基类
+
+    子类负责内容渲染、载荷构建和响应判断，
+    分批发送流程（同步 send / 异步 send_async）由基类统一实现
+    """
+
+    # 渠道显示名称（用于日志）
+    CHANNEL_NAME = ""
+
+    # 分段起始行前缀：统计标题、词组标题、分隔线、新增/失败区域标题
+    SECTION_PREFIXES = ("📊", "🔥", "📈", "📌", "🆕", "⚠️", "⏱️", "🕒", "---", "━")
 
     def __init__(
         self, webhook_url: str, proxy_url: Optional[str] = None, timeout: int = 30
@@ -30,6 +47,13 @@ class BaseNotifier(ABC):
         self.timeout = timeout
         self.headers = self._get_headers()
         self.proxies = self._get_proxies()
+        # 与抓取共享的代理池，设置后代替 proxy_url，由调度器注入
+        self.proxy_pool: Optional[ProxyPool] = None
+        # 单批次最大字节数，None 表示不分批
+        self.max_bytes: Optional[int] = None
+        self.batch_interval = 0.0
+        # 最近一次发送失败的原因
+        self.last_error = ""
 
     def _get_headers(self) -> Dict:
         """获取请求头"""
@@ -41,6 +65,107 @@ class BaseNotifier(ABC):
             return {"http": self.proxy_url, "https": self.proxy_url}
         return None
 
+    @staticmethod
+    def _format_age(seconds: float) -> str:
+        """缓存数据的时长，如 “12 分钟前”"""
+        minutes = int(seconds // 60)
+        return f"{minutes} 分钟前" if minutes else "不到 1 分钟前"
+
+    def _render_platform_sections(
+        self,
+        report_data: Dict,
+        text_content: str,
+        separator: str,
+        heading: str = "**{}**",
+        item: str = "**{id}**{note}",
+        failed_item: Optional[str] = None,
+    ) -> str:
+        """追加抓取失败、超时未完成和使用缓存数据的平台区域
+
+        各渠道只有分隔线和强调格式不同
+
+        Args:
+            report_data: 报告数据
+            text_content: 已渲染的内容
+            separator: 区域之前的分隔线
+            heading: 区域标题格式
+            item: 平台行格式，{id} 为平台ID，{note} 为附加说明（如缓存时长）
+            failed_item: 失败平台的行格式，默认与 item 相同
+
+        Returns:
+            追加区域后的内容
+        """
+        stale_ages = report_data.get("stale_ages") or {}
+        sections = [
+            (
+                "⚠️",
+                "数据获取失败的平台：",
+                failed_item or item,
+                [(id_value, "") for id_value in report_data.get("failed_ids") or []],
+            ),
+            (
+                "⏱️",
+                "抓取超时未完成的平台：",
+                item,
+                [(id_value, "") for id_value in report_data.get("cancelled_ids") or []],
+            ),
+            (
+                "🕒",
+                "抓取失败、使用缓存数据的平台：",
+                item,
+                [
+                    (id_value, f"（{self._format_age(age)}）")
+                    for id_value, age in stale_ages.items()
+                ],
+            ),
+        ]
+
+        for icon, title, line_format, rows in sections:
+            if not rows:
+                continue
+            if text_content and "暂无匹配" not in text_content:
+                text_content += f"\n{separator}\n\n"
+
+            text_content += f"{icon} {heading.format(title)}\n\n"
+            for id_value, note in rows:
+                text_content += f"  • {line_format.format(id=id_value, note=note)}\n"
+
+        return text_content
+
+    def _proxy_key(self) -> str:
+        """代理池中固定代理使用的渠道名，如 feishu"""
+        return self.get_platform_name().lower()
+
+    def _release_proxy(self, proxy: Optional[str], ok: Optional[bool]) -> None:
+        """归还代理池中的代理"""
+        if self.proxy_pool is not None and proxy is not None:
+            self.proxy_pool.release(proxy, ok)
+
+    def _post(self, payload: Dict) -> requests.Response:
+        """同步发送一个批次，代理池中的代理只在请求期间占用"""
+        proxies = self.proxies
+        proxy = None
+        if self.proxy_pool is not None:
+            proxy = self.proxy_pool.acquire_sync(self._proxy_key())
+            proxies = {"http": proxy, "https": proxy}
+
+        proxy_ok = None
+        try:
+            response = requests.post(
+                self.webhook_url,
+                headers=self.headers,
+                json=payload,
+                proxies=proxies,
+                timeout=self.timeout,
+            )
+            proxy_ok = True
+            return response
+        except (requests.ConnectionError, requests.Timeout):
+            proxy_ok = False
+            raise
+        finally:
+            self._release_proxy(proxy, proxy_ok)
+
     @abstractmethod
     def render_content(
         self, report_data: Dict, update_info: Optional[Dict] = None, mode: str = "daily"
@@ -70,7 +195,129 @@ class BaseNotifier(ABC):
         """
         pass
 
-    @abstractmethod
+    def check_response(
+        self, status_code: int, result: Optional[Dict]
+    ) -> Tuple[bool, str]:
+        """判断推送响应是否成功（子类可覆盖）
+
+        Args:
+            status_code: HTTP 状态码
+            result: 响应 JSON，无法解析时为 None
+
+        Returns:
+            (是否成功, 错误信息)
+        """
+        if status_code == 200:
+            return True, ""
+        return False, f"状态码：{status_code}"
+
+    # ========== 分批 ==========
+
+    def _apply_batch_header(self, content: str, index: int, total: int) -> str:
+        """为批次添加批次标识（子类可覆盖）"""
+        return content
+
+    def _batch_header_reserve(self) -> int:
+        """批次标识占用的最大字节数，分批时预留"""
+        return len(self._apply_batch_header("", 999, 999).encode("utf-8"))
+
+    def _is_section_start(self, line: str) -> bool:
+        """判断是否为分段起始行（词组标题或来源标题等）"""
+        stripped = line.lstrip()
+        return stripped.startswith(self.SECTION_PREFIXES) or stripped.endswith("条):")
+
+    def _split_into_batches(self, content: str) -> List[str]:
+        """将内容按字节上限分批
+
+        逐行累计 UTF-8 字节数，线性时间完成分批；
+        超出上限时优先在分段起始行处断开（批次已过半时），否则在行边界断开，
+        单条新闻不会被拆开。每批预留批次标识所需的字节数
+
+        Args:
+            content: 渲染后的内容
+
+        Returns:
+            分批后的内容列表
+        """
+        if self.max_bytes is None:
+            return [content]
+        if len(content.encode("utf-8")) <= self.max_bytes:
+            return [content]
+
+        budget = self.max_bytes - self._batch_header_reserve()
+        lines = content.split("\n")
+
+        # offsets[i] 为前 i 行（含换行符）的字节数
+        offsets = [0]
+        for line in lines:
+            offsets.append(offsets[-1] + len(line.encode("utf-8")) + 1)
+
+        batches = []
+
+        def flush(begin: int, end: int) -> None:
+            batch = "\n".join(lines[begin:end]).lstrip("\n").rstrip()
+            if batch:
+                batches.append(batch)
+
+        start = 0
+        boundary = None  # 当前批次内最后一个分段起始行
+        i = 0
+        while i < len(lines):
+            line_end = offsets[i + 1]
+            if line_end - offsets[start] - 1 > budget and i > start:
+                if (
+                    boundary is not None
+                    and (offsets[boundary] - offsets[start]) * 2 >= budget
+                ):
+                    cut = boundary
+                else:
+                    cut = i
+                flush(start, cut)
+                start = cut
+                boundary = None
+                continue
+
+            if i > start and self._is_section_start(lines[i]):
+                boundary = i
+            i += 1
+
+        flush(start, len(lines))
+        return batches if batches else [content]
+
+    def prepare_batches(self, content: str) -> List[str]:
+        """将内容拆分为待发送批次，多批次时添加批次标识
+
+        Args:
+            content: 渲染后的内容
+
+        Returns:
+            待发送的批次内容列表
+        """
+        batches = self._split_into_batches(content)
+        if len(batches) > 1:
+            batches = [
+                self._apply_batch_header(batch, i, len(batches))
+                for i, batch in enumerate(batches, 1)
+            ]
+        return batches
+
+    def _log_batch_result(
+        self, ok: bool, error: str, index: int, total: int, report_type: str
+    ) -> None:
+        """记录单个批次的发送结果"""
+        name = self.CHANNEL_NAME or self.get_platform_name()
+        if total == 1:
+            if ok:
+                logger.info(f"{name}通知发送成功 [{report_type}]")
+            else:
+                logger.error(f"{name}通知发送失败 [{report_type}]，{error}")
+        elif ok:
+            logger.info(f"{name}第 {index}/{total} 批次发送成功 [{report_type}]")
+        else:
+            logger.error(f"{name}第 {index}/{total} 批次发送失败 [{report_type}]，{error}")
+
+    # ========== 同步发送 ==========
+
     def send(
         self,
         report_data: Dict,
@@ -78,7 +325,7 @@ class BaseNotifier(ABC):
         update_info: Optional[Dict] = None,
         mode: str = "daily",
     ) -> bool:
-        """发送推送（子类实现）
+        """发送推送（按批次顺序发送）
 
         Args:
             report_data: 报告数据
@@ -89,7 +336,135 @@ class BaseNotifier(ABC):
         Returns:
             是否发送成功
         """
-        pass
+        name = self.CHANNEL_NAME or self.get_platform_name()
+        self.last_error = ""
+        try:
+            content = self.render_content(report_data, update_info, mode)
+            batches = self.prepare_batches(content)
+            total = len(batches)
+            if total > 1:
+                logger.info(f"{name}消息分为 {total} 批次发送 [{report_type}]")
+
+            for i, batch_content in enumerate(batches, 1):
+                if total > 1:
+                    logger.info(
+                        f"发送{name}第 {i}/{total} 批次，大小：{len(batch_content.encode('utf-8'))} 字节 [{report_type}]"
+                    )
+
+                payload = self.build_payload(batch_content, report_type)
+                with span("notify_batch", channel=self.get_platform_name(), batch=i):
+                    response = self._post(payload)
+
+                    result = None
+                    if response.status_code == 200:
+                        try:
+                            result = response.json()
+                        except ValueError:
+                            result = None
+
+                ok, error = self.check_response(response.status_code, result)
+                self._log_batch_result(ok, error, i, total, report_type)
+                if not ok:
+                    self.last_error = error
+                    return False
+
+                # 批次间间隔
+                if i < total and self.batch_interval:
+                    time.sleep(self.batch_interval)
+
+            if total > 1:
+                logger.info(f"{name}所有 {total} 批次发送完成 [{report_type}]")
+            return True
+
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"{name}通知发送出错 [{report_type}]：{e}", exc_info=True)
+            return False
+
+    # ========== 异步发送 ==========
+
+    async def send_async(
+        self,
+        session: aiohttp.ClientSession,
+        report_data: Dict,
+        report_type: str,
+        update_info: Optional[Dict] = None,
+        mode: str = "daily",
+    ) -> bool:
+        """异步发送推送（同一渠道内批次保持顺序）
+
+        Args:
+            session: 共享的 aiohttp 会话
+            report_data: 报告数据
+            report_type: 报告类型
+            update_info: 更新信息（可选）
+            mode: 报告模式
+
+        Returns:
+            是否发送成功
+        """
+        name = self.CHANNEL_NAME or self.get_platform_name()
+        self.last_error = ""
+        try:
+            content = self.render_content(report_data, update_info, mode)
+            batches = self.prepare_batches(content)
+            total = len(batches)
+            if total > 1:
+                logger.info(f"{name}消息分为 {total} 批次发送 [{report_type}]")
+
+            for i, batch_content in enumerate(batches, 1):
+                payload = self.build_payload(batch_content, report_type)
+                # 各渠道并发发送，只记录耗时
+                with span(
+                    "notify_batch", cpu=False, channel=self.get_platform_name(), batch=i
+                ):
+                    proxy = self.proxy_url
+                    if self.proxy_pool is not None:
+                        proxy = await self.proxy_pool.acquire(self._proxy_key())
+                    proxy_ok = None
+                    try:
+                        async with session.post(
+                            self.webhook_url,
+                            headers=self.headers,
+                            json=payload,
+                            proxy=proxy,
+                            timeout=aiohttp.ClientTimeout(total=self.timeout),
+                        ) as response:
+                            proxy_ok = True
+                            result = None
+                            if response.status == 200:
+                                try:
+                                    result = await response.json(content_type=None)
+                                except ValueError:
+                                    result = None
+                    except (asyncio.TimeoutError, aiohttp.ClientConnectionError):
+                        proxy_ok = False
+                        raise
+                    finally:
+                        self._release_proxy(proxy, proxy_ok)
+
+                ok, error = self.check_response(response.status, result)
+                self._log_batch_result(ok, error, i, total, report_type)
+                if not ok:
+                    self.last_error = error
+                    return False
+
+                # 批次间间隔只阻塞本渠道
+                if i < total and self.batch_interval:
+                    await asyncio.sleep(self.batch_interval)
+
+            if total > 1:
+                logger.info(f"{name}所有 {total} 批次发送完成 [{report_type}]")
+            return True
+
+        except asyncio.TimeoutError:
+            self.last_error = f"请求超时（{self.timeout}秒）"
+            logger.error(f"{name}通知发送超时 [{report_type}]")
+            return False
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"{name}通知发送出错 [{report_type}]：{e}", exc_info=True)
+            return False
 
     def get_platform_name(self) -> str:
         """获取平台名称"""
@@ -2,10 +2,7 @@
 钉钉推送模块（支持分批发送）
 """
 
-import time
-from typing import Dict, List, Optional
-
-import requests
+from typing import Dict, Optional, Tuple
 
 from ..utils.file_utils import clean_title
 from ..utils.logger import get_logger
@@ -18,6 +15,8 @@ logger = get_logger(__name__)
 class DingTalkNotifier(BaseNotifier):
     """钉钉推送器"""
 
+    CHANNEL_NAME = "钉钉"
+
     def __init__(
         self,
         webhook_url: str,
@@ -176,14 +175,8 @@ class DingTalkNotifier(BaseNotifier):
 
                 text_content += "\n"
 
-        # 处理失败的平台
-        if report_data.get("failed_ids"):
-            if text_content and "暂无匹配" not in text_content:
-                text_content += "\n---\n\n"
-
-            text_content += "⚠️ **数据获取失败的平台：**\n\n"
-            for i, id_value in enumerate(report_data["failed_ids"], 1):
-                text_content += f"  • **{id_value}**\n"
+        # 处理失败、超时未完成和使用缓存数据的平台
+        text_content = self._render_platform_sections(report_data, text_content, "---")
 
         # 添加更新时间
         text_content += f"\n\n> 更新时间：{now.strftime('%Y-%m-%d %H:%M:%S')}"
@@ -194,33 +187,6 @@ class DingTalkNotifier(BaseNotifier):
 
         return text_content
 
-    def _split_into_batches(self, content: str) -> List[str]:
-        """将内容分批（按字节大小）"""
-        content_bytes = content.encode("utf-8")
-
-        if len(content_bytes) <= self.max_bytes:
-            return [content]
-
-        batches = []
-        current_batch = ""
-
-        # 按行分割
-        lines = content.split("\n")
-
-        for line in lines:
-            test_batch = current_batch + line + "\n"
-            if len(test_batch.encode("utf-8")) > self.max_bytes:
-                if current_batch:
-                    batches.append(current_batch.rstrip())
-                current_batch = line + "\n"
-            else:
-                current_batch = test_batch
-
-        if current_batch:
-            batches.append(current_batch.rstrip())
-
-        return batches if batches else [content]
-
     def build_payload(self, content: str, report_type: str) -> Dict:
         """构建钉钉推送载荷"""
         return {
@@ -231,75 +197,26 @@ class DingTalkNotifier(BaseNotifier):
             },
         }
 
-    def send(
-        self,
-        report_data: Dict,
-        report_type: str,
-        update_info: Optional[Dict] = None,
-        mode: str = "daily",
-    ) -> bool:
-        """发送到钉钉（支持分批）"""
-        try:
-            # 渲染内容
-            content = self.render_content(report_data, update_info, mode)
-
-            # 分批
-            batches = self._split_into_batches(content)
-            logger.info(f"钉钉消息分为 {len(batches)} 批次发送 [{report_type}]")
-
-            # 逐批发送
-            for i, batch_content in enumerate(batches, 1):
-                batch_size = len(batch_content.encode("utf-8"))
-                logger.info(
-                    f"发送钉钉第 {i}/{len(batches)} 批次，大小：{batch_size} 字节 [{report_type}]"
-                )
-
-                # 添加批次标识
-                if len(batches) > 1:
-                    batch_header = f"**[第 {i}/{len(batches)} 批次]**\n\n"
-                    if "📊 **热点词汇统计**" in batch_content:
-                        batch_content = batch_content.replace(
-                            "📊 **热点词汇统计**\n\n",
-                            f"📊 **热点词汇统计** {batch_header}\n\n",
-                        )
-                    else:
-                        batch_content = batch_header + batch_content
-
-                # 构建载荷
-                payload = self.build_payload(batch_content, report_type)
-
-                # 发送请求
-                response = requests.post(
-                    self.webhook_url,
-                    headers=self.headers,
-                    json=payload,
-                    proxies=self.proxies,
-                    timeout=self.timeout,
-                )
-
-                if response.status_code == 200:
-                    result = response.json()
-                    if result.get("errcode") == 0:
-                        logger.info(
-                            f"钉钉第 {i}/{len(batches)} 批次发送成功 [{report_type}]"
-                        )
-                        # 批次间间隔
-                        if i < len(batches):
-                            time.sleep(self.batch_interval)
-                    else:
-                        logger.error(
-                            f"钉钉第 {i}/{len(batches)} 批次发送失败 [{report_type}]，错误：{result.get('errmsg')}"
-                        )
-                        return False
-                else:
-                    logger.error(
-                        f"钉钉第 {i}/{len(batches)} 批次发送失败 [{report_type}]，状态码：{response.status_code}"
-                    )
-                    return False
-
-            logger.info(f"钉钉所有 {len(batches)} 批次发送完成 [{report_type}]")
-            return True
-
-        except Exception as e:
-            logger.error(f"钉钉通知发送出错 [{report_type}]：{e}", exc_info=True)
-            return False
+    def _apply_batch_header(self, content: str, index: int, total: int) -> str:
+        """添加批次标识（优先插入到统计标题后）"""
+        batch_header = f"**[第 {index}/{total} 批次]**\n\n"
+        if "📊 **热点词汇统计**" in content:
+            return content.replace(
+                "📊 **热点词汇统计**\n\n",
+                f"📊 **热点词汇统计** {batch_header}\n\n",
+            )
+        return batch_header + content
+
+    def _batch_header_reserve(self) -> int:
+        """批次标识插入统计标题后时额外占用一个空格"""
+        return super()._batch_header_reserve() + 1
+
+    def check_response(
+        self, status_code: int, result: Optional[Dict]
+    ) -> Tuple[bool, str]:
+        """判断钉钉响应是否成功"""
+        if status_code != 200:
+            return False, f"状态码：{status_code}"
+        if not result or result.get("errcode") != 0:
+            return False, f"错误：{(result or {}).get('errmsg')}"
+        return True, ""
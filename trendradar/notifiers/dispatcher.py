@@ -0,0 +1,175 @@
+"""
+多渠道推送调度模块
+
+在共享的 aiohttp 会话上并发推送所有渠道，
+单个渠道的批次保持顺序，各渠道独立计时和统计失败
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from ..utils.logger import get_logger
+from ..utils.metrics import record
+from ..utils.proxy_pool import ProxyPool
+from .base import BaseNotifier
+from .dingtalk import DingTalkNotifier
+from .feishu import FeishuNotifier
+from .telegram import TelegramNotifier
+from .wework import WeWorkNotifier
+
+logger = get_logger(__name__)
+
+
+class NotificationDispatcher:
+    """多渠道并发推送调度器"""
+
+    def __init__(
+        self, notifiers: List[BaseNotifier], proxy_pool: Optional[ProxyPool] = None
+    ):
+        """初始化调度器
+
+        Args:
+            notifiers: 推送器列表
+            proxy_pool: 与抓取共享的代理池，设置后代替各推送器的 proxy_url
+        """
+        self.notifiers = notifiers
+        self.proxy_pool = proxy_pool
+        for notifier in notifiers:
+            notifier.proxy_pool = proxy_pool
+
+    @classmethod
+    def from_config(
+        cls,
+        config: Dict,
+        proxy_url: Optional[str] = None,
+        proxy_pool: Optional[ProxyPool] = None,
+    ) -> "NotificationDispatcher":
+        """根据配置创建已配置渠道的推送器
+
+        Args:
+            config: 配置字典（utils/config.py 生成的大写键名）
+            proxy_url: 代理地址
+            proxy_pool: 与抓取共享的代理池
+
+        Returns:
+            推送调度器
+        """
+        notifiers: List[BaseNotifier] = []
+
+        feishu_url = config.get("FEISHU_WEBHOOK_URL")
+        if feishu_url:
+            notifiers.append(
+                FeishuNotifier(webhook_url=feishu_url, proxy_url=proxy_url)
+            )
+
+        dingtalk_url = config.get("DINGTALK_WEBHOOK_URL")
+        if dingtalk_url:
+            notifiers.append(
+                DingTalkNotifier(webhook_url=dingtalk_url, proxy_url=proxy_url)
+            )
+
+        wework_url = config.get("WEWORK_WEBHOOK_URL")
+        if wework_url:
+            notifiers.append(
+                WeWorkNotifier(webhook_url=wework_url, proxy_url=proxy_url)
+            )
+
+        telegram_token = config.get("TELEGRAM_BOT_TOKEN")
+        telegram_chat_id = config.get("TELEGRAM_CHAT_ID")
+        if telegram_token and telegram_chat_id:
+            notifiers.append(
+                TelegramNotifier(
+                    bot_token=telegram_token,
+                    chat_id=telegram_chat_id,
+                    proxy_url=proxy_url,
+                )
+            )
+
+        return cls(notifiers, proxy_pool=proxy_pool)
+
+    async def _send_channel(
+        self,
+        session: aiohttp.ClientSession,
+        notifier: BaseNotifier,
+        report_data: Dict,
+        report_type: str,
+        update_info: Optional[Dict],
+        mode: str,
+    ) -> Dict:
+        """发送单个渠道并记录耗时和失败原因"""
+        start_time = time.perf_counter()
+        success = await notifier.send_async(
+            session, report_data, report_type, update_info=update_info, mode=mode
+        )
+        return {
+            "success": success,
+            "duration": time.perf_counter() - start_time,
+            "error": notifier.last_error,
+        }
+
+    async def dispatch_async(
+        self,
+        report_data: Dict,
+        report_type: str,
+        update_info: Optional[Dict] = None,
+        mode: str = "daily",
+    ) -> Dict[str, Dict]:
+        """并发推送到所有渠道
+
+        Args:
+            report_data: 报告数据
+            report_type: 报告类型
+            update_info: 更新信息（可选）
+            mode: 报告模式
+
+        Returns:
+            各渠道结果 {渠道名: {success, duration, error}}
+        """
+        if not self.notifiers:
+            return {}
+
+        async with aiohttp.ClientSession() as session:
+            tasks = [
+                self._send_channel(
+                    session, notifier, report_data, report_type, update_info, mode
+                )
+                for notifier in self.notifiers
+            ]
+            results_raw = await asyncio.gather(*tasks, return_exceptions=True)
+
+        results = {}
+        for notifier, result in zip(self.notifiers, results_raw):
+            name = notifier.get_platform_name()
+            if isinstance(result, Exception):
+                logger.error(f"{name} 推送异常: {result}")
+                result = {"success": False, "duration": 0.0, "error": str(result)}
+            results[name] = result
+
+        if self.proxy_pool is not None:
+            record("proxy_pool", self.proxy_pool.summary())
+        return results
+
+    def dispatch(
+        self,
+        report_data: Dict,
+        report_type: str,
+        update_info: Optional[Dict] = None,
+        mode: str = "daily",
+    ) -> Dict[str, Dict]:
+        """并发推送到所有渠道（同步入口）
+
+        Args:
+            report_data: 报告数据
+            report_type: 报告类型
+            update_info: 更新信息（可选）
+            mode: 报告模式
+
+        Returns:
+            各渠道结果 {渠道名: {success, duration, error}}
+        """
+        return asyncio.run(
+            self.dispatch_async(report_data, report_type, update_info, mode)
+        )
@@ -4,8 +4,6 @@
 
 from typing import Dict, Optional
 
-import requests
-
 from ..utils.file_utils import clean_title
 from ..utils.logger import get_logger
 from ..utils.time_utils import get_beijing_time
@@ -17,6 +15,8 @@ logger = get_logger(__name__)
 class FeishuNotifier(BaseNotifier):
     """飞书推送器"""
 
+    CHANNEL_NAME = "飞书"
+
     def __init__(
         self,
         webhook_url: str,
@@ -158,14 +158,14 @@ class FeishuNotifier(BaseNotifier):
 
                 text_content += "\n"
 
-        # 处理失败的平台
-        if report_data.get("failed_ids"):
-            if text_content and "暂无匹配" not in text_content:
-                text_content += f"\n{self.message_separator}\n\n"
-
-            text_content += "⚠️ **数据获取失败的平台：**\n\n"
-            for i, id_value in enumerate(report_data["failed_ids"], 1):
-                text_content += f"  • <font color='red'>{id_value}</font>\n"
+        # 处理失败、超时未完成和使用缓存数据的平台
+        text_content = self._render_platform_sections(
+            report_data,
+            text_content,
+            self.message_separator,
+            item="<font color='grey'>{id}{note}</font>",
+            failed_item="<font color='red'>{id}</font>",
+        )
 
         # 添加更新时间
         now = get_beijing_time()
@@ -189,40 +189,3 @@ class FeishuNotifier(BaseNotifier):
                 "report_type": report_type,
             },
         }
-
-    def send(
-        self,
-        report_data: Dict,
-        report_type: str,
-        update_info: Optional[Dict] = None,
-        mode: str = "daily",
-    ) -> bool:
-        """发送到飞书"""
-        try:
-            # 渲染内容
-            content = self.render_content(report_data, update_info, mode)
-
-            # 构建载荷
-            payload = self.build_payload(content, report_type)
-
-            # 发送请求
-            response = requests.post(
-                self.webhook_url,
-                headers=self.headers,
-                json=payload,
-                proxies=self.proxies,
-                timeout=self.timeout,
-            )
-
-            if response.status_code == 200:
-                logger.info(f"飞书通知发送成功 [{report_type}]")
-                return True
-            else:
-                logger.error(
-                    f"飞书通知发送失败 [{report_type}]，状态码：{response.status_code}"
-                )
-                return False
-
-        except Exception as e:
-            logger.error(f"飞书通知发送出错 [{report_type}]：{e}", exc_info=True)
-            return False
@@ -2,10 +2,7 @@
 Telegram推送模块（支持分批发送）
 """
 
-import time
-from typing import Dict, List, Optional
-
-import requests
+from typing import Dict, Optional, Tuple
 
 from ..utils.file_utils import clean_title
 from ..utils.logger import get_logger
@@ -18,6 +15,8 @@ logger = get_logger(__name__)
 class TelegramNotifier(BaseNotifier):
     """Telegram推送器"""
 
+    CHANNEL_NAME = "Telegram"
+
     def __init__(
         self,
         bot_token: str,
@@ -191,13 +190,13 @@ class TelegramNotifier(BaseNotifier):
 
                 text_content += "\n"
 
-        if report_data.get("failed_ids"):
-            if text_content and "暂无匹配" not in text_content:
-                text_content += "\n━━━━━━━━━━━━━━━━━━\n\n"
-
-            text_content += "⚠️ <b>数据获取失败的平台：</b>\n\n"
-            for i, id_value in enumerate(report_data["failed_ids"], 1):
-                text_content += f"  • <b>{id_value}</b>\n"
+        text_content = self._render_platform_sections(
+            report_data,
+            text_content,
+            "━━━━━━━━━━━━━━━━━━",
+            heading="<b>{}</b>",
+            item="<b>{id}</b>{note}",
+        )
 
         text_content += f"\n\n<i>更新时间：{now.strftime('%Y-%m-%d %H:%M:%S')}</i>"
 
@@ -206,31 +205,6 @@ class TelegramNotifier(BaseNotifier):
 
         return text_content
 
-    def _split_into_batches(self, content: str) -> List[str]:
-        """将内容分批（按字节大小）"""
-        content_bytes = content.encode("utf-8")
-
-        if len(content_bytes) <= self.max_bytes:
-            return [content]
-
-        batches = []
-        current_batch = ""
-        lines = content.split("\n")
-
-        for line in lines:
-            test_batch = current_batch + line + "\n"
-            if len(test_batch.encode("utf-8")) > self.max_bytes:
-                if current_batch:
-                    batches.append(current_batch.rstrip())
-                current_batch = line + "\n"
-            else:
-                current_batch = test_batch
-
-        if current_batch:
-            batches.append(current_batch.rstrip())
-
-        return batches if batches else [content]
-
     def build_payload(self, content: str, report_type: str) -> Dict:
         """构建Telegram推送载荷"""
         return {
@@ -240,68 +214,16 @@ class TelegramNotifier(BaseNotifier):
             "disable_web_page_preview": True,
         }
 
-    def send(
-        self,
-        report_data: Dict,
-        report_type: str,
-        update_info: Optional[Dict] = None,
-        mode: str = "daily",
-    ) -> bool:
-        """发送到Telegram（支持分批）"""
-        try:
-            # 渲染内容
-            content = self.render_content(report_data, update_info, mode)
-
-            # 分批
-            batches = self._split_into_batches(content)
-            logger.info(f"Telegram消息分为 {len(batches)} 批次发送 [{report_type}]")
-
-            # 逐批发送
-            for i, batch_content in enumerate(batches, 1):
-                batch_size = len(batch_content.encode("utf-8"))
-                logger.info(
-                    f"发送Telegram第 {i}/{len(batches)} 批次，大小：{batch_size} 字节 [{report_type}]"
-                )
-
-                # 添加批次标识
-                if len(batches) > 1:
-                    batch_header = f"<b>[第 {i}/{len(batches)} 批次]</b>\n\n"
-                    batch_content = batch_header + batch_content
-
-                # 构建载荷
-                payload = self.build_payload(batch_content, report_type)
-
-                # 发送请求
-                response = requests.post(
-                    self.webhook_url,
-                    headers=self.headers,
-                    json=payload,
-                    proxies=self.proxies,
-                    timeout=self.timeout,
-                )
-
-                if response.status_code == 200:
-                    result = response.json()
-                    if result.get("ok"):
-                        logger.info(
-                            f"Telegram第 {i}/{len(batches)} 批次发送成功 [{report_type}]"
-                        )
-                        if i < len(batches):
-                            time.sleep(self.batch_interval)
-                    else:
-                        logger.error(
-                            f"Telegram第 {i}/{len(batches)} 批次发送失败 [{report_type}]，错误：{result.get('description')}"
-                        )
-                        return False
-                else:
-                    logger.error(
-                        f"Telegram第 {i}/{len(batches)} 批次发送失败 [{report_type}]，状态码：{response.status_code}"
-                    )
-                    return False
-
-            logger.info(f"Telegram所有 {len(batches)} 批次发送完成 [{report_type}]")
-            return True
-
-        except Exception as e:
-            logger.error(f"Telegram通知发送出错 [{report_type}]：{e}", exc_info=True)
-            return False
+    def _apply_batch_header(self, content: str, index: int, total: int) -> str:
+        """添加批次标识"""
+        return f"<b>[第 {index}/{total} 批次]</b>\n\n" + content
+
+    def check_response(
+        self, status_code: int, result: Optional[Dict]
+    ) -> Tuple[bool, str]:
+        """判断Telegram响应是否成功"""
+        if status_code != 200:
+            return False, f"状态码：{status_code}"
+        if not result or not result.get("ok"):
+            return False, f"错误：{(result or {}).get('description')}"
+        return True, ""
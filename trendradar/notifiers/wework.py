@@ -2,10 +2,7 @@
 企业微信推送模块（支持分批发送）
 """
 
-import time
-from typing import Dict, List, Optional
-
-import requests
+from typing import Dict, Optional, Tuple
 
 from ..utils.file_utils import clean_title
 from ..utils.logger import get_logger
@@ -18,6 +15,8 @@ logger = get_logger(__name__)
 class WeWorkNotifier(BaseNotifier):
     """企业微信推送器"""
 
+    CHANNEL_NAME = "企业微信"
+
     def __init__(
         self,
         webhook_url: str,
@@ -166,13 +165,7 @@ class WeWorkNotifier(BaseNotifier):
 
                 text_content += "\n"
 
-        if report_data.get("failed_ids"):
-            if text_content and "暂无匹配" not in text_content:
-                text_content += "\n---\n\n"
-
-            text_content += "⚠️ **数据获取失败的平台：**\n\n"
-            for i, id_value in enumerate(report_data["failed_ids"], 1):
-                text_content += f"  • **{id_value}**\n"
+        text_content = self._render_platform_sections(report_data, text_content, "---")
 
         text_content += f"\n\n> 更新时间：{now.strftime('%Y-%m-%d %H:%M:%S')}"
 
@@ -181,97 +174,20 @@ class WeWorkNotifier(BaseNotifier):
 
         return text_content
 
-    def _split_into_batches(self, content: str) -> List[str]:
-        """将内容分批（按字节大小）"""
-        content_bytes = content.encode("utf-8")
-
-        if len(content_bytes) <= self.max_bytes:
-            return [content]
-
-        batches = []
-        current_batch = ""
-        lines = content.split("\n")
-
-        for line in lines:
-            test_batch = current_batch + line + "\n"
-            if len(test_batch.encode("utf-8")) > self.max_bytes:
-                if current_batch:
-                    batches.append(current_batch.rstrip())
-                current_batch = line + "\n"
-            else:
-                current_batch = test_batch
-
-        if current_batch:
-            batches.append(current_batch.rstrip())
-
-        return batches if batches else [content]
-
     def build_payload(self, content: str, report_type: str) -> Dict:
         """构建企业微信推送载荷"""
         return {"msgtype": "markdown", "markdown": {"content": content}}
 
-    def send(
-        self,
-        report_data: Dict,
-        report_type: str,
-        update_info: Optional[Dict] = None,
-        mode: str = "daily",
-    ) -> bool:
-        """发送到企业微信（支持分批）"""
-        try:
-            # 渲染内容
-            content = self.render_content(report_data, update_info, mode)
-
-            # 分批
-            batches = self._split_into_batches(content)
-            logger.info(f"企业微信消息分为 {len(batches)} 批次发送 [{report_type}]")
-
-            # 逐批发送
-            for i, batch_content in enumerate(batches, 1):
-                batch_size = len(batch_content.encode("utf-8"))
-                logger.info(
-                    f"发送企业微信第 {i}/{len(batches)} 批次，大小：{batch_size} 字节 [{report_type}]"
-                )
-
-                # 添加批次标识
-                if len(batches) > 1:
-                    batch_header = f"**[第 {i}/{len(batches)} 批次]**\n\n"
-                    batch_content = batch_header + batch_content
-
-                # 构建载荷
-                payload = self.build_payload(batch_content, report_type)
-
-                # 发送请求
-                response = requests.post(
-                    self.webhook_url,
-                    headers=self.headers,
-                    json=payload,
-                    proxies=self.proxies,
-                    timeout=self.timeout,
-                )
-
-                if response.status_code == 200:
-                    result = response.json()
-                    if result.get("errcode") == 0:
-                        logger.info(
-                            f"企业微信第 {i}/{len(batches)} 批次发送成功 [{report_type}]"
-                        )
-                        if i < len(batches):
-                            time.sleep(self.batch_interval)
-                    else:
-                        logger.error(
-                            f"企业微信第 {i}/{len(batches)} 批次发送失败 [{report_type}]，错误：{result.get('errmsg')}"
-                        )
-                        return False
-                else:
-                    logger.error(
-                        f"企业微信第 {i}/{len(batches)} 批次发送失败 [{report_type}]，状态码：{response.status_code}"
-                    )
-                    return False
-
-            logger.info(f"企业微信所有 {len(batches)} 批次发送完成 [{report_type}]")
-            return True
-
-        except Exception as e:
-            logger.error(f"企业微信通知发送出错 [{report_type}]：{e}", exc_info=True)
-            return False
+    def _apply_batch_header(self, content: str, index: int, total: int) -> str:
+        """添加批次标识"""
+        return f"**[第 {index}/{total} 批次]**\n\n" + content
+
+    def check_response(
+        self, status_code: int, result: Optional[Dict]
+    ) -> Tuple[bool, str]:
+        """判断企业微信响应是否成功"""
+        if status_code != 200:
+            return False, f"状态码：{status_code}"
+        if not result or result.get("errcode") != 0:
+            return False, f"错误：{(result or {}).get('errmsg')}"
+        return True, ""
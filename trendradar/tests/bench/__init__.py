@@ -0,0 +1,21 @@
+"""
+性能基准测试
+
+默认跳过，设置 TRENDRADAR_BENCH=1 后运行：
+
+    TRENDRADAR_BENCH=1 pytest trendradar/tests/bench -s --no-cov
+
+规模通过 TRENDRADAR_BENCH_SCALE 指定（平台数x条目数x快照数，默认 500x50x288），
+没有该规模的基准时流水线基准跳过回归检查。
+
+baseline.json 中的基准是某台机器上测得的绝对吞吐，同时保存了该机器的参考吞吐
+（固定的标题合并负载），比较时按本机与记录时参考吞吐之比换算，只能抵消 CPU 速度差异。
+磁盘、CPU 核数或网络栈不同的机器（如 CI）应在该机器上重新记录基准：
+
+    TRENDRADAR_BENCH=1 TRENDRADAR_BENCH_UPDATE=1 TRENDRADAR_BENCH_SCALE=500x50x288 \
+        TRENDRADAR_BENCH_BASELINE=/path/to/baseline-ci.json \
+        pytest trendradar/tests/bench/test_pipeline_bench.py -s --no-cov
+
+TRENDRADAR_BENCH_UPDATE=1 时把本次结果写入基准文件（不做比较），
+TRENDRADAR_BENCH_BASELINE 指定基准文件，默认为本目录的 baseline.json
+"""
@@ -0,0 +1,317 @@
+"""
+本地模拟服务
+
+NewsnowStandIn 模拟 newsnow 的 /api/s?id=...&latest 接口，
+WebhookStandIn 模拟各推送渠道的 Webhook，两者都在后台线程的事件循环中运行。
+基准测试和单元测试共用，单元测试通过 conftest 中的 newsnow / webhook fixture 启动
+"""
+
+import asyncio
+import math
+import random
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from aiohttp import web
+
+# 标题词汇，包含 config/frequency_words.txt 中的部分关键词，保证有一定命中率
+VOCABULARY = [
+    "大模型",
+    "人工智能",
+    "英伟达",
+    "半导体",
+    "新能源",
+    "储能",
+    "美股",
+    "港股",
+    "利率",
+    "经济",
+    "登月",
+    "低空",
+    "天气",
+    "电影",
+    "球赛",
+    "美食",
+    "旅游",
+    "演唱会",
+    "招聘",
+    "限时",
+]
+
+
+def make_items(
+    platform_id: str, snapshot: int, item_count: int, churn: int
+) -> List[Dict]:
+    """生成某平台某次快照的榜单条目
+
+    每次快照榜单整体下移 churn 条，即每次有 churn 条新标题进入榜单
+
+    Args:
+        platform_id: 平台 ID
+        snapshot: 快照序号
+        item_count: 每个平台的条目数
+        churn: 每次快照新增的标题数
+
+    Returns:
+        newsnow 格式的条目列表
+    """
+    start = snapshot * churn
+    items = []
+    for n in range(start + item_count - 1, start - 1, -1):
+        word = VOCABULARY[(n * 7 + len(platform_id)) % len(VOCABULARY)]
+        items.append(
+            {
+                "title": f"{platform_id} {word} 热点 {n}",
+                "url": f"https://example.com/{platform_id}/{n}",
+                "mobileUrl": f"https://m.example.com/{platform_id}/{n}",
+            }
+        )
+    return items
+
+
+def fixed_latency(seconds: float) -> Callable[[random.Random], float]:
+    """固定延迟"""
+    return lambda rng: seconds
+
+
+def uniform_latency(low: float, high: float) -> Callable[[random.Random], float]:
+    """均匀分布延迟"""
+    return lambda rng: rng.uniform(low, high)
+
+
+def lognormal_latency(median: float, sigma: float) -> Callable[[random.Random], float]:
+    """对数正态分布延迟（长尾），median 为中位数（秒）"""
+    mu = math.log(median)
+    return lambda rng: rng.lognormvariate(mu, sigma)
+
+
+class _BackgroundServer:
+    """在后台线程的事件循环中运行的 aiohttp 服务"""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._runner: Optional[web.AppRunner] = None
+        self.port = 0
+
+    def build_app(self) -> web.Application:
+        raise NotImplementedError
+
+    def start(self) -> "_BackgroundServer":
+        """启动服务，返回后即可接受请求"""
+        ready = threading.Event()
+
+        async def setup() -> None:
+            self._runner = web.AppRunner(self.build_app(), access_log=None)
+            await self._runner.setup()
+            site = web.TCPSite(self._runner, "127.0.0.1", 0)
+            await site.start()
+            self.port = site._server.sockets[0].getsockname()[1]
+
+        def serve() -> None:
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(setup())
+            ready.set()
+            self._loop.run_forever()
+            self._loop.run_until_complete(self._runner.cleanup())
+            # 取消仍在延迟中的请求，如单元测试中模拟卡住的请求
+            pending = asyncio.all_tasks(self._loop)
+            for task in pending:
+                task.cancel()
+            self._loop.run_until_complete(
+                asyncio.gather(*pending, return_exceptions=True)
+            )
+            self._loop.close()
+
+        self._thread = threading.Thread(target=serve, daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self) -> None:
+        """停止服务"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
+
+    def __enter__(self) -> "_BackgroundServer":
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+
+class NewsnowStandIn(_BackgroundServer):
+    """newsnow 接口模拟服务
+
+    请求延迟、错误率和 cache 响应比例可配置，随机数种子固定保证可复现；
+    还可以指定固定失败的平台、各平台的固定延迟、上游容量（并发超出时返回 429）
+    和支持条件请求（ETag）的平台。子类可重写 delay 定制每个请求的延迟
+    """
+
+    def __init__(
+        self,
+        item_count: int = 50,
+        churn: int = 2,
+        latency: Callable[[random.Random], float] = fixed_latency(0.0),
+        error_rate: float = 0.0,
+        cache_rate: float = 0.0,
+        seed: int = 0,
+        delays: Optional[Dict[str, float]] = None,
+        down: Iterable[str] = (),
+        capacity: Optional[int] = None,
+        etag_platforms: Iterable[str] = (),
+    ):
+        """初始化模拟服务
+
+        Args:
+            item_count: 每个平台返回的条目数
+            churn: 每次快照新增的标题数
+            latency: 延迟分布，参数为随机数生成器，返回秒数
+            error_rate: 返回 HTTP 503 的比例
+            cache_rate: 返回 status: cache 的比例
+            seed: 随机数种子
+            delays: 各平台的固定延迟 {平台ID: 秒}，优先于 latency
+            down: 总是返回 HTTP 503 的平台ID
+            capacity: 上游容量，处理中的请求超过该数时返回 HTTP 429，None 表示不限
+            etag_platforms: 返回 ETag（随快照序号变化）并响应 If-None-Match 的平台ID
+        """
+        super().__init__()
+        self.item_count = item_count
+        self.churn = churn
+        self.latency = latency
+        self.error_rate = error_rate
+        self.cache_rate = cache_rate
+        self.rng = random.Random(seed)
+        self.delays = dict(delays or {})
+        self.down = set(down)
+        self.capacity = capacity
+        self.etag_platforms = set(etag_platforms)
+        # 当前快照序号，由调用方在每轮抓取前设置
+        self.snapshot = 0
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        # 各平台的请求次数和最近一次请求的请求头
+        self.platform_requests: Dict[str, int] = {}
+        self.last_headers: Dict[str, Dict[str, str]] = {}
+
+    @property
+    def url(self) -> str:
+        """可直接赋给 DataFetcher.API_BASE_URL 的地址"""
+        return f"http://127.0.0.1:{self.port}/api/s"
+
+    def items(self, platform_id: str) -> List[Dict]:
+        """某平台当前快照的榜单条目"""
+        return make_items(platform_id, self.snapshot, self.item_count, self.churn)
+
+    def delay(self, platform_id: str, count: int) -> float:
+        """本次请求的延迟（秒）
+
+        Args:
+            platform_id: 平台 ID
+            count: 该平台的第几次请求（从 1 开始）
+        """
+        if platform_id in self.delays:
+            return self.delays[platform_id]
+        return self.latency(self.rng)
+
+    async def handle(self, request: web.Request) -> web.Response:
+        platform_id = request.query.get("id", "")
+        self.requests += 1
+        count = self.platform_requests.get(platform_id, 0) + 1
+        self.platform_requests[platform_id] = count
+        self.last_headers[platform_id] = dict(request.headers)
+
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            delay = self.delay(platform_id, count)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            return self.respond(request, platform_id)
+        finally:
+            self.in_flight -= 1
+
+    def respond(self, request: web.Request, platform_id: str) -> web.Response:
+        """延迟结束后生成响应"""
+        if self.capacity is not None and self.in_flight > self.capacity:
+            self.throttled += 1
+            return web.Response(status=429, text="Too Many Requests")
+
+        if platform_id in self.down or self.rng.random() < self.error_rate:
+            self.errors += 1
+            return web.Response(status=503, text="Service Unavailable")
+
+        headers = {}
+        if platform_id in self.etag_platforms:
+            headers["ETag"] = f'"v{self.snapshot}"'
+            if request.headers.get("If-None-Match") == headers["ETag"]:
+                return web.Response(status=304, headers=headers)
+
+        status = "cache" if self.rng.random() < self.cache_rate else "success"
+        return web.json_response(
+            {"status": status, "id": platform_id, "items": self.items(platform_id)},
+            headers=headers,
+        )
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/api/s", self.handle)
+        return app
+
+
+class WebhookStandIn(_BackgroundServer):
+    """推送渠道 Webhook 模拟服务，除 broken 中的渠道外所有路径均返回成功"""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        broken: Iterable[str] = (),
+        keep_payloads: bool = False,
+    ):
+        """初始化模拟服务
+
+        Args:
+            latency: 每个请求的固定延迟（秒）
+            broken: 返回错误码的渠道名
+            keep_payloads: 是否在 received 中保存收到的 (渠道名, 请求体 JSON)
+        """
+        super().__init__()
+        self.latency = latency
+        self.broken = set(broken)
+        self.keep_payloads = keep_payloads
+        self.received: List[Tuple[str, Dict]] = []
+        self.requests = 0
+        self.bytes_received = 0
+
+    def url(self, channel: str) -> str:
+        """某个渠道的 Webhook 地址"""
+        return f"http://127.0.0.1:{self.port}/{channel}"
+
+    async def handle(self, request: web.Request) -> web.Response:
+        channel = request.match_info["channel"]
+        body = await request.read()
+        self.requests += 1
+        self.bytes_received += len(body)
+        if self.keep_payloads:
+            self.received.append((channel, await request.json()))
+
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        if channel in self.broken:
+            return web.json_response(
+                {"errcode": 40001, "errmsg": "invalid key", "ok": False}
+            )
+        # 同时满足飞书（200）、钉钉/企业微信（errcode）和 Telegram（ok）的判断
+        return web.json_response({"errcode": 0, "errmsg": "ok", "ok": True})
+
+    def build_app(self) -> web.Application:
+        # 飞书不分批，当日汇总的单条消息可能超过 aiohttp 默认的 1MB 请求体上限
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post("/{channel}", self.handle)
+        return app
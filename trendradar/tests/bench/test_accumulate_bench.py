@@ -0,0 +1,166 @@
+"""
+当日标题累计的单次出现耗时基准
+
+在模拟的一整天快照（每 5 分钟一次，共 288 次）上比较原来的合并方式
+（每次复制排名列表、在列表中查重并重建字典）与 TitleAccumulator 原地累计的耗时
+"""
+
+import os
+import timeit
+from typing import Callable, Dict, List, Tuple
+
+import pytest
+
+from trendradar.core.analyzer import process_source_data
+
+pytestmark = [
+    pytest.mark.slow,
+    pytest.mark.skipif(
+        os.environ.get("TRENDRADAR_BENCH") != "1",
+        reason="基准测试默认跳过，设置 TRENDRADAR_BENCH=1 运行",
+    ),
+]
+
+SNAPSHOT_COUNT = 288
+
+PLATFORM_COUNT = 20
+
+TITLE_COUNT = 50
+
+REPEAT = 3
+
+
+def make_day() -> List[Tuple[str, Dict[str, Dict]]]:
+    """生成一天的快照 [(时间, {平台ID: 标题数据})]
+
+    一半标题全天在榜，排名每次轮换，当天会出现全部 50 个排名；
+    另一半标题每次快照换一批
+    """
+    day = []
+    sticky = TITLE_COUNT // 2
+    for snapshot in range(SNAPSHOT_COUNT):
+        minutes = snapshot * 5
+        time_info = f"{minutes // 60:02d}时{minutes % 60:02d}分"
+        platforms = {}
+        for p in range(PLATFORM_COUNT):
+            titles = {}
+            for n in range(TITLE_COUNT):
+                if n < sticky:
+                    title = f"平台{p} 常驻标题{n}"
+                else:
+                    title = f"平台{p} 标题{snapshot}-{n}"
+                titles[title] = {
+                    "ranks": [(n + snapshot) % TITLE_COUNT + 1],
+                    "url": f"https://example.com/{p}/{n}",
+                    "mobileUrl": "",
+                }
+            platforms[f"p{p}"] = titles
+        day.append((time_info, platforms))
+    return day
+
+
+def legacy_process_source_data(
+    source_id: str,
+    title_data: Dict,
+    time_info: str,
+    all_results: Dict,
+    title_info: Dict,
+) -> None:
+    """原来的合并方式：排名列表每次复制，在列表中查重，all_results 的字典每次重建"""
+    if source_id not in all_results:
+        all_results[source_id] = title_data
+        title_info.setdefault(source_id, {})
+        for title, data in title_data.items():
+            title_info[source_id][title] = {
+                "first_time": time_info,
+                "last_time": time_info,
+                "count": 1,
+                "ranks": data.get("ranks", []),
+                "url": data.get("url", ""),
+                "mobileUrl": data.get("mobileUrl", ""),
+            }
+        return
+
+    for title, data in title_data.items():
+        ranks = data.get("ranks", [])
+        url = data.get("url", "")
+        mobile_url = data.get("mobileUrl", "")
+
+        if title not in all_results[source_id]:
+            all_results[source_id][title] = {
+                "ranks": ranks,
+                "url": url,
+                "mobileUrl": mobile_url,
+            }
+            title_info[source_id][title] = {
+                "first_time": time_info,
+                "last_time": time_info,
+                "count": 1,
+                "ranks": ranks,
+                "url": url,
+                "mobileUrl": mobile_url,
+            }
+        else:
+            existing_data = all_results[source_id][title]
+            merged_ranks = existing_data.get("ranks", []).copy()
+            for rank in ranks:
+                if rank not in merged_ranks:
+                    merged_ranks.append(rank)
+
+            all_results[source_id][title] = {
+                "ranks": merged_ranks,
+                "url": existing_data.get("url", "") or url,
+                "mobileUrl": existing_data.get("mobileUrl", "") or mobile_url,
+            }
+            title_info[source_id][title]["last_time"] = time_info
+            title_info[source_id][title]["ranks"] = merged_ranks
+            title_info[source_id][title]["count"] += 1
+            if not title_info[source_id][title].get("url"):
+                title_info[source_id][title]["url"] = url
+            if not title_info[source_id][title].get("mobileUrl"):
+                title_info[source_id][title]["mobileUrl"] = mobile_url
+
+
+def accumulate(day: List, merge: Callable) -> Tuple[Dict, Dict]:
+    """按快照顺序合并一整天的数据"""
+    all_results, title_info = {}, {}
+    for time_info, platforms in day:
+        for source_id, title_data in platforms.items():
+            # 原来的方式会把平台首次出现的标题数据直接作为 all_results 并替换其中的条目，
+            # 传入浅拷贝，保证每轮使用相同的快照
+            merge(source_id, dict(title_data), time_info, all_results, title_info)
+    return all_results, title_info
+
+
+def per_observation_ns(day: List, merge: Callable) -> float:
+    """取多轮中最快一轮的单次出现耗时（纳秒）"""
+    best = min(timeit.repeat(lambda: accumulate(day, merge), repeat=REPEAT, number=1))
+    return best / (SNAPSHOT_COUNT * PLATFORM_COUNT * TITLE_COUNT) * 1e9
+
+
+class TestAccumulateBench:
+    """当日标题累计基准测试类"""
+
+    def test_per_observation_cost(self):
+        """测试原地累计与原来的合并结果相同且不更慢"""
+        day = make_day()
+
+        legacy_results, legacy_info = accumulate(day, legacy_process_source_data)
+        all_results, title_info = accumulate(day, process_source_data)
+        assert all_results == legacy_results
+        assert title_info == legacy_info
+
+        costs = {
+            "legacy dict": per_observation_ns(day, legacy_process_source_data),
+            "accumulator": per_observation_ns(day, process_source_data),
+        }
+
+        observations = SNAPSHOT_COUNT * PLATFORM_COUNT * TITLE_COUNT
+        print(
+            f"\n标题累计基准（{SNAPSHOT_COUNT} 次快照 × {PLATFORM_COUNT} 个平台"
+            f" × {TITLE_COUNT} 条，共 {observations} 次出现）"
+        )
+        for name, cost in costs.items():
+            print(f"  {name:<12} {cost:>8.0f} ns/次")
+
+        assert costs["accumulator"] <= costs["legacy dict"]
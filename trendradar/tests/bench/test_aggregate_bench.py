@@ -0,0 +1,108 @@
+"""
+当日聚合状态的单次运行耗时基准
+
+在模拟的一整天快照（每 5 分钟一次，共 288 次）上逐次运行合并和保存，
+比较每次整体重写状态文件与追加增量日志时，单次运行耗时随当日快照数的变化
+"""
+
+import os
+import statistics
+import time
+from typing import List
+
+import pytest
+
+from trendradar.core.aggregate import DayAggregate
+
+from ..test_aggregate import DATE_FOLDER, write_snapshot
+
+pytestmark = [
+    pytest.mark.slow,
+    pytest.mark.skipif(
+        os.environ.get("TRENDRADAR_BENCH") != "1",
+        reason="基准测试默认跳过，设置 TRENDRADAR_BENCH=1 运行",
+    ),
+]
+
+SNAPSHOT_COUNT = 288
+
+PLATFORM_COUNT = 20
+
+TITLE_COUNT = 50
+
+# 比较当日开始和结束时各这么多次运行耗时的中位数
+WINDOW = 24
+
+
+def snapshot_platforms(snapshot: int) -> dict:
+    """第 snapshot 次快照的标题：一半全天在榜、排名轮换，另一半每次换一批"""
+    sticky = TITLE_COUNT // 2
+    platforms = {}
+    for p in range(PLATFORM_COUNT):
+        titles = [f"平台{p} 常驻标题{n}" for n in range(sticky)]
+        titles += [f"平台{p} 标题{snapshot}-{n}" for n in range(sticky, TITLE_COUNT)]
+        shift = snapshot % TITLE_COUNT
+        platforms[f"p{p}"] = titles[shift:] + titles[:shift]
+    return platforms
+
+
+def run_day(tmp_path, name: str, full_rewrite: bool) -> List[float]:
+    """逐次写入快照并运行合并和保存，返回每次运行的耗时（秒）
+
+    聚合状态在运行之间保留在内存中（与常驻进程相同），
+    full_rewrite 时整体重写状态文件（增量日志之前的做法）；
+    整体重写只在比较的首尾两段运行中执行，中间的运行只合并不保存，以缩短基准耗时
+    """
+    output_dir = str(tmp_path / name)
+    txt_dir = tmp_path / name / DATE_FOLDER / "txt"
+    aggregate = DayAggregate(DATE_FOLDER, output_dir=output_dir)
+    costs = []
+    for snapshot in range(SNAPSHOT_COUNT):
+        minutes = snapshot * 5
+        time_info = f"{minutes // 60:02d}时{minutes % 60:02d}分"
+        write_snapshot(txt_dir, time_info, snapshot_platforms(snapshot))
+
+        start = time.perf_counter()
+        aggregate.refresh()
+        if not full_rewrite:
+            aggregate.save()
+        elif snapshot < WINDOW or snapshot >= SNAPSHOT_COUNT - WINDOW:
+            aggregate._compact = True
+            aggregate.save()
+        costs.append(time.perf_counter() - start)
+
+    reloaded = DayAggregate(DATE_FOLDER, output_dir=output_dir)
+    assert reloaded.load()
+    assert reloaded.refresh() == 0
+    assert reloaded.view() == aggregate.view()
+    return costs
+
+
+class TestAggregateBench:
+    """当日聚合状态基准测试类"""
+
+    def test_per_run_cost_flat(self, tmp_path):
+        """测试追加日志时单次运行耗时不随当日快照数增长"""
+        costs = {
+            "full rewrite": run_day(tmp_path, "full", full_rewrite=True),
+            "delta log": run_day(tmp_path, "log", full_rewrite=False),
+        }
+
+        print(
+            f"\n当日聚合单次运行耗时（{SNAPSHOT_COUNT} 次快照 × {PLATFORM_COUNT} 个平台"
+            f" × {TITLE_COUNT} 条）"
+        )
+        print(f"  {'':<14} {'前24次中位数':>10} {'后24次中位数':>10} {'最慢':>10}")
+        ratios = {}
+        for name, runs in costs.items():
+            first = statistics.median(runs[:WINDOW])
+            last = statistics.median(runs[-WINDOW:])
+            ratios[name] = last / first
+            print(
+                f"  {name:<14} {first * 1e3:>8.2f}ms {last * 1e3:>8.2f}ms"
+                f" {max(runs) * 1e3:>8.2f}ms"
+            )
+
+        # 偶尔的日志合并体现在最慢一次中，通常的运行只追加日志，耗时与开始时相当
+        assert ratios["delta log"] < 3
+        assert ratios["delta log"] < ratios["full rewrite"]
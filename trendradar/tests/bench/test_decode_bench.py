@@ -0,0 +1,71 @@
+"""
+响应解析的单条目耗时基准
+
+比较原来的解析方式（先解码为字符串再用标准库解析，之后再整理标题）
+与 decode_json 直接解析原始字节后整理标题的每条目耗时
+"""
+
+import json
+import os
+import timeit
+from typing import Callable, Dict
+
+import pytest
+
+from trendradar.core import fetcher
+from trendradar.core.fetcher import decode_json, parse_platform_titles
+
+from .standin import make_items
+
+pytestmark = [
+    pytest.mark.slow,
+    pytest.mark.skipif(
+        os.environ.get("TRENDRADAR_BENCH") != "1",
+        reason="基准测试默认跳过，设置 TRENDRADAR_BENCH=1 运行",
+    ),
+]
+
+ITEM_COUNT = 500
+
+REPEAT = 5
+
+NUMBER = 200
+
+
+def per_item_ns(func: Callable[[], Dict]) -> float:
+    """取多轮中最快一轮的每条目耗时（纳秒）"""
+    best = min(timeit.repeat(func, repeat=REPEAT, number=NUMBER))
+    return best / NUMBER / ITEM_COUNT * 1e9
+
+
+class TestDecodeBench:
+    """响应解析基准测试类"""
+
+    def test_per_item_cost(self, monkeypatch):
+        """测试直接解析原始字节不慢于先解码为字符串"""
+        body = json.dumps(
+            {"status": "success", "items": make_items("baidu", 0, ITEM_COUNT, 0)},
+            ensure_ascii=False,
+        ).encode("utf-8")
+
+        def text_then_parse() -> Dict:
+            # 原来的 response.json()：先按编码解码为字符串，再用标准库解析
+            return parse_platform_titles(json.loads(body.decode("utf-8")))
+
+        def bytes_then_parse() -> Dict:
+            return parse_platform_titles(decode_json(body))
+
+        assert bytes_then_parse() == text_then_parse()
+
+        costs = {"text + json": per_item_ns(text_then_parse)}
+        with monkeypatch.context() as patch:
+            patch.setattr(fetcher, "orjson", None)
+            costs["bytes + json"] = per_item_ns(bytes_then_parse)
+        if fetcher.orjson is not None:
+            costs["bytes + orjson"] = per_item_ns(bytes_then_parse)
+
+        print(f"\n响应解析基准（{ITEM_COUNT} 条/响应，{len(body)} 字节）")
+        for name, cost in costs.items():
+            print(f"  {name:<16} {cost:>8.0f} ns/条")
+
+        assert min(costs.values()) <= costs["text + json"] * 1.1
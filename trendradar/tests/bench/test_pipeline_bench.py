@@ -0,0 +1,295 @@
+"""
+整条流水线的吞吐基准
+
+抓取 → 保存 → 当日聚合 → 新增检测 对每个快照执行一次，
+关键词匹配 → HTML 渲染 → 推送 在最后一个快照（当日数据量最大）上执行一次，
+各阶段吞吐低于 baseline.json 中对应规模的基准值 (1 - tolerance) 倍时失败。
+基准值与记录时本机的参考吞吐（calibrate）一起保存，比较时按两次参考吞吐之比换算到本机
+"""
+
+import json
+import os
+import timeit
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, Tuple
+
+import pytest
+
+from trendradar.core import (
+    DataFetcher,
+    DayAggregate,
+    SeenTitleIndex,
+    WordGroupMatcher,
+    count_word_frequency,
+    detect_latest_new_titles,
+    generate_html_report,
+    prepare_report_data,
+    process_source_data,
+    read_all_today_titles,
+    save_titles_to_file,
+)
+from trendradar.notifiers import (
+    DingTalkNotifier,
+    FeishuNotifier,
+    NotificationDispatcher,
+    WeWorkNotifier,
+)
+from trendradar.utils import time_utils
+from trendradar.utils.config import load_frequency_words
+from trendradar.utils.metrics import RunMetrics
+
+from .standin import NewsnowStandIn, WebhookStandIn, lognormal_latency
+
+pytestmark = [
+    pytest.mark.slow,
+    pytest.mark.skipif(
+        os.environ.get("TRENDRADAR_BENCH") != "1",
+        reason="基准测试默认跳过，设置 TRENDRADAR_BENCH=1 运行",
+    ),
+]
+
+BASELINE_PATH = Path(
+    os.environ.get("TRENDRADAR_BENCH_BASELINE")
+    or Path(__file__).with_name("baseline.json")
+)
+
+FREQUENCY_WORDS_PATH = Path(__file__).parents[3] / "config" / "frequency_words.txt"
+
+DEFAULT_SCALE = "500x50x288"
+
+# 各阶段吞吐的计量单位
+UNITS = {
+    "fetch": "platforms/s",
+    "save": "titles/s",
+    "aggregate": "titles/s",
+    "detect_new": "titles/s",
+    "match": "titles/s",
+    "render": "titles/s",
+    "notify": "batches/s",
+}
+
+
+def parse_scale(scale: str) -> Tuple[int, int, int]:
+    """解析规模字符串，如 500x50x288 → (平台数, 条目数, 快照数)"""
+    platforms, items, snapshots = (int(part) for part in scale.lower().split("x"))
+    if not 2 <= snapshots <= 24 * 60:
+        raise ValueError(f"快照数必须在 2 到 1440 之间: {snapshots}")
+    return platforms, items, snapshots
+
+
+def calibrate() -> float:
+    """本机的参考吞吐（titles/s）
+
+    固定负载：把 50 个平台 × 50 条的快照合并进空的当日累计结果，
+    单轮很短、轮数较多，取最快一轮以减少其他进程的干扰
+    """
+    snapshot = {
+        f"p{p}": {
+            f"平台{p} 标题{n}": {"ranks": [n + 1], "url": "", "mobileUrl": ""}
+            for n in range(50)
+        }
+        for p in range(50)
+    }
+
+    def merge() -> None:
+        all_results: Dict = {}
+        title_info: Dict = {}
+        for source_id, title_data in snapshot.items():
+            process_source_data(
+                source_id, title_data, "08时00分", all_results, title_info
+            )
+
+    best = min(timeit.repeat(merge, repeat=200, number=1))
+    return 50 * 50 / best
+
+
+def check_baseline(
+    scale: str, throughput: Dict[str, float], calibration: float
+) -> None:
+    """与基准比较，TRENDRADAR_BENCH_UPDATE=1 时改为写入基准
+
+    基准值按本次与记录时参考吞吐之比换算，没有该规模的基准时跳过并提示如何记录
+    """
+    if BASELINE_PATH.exists():
+        baseline = json.loads(BASELINE_PATH.read_text(encoding="utf-8"))
+    else:
+        baseline = {"tolerance": 0.5, "scales": {}}
+
+    if os.environ.get("TRENDRADAR_BENCH_UPDATE") == "1":
+        baseline["scales"][scale] = {
+            "calibration": round(calibration, 1),
+            "throughput": {
+                stage: round(value, 1) for stage, value in throughput.items()
+            },
+        }
+        BASELINE_PATH.write_text(
+            json.dumps(baseline, ensure_ascii=False, indent=2) + "\n",
+            encoding="utf-8",
+        )
+        return
+
+    recorded = baseline["scales"].get(scale)
+    if recorded is None:
+        hint = "设置 TRENDRADAR_BENCH_UPDATE=1 运行一次以记录"
+        pytest.skip(f"{BASELINE_PATH} 中没有规模 {scale} 的基准，{hint}")
+
+    factor = calibration / recorded["calibration"]
+    tolerance = baseline["tolerance"]
+    print(f"  本机参考吞吐为记录基准时的 {factor:.2f} 倍，基准按此换算")
+    regressions = [
+        f"{stage}: {throughput[stage]:.1f} < {value:.1f} × {factor:.2f}"
+        f" × {1 - tolerance:.2f} {UNITS[stage]}"
+        for stage, value in recorded["throughput"].items()
+        if stage in throughput and throughput[stage] < value * factor * (1 - tolerance)
+    ]
+    assert not regressions, "吞吐低于基准:\n" + "\n".join(regressions)
+
+
+class TestPipelineBench:
+    """流水线吞吐基准测试类"""
+
+    def test_pipeline_throughput(self, tmp_path, monkeypatch):
+        """测试各阶段吞吐不低于基准"""
+        scale = os.environ.get("TRENDRADAR_BENCH_SCALE", DEFAULT_SCALE)
+        platform_count, item_count, snapshot_count = parse_scale(scale)
+        calibration = calibrate()
+
+        # 固定北京时间，快照均匀分布在同一天内，避免运行期间跨天
+        step = timedelta(minutes=24 * 60 // snapshot_count)
+        day_start = time_utils.get_beijing_time().replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        clock = {"now": day_start}
+        monkeypatch.setattr(time_utils, "get_beijing_time", lambda: clock["now"])
+        monkeypatch.chdir(tmp_path)
+
+        word_groups, filter_words = load_frequency_words(str(FREQUENCY_WORDS_PATH))
+        matcher = WordGroupMatcher(word_groups, filter_words)
+        platforms = [
+            {"id": f"p{i:04d}", "name": f"平台{i}"} for i in range(platform_count)
+        ]
+        platform_ids = [p["id"] for p in platforms]
+        id_to_name = {p["id"]: p["name"] for p in platforms}
+
+        counts = dict.fromkeys(UNITS, 0)
+        newsnow = NewsnowStandIn(
+            item_count=item_count,
+            latency=lognormal_latency(0.005, 0.5),
+            error_rate=0.01,
+            cache_rate=0.1,
+        )
+        webhook = WebhookStandIn()
+
+        with newsnow, webhook, RunMetrics() as metrics:
+            # 模拟服务在本机，不限速；并发窗口仍按默认配置自适应
+            fetcher = DataFetcher(
+                {"PLATFORMS": platforms, "RATE_LIMIT": {"REQUESTS_PER_SECOND": 0}},
+                max_retries=0,
+            )
+            fetcher.API_BASE_URL = newsnow.url
+            fetcher.open()
+            aggregate = DayAggregate()
+            seen_index = SeenTitleIndex()
+
+            try:
+                for snapshot in range(snapshot_count):
+                    newsnow.snapshot = snapshot
+                    clock["now"] = day_start + step * snapshot
+                    results: Dict[str, Dict] = {}
+                    failed = []
+
+                    def handle_platform(platform, result):
+                        if result is None:
+                            failed.append(platform["id"])
+                            return
+                        titles = result["titles"]
+                        matcher.prime(titles)
+                        results[platform["id"]] = titles
+
+                    with metrics.span("fetch"):
+                        fetcher.fetch_all_streaming(handle_platform)
+                    counts["fetch"] += platform_count
+
+                    snapshot_titles = sum(len(t) for t in results.values())
+                    with metrics.span("save"):
+                        save_titles_to_file(
+                            results, id_to_name, failed, seen_index=seen_index
+                        )
+                    counts["save"] += snapshot_titles
+
+                    with metrics.span("aggregate"):
+                        (
+                            all_results,
+                            final_id_to_name,
+                            title_info,
+                        ) = read_all_today_titles(platform_ids, aggregate=aggregate)
+                    counts["aggregate"] += snapshot_titles
+
+                    with metrics.span("detect_new"):
+                        new_titles = detect_latest_new_titles(
+                            platform_ids, seen_index=seen_index
+                        )
+                    counts["detect_new"] += snapshot_titles
+            finally:
+                fetcher.close()
+
+            # 当日最后一次运行的数据量最大，匹配、渲染和推送只跑一次
+            total_titles = sum(len(t) for t in all_results.values())
+            with metrics.span("match"):
+                stats = count_word_frequency(
+                    results=all_results,
+                    word_groups=word_groups,
+                    filter_words=filter_words,
+                    id_to_name=final_id_to_name,
+                    title_info=title_info,
+                    matcher=matcher,
+                )
+            counts["match"] = total_titles
+            stats = [{"word": "热点新闻", "count": len(stats), "titles": stats}]
+
+            with metrics.span("render"):
+                generate_html_report(
+                    stats=stats,
+                    total_titles=total_titles,
+                    failed_ids=failed,
+                    new_titles=new_titles,
+                    id_to_name=final_id_to_name,
+                    is_daily_summary=True,
+                    matcher=matcher,
+                )
+            counts["render"] = stats[0]["count"]
+
+            dispatcher = NotificationDispatcher(
+                [
+                    FeishuNotifier(webhook.url("feishu")),
+                    DingTalkNotifier(webhook.url("dingtalk"), batch_interval=0),
+                    WeWorkNotifier(webhook.url("wework"), batch_interval=0),
+                ]
+            )
+            report_data = prepare_report_data(
+                stats, failed, new_titles, final_id_to_name, matcher=matcher
+            )
+            with metrics.span("notify"):
+                channel_results = dispatcher.dispatch(report_data, "每日汇总报告")
+            counts["notify"] = webhook.requests
+
+        for name, result in channel_results.items():
+            assert result["success"], f"{name} 推送失败: {result['error']}"
+        assert newsnow.requests == platform_count * snapshot_count
+
+        totals = metrics.stage_totals()
+        throughput = {
+            stage: counts[stage] / totals[stage] for stage in UNITS if totals[stage] > 0
+        }
+
+        print(f"\n流水线基准 {scale}（失败请求 {newsnow.errors}）")
+        for stage, unit in UNITS.items():
+            print(
+                f"  {stage:<10} {counts[stage]:>10} 条 {totals[stage]:>8.2f}s "
+                f"{throughput.get(stage, 0):>12.1f} {unit}"
+            )
+
+        # 运行前后各测一次参考吞吐，取较高的一次
+        calibration = max(calibration, calibrate())
+        check_baseline(scale, throughput, calibration)
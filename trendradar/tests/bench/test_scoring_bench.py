@@ -0,0 +1,85 @@
+"""
+权重计算与排序的单条目耗时基准
+
+比较原来逐条调用 calculate_news_weight 后完整排序，
+与 calculate_news_weights 批量计算后按报告条数上限取前 N 条的每条目耗时
+"""
+
+import heapq
+import os
+import random
+import timeit
+from operator import itemgetter
+from typing import Callable, List
+
+import pytest
+
+from trendradar.core import matcher
+from trendradar.core.matcher import calculate_news_weight, calculate_news_weights
+from trendradar.core.records import TitleAccumulator
+
+pytestmark = [
+    pytest.mark.slow,
+    pytest.mark.skipif(
+        os.environ.get("TRENDRADAR_BENCH") != "1",
+        reason="基准测试默认跳过，设置 TRENDRADAR_BENCH=1 运行",
+    ),
+]
+
+ITEM_COUNT = 20000
+
+MAX_NEWS = 100
+
+REPEAT = 5
+
+NUMBER = 5
+
+
+def make_records() -> List[TitleAccumulator]:
+    """模拟当日匹配到的标题记录，排名分布在 1-50"""
+    rng = random.Random(2025)
+    records = []
+    for _ in range(ITEM_COUNT):
+        record = TitleAccumulator("08时00分", [rng.randint(1, 50)])
+        for _ in range(rng.randint(0, 20)):
+            record.observe("09时00分", [rng.randint(1, 50)])
+        records.append(record)
+    return records
+
+
+def per_item_ns(func: Callable[[], List]) -> float:
+    """取多轮中最快一轮的每条目耗时（纳秒）"""
+    best = min(timeit.repeat(func, repeat=REPEAT, number=NUMBER))
+    return best / NUMBER / ITEM_COUNT * 1e9
+
+
+class TestScoringBench:
+    """权重计算基准测试类"""
+
+    def test_per_item_cost(self, monkeypatch):
+        """测试批量计算的结果相同且不慢于逐条计算"""
+        records = make_records()
+
+        def per_item() -> List:
+            weights = [calculate_news_weight(record, 10) for record in records]
+            ranked = sorted(enumerate(weights), key=itemgetter(1), reverse=True)
+            return ranked[:MAX_NEWS]
+
+        def batch() -> List:
+            weights = calculate_news_weights(records, 10)
+            return heapq.nlargest(MAX_NEWS, enumerate(weights), key=itemgetter(1))
+
+        assert batch() == per_item()
+
+        costs = {"per item + sort": per_item_ns(per_item)}
+        with monkeypatch.context() as patch:
+            patch.setattr(matcher, "np", None)
+            costs["batch (python)"] = per_item_ns(batch)
+        if matcher.np is not None:
+            costs["batch (numpy)"] = per_item_ns(batch)
+
+        print(f"\n权重计算基准（{ITEM_COUNT} 条，取前 {MAX_NEWS} 条）")
+        for name, cost in costs.items():
+            print(f"  {name:<18} {cost:>8.0f} ns/条")
+
+        assert min(costs.values()) <= costs["per item + sort"] * 1.1
@@ -3,10 +3,25 @@ pytest 配置文件和通用 fixtures
 """
 
 from pathlib import Path
-from typing import Dict
+from typing import Callable, Dict, Iterable, Iterator
 
 import pytest
 
+from trendradar.core.fetcher import DataFetcher
+from trendradar.utils.rate_limiter import RateLimiter
+
+from .bench.standin import NewsnowStandIn, WebhookStandIn
+
+
+class FakeClock:
+    """可手动推进的时钟，修改 now 推进时间"""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
 
 @pytest.fixture
 def sample_config() -> Dict:
@@ -85,3 +100,71 @@ def sample_frequency_words() -> Dict[str, int]:
         "教育": 2,
         "经济": 1,
     }
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    """可手动推进的时钟，传给各组件的 clock 参数"""
+    return FakeClock()
+
+
+@pytest.fixture
+def newsnow() -> Iterator[Callable[..., NewsnowStandIn]]:
+    """启动本地 newsnow 模拟服务的工厂，测试结束时停止
+
+    参数同 NewsnowStandIn，stand_in 指定要启动的子类
+    """
+    servers = []
+
+    def start(stand_in=NewsnowStandIn, **kwargs) -> NewsnowStandIn:
+        server = stand_in(**kwargs).start()
+        servers.append(server)
+        return server
+
+    yield start
+
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def webhook() -> Iterator[Callable[..., WebhookStandIn]]:
+    """启动本地 Webhook 模拟服务的工厂，参数同 WebhookStandIn，测试结束时停止"""
+    servers = []
+
+    def start(**kwargs) -> WebhookStandIn:
+        server = WebhookStandIn(**kwargs).start()
+        servers.append(server)
+        return server
+
+    yield start
+
+    for server in servers:
+        server.stop()
+
+
+@pytest.fixture
+def make_fetcher() -> Callable[..., DataFetcher]:
+    """创建测试用抓取器的工厂
+
+    默认抓取 p0..p3 四个平台、不重试、不限速，重试前不等待；
+    base_url 为 API 地址，其余关键字参数传给 DataFetcher
+    """
+
+    def make(
+        base_url: str = "",
+        platform_ids: Iterable[str] = ("p0", "p1", "p2", "p3"),
+        max_retries: int = 0,
+        **kwargs,
+    ) -> DataFetcher:
+        kwargs.setdefault("rate_limiter", RateLimiter(requests_per_second=0))
+        platforms = [{"id": pid, "name": pid} for pid in platform_ids]
+        fetcher = DataFetcher(
+            {"PLATFORMS": platforms}, max_retries=max_retries, **kwargs
+        )
+        if base_url:
+            fetcher.API_BASE_URL = base_url
+        fetcher._retry_wait = lambda attempt, tried: 0.0
+        return fetcher
+
+    return make
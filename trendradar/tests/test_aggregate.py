@@ -0,0 +1,281 @@
+"""
+测试当日聚合状态模块
+"""
+
+import json
+import os
+
+import pytest
+
+from trendradar.core import storage
+from trendradar.core.aggregate import DayAggregate
+from trendradar.core.analyzer import process_source_data
+from trendradar.core.storage import parse_file_titles, read_all_today_titles
+
+DATE_FOLDER = "2025年10月08日"
+
+
+def write_snapshot(txt_dir, name, platforms, unchanged=()):
+    """写入一个快照文件 platforms: {platform_id: [title, ...]}"""
+    txt_dir.mkdir(parents=True, exist_ok=True)
+    lines = []
+    for platform_id, titles in platforms.items():
+        lines.append(f"{platform_id} | {platform_id.upper()}")
+        for rank, title in enumerate(titles, 1):
+            lines.append(f"{rank}. {title} [URL:https://example.com/{title}]")
+        lines.append("")
+    if unchanged:
+        lines.append("==== 以下ID内容未变化 ====")
+        lines.extend(unchanged)
+        lines.append("")
+    (txt_dir / f"{name}.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def full_replay(txt_dir):
+    """旧实现：每次重新解析全部快照"""
+    all_results, id_to_name, title_info = {}, {}, {}
+    for file_path in sorted(f for f in txt_dir.iterdir() if f.suffix == ".txt"):
+        titles_by_id, file_id_to_name = parse_file_titles(file_path)
+        id_to_name.update(file_id_to_name)
+        for source_id, title_data in titles_by_id.items():
+            process_source_data(
+                source_id, title_data, file_path.stem, all_results, title_info
+            )
+    return all_results, id_to_name, title_info
+
+
+class TestDayAggregate:
+    """当日聚合状态测试类"""
+
+    @pytest.fixture
+    def txt_dir(self, tmp_path):
+        return tmp_path / "output" / DATE_FOLDER / "txt"
+
+    @pytest.fixture
+    def aggregate(self, tmp_path):
+        return DayAggregate(DATE_FOLDER, output_dir=str(tmp_path / "output"))
+
+    def test_incremental_matches_full_replay(self, tmp_path, txt_dir, aggregate):
+        """测试增量合并结果与全量重放一致"""
+        write_snapshot(txt_dir, "08时00分", {"baidu": ["A", "B"], "weibo": ["C"]})
+        assert aggregate.refresh() == 1
+        aggregate.save()
+
+        write_snapshot(txt_dir, "08时05分", {"baidu": ["B", "D", "A"]})
+        write_snapshot(txt_dir, "08时10分", {"weibo": ["C", "E"], "baidu": ["D"]})
+
+        reloaded = DayAggregate(DATE_FOLDER, output_dir=str(tmp_path / "output"))
+        assert reloaded.load()
+        assert reloaded.refresh() == 2
+
+        assert reloaded.view() == full_replay(txt_dir)
+        assert reloaded.title_info["baidu"]["A"]["count"] == 2
+        assert reloaded.title_info["baidu"]["A"]["ranks"] == [1, 3]
+        assert reloaded.title_info["baidu"]["D"]["first_time"] == "08时05分"
+
+    def test_refresh_without_new_files(self, txt_dir, aggregate):
+        """测试没有新文件时不重复合并"""
+        write_snapshot(txt_dir, "08时00分", {"baidu": ["A"]})
+        aggregate.refresh()
+        assert aggregate.refresh() == 0
+        assert aggregate.title_info["baidu"]["A"]["count"] == 1
+
+    def test_corrupt_state_rebuilds(self, tmp_path, txt_dir, aggregate):
+        """测试状态文件损坏时从快照文件重建"""
+        write_snapshot(txt_dir, "08时00分", {"baidu": ["A"]})
+        write_snapshot(txt_dir, "08时05分", {"baidu": ["A", "B"]})
+        aggregate.state_path.parent.mkdir(parents=True)
+        aggregate.state_path.write_text("{not json", encoding="utf-8")
+
+        assert not aggregate.load()
+        assert aggregate.refresh() == 2
+        assert aggregate.view() == full_replay(txt_dir)
+
+    def test_version_mismatch_rebuilds(self, txt_dir, aggregate):
+        """测试状态版本不匹配时重建"""
+        write_snapshot(txt_dir, "08时00分", {"baidu": ["A"]})
+        aggregate.refresh()
+        aggregate.save()
+
+        state = json.loads(aggregate.state_path.read_text(encoding="utf-8"))
+        state["version"] = DayAggregate.STATE_VERSION + 1
+        aggregate.state_path.write_text(json.dumps(state), encoding="utf-8")
+
+        assert not aggregate.load()
+        assert aggregate.applied_files == {}
+
+    def test_rewritten_file_rebuilds(self, txt_dir, aggregate):
+        """测试已合并的文件被改写时重建"""
+        write_snapshot(txt_dir, "08时00分", {"baidu": ["A"]})
+        aggregate.refresh()
+
+        write_snapshot(txt_dir, "08时00分", {"baidu": ["A", "B"]})
+        file_path = txt_dir / "08时00分.txt"
+        stat = file_path.stat()
+        os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        assert aggregate.refresh() == 1
+        assert aggregate.title_info["baidu"]["A"]["count"] == 1
+        assert "B" in aggregate.all_results["baidu"]
+
+    def test_out_of_order_file_rebuilds(self, txt_dir, aggregate):
+        """测试新文件排在已合并文件之前时重建"""
+        write_snapshot(txt_dir, "08时10分", {"baidu": ["A"]})
+        aggregate.refresh()
+
+        write_snapshot(txt_dir, "08时00分", {"baidu": ["A"]})
+        assert aggregate.refresh() == 2
+        assert aggregate.title_info["baidu"]["A"]["first_time"] == "08时00分"
+        assert aggregate.title_info["baidu"]["A"]["last_time"] == "08时10分"
+
+    def test_unchanged_platform_reuses_last_titles(self, tmp_path, txt_dir, aggregate):
+        """测试内容未变化的平台沿用上一次的标题，结果与完整快照一致"""
+        full_dir = tmp_path / "full" / "txt"
+        write_snapshot(txt_dir, "08时00分", {"baidu": ["A", "B"], "weibo": ["C"]})
+        write_snapshot(full_dir, "08时00分", {"baidu": ["A", "B"], "weibo": ["C"]})
+        write_snapshot(txt_dir, "08时05分", {"baidu": ["B", "D"]}, unchanged=["weibo"])
+        write_snapshot(full_dir, "08时05分", {"baidu": ["B", "D"], "weibo": ["C"]})
+        aggregate.refresh()
+        aggregate.save()
+
+        write_snapshot(txt_dir, "08时10分", {"weibo": ["C", "E"]}, unchanged=["baidu"])
+        write_snapshot(full_dir, "08时10分", {"weibo": ["C", "E"], "baidu": ["B", "D"]})
+        reloaded = DayAggregate(DATE_FOLDER, output_dir=str(tmp_path / "output"))
+        assert reloaded.load()
+        assert reloaded.refresh() == 1
+
+        assert reloaded.view() == full_replay(full_dir)
+        assert reloaded.title_info["baidu"]["D"]["count"] == 2
+        assert reloaded.title_info["weibo"]["C"]["count"] == 3
+
+    def test_view_filters_platforms(self, txt_dir, aggregate):
+        """测试按平台过滤"""
+        write_snapshot(txt_dir, "08时00分", {"baidu": ["A"], "weibo": ["B"]})
+        aggregate.refresh()
+
+        all_results, id_to_name, title_info = aggregate.view(["weibo"])
+        assert list(all_results) == ["weibo"]
+        assert id_to_name == {"weibo": "WEIBO"}
+        assert list(title_info) == ["weibo"]
+
+
+class TestDayAggregateLog:
+    """当日聚合状态增量日志测试类"""
+
+    @pytest.fixture
+    def output_dir(self, tmp_path):
+        return str(tmp_path / "output")
+
+    @pytest.fixture
+    def txt_dir(self, tmp_path):
+        return tmp_path / "output" / DATE_FOLDER / "txt"
+
+    def run(self, output_dir):
+        """模拟一次运行：加载、合并、保存"""
+        aggregate = DayAggregate(DATE_FOLDER, output_dir=output_dir)
+        aggregate.load()
+        aggregate.refresh()
+        aggregate.save()
+        return aggregate
+
+    def test_save_appends_only_new_snapshots(self, output_dir, txt_dir):
+        """测试后续运行只追加日志，不重写基础状态文件"""
+        write_snapshot(txt_dir, "08时00分", {"baidu": ["A", "B"], "weibo": ["C"]})
+        first = self.run(output_dir)
+        base = first.state_path.read_bytes()
+        assert first.log_path.read_bytes() == b""
+
+        write_snapshot(txt_dir, "08时05分", {"baidu": ["B", "D"]}, unchanged=["weibo"])
+        self.run(output_dir)
+        write_snapshot(txt_dir, "08时10分", {"weibo": ["C", "E"]}, unchanged=["baidu"])
+        last = self.run(output_dir)
+
+        assert first.state_path.read_bytes() == base
+        assert len(first.log_path.read_bytes().splitlines()) == 2
+
+        reloaded = DayAggregate(DATE_FOLDER, output_dir=output_dir)
+        assert reloaded.load()
+        assert reloaded.refresh() == 0
+        assert reloaded.view() == last.view()
+        assert reloaded.title_info["weibo"]["C"]["count"] == 3
+        assert reloaded.trajectories.analyze() == last.trajectories.analyze()
+
+    def test_compaction(self, output_dir, txt_dir, monkeypatch):
+        """测试日志超过基础状态文件大小时整体重写并清空日志"""
+        monkeypatch.setattr(DayAggregate, "COMPACT_MIN_BYTES", 0)
+        write_snapshot(txt_dir, "08时00分", {"baidu": ["A"]})
+        aggregate = self.run(output_dir)
+
+        sizes = []
+        for minute in range(5, 60, 5):
+            titles = [f"标题{minute}-{n}" for n in range(5)]
+            write_snapshot(txt_dir, f"08时{minute:02d}分", {"baidu": titles})
+            aggregate = self.run(output_dir)
+            sizes.append(aggregate.log_path.stat().st_size)
+
+        # 日志增长到超过基础状态后清空
+        assert 0 in sizes and max(sizes) > 0
+        assert aggregate.view() == full_replay(txt_dir)
+
+    def test_truncated_log_tail(self, output_dir, txt_dir):
+        """测试日志末尾写入中断时丢弃该行，从快照补齐后整体重写"""
+        write_snapshot(txt_dir, "08时00分", {"baidu": ["A"]})
+        self.run(output_dir)
+        write_snapshot(txt_dir, "08时05分", {"baidu": ["A", "B"]})
+        self.run(output_dir)
+        write_snapshot(txt_dir, "08时10分", {"baidu": ["C"]})
+        aggregate = self.run(output_dir)
+
+        log = aggregate.log_path.read_bytes()
+        aggregate.log_path.write_bytes(log[:-5])
+
+        reloaded = DayAggregate(DATE_FOLDER, output_dir=output_dir)
+        assert reloaded.load()
+        assert list(reloaded.applied_files) == ["08时00分.txt", "08时05分.txt"]
+        assert reloaded.refresh() == 1
+        reloaded.save()
+
+        assert reloaded.view() == full_replay(txt_dir)
+        assert reloaded.log_path.read_bytes() == b""
+
+    def test_interrupted_compaction_skips_applied(self, output_dir, txt_dir):
+        """测试重写基础状态后未清空日志时，重放跳过已包含的快照"""
+        write_snapshot(txt_dir, "08时00分", {"baidu": ["A"]})
+        self.run(output_dir)
+        write_snapshot(txt_dir, "08时05分", {"baidu": ["A", "B"]})
+        aggregate = self.run(output_dir)
+        log = aggregate.log_path.read_bytes()
+
+        aggregate._compact = True
+        aggregate.save()
+        aggregate.log_path.write_bytes(log)
+
+        reloaded = DayAggregate(DATE_FOLDER, output_dir=output_dir)
+        assert reloaded.load()
+        assert reloaded.title_info["baidu"]["A"]["count"] == 2
+        assert reloaded.view() == full_replay(txt_dir)
+
+    def test_day_rollover_keeps_settings(self, output_dir, txt_dir, monkeypatch):
+        """测试跨天时新的聚合状态沿用原来的全部设置"""
+        write_snapshot(txt_dir, "08时00分", {"baidu": ["A"]})
+        yesterday = DayAggregate(
+            "2025年10月07日", output_dir=output_dir, track_trends=False
+        )
+
+        today = yesterday.for_date(DATE_FOLDER)
+        assert (today.output_dir, today.store, today.track_trends) == (
+            output_dir,
+            None,
+            False,
+        )
+
+        monkeypatch.setattr(storage, "format_date_folder", lambda: DATE_FOLDER)
+        monkeypatch.setattr(
+            "trendradar.core.aggregate.format_date_folder", lambda: DATE_FOLDER
+        )
+        all_results, _, _ = read_all_today_titles(aggregate=yesterday)
+        assert list(all_results["baidu"]) == ["A"]
+        state_path = txt_dir.parent / "state" / DayAggregate.STATE_FILENAME
+        assert (
+            json.loads(state_path.read_text(encoding="utf-8"))["trajectories"] is None
+        )
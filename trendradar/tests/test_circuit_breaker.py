@@ -0,0 +1,168 @@
+"""
+测试平台熔断模块
+"""
+
+import pytest
+
+from trendradar.core.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from trendradar.utils.metrics import RunMetrics
+
+
+class TestCircuitBreaker:
+    """熔断器状态转换测试类"""
+
+    def test_opens_after_threshold(self, clock):
+        """测试连续失败达到阈值后熔断，冷却期内拒绝"""
+        breaker = CircuitBreaker(failure_threshold=2, cooldown=60, clock=clock)
+
+        assert not breaker.record_failure("a")
+        assert breaker.allow("a")
+        assert breaker.record_failure("a")
+        assert breaker.state("a") == OPEN
+        assert not breaker.allow("a")
+        assert breaker.retry_after("a") == 60
+
+    def test_success_resets_failures(self):
+        """测试成功后连续失败计数清零"""
+        breaker = CircuitBreaker(failure_threshold=2)
+        breaker.record_failure("a")
+        breaker.record_success("a")
+        assert not breaker.record_failure("a")
+        assert breaker.state("a") == CLOSED
+
+    def test_half_open_probe_backoff(self, clock):
+        """测试冷却结束后放行探测，探测失败时冷却时间加倍，成功时恢复"""
+        breaker = CircuitBreaker(
+            failure_threshold=1, cooldown=60, max_cooldown=200, clock=clock
+        )
+        breaker.record_failure("a")
+
+        clock.now += 60
+        assert breaker.allow("a")
+        assert breaker.state("a") == HALF_OPEN
+        assert breaker.record_failure("a")
+        assert breaker.retry_after("a") == 120
+
+        clock.now += 120
+        assert breaker.allow("a")
+        breaker.record_failure("a")
+        assert breaker.retry_after("a") == 200
+
+        clock.now += 200
+        assert breaker.allow("a")
+        breaker.record_success("a")
+        assert breaker.state("a") == CLOSED
+        assert breaker.summary() == {}
+
+    def test_state_round_trip(self, tmp_path, clock):
+        """测试熔断状态保存后在新实例中生效"""
+        state_path = str(tmp_path / "state" / "circuit_breakers.json")
+        breaker = CircuitBreaker(
+            failure_threshold=1, state_path=state_path, clock=clock
+        )
+        breaker.record_failure("a")
+        breaker.save()
+
+        restarted = CircuitBreaker(state_path=state_path, clock=clock)
+        assert restarted.load()
+        assert not restarted.allow("a")
+        assert restarted.summary()["a"]["trips"] == 1
+
+    def test_invalid_state_is_ignored(self, tmp_path):
+        """测试状态文件损坏时所有平台恢复正常"""
+        state_path = tmp_path / "circuit_breakers.json"
+        state_path.write_text(
+            '{"version": 1, "platforms": {"a": {"state": "broken"}}}',
+            encoding="utf-8",
+        )
+        breaker = CircuitBreaker(state_path=str(state_path))
+        assert not breaker.load()
+        assert breaker.allow("a")
+
+    def test_from_config(self):
+        """测试根据配置创建，未启用时返回 None"""
+        assert (
+            CircuitBreaker.from_config({"CIRCUIT_BREAKER": {"ENABLED": False}}) is None
+        )
+        breaker = CircuitBreaker.from_config(
+            {"CIRCUIT_BREAKER": {"FAILURE_THRESHOLD": 5, "COOLDOWN": 30}}
+        )
+        assert (breaker.failure_threshold, breaker.cooldown) == (5, 30)
+
+
+class TestFetcherCircuitBreaker:
+    """抓取器熔断测试类"""
+
+    @pytest.fixture
+    def dead_platform_server(self, newsnow):
+        """dead 平台总是返回 503，其余平台正常"""
+        return newsnow(item_count=1, down={"dead"})
+
+    @pytest.mark.asyncio
+    async def test_open_platform_skipped(
+        self, dead_platform_server, make_fetcher, clock
+    ):
+        """测试熔断后不再请求失效平台，并作为失败平台返回"""
+        requests = dead_platform_server.platform_requests
+        breaker = CircuitBreaker(failure_threshold=2, cooldown=60, clock=clock)
+        fetcher = make_fetcher(
+            dead_platform_server.url,
+            ["dead", "live"],
+            max_retries=2,
+            circuit_breaker=breaker,
+        )
+
+        for _ in range(2):
+            await fetcher.fetch_all_async()
+        assert requests["dead"] == 6
+        assert fetcher.breaker_tripped == ["dead"]
+
+        with RunMetrics() as metrics:
+            results, failed = await fetcher.fetch_all_async()
+        assert failed == ["dead"]
+        assert [r["platform_id"] for r in results] == ["live"]
+        assert requests["dead"] == 6
+        assert metrics.extra["circuit_breaker"]["skipped"] == ["dead"]
+        assert metrics.extra["circuit_breaker"]["platforms"]["dead"]["state"] == OPEN
+
+    @pytest.mark.asyncio
+    async def test_half_open_probe_not_retried(
+        self, dead_platform_server, make_fetcher, clock
+    ):
+        """测试冷却结束后的探测只请求一次"""
+        requests = dead_platform_server.platform_requests
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=60, clock=clock)
+        fetcher = make_fetcher(
+            dead_platform_server.url,
+            ["dead", "live"],
+            max_retries=2,
+            circuit_breaker=breaker,
+        )
+        await fetcher.fetch_all_async()
+        assert requests["dead"] == 3
+
+        clock.now += 60
+        await fetcher.fetch_all_async()
+        assert requests["dead"] == 4
+        assert breaker.state("dead") == OPEN
+        assert breaker.retry_after("dead") == 120
+
+    def test_sync_skips_open_platform(self, make_fetcher, monkeypatch):
+        """测试同步抓取同样跳过熔断中的平台"""
+        breaker = CircuitBreaker(failure_threshold=1)
+        breaker.record_failure("dead")
+        fetcher = make_fetcher(
+            "http://127.0.0.1:9/api/s",
+            ["dead", "live"],
+            max_retries=2,
+            circuit_breaker=breaker,
+        )
+        monkeypatch.setattr(
+            fetcher,
+            "fetch_platform_sync",
+            lambda platform, max_retries=None: {"platform_id": platform["id"]},
+        )
+
+        results, failed = fetcher.fetch_all_sync(request_interval=0)
+        assert failed == ["dead"]
+        assert results == [{"platform_id": "live"}]
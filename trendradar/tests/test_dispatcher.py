@@ -0,0 +1,127 @@
+"""
+测试多渠道推送调度模块
+"""
+
+import time
+
+import pytest
+
+from trendradar.notifiers import (
+    DingTalkNotifier,
+    FeishuNotifier,
+    NotificationDispatcher,
+    WeWorkNotifier,
+)
+
+REPORT_DATA = {
+    "stats": [
+        {
+            "word": "AI",
+            "count": 3,
+            "titles": [
+                {
+                    "title": f"人工智能新闻 {i}",
+                    "source_name": "科技新闻",
+                    "time_display": "10时30分",
+                    "count": 1,
+                    "ranks": [i],
+                    "rank_threshold": 5,
+                    "url": f"https://example.com/{i}",
+                    "mobile_url": "",
+                    "is_new": False,
+                }
+                for i in range(1, 4)
+            ],
+        }
+    ],
+    "new_titles": [],
+    "failed_ids": [],
+    "total_new_count": 0,
+}
+
+
+@pytest.fixture
+def webhook_server(webhook):
+    """本地 webhook 模拟服务，每个请求延迟 0.3 秒，broken 渠道返回错误码"""
+    return webhook(latency=0.3, broken={"broken"}, keep_payloads=True)
+
+
+class TestNotificationDispatcher:
+    """多渠道推送调度器测试类"""
+
+    def test_from_config(self):
+        """测试根据配置创建推送器"""
+        dispatcher = NotificationDispatcher.from_config(
+            {
+                "FEISHU_WEBHOOK_URL": "https://example.com/feishu",
+                "WEWORK_WEBHOOK_URL": "https://example.com/wework",
+                "TELEGRAM_BOT_TOKEN": "token",
+                "TELEGRAM_CHAT_ID": "",
+            }
+        )
+        names = [n.get_platform_name() for n in dispatcher.notifiers]
+        assert names == ["Feishu", "WeWork"]
+
+    @pytest.mark.asyncio
+    async def test_channels_run_concurrently(self, webhook_server):
+        """测试各渠道并发发送，总耗时约等于最慢渠道"""
+        dispatcher = NotificationDispatcher(
+            [
+                FeishuNotifier(webhook_url=webhook_server.url("feishu")),
+                DingTalkNotifier(webhook_url=webhook_server.url("dingtalk")),
+                WeWorkNotifier(webhook_url=webhook_server.url("wework")),
+            ]
+        )
+
+        start_time = time.perf_counter()
+        results = await dispatcher.dispatch_async(REPORT_DATA, "测试报告")
+        duration = time.perf_counter() - start_time
+
+        assert all(result["success"] for result in results.values())
+        assert len(webhook_server.received) == 3
+        assert duration < 0.8
+
+    @pytest.mark.asyncio
+    async def test_batches_stay_ordered(self, webhook_server):
+        """测试同一渠道内批次按顺序发送"""
+        notifier = WeWorkNotifier(
+            webhook_url=webhook_server.url("wework"), max_bytes=300, batch_interval=0
+        )
+        dispatcher = NotificationDispatcher([notifier])
+
+        results = await dispatcher.dispatch_async(REPORT_DATA, "测试报告")
+
+        assert results["WeWork"]["success"]
+        contents = [
+            payload["markdown"]["content"] for _, payload in webhook_server.received
+        ]
+        assert len(contents) > 1
+        for i, content in enumerate(contents, 1):
+            assert content.startswith(f"**[第 {i}/{len(contents)} 批次]**")
+
+    @pytest.mark.asyncio
+    async def test_failure_accounted_per_channel(self, webhook_server):
+        """测试单个渠道失败不影响其他渠道"""
+        dispatcher = NotificationDispatcher(
+            [
+                WeWorkNotifier(webhook_url=webhook_server.url("broken")),
+                DingTalkNotifier(webhook_url=webhook_server.url("dingtalk")),
+            ]
+        )
+
+        results = await dispatcher.dispatch_async(REPORT_DATA, "测试报告")
+
+        assert not results["WeWork"]["success"]
+        assert "invalid key" in results["WeWork"]["error"]
+        assert results["DingTalk"]["success"]
+
+    @pytest.mark.asyncio
+    async def test_channel_timeout(self, webhook_server):
+        """测试渠道使用各自的超时设置"""
+        slow = FeishuNotifier(webhook_url=webhook_server.url("feishu"), timeout=0.1)
+        dispatcher = NotificationDispatcher([slow])
+
+        results = await dispatcher.dispatch_async(REPORT_DATA, "测试报告")
+
+        assert not results["Feishu"]["success"]
+        assert "超时" in results["Feishu"]["error"]
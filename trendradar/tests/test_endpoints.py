@@ -0,0 +1,162 @@
+"""
+测试 API 端点选择模块
+"""
+
+import asyncio
+
+import pytest
+
+from trendradar.core.endpoints import EndpointPool
+from trendradar.core.fetcher import DataFetcher
+from trendradar.utils.exceptions import ConfigError
+from trendradar.utils.metrics import RunMetrics
+from trendradar.utils.validator import ConfigValidator
+
+A = "http://a.example.com/api/s"
+B = "http://b.example.com/api/s"
+
+
+class TestEndpointPool:
+    """端点池测试类"""
+
+    def test_select_by_score(self):
+        """测试选择得分最好的端点，得分相同时按配置顺序"""
+        pool = EndpointPool([A, B])
+        assert pool.select() == A
+
+        pool.record_success(A, 0.5)
+        # 没有记录的端点优先尝试一次
+        assert pool.select() == B
+
+        pool.record_success(B, 0.2)
+        assert pool.select() == B
+        assert pool.select(exclude=[B]) == A
+        assert pool.select(exclude=[A, B]) == B
+
+    def test_latency_moving_average(self):
+        """测试延迟按滑动平均更新"""
+        pool = EndpointPool([A], alpha=0.5)
+        pool.record_success(A, 1.0)
+        pool.record_success(A, 0.5)
+        assert pool.stats[A]["latency"] == 0.75
+
+    def test_failure_penalty_decays(self, clock):
+        """测试失败的端点得分变差，错误率随时间半衰后重新被选中"""
+        pool = EndpointPool([A, B], alpha=0.5, error_half_life=60, clock=clock)
+        pool.record_success(A, 0.1)
+        pool.record_success(B, 0.5)
+
+        pool.record_failure(A)
+        assert pool.score(A) == pytest.approx(0.1 + 10 * 0.5)
+        assert pool.select() == B
+
+        clock.now += 600
+        assert pool.score(A) < pool.score(B)
+        assert pool.select() == A
+
+    def test_state_round_trip(self, tmp_path):
+        """测试得分跨运行保存，已移除的端点不再保留"""
+        state_path = str(tmp_path / "state" / "endpoints.json")
+        pool = EndpointPool([A, B], state_path=state_path)
+        pool.record_failure(A)
+        pool.record_success(B, 0.3)
+        pool.save()
+
+        restarted = EndpointPool([A, B], state_path=state_path)
+        assert restarted.load()
+        assert restarted.select() == B
+
+        removed = EndpointPool([A], state_path=state_path)
+        assert removed.load()
+        assert list(removed.stats) == [A]
+
+    def test_invalid_state_is_ignored(self, tmp_path):
+        """测试状态文件损坏时重新打分"""
+        state_path = tmp_path / "endpoints.json"
+        state_path.write_text(f'{{"version": 1, "endpoints": {{"{A}": 1}}}}')
+
+        pool = EndpointPool([A], state_path=str(state_path))
+        pool.stats = {A: {"latency": 1.0, "errors": 0.0, "updated_at": 0.0}}
+        assert not pool.load()
+        assert pool.stats == {}
+
+    def test_from_config(self):
+        """测试未配置端点时使用默认地址"""
+        assert EndpointPool.from_config({"API_ENDPOINTS": []}) is None
+        assert EndpointPool.from_config({"API_ENDPOINTS": [A, B]}).urls == [A, B]
+
+
+class TestFetcherFailover:
+    """抓取器端点切换测试类"""
+
+    @pytest.fixture
+    def mirrors(self, newsnow):
+        """两个等价端点：第一个总是返回 503，第二个正常返回"""
+        return newsnow(item_count=1, error_rate=1.0), newsnow(item_count=1)
+
+    @pytest.mark.asyncio
+    async def test_async_failover(self, mirrors, make_fetcher, tmp_path):
+        """测试端点失败时立即切换到其他端点，下次运行直接使用健康的端点"""
+        down, up = mirrors
+        urls = [down.url, up.url]
+        state_path = str(tmp_path / "endpoints.json")
+        pool = EndpointPool(urls, state_path=state_path)
+        fetcher = make_fetcher(max_retries=1, endpoints=pool)
+
+        with RunMetrics() as metrics:
+            results, failed = await asyncio.wait_for(fetcher.fetch_all_async(), 2)
+
+        assert len(results) == 4
+        assert failed == []
+        assert up.requests == 4
+        assert pool.select() == up.url
+        assert set(metrics.to_dict()["extra"]["endpoints"]) == set(urls)
+        pool.save()
+
+        restarted = EndpointPool(urls, state_path=state_path)
+        restarted.load()
+        down.requests = up.requests = 0
+        results, failed = await make_fetcher(
+            max_retries=1, endpoints=restarted
+        ).fetch_all_async()
+
+        assert len(results) == 4
+        assert (down.requests, up.requests) == (0, 4)
+
+    @pytest.mark.asyncio
+    async def test_sync_failover(self, mirrors, make_fetcher):
+        """测试同步抓取同样在端点失败时切换"""
+        down, up = mirrors
+        pool = EndpointPool([down.url, up.url])
+        fetcher = make_fetcher(max_retries=1, endpoints=pool)
+        loop = asyncio.get_running_loop()
+
+        results, failed = await asyncio.wait_for(
+            loop.run_in_executor(None, fetcher.fetch_all_sync), 2
+        )
+
+        assert len(results) == 4
+        assert up.requests == 4
+        assert pool.select() == up.url
+
+    def test_default_endpoint(self):
+        """测试未配置端点池时使用 API_BASE_URL"""
+        fetcher = DataFetcher({"PLATFORMS": []})
+        assert fetcher._select_endpoint() == DataFetcher.API_BASE_URL
+        assert fetcher._build_url("baidu").startswith(DataFetcher.API_BASE_URL)
+
+
+class TestEndpointConfig:
+    """端点配置验证测试类"""
+
+    def test_invalid_url(self, sample_config):
+        """测试端点地址格式错误时报错"""
+        sample_config["API_ENDPOINTS"] = ["newsnow.example.com/api/s"]
+        with pytest.raises(ConfigError):
+            ConfigValidator().validate(sample_config)
+
+    def test_duplicate_url(self, sample_config):
+        """测试端点地址重复时报错"""
+        sample_config["API_ENDPOINTS"] = [A, A]
+        with pytest.raises(ConfigError):
+            ConfigValidator().validate(sample_config)
@@ -2,13 +2,42 @@
 测试数据抓取模块
 """
 
+import asyncio
+import json
+import time
 from unittest.mock import AsyncMock, Mock, patch
 
 import aiohttp
 import pytest
 import requests
 
-from trendradar.core.fetcher import DataFetcher
+from trendradar.core import fetcher as fetcher_module
+from trendradar.core.fetcher import DataFetcher, decode_json, parse_platform_titles
+from trendradar.core.http_cache import HttpValidatorCache, hash_body
+from trendradar.utils.rate_limiter import RateLimiter
+
+# 流式抓取测试的平台，按完成先后为 fast、fail、medium、slow
+STREAMING_IDS = ["slow", "medium", "fast", "fail"]
+
+
+@pytest.fixture
+def newsnow_server(newsnow):
+    """本地 newsnow 模拟服务，各平台响应延迟不同，fail 平台返回 503"""
+    return newsnow(
+        item_count=1,
+        delays={"slow": 0.4, "medium": 0.2, "fast": 0.0, "fail": 0.1},
+        down={"fail"},
+    )
+
+
+@pytest.fixture
+def conditional_server(newsnow):
+    """支持条件请求的模拟服务
+
+    etag 平台返回 ETag 并响应 If-None-Match，plain 平台不返回校验头；
+    修改 snapshot 模拟内容更新
+    """
+    return newsnow(item_count=1, cache_rate=1.0, etag_platforms={"etag"})
 
 
 class TestDataFetcher:
@@ -56,7 +85,7 @@ class TestDataFetcher:
         """测试同步抓取成功"""
         # Mock 响应
         mock_response = Mock()
-        mock_response.json.return_value = sample_api_response
+        mock_response.content = json.dumps(sample_api_response).encode()
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
 
@@ -87,7 +116,7 @@ class TestDataFetcher:
     ):
         """测试同步抓取 - 无效状态"""
         mock_response = Mock()
-        mock_response.json.return_value = {"status": "error"}
+        mock_response.content = b'{"status": "error"}'
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
 
@@ -103,8 +132,11 @@ class TestDataFetcher:
         """测试异步抓取成功"""
         # Mock aiohttp 响应
         mock_response = AsyncMock()
-        mock_response.json = AsyncMock(return_value=sample_api_response)
+        mock_response.read = AsyncMock(
+            return_value=json.dumps(sample_api_response).encode()
+        )
         mock_response.raise_for_status = Mock()
+        mock_response.status = 200
         mock_response.__aenter__ = AsyncMock(return_value=mock_response)
         mock_response.__aexit__ = AsyncMock(return_value=None)
 
@@ -132,11 +164,11 @@ class TestDataFetcher:
 
         assert result is None
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_fetch_all_sync(self, mock_get, sample_config, sample_api_response):
         """测试同步抓取所有平台"""
         mock_response = Mock()
-        mock_response.json.return_value = sample_api_response
+        mock_response.content = json.dumps(sample_api_response).encode()
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
 
@@ -155,8 +187,11 @@ class TestDataFetcher:
         """测试异步抓取所有平台"""
         # Mock aiohttp 会话和响应
         mock_response = AsyncMock()
-        mock_response.json = AsyncMock(return_value=sample_api_response)
+        mock_response.read = AsyncMock(
+            return_value=json.dumps(sample_api_response).encode()
+        )
         mock_response.raise_for_status = Mock()
+        mock_response.status = 200
         mock_response.__aenter__ = AsyncMock(return_value=mock_response)
         mock_response.__aexit__ = AsyncMock(return_value=None)
 
@@ -173,11 +208,11 @@ class TestDataFetcher:
         assert len(results) == 3
         assert len(failed) == 0
 
-    @patch("requests.get")
+    @patch("requests.Session.get")
     def test_fetch_all_use_sync(self, mock_get, sample_config, sample_api_response):
         """测试统一接口 - 同步模式"""
         mock_response = Mock()
-        mock_response.json.return_value = sample_api_response
+        mock_response.content = json.dumps(sample_api_response).encode()
         mock_response.raise_for_status = Mock()
         mock_get.return_value = mock_response
 
@@ -186,3 +221,342 @@ class TestDataFetcher:
 
         assert len(results) == 3
         assert len(failed) == 0
+
+    @patch("aiohttp.ClientSession")
+    def test_open_reuses_session(
+        self, mock_session_class, sample_config, sample_api_response
+    ):
+        """测试常驻模式下多次抓取复用同一个会话"""
+        mock_response = AsyncMock()
+        mock_response.read = AsyncMock(
+            return_value=json.dumps(sample_api_response).encode()
+        )
+        mock_response.raise_for_status = Mock()
+        mock_response.status = 200
+        mock_response.__aenter__ = AsyncMock(return_value=mock_response)
+        mock_response.__aexit__ = AsyncMock(return_value=None)
+
+        mock_session = AsyncMock()
+        mock_session.closed = False
+        mock_session.get = Mock(return_value=mock_response)
+        mock_session_class.return_value = mock_session
+
+        fetcher = DataFetcher(sample_config)
+        fetcher.open()
+        try:
+            for _ in range(2):
+                results, failed = fetcher.fetch_all(use_async=True)
+                assert len(results) == 3
+                assert len(failed) == 0
+        finally:
+            fetcher.close()
+
+        assert mock_session_class.call_count == 1
+        mock_session.close.assert_awaited_once()
+        assert fetcher._loop is None
+
+
+class TestStreamingFetch:
+    """流式抓取测试类"""
+
+    @pytest.mark.asyncio
+    async def test_iter_yields_in_completion_order(self, newsnow_server, make_fetcher):
+        """测试按完成顺序产出结果，失败平台产出 None"""
+        fetcher = make_fetcher(newsnow_server.url, STREAMING_IDS)
+
+        order = []
+        async for platform, result in fetcher.iter_fetch_async():
+            order.append((platform["id"], result is not None))
+
+        assert order == [
+            ("fast", True),
+            ("fail", False),
+            ("medium", True),
+            ("slow", True),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_fetch_all_async_keeps_platform_order(
+        self, newsnow_server, make_fetcher
+    ):
+        """测试 fetch_all_async 仍按平台配置顺序返回"""
+        fetcher = make_fetcher(newsnow_server.url, STREAMING_IDS)
+
+        results, failed = await fetcher.fetch_all_async()
+
+        assert [r["platform_id"] for r in results] == ["slow", "medium", "fast"]
+        assert failed == ["fail"]
+
+    @pytest.mark.asyncio
+    async def test_early_exit_cancels_pending(self, newsnow_server, make_fetcher):
+        """测试调用方提前退出时取消未完成的抓取"""
+        fetcher = make_fetcher(newsnow_server.url, STREAMING_IDS)
+
+        stream = fetcher.iter_fetch_async()
+        platform, _ = await stream.__anext__()
+        await stream.aclose()
+
+        assert platform["id"] == "fast"
+
+
+class TestFetchDeadline:
+    """抓取时限和优先级测试类"""
+
+    @pytest.mark.asyncio
+    async def test_deadline_cancels_slow_platform(self, newsnow_server, make_fetcher):
+        """测试到达时限后返回已完成的结果，未完成的平台单独记录"""
+        fetcher = make_fetcher(newsnow_server.url, STREAMING_IDS)
+
+        results, failed = await fetcher.fetch_all_async(deadline=0.3)
+
+        assert [r["platform_id"] for r in results] == ["medium", "fast"]
+        assert failed == ["fail"]
+        assert fetcher.last_cancelled == ["slow"]
+
+    @pytest.mark.asyncio
+    async def test_deadline_from_config(self, newsnow_server, make_fetcher):
+        """测试默认使用配置中的时限，下次抓取时重置取消列表"""
+        fetcher = make_fetcher(newsnow_server.url, STREAMING_IDS)
+        fetcher.deadline = 0.3
+        await fetcher.fetch_all_async()
+        assert fetcher.last_cancelled == ["slow"]
+
+        results, _ = await fetcher.fetch_all_async(deadline=0)
+        assert len(results) == 3
+        assert fetcher.last_cancelled == []
+
+    @pytest.mark.asyncio
+    async def test_priority_scheduled_first(self, newsnow_server):
+        """测试并发受限时高优先级平台先抓取"""
+        platforms = [
+            {"id": "fast", "name": "fast"},
+            {"id": "medium", "name": "medium", "priority": 5},
+            {"id": "fail", "name": "fail", "priority": -1},
+            {"id": "slow", "name": "slow", "priority": 5},
+        ]
+        limiter = RateLimiter(
+            requests_per_second=0, initial_concurrency=1, max_concurrency=1
+        )
+        fetcher = DataFetcher(
+            {"PLATFORMS": platforms}, max_retries=0, rate_limiter=limiter
+        )
+        fetcher.API_BASE_URL = newsnow_server.url
+
+        order = [platform["id"] async for platform, _ in fetcher.iter_fetch_async()]
+
+        assert order == ["medium", "slow", "fast", "fail"]
+
+    def test_sync_deadline_skips_remaining(self, monkeypatch):
+        """测试同步抓取到达时限后不再发起新的请求"""
+        platforms = [
+            {"id": "a", "name": "a"},
+            {"id": "b", "name": "b", "priority": 1},
+            {"id": "c", "name": "c"},
+        ]
+        limiter = RateLimiter(initial_concurrency=1, max_concurrency=1)
+        fetcher = DataFetcher(
+            {"PLATFORMS": platforms, "FETCH_DEADLINE": 0.2}, rate_limiter=limiter
+        )
+        fetched = []
+
+        def fake_fetch(platform, max_retries=None):
+            fetched.append(platform["id"])
+            time.sleep(0.12)
+            return {"platform_id": platform["id"]}
+
+        monkeypatch.setattr(fetcher, "fetch_platform_sync", fake_fetch)
+        results, failed = fetcher.fetch_all_sync(request_interval=0)
+
+        assert fetched == ["b", "a"]
+        assert results == [{"platform_id": "b"}]
+        assert failed == []
+        assert fetcher.last_cancelled == ["a", "c"]
+
+    def test_sync_deadline_joins_in_flight(self, monkeypatch):
+        """测试到达时限后等进行中的线程退出再关闭会话，其结果被丢弃"""
+        platforms = [{"id": "fast", "name": "fast"}, {"id": "slow", "name": "slow"}]
+        fetcher = DataFetcher({"PLATFORMS": platforms, "FETCH_DEADLINE": 0.1})
+        sessions = []
+
+        def fake_fetch(platform, max_retries=None):
+            if platform["id"] == "slow":
+                time.sleep(0.3)
+            # 线程结束时会话仍未关闭
+            sessions.append(fetcher._http)
+            return {"platform_id": platform["id"]}
+
+        monkeypatch.setattr(fetcher, "fetch_platform_sync", fake_fetch)
+        results, failed = fetcher.fetch_all_sync()
+
+        assert len(sessions) == 2
+        assert all(session is not None for session in sessions)
+        assert fetcher._http is None
+        assert results == [{"platform_id": "fast"}]
+        assert fetcher.last_cancelled == ["slow"]
+
+
+class TestThreadedSyncFetch:
+    """线程池同步抓取测试类"""
+
+    @pytest.mark.asyncio
+    async def test_same_results_as_async(self, newsnow_server, make_fetcher):
+        """测试同步模式并发抓取，结果与异步模式一致"""
+        fetcher = make_fetcher(newsnow_server.url, STREAMING_IDS)
+        loop = asyncio.get_running_loop()
+
+        start = time.monotonic()
+        sync_results, sync_failed = await loop.run_in_executor(
+            None, fetcher.fetch_all_sync
+        )
+        elapsed = time.monotonic() - start
+        async_results, async_failed = await fetcher.fetch_all_async()
+
+        # 顺序抓取至少需要各平台延迟之和 0.7 秒
+        assert elapsed < 0.6
+        assert sync_results == async_results
+        assert sync_failed == async_failed == ["fail"]
+        assert fetcher._http is None
+
+    @pytest.mark.asyncio
+    async def test_paced_by_rate_limiter(self, newsnow_server):
+        """测试请求速率由共享的限流器控制"""
+        platforms = [{"id": f"p{i}", "name": f"p{i}"} for i in range(5)]
+        limiter = RateLimiter(requests_per_second=20, burst=1)
+        fetcher = DataFetcher(
+            {"PLATFORMS": platforms}, max_retries=0, rate_limiter=limiter
+        )
+        fetcher.API_BASE_URL = newsnow_server.url
+        loop = asyncio.get_running_loop()
+
+        start = time.monotonic()
+        results, failed = await loop.run_in_executor(None, fetcher.fetch_all_sync)
+
+        assert len(results) == 5
+        # 第一个请求使用突发额度，之后每个请求间隔 0.05 秒
+        assert time.monotonic() - start >= 0.19
+
+
+class TestParsePlatformTitles:
+    """API 响应整理测试类"""
+
+    def test_parse(self):
+        """测试整理排名、链接并跳过无效条目"""
+        api_data = {
+            "status": "success",
+            "items": [
+                {"title": "新闻A", "url": "https://a", "mobileUrl": "https://m.a"},
+                {"title": ""},
+                "invalid",
+                {"title": None},
+                {"title": "新闻B", "url": None},
+            ],
+        }
+
+        titles = parse_platform_titles(api_data)
+
+        assert titles == {
+            "新闻A": {"ranks": [1], "url": "https://a", "mobileUrl": "https://m.a"},
+            "新闻B": {"ranks": [5], "url": "", "mobileUrl": ""},
+        }
+
+    def test_invalid_payload(self):
+        """测试结构异常的响应"""
+        assert parse_platform_titles({"items": None}) == {}
+        assert parse_platform_titles(None) == {}
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_decode_json(self, monkeypatch, use_orjson):
+        """测试直接解析 UTF-8 字节，未安装 orjson 时使用标准库"""
+        if not use_orjson:
+            monkeypatch.setattr("trendradar.core.fetcher.orjson", None)
+        elif fetcher_module.orjson is None:
+            pytest.skip("未安装 orjson")
+        body = '{"status": "success", "items": [{"title": "新闻A"}]}'.encode()
+
+        assert decode_json(body) == {"status": "success", "items": [{"title": "新闻A"}]}
+        with pytest.raises(ValueError):
+            decode_json(b"{")
+
+    @pytest.mark.asyncio
+    async def test_result_carries_titles(self, newsnow_server, make_fetcher):
+        """测试抓取结果附带整理好的标题字典"""
+        fetcher = make_fetcher(newsnow_server.url, STREAMING_IDS)
+        results, _ = await fetcher.fetch_all_async()
+
+        item = newsnow_server.items("slow")[0]
+        assert results[0]["titles"] == {
+            item["title"]: {
+                "ranks": [1],
+                "url": item["url"],
+                "mobileUrl": item["mobileUrl"],
+            }
+        }
+        assert all(r["titles"] == parse_platform_titles(r["data"]) for r in results)
+
+
+class TestConditionalFetch:
+    """条件请求测试类"""
+
+    def make_fetcher(self, make_fetcher, server, tmp_path):
+        cache = HttpValidatorCache("2025年10月08日", str(tmp_path))
+        return make_fetcher(server.url, ["etag", "plain"], validator_cache=cache)
+
+    @pytest.mark.asyncio
+    async def test_unchanged_after_first_fetch(
+        self, conditional_server, make_fetcher, tmp_path
+    ):
+        """测试 304 和响应体哈希相同时标记为未变化"""
+        fetcher = self.make_fetcher(make_fetcher, conditional_server, tmp_path)
+
+        first, failed = await fetcher.fetch_all_async()
+        assert [r["status"] for r in first] == ["cache", "cache"]
+        assert failed == []
+        assert "If-None-Match" not in conditional_server.last_headers["etag"]
+
+        second, _ = await fetcher.fetch_all_async()
+        assert [r["status"] for r in second] == ["unchanged", "unchanged"]
+        assert all(r["data"] is None for r in second)
+        assert conditional_server.last_headers["etag"]["If-None-Match"] == '"v0"'
+
+    @pytest.mark.asyncio
+    async def test_changed_content_is_downloaded(
+        self, conditional_server, make_fetcher, tmp_path
+    ):
+        """测试内容更新后重新下载并更新校验信息"""
+        fetcher = self.make_fetcher(make_fetcher, conditional_server, tmp_path)
+        await fetcher.fetch_all_async()
+
+        conditional_server.snapshot = 1
+        results, _ = await fetcher.fetch_all_async()
+
+        assert [r["status"] for r in results] == ["cache", "cache"]
+        assert results[0]["data"]["items"] == conditional_server.items("etag")
+        assert fetcher.validator_cache.entries["etag"]["etag"] == '"v1"'
+
+    @pytest.mark.asyncio
+    async def test_cache_persists(self, conditional_server, make_fetcher, tmp_path):
+        """测试校验信息保存后在新的抓取器中生效"""
+        fetcher = self.make_fetcher(make_fetcher, conditional_server, tmp_path)
+        await fetcher.fetch_all_async()
+        fetcher.validator_cache.save()
+
+        restarted = self.make_fetcher(make_fetcher, conditional_server, tmp_path)
+        assert restarted.validator_cache.load()
+        results, _ = await restarted.fetch_all_async()
+        assert [r["status"] for r in results] == ["unchanged", "unchanged"]
+
+    @patch("requests.get")
+    def test_sync_304(self, mock_get, sample_platform, tmp_path):
+        """测试同步抓取收到 304 时不解析响应体"""
+        cache = HttpValidatorCache("2025年10月08日", str(tmp_path))
+        cache.update("baidu", hash_body(b"{}"), etag='"v1"')
+        mock_response = Mock(status_code=304, content=b"", headers={})
+        mock_response.raise_for_status = Mock()
+        mock_get.return_value = mock_response
+
+        fetcher = DataFetcher({"PLATFORMS": []}, validator_cache=cache)
+        result = fetcher.fetch_platform_sync(sample_platform)
+
+        assert result["status"] == "unchanged"
+        assert mock_get.call_args.kwargs["headers"]["If-None-Match"] == '"v1"'
+        mock_response.json.assert_not_called()
@@ -12,6 +12,8 @@ from trendradar.utils.file_utils import (
     get_config_path,
     get_output_path,
     get_project_root,
+    load_state,
+    write_state_atomic,
 )
 
 
@@ -86,3 +88,39 @@ class TestFileUtils:
         """测试获取自定义配置路径"""
         config_path = get_config_path("custom.yaml")
         assert config_path.name == "custom.yaml"
+
+
+class TestStateFile:
+    """状态文件读写测试类"""
+
+    def test_round_trip(self, tmp_path):
+        """测试写入后按版本读取，目录不存在时自动创建"""
+        path = tmp_path / "state" / "test.json"
+        state = {"version": 2, "entries": {"标题": [1, 2]}}
+        assert write_state_atomic(path, state)
+        assert load_state(path, 2) == state
+        assert not path.with_suffix(".tmp").exists()
+
+    def test_load_rejects_invalid(self, tmp_path):
+        """测试版本不匹配或内容不是 JSON 对象时抛出 ValueError"""
+        path = tmp_path / "test.json"
+        write_state_atomic(path, {"version": 1})
+        with pytest.raises(ValueError, match="版本不匹配"):
+            load_state(path, 2)
+
+        path.write_text("[1, 2]", encoding="utf-8")
+        with pytest.raises(ValueError):
+            load_state(path, 1)
+
+        path.write_text("{broken", encoding="utf-8")
+        with pytest.raises(ValueError):
+            load_state(path, 1)
+
+    def test_failed_write_keeps_original(self, tmp_path):
+        """测试写入失败时返回 False，原文件保持不变且不留下临时文件"""
+        path = tmp_path / "test.json"
+        write_state_atomic(path, {"version": 1, "value": "old"})
+
+        assert not write_state_atomic(path, {"version": 1, "value": object()})
+        assert load_state(path, 1) == {"version": 1, "value": "old"}
+        assert not path.with_suffix(".tmp").exists()
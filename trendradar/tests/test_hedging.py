@@ -0,0 +1,187 @@
+"""
+测试对冲请求模块
+"""
+
+import asyncio
+
+import pytest
+
+from trendradar.core.hedging import HedgePolicy, percentile
+from trendradar.utils.exceptions import ConfigError
+from trendradar.utils.metrics import RunMetrics
+from trendradar.utils.validator import ConfigValidator
+
+from .bench.standin import NewsnowStandIn
+
+
+class StallingStandIn(NewsnowStandIn):
+    """每个平台的第一个请求卡住 stall 秒，之后的请求立即返回"""
+
+    def __init__(self, stall: float = 5.0):
+        super().__init__(item_count=1)
+        self.stall = stall
+
+    def delay(self, platform_id: str, count: int) -> float:
+        return self.stall if count == 1 else 0.0
+
+
+@pytest.fixture
+def stalling_server(newsnow):
+    """每个平台的第一个请求卡住 5 秒的模拟服务"""
+    return newsnow(StallingStandIn)
+
+
+def make_policy(platform_ids, **kwargs) -> HedgePolicy:
+    """创建已积累 10 个 10ms 延迟样本的对冲策略"""
+    policy = HedgePolicy(min_delay=0.05, **kwargs)
+    for platform_id in platform_ids:
+        for _ in range(10):
+            policy.record_latency(platform_id, 0.01)
+    return policy
+
+
+class TestHedgePolicy:
+    """对冲策略测试类"""
+
+    def test_percentile(self):
+        """测试最近秩法百分位数"""
+        values = list(range(1, 101))
+        assert percentile(values, 95) == 95
+        assert percentile(values, 100) == 100
+        assert percentile([3.0], 50) == 3.0
+
+    def test_delay_needs_samples(self):
+        """测试样本不足时不对冲，足够后取分位数且不低于下限"""
+        policy = HedgePolicy(percentile=90, min_samples=3, min_delay=0.2)
+        policy.record_latency("baidu", 0.5)
+        policy.record_latency("baidu", 0.1)
+        assert policy.hedge_delay("baidu") is None
+
+        policy.record_latency("baidu", 1.0)
+        assert policy.hedge_delay("baidu") == 1.0
+        assert policy.hedge_delay("weibo") is None
+
+        fast = HedgePolicy(min_samples=1, min_delay=0.2)
+        fast.record_latency("baidu", 0.01)
+        assert fast.hedge_delay("baidu") == 0.2
+
+    def test_window_keeps_recent(self):
+        """测试只保留最近的样本"""
+        policy = HedgePolicy(min_samples=2, window=3)
+        for value in (9.0, 9.0, 1.0, 1.0, 1.0):
+            policy.record_latency("baidu", value)
+        assert policy.history["baidu"] == [1.0, 1.0, 1.0]
+
+    def test_budget(self):
+        """测试对冲次数受预算限制"""
+        policy = HedgePolicy(budget_ratio=0.5)
+        policy.start_run()
+        assert policy.try_hedge()
+        assert not policy.try_hedge()
+
+        policy.on_request()
+        policy.on_request()
+        assert policy.try_hedge()
+        policy.record_win()
+        assert policy.summary() == {
+            "requests": 2,
+            "hedged": 2,
+            "wins": 1,
+            "denied": 1,
+        }
+
+    def test_state_round_trip(self, tmp_path):
+        """测试延迟历史跨运行保存"""
+        state_path = str(tmp_path / "state" / "latency_history.json")
+        make_policy(["baidu"], state_path=state_path).save()
+
+        restarted = HedgePolicy(state_path=state_path)
+        assert restarted.load()
+        assert restarted.history == {"baidu": [0.01] * 10}
+
+    def test_invalid_state_is_ignored(self, tmp_path):
+        """测试状态文件损坏时重新积累"""
+        state_path = tmp_path / "latency_history.json"
+        state_path.write_text('{"version": 1, "history": []}', encoding="utf-8")
+
+        policy = HedgePolicy(state_path=str(state_path))
+        assert not policy.load()
+        assert policy.history == {}
+
+    def test_from_config(self):
+        """测试默认不启用"""
+        assert HedgePolicy.from_config({}) is None
+        policy = HedgePolicy.from_config(
+            {"HEDGING": {"ENABLED": True, "PERCENTILE": 90, "MIN_SAMPLES": 5}}
+        )
+        assert (policy.percentile, policy.min_samples) == (90, 5)
+
+
+class TestFetcherHedging:
+    """抓取器对冲请求测试类"""
+
+    @pytest.mark.asyncio
+    async def test_hedge_wins_over_stalled_request(self, stalling_server, make_fetcher):
+        """测试首发请求卡住时对冲请求胜出，统计写入运行指标"""
+        policy = make_policy(["baidu"])
+        fetcher = make_fetcher(stalling_server.url, ["baidu"], hedge_policy=policy)
+
+        with RunMetrics() as metrics:
+            results, failed = await asyncio.wait_for(fetcher.fetch_all_async(), 2)
+
+        assert {item["platform_id"] for item in results} == {"baidu"}
+        assert failed == []
+        assert stalling_server.platform_requests == {"baidu": 2}
+        assert metrics.to_dict()["extra"]["hedging"] == {
+            "requests": 1,
+            "hedged": 1,
+            "wins": 1,
+            "denied": 0,
+        }
+        # 胜出请求的延迟计入历史，被取消的请求不计入
+        assert len(policy.history["baidu"]) == 11
+
+    @pytest.mark.asyncio
+    async def test_budget_caps_hedges(self, stalling_server, make_fetcher):
+        """测试预算用完后不再对冲，请求等待首发请求返回"""
+        stalling_server.stall = 0.3
+        platform_ids = ["baidu", "weibo", "zhihu"]
+        policy = make_policy(platform_ids, budget_ratio=0)
+        fetcher = make_fetcher(stalling_server.url, platform_ids, hedge_policy=policy)
+
+        results, failed = await fetcher.fetch_all_async()
+
+        assert {item["platform_id"] for item in results} == set(platform_ids)
+        assert stalling_server.requests == 4
+        assert policy.summary()["hedged"] == 1
+        assert policy.summary()["denied"] == 2
+
+    @pytest.mark.asyncio
+    async def test_no_hedge_without_history(self, stalling_server, make_fetcher):
+        """测试没有延迟历史时只发首发请求"""
+        stalling_server.stall = 0.1
+        policy = HedgePolicy()
+        fetcher = make_fetcher(stalling_server.url, ["baidu"], hedge_policy=policy)
+
+        results, failed = await fetcher.fetch_all_async()
+
+        assert {item["platform_id"] for item in results} == {"baidu"}
+        assert stalling_server.platform_requests == {"baidu": 1}
+        assert policy.summary()["hedged"] == 0
+        assert len(policy.history["baidu"]) == 1
+
+
+class TestHedgingConfig:
+    """对冲配置验证测试类"""
+
+    def test_invalid_percentile(self, sample_config):
+        """测试分位数超出范围时报错"""
+        sample_config["HEDGING"] = {"PERCENTILE": 120}
+        with pytest.raises(ConfigError):
+            ConfigValidator().validate(sample_config)
+
+    def test_invalid_min_samples(self, sample_config):
+        """测试样本数不是正整数时报错"""
+        sample_config["HEDGING"] = {"MIN_SAMPLES": 0}
+        with pytest.raises(ConfigError):
+            ConfigValidator().validate(sample_config)
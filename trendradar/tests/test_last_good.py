@@ -0,0 +1,170 @@
+"""
+测试最近成功数据缓存模块
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from trendradar.core.analyzer import process_source_data
+from trendradar.core.last_good import LastGoodCache
+from trendradar.utils.exceptions import ConfigError
+from trendradar.utils.metrics import RunMetrics
+from trendradar.utils.validator import ConfigValidator
+
+PLATFORM_IDS = ["baidu", "weibo"]
+
+TITLES = {"标题A": {"ranks": [1], "url": "https://example.com/a", "mobileUrl": ""}}
+
+
+class TestLastGoodCache:
+    """最近成功数据缓存测试类"""
+
+    def test_max_staleness(self, clock):
+        """测试超过最长使用时间的缓存不再返回"""
+        cache = LastGoodCache(max_staleness=600, clock=clock)
+        assert cache.get("baidu") is None
+
+        cache.update("baidu", TITLES)
+        clock.now += 120
+        assert cache.get("baidu") == (TITLES, 120)
+
+        clock.now += 481
+        assert cache.get("baidu") is None
+
+    def test_touch_refreshes_age(self, clock):
+        """测试内容未变化时刷新缓存时间"""
+        cache = LastGoodCache(max_staleness=600, clock=clock)
+        cache.update("baidu", TITLES)
+        clock.now += 500
+        cache.touch("baidu")
+        cache.touch("weibo")
+
+        clock.now += 300
+        assert cache.get("baidu") == (TITLES, 300)
+        assert "weibo" not in cache.platforms
+
+    def test_state_round_trip(self, tmp_path, clock):
+        """测试缓存跨运行保存，过期的平台不再写入"""
+        state_path = str(tmp_path / "state" / "last_good.json")
+        cache = LastGoodCache(max_staleness=600, state_path=state_path, clock=clock)
+        cache.update("weibo", TITLES)
+        clock.now += 700
+        cache.update("baidu", TITLES)
+        cache.save()
+
+        restarted = LastGoodCache(max_staleness=600, state_path=state_path, clock=clock)
+        assert restarted.load()
+        assert list(restarted.platforms) == ["baidu"]
+        assert restarted.get("baidu") == (TITLES, 0)
+
+    def test_invalid_state_is_ignored(self, tmp_path):
+        """测试状态文件损坏时忽略缓存"""
+        state_path = tmp_path / "last_good.json"
+        state_path.write_text(
+            json.dumps({"version": 1, "platforms": {"baidu": {"titles": []}}}),
+            encoding="utf-8",
+        )
+
+        cache = LastGoodCache(state_path=str(state_path))
+        assert not cache.load()
+        assert cache.platforms == {}
+
+    def test_from_config(self):
+        """测试默认启用，关闭或最长使用时间为 0 时不创建"""
+        assert LastGoodCache.from_config({}).max_staleness == 3600
+        assert LastGoodCache.from_config({"STALE_FALLBACK": {"ENABLED": False}}) is None
+        assert (
+            LastGoodCache.from_config({"STALE_FALLBACK": {"MAX_STALENESS": 0}}) is None
+        )
+
+
+class TestFetcherStaleFallback:
+    """抓取器缓存数据回退测试类"""
+
+    @pytest.fixture
+    def flaky_server(self, newsnow):
+        """本地 API 模拟服务，down 中的平台返回 503"""
+        return newsnow(item_count=1)
+
+    @pytest.mark.asyncio
+    async def test_async_returns_stale(self, flaky_server, make_fetcher, clock):
+        """测试平台失败时返回缓存数据，成功的平台更新缓存"""
+        cache = LastGoodCache(max_staleness=600, clock=clock)
+        cache.update("weibo", TITLES)
+        clock.now += 90
+        flaky_server.down = {"weibo"}
+        fetcher = make_fetcher(flaky_server.url, PLATFORM_IDS, last_good=cache)
+
+        with RunMetrics() as metrics:
+            results, failed = await fetcher.fetch_all_async()
+
+        assert failed == []
+        baidu, weibo = results
+        assert baidu["status"] == "success"
+        assert weibo["status"] == "stale"
+        assert weibo["titles"] == TITLES
+        assert weibo["age"] == 90
+        assert fetcher.last_stale == {"weibo": 90}
+        assert metrics.to_dict()["extra"]["stale"] == {"weibo": 90}
+        assert cache.get("baidu") == (baidu["titles"], 0)
+
+    @pytest.mark.asyncio
+    async def test_expired_cache_fails(self, flaky_server, make_fetcher, clock):
+        """测试缓存超过最长使用时间时平台仍按失败处理"""
+        cache = LastGoodCache(max_staleness=60, clock=clock)
+        cache.update("weibo", TITLES)
+        clock.now += 90
+        flaky_server.down = {"weibo"}
+        fetcher = make_fetcher(flaky_server.url, PLATFORM_IDS, last_good=cache)
+
+        results, failed = await fetcher.fetch_all_async()
+
+        assert [item["platform_id"] for item in results] == ["baidu"]
+        assert failed == ["weibo"]
+
+    @pytest.mark.asyncio
+    async def test_sync_returns_stale(self, flaky_server, make_fetcher):
+        """测试同步抓取同样返回缓存数据"""
+        cache = LastGoodCache()
+        cache.update("baidu", TITLES)
+        flaky_server.down = {"baidu"}
+        fetcher = make_fetcher(flaky_server.url, PLATFORM_IDS, last_good=cache)
+        loop = asyncio.get_running_loop()
+
+        results, failed = await loop.run_in_executor(None, fetcher.fetch_all_sync)
+
+        assert failed == []
+        assert [item["status"] for item in results] == ["stale", "success"]
+        assert list(fetcher.last_stale) == ["baidu"]
+
+
+class TestStaleProcessing:
+    """缓存数据合并测试类"""
+
+    def test_stale_does_not_increment_count(self):
+        """测试缓存数据不增加已有标题的次数，只补入尚未出现的标题"""
+        all_results, title_info = {}, {}
+        process_source_data("baidu", dict(TITLES), "08时00分", all_results, title_info)
+
+        stale = dict(TITLES)
+        stale["标题B"] = {"ranks": [2], "url": "", "mobileUrl": ""}
+        process_source_data(
+            "baidu", stale, "08时05分", all_results, title_info, is_stale=True
+        )
+
+        assert title_info["baidu"]["标题A"]["count"] == 1
+        assert title_info["baidu"]["标题A"]["last_time"] == "08时00分"
+        assert title_info["baidu"]["标题B"]["count"] == 1
+        assert set(all_results["baidu"]) == {"标题A", "标题B"}
+
+
+class TestStaleFallbackConfig:
+    """缓存数据回退配置验证测试类"""
+
+    def test_invalid_max_staleness(self, sample_config):
+        """测试最长使用时间为负数时报错"""
+        sample_config["STALE_FALLBACK"] = {"MAX_STALENESS": -1}
+        with pytest.raises(ConfigError):
+            ConfigValidator().validate(sample_config)
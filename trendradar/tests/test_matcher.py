@@ -0,0 +1,245 @@
+"""
+测试关键词匹配模块
+"""
+
+import random
+import time
+
+import pytest
+
+from trendradar.core import matcher as matcher_module
+from trendradar.core.matcher import (
+    WordGroupMatcher,
+    calculate_news_weight,
+    calculate_news_weights,
+    count_word_frequency,
+    matches_word_groups,
+)
+from trendradar.core.records import TitleAccumulator, TitleRecord
+from trendradar.core.trends import TitleTrend
+from trendradar.utils.aho_corasick import AhoCorasick
+from trendradar.utils.exceptions import ConfigError
+from trendradar.utils.validator import ConfigValidator
+
+
+def random_word(rng, alphabet, min_len=1, max_len=4):
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(min_len, max_len)))
+
+
+def random_records(rng, count):
+    """随机标题记录，包含累计记录、普通记录、字典和没有排名的条目"""
+    records = []
+    for i in range(count):
+        ranks = rng.sample(range(1, 60), rng.randint(0, 8))
+        kind = i % 4
+        if kind == 0 and ranks:
+            record = TitleAccumulator("08时00分", ranks)
+            for _ in range(rng.randint(0, 12)):
+                record.observe("09时00分", [rng.randint(1, 30)])
+        elif kind == 1:
+            record = TitleRecord("08时00分", "09时00分", rng.randint(1, 20), ranks)
+        elif kind == 2:
+            record = {"ranks": ranks}
+        else:
+            record = {"ranks": ranks, "count": rng.randint(1, 15)}
+        records.append(record)
+    return records
+
+
+def random_rules(rng, alphabet, group_count, words_per_group, filter_count):
+    word_groups = []
+    for _ in range(group_count):
+        required = [random_word(rng, alphabet) for _ in range(rng.randint(0, 2))]
+        normal = [random_word(rng, alphabet) for _ in range(words_per_group)]
+        word_groups.append({"required": required, "normal": normal})
+    filter_words = [random_word(rng, alphabet, 2, 4) for _ in range(filter_count)]
+    return word_groups, filter_words
+
+
+class TestAhoCorasick:
+    """Aho-Corasick 自动机测试类"""
+
+    def test_find_all_overlapping(self):
+        """测试重叠与嵌套模式串"""
+        automaton = AhoCorasick(["he", "she", "his", "hers"])
+        assert automaton.find_all("ushers") == {0, 1, 3}
+        assert automaton.find_all("this") == {2}
+        assert automaton.find_all("") == set()
+
+    def test_find_all_matches_substring_semantics(self):
+        """测试与 in 运算符语义一致"""
+        rng = random.Random(7)
+        alphabet = "ab人工智能"
+        patterns = [random_word(rng, alphabet) for _ in range(50)] + [""]
+        automaton = AhoCorasick(patterns)
+
+        for _ in range(300):
+            text = random_word(rng, alphabet, 0, 20)
+            expected = {i for i, p in enumerate(patterns) if p in text}
+            assert automaton.find_all(text) == expected
+
+
+class TestWordGroupMatcher:
+    """预编译词组匹配器测试类"""
+
+    def test_basic_rules(self):
+        """测试必须词、普通词与过滤词"""
+        word_groups = [
+            {"required": ["华为"], "normal": ["手机", "芯片"]},
+            {"required": [], "normal": ["AI"]},
+        ]
+        matcher = WordGroupMatcher(word_groups, ["广告"])
+
+        assert matcher.matches("华为发布新手机")
+        assert not matcher.matches("苹果发布新手机")
+        assert matcher.matches("OpenAI 发布新模型")
+        assert matcher.matches("ai 芯片")
+        assert not matcher.matches("华为手机广告")
+
+    def test_empty_groups_match_everything(self):
+        """测试没有词组时匹配所有标题"""
+        matcher = WordGroupMatcher([], ["广告"])
+        assert matcher.matches("任何标题广告")
+
+    def test_equivalent_to_matches_word_groups(self):
+        """测试与 matches_word_groups 结果一致"""
+        rng = random.Random(42)
+        alphabet = "abcAB科技人工智能"
+        for _ in range(20):
+            word_groups, filter_words = random_rules(rng, alphabet, 8, 4, 3)
+            matcher = WordGroupMatcher(word_groups, filter_words)
+            for _ in range(200):
+                title = random_word(rng, alphabet, 0, 30)
+                assert matcher.matches(title) == matches_word_groups(
+                    title, word_groups, filter_words
+                )
+
+    def test_prime_caches_results(self):
+        """测试预匹配结果被缓存复用"""
+        matcher = WordGroupMatcher([{"required": [], "normal": ["AI"]}], [])
+
+        assert matcher.prime(["AI 新进展", "体育新闻", "ai 芯片"]) == 2
+        assert matcher._cache == {"AI 新进展": True, "体育新闻": False, "ai 芯片": True}
+
+        matcher._automaton = None  # 缓存命中时不再扫描
+        assert matcher.matches("AI 新进展")
+        assert not matcher.matches("体育新闻")
+
+    def test_cache_limit(self):
+        """测试缓存超出上限后清空"""
+        matcher = WordGroupMatcher([{"required": [], "normal": ["AI"]}], [])
+        matcher.CACHE_LIMIT = 2
+        matcher.prime(["a", "b", "c"])
+        assert list(matcher._cache) == ["c"]
+
+    def test_count_word_frequency_uses_matcher(self):
+        """测试 count_word_frequency 使用预编译匹配器"""
+        results = {"baidu": {"AI 新进展": {"ranks": [1]}, "体育新闻": {"ranks": [2]}}}
+        word_groups = [{"required": [], "normal": ["AI"]}]
+        matcher = WordGroupMatcher(word_groups, [])
+
+        matched = count_word_frequency(
+            results, word_groups, [], {"baidu": "百度"}, matcher=matcher
+        )
+        assert [news["title"] for news in matched] == ["AI 新进展"]
+
+    @pytest.mark.slow
+    def test_benchmark_against_matches_word_groups(self):
+        """基准测试：大词表下预编译匹配器对比逐词扫描"""
+        rng = random.Random(2025)
+        alphabet = "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法所民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点从业本去把性好应开它合还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质气第向道命此变条只没结解问意建月公无系军很情者最立代想已通并提直题党程展五果料象员革位入常文总次品式活设及管特件长求老头基资边流路级少图山统接知较将组见计别她手角期根论运农指几九区强放决西被干做必战先回则任取据处理府研"
+        word_groups, filter_words = random_rules(rng, alphabet, 300, 10, 200)
+        titles = [random_word(rng, alphabet, 10, 40) for _ in range(2000)]
+
+        start = time.perf_counter()
+        expected = [matches_word_groups(t, word_groups, filter_words) for t in titles]
+        naive_duration = time.perf_counter() - start
+
+        matcher = WordGroupMatcher(word_groups, filter_words)
+        start = time.perf_counter()
+        actual = [matcher.matches(t) for t in titles]
+        compiled_duration = time.perf_counter() - start
+
+        print(
+            f"\n{matcher.keyword_count} 个关键词, {len(titles)} 条标题: "
+            f"逐词扫描 {naive_duration * 1000:.1f}ms, "
+            f"自动机 {compiled_duration * 1000:.1f}ms"
+        )
+        assert actual == expected
+        assert compiled_duration < naive_duration
+
+
+class TestBatchScoring:
+    """批量权重计算测试类"""
+
+    WEIGHT_CONFIGS = [
+        None,
+        {"RANK_WEIGHT": 0.4, "FREQUENCY_WEIGHT": 0.3, "HOTNESS_WEIGHT": 0.3},
+        {
+            "RANK_WEIGHT": 1 / 3,
+            "FREQUENCY_WEIGHT": 1 / 3,
+            "HOTNESS_WEIGHT": 1 / 3,
+            "TREND_WEIGHT": 0.7,
+        },
+    ]
+
+    @pytest.fixture(params=["numpy", "python"])
+    def backend(self, request, monkeypatch):
+        """分别使用向量化计算和逐条计算"""
+        if request.param == "numpy":
+            if matcher_module.np is None:
+                pytest.skip("未安装 numpy")
+        else:
+            monkeypatch.setattr(matcher_module, "np", None)
+        return request.param
+
+    def test_identical_to_per_item(self, backend):
+        """测试批量计算的权重与逐条计算完全相同（不是近似相等）"""
+        rng = random.Random(11)
+        records = random_records(rng, 500)
+        trends = [
+            TitleTrend(1, 0.0, 0.0, rng.uniform(-20, 20), 0.0, 0)
+            if rng.random() < 0.5
+            else None
+            for _ in records
+        ]
+
+        for weight_config in self.WEIGHT_CONFIGS:
+            for threshold in (3, 5, 10):
+                expected = [
+                    calculate_news_weight(record, threshold, weight_config, trend)
+                    for record, trend in zip(records, trends)
+                ]
+                assert (
+                    calculate_news_weights(records, threshold, weight_config, trends)
+                    == expected
+                )
+
+    def test_empty(self, backend):
+        """测试没有条目时返回空列表"""
+        assert calculate_news_weights([]) == []
+
+    def test_top_k_matches_full_sort(self):
+        """测试限制条数时结果与完整排序后截取相同，包括权重相同的条目的顺序"""
+        rng = random.Random(5)
+        results = {
+            platform: {
+                f"{platform} 标题{n}": {"ranks": [rng.randint(1, 5)], "url": ""}
+                for n in range(200)
+            }
+            for platform in ("baidu", "weibo")
+        }
+        full = count_word_frequency(results, [], [], {})
+
+        top = count_word_frequency(results, [], [], {}, max_news=30)
+
+        assert [news["title"] for news in top] == [news["title"] for news in full[:30]]
+        assert [news["weight"] for news in full] == sorted(
+            (news["weight"] for news in full), reverse=True
+        )
+
+    def test_invalid_max_news(self, sample_config):
+        """测试最多显示条数为负数时报错"""
+        sample_config["MAX_NEWS"] = -1
+        with pytest.raises(ConfigError):
+            ConfigValidator().validate(sample_config)
@@ -0,0 +1,120 @@
+"""
+测试运行指标模块
+"""
+
+import asyncio
+import json
+import sys
+
+import pytest
+
+from trendradar.utils import metrics as metrics_module
+from trendradar.utils.metrics import RunMetrics, get_current_metrics, record, span
+
+
+class TestRunMetrics:
+    """运行指标记录器测试类"""
+
+    def test_span_records_stage(self):
+        """测试记录耗时、CPU 时间和标签"""
+        with RunMetrics() as metrics:
+            with span("fetch_platform", platform="baidu"):
+                sum(range(10000))
+            with span("notify_batch", cpu=False, channel="Feishu", batch=1):
+                pass
+
+        fetch, notify = metrics.spans
+        assert fetch["name"] == "fetch_platform"
+        assert fetch["wall"] >= 0
+        assert "cpu" in fetch
+        assert fetch["labels"] == {"platform": "baidu"}
+        assert "cpu" not in notify
+        assert notify["labels"] == {"channel": "Feishu", "batch": 1}
+        assert metrics.status == "ok"
+        assert metrics.wall >= fetch["wall"]
+
+    def test_memory_recorded(self, monkeypatch):
+        """测试阶段记录当前常驻内存，进程内存峰值只在运行结束时记录一次"""
+        monkeypatch.setattr(metrics_module, "get_current_rss_kb", lambda: 2048)
+        monkeypatch.setattr(metrics_module, "get_peak_rss_kb", lambda: 4096)
+        with RunMetrics() as metrics:
+            with span("match"):
+                pass
+
+        assert metrics.spans[0]["rss_kb"] == 2048
+        assert "peak_rss_kb" not in metrics.spans[0]
+        run = metrics.to_dict()
+        assert run["process_peak_rss_kb"] == 4096
+        assert "peak_rss_kb" not in run
+
+    @pytest.mark.skipif(not sys.platform.startswith("linux"), reason="只支持 Linux")
+    def test_current_rss(self):
+        """测试读取当前常驻内存"""
+        assert metrics_module.get_current_rss_kb() > 0
+
+    def test_span_without_metrics_is_noop(self):
+        """测试没有活动记录器时 span 不做任何事"""
+        assert get_current_metrics() is None
+        with span("match"):
+            pass
+
+    def test_record_extra_state(self):
+        """测试记录阶段耗时以外的运行状态"""
+        record("circuit_breaker", {"skipped": []})
+        with RunMetrics() as metrics:
+            record("circuit_breaker", {"skipped": ["baidu"]})
+
+        assert metrics.to_dict()["extra"] == {"circuit_breaker": {"skipped": ["baidu"]}}
+
+    def test_error_recorded(self):
+        """测试阶段异常时记录错误并标记运行失败"""
+        metrics = RunMetrics()
+        with pytest.raises(RuntimeError):
+            with metrics:
+                with span("save"):
+                    raise RuntimeError("disk full")
+
+        assert metrics.spans[0]["error"] is True
+        assert metrics.status == "error"
+        assert get_current_metrics() is None
+
+    def test_async_tasks_share_metrics(self):
+        """测试异步任务继承当前记录器"""
+
+        async def fetch(platform_id):
+            with span("fetch_platform", cpu=False, platform=platform_id):
+                await asyncio.sleep(0)
+
+        async def fetch_all():
+            await asyncio.gather(fetch("baidu"), fetch("weibo"))
+
+        with RunMetrics() as metrics:
+            asyncio.run(fetch_all())
+
+        platforms = sorted(s["labels"]["platform"] for s in metrics.spans)
+        assert platforms == ["baidu", "weibo"]
+
+    def test_stage_totals(self):
+        """测试按阶段汇总耗时"""
+        metrics = RunMetrics()
+        metrics.spans = [
+            {"name": "fetch_platform", "wall": 0.5},
+            {"name": "fetch_platform", "wall": 0.25},
+            {"name": "match", "wall": 0.1},
+        ]
+        assert metrics.stage_totals() == {"fetch_platform": 0.75, "match": 0.1}
+
+    def test_write_appends_json_lines(self, tmp_path):
+        """测试每次运行追加一行 JSON"""
+        for _ in range(2):
+            with RunMetrics() as metrics:
+                with span("match"):
+                    pass
+            file_path = metrics.write(str(tmp_path))
+
+        assert file_path.parent == tmp_path / "metrics"
+        lines = file_path.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 2
+        record = json.loads(lines[-1])
+        assert record["status"] == "ok"
+        assert [s["name"] for s in record["spans"]] == ["match"]
@@ -5,8 +5,11 @@
 """
 
 import sys
+import time
 from pathlib import Path
 
+import pytest
+
 # 添加项目根目录到 Python 路径
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -177,6 +180,104 @@ def test_telegram():
     return True
 
 
+def build_large_report(groups: int = 6, titles_per_group: int = 40) -> dict:
+    """构造需要分批发送的报告数据"""
+    return {
+        "stats": [
+            {
+                "word": f"词组{g}",
+                "count": titles_per_group,
+                "titles": [
+                    {
+                        "title": f"第{g}组的一条很长很长的测试新闻标题 {t}",
+                        "source_name": "科技新闻",
+                        "time_display": "10时30分",
+                        "count": 2,
+                        "ranks": [t % 10 + 1],
+                        "rank_threshold": 5,
+                        "url": f"https://example.com/{g}/{t}",
+                        "mobile_url": "",
+                        "is_new": False,
+                    }
+                    for t in range(titles_per_group)
+                ],
+            }
+            for g in range(groups)
+        ],
+        "new_titles": [],
+        "failed_ids": [],
+        "total_new_count": 0,
+    }
+
+
+class TestBatchSplitter:
+    """推送分批测试类"""
+
+    @pytest.mark.parametrize(
+        "notifier",
+        [
+            WeWorkNotifier(webhook_url="mock_url", max_bytes=4000),
+            DingTalkNotifier(webhook_url="mock_url", max_bytes=4000),
+            TelegramNotifier(
+                bot_token="mock_token", chat_id="mock_chat_id", max_bytes=4000
+            ),
+        ],
+    )
+    def test_batches_fit_with_header(self, notifier):
+        """测试添加批次标识后每批仍不超过字节上限"""
+        content = notifier.render_content(build_large_report(), mode="daily")
+        batches = notifier.prepare_batches(content)
+
+        assert len(batches) > 1
+        for batch in batches:
+            assert len(batch.encode("utf-8")) <= notifier.max_bytes
+
+    def test_news_items_never_split(self):
+        """测试单条新闻不会被拆开，且内容不丢失"""
+        notifier = WeWorkNotifier(webhook_url="mock_url", max_bytes=3000)
+        content = notifier.render_content(build_large_report(), mode="daily")
+        batches = notifier._split_into_batches(content)
+
+        original_lines = [line for line in content.split("\n") if line.strip()]
+        split_lines = [
+            line for batch in batches for line in batch.split("\n") if line.strip()
+        ]
+        assert split_lines == original_lines
+
+    def test_prefers_section_boundaries(self):
+        """测试优先在词组标题处断开"""
+        notifier = WeWorkNotifier(webhook_url="mock_url", max_bytes=6000)
+        content = notifier.render_content(
+            build_large_report(groups=8, titles_per_group=12), mode="daily"
+        )
+        batches = notifier._split_into_batches(content)
+
+        assert len(batches) > 1
+        for batch in batches[1:]:
+            first_line = batch.split("\n")[0]
+            assert notifier._is_section_start(first_line)
+
+    def test_small_content_not_split(self):
+        """测试未超出上限时不分批、不加批次标识"""
+        notifier = TelegramNotifier(bot_token="mock_token", chat_id="mock_chat_id")
+        content = "短消息"
+        assert notifier.prepare_batches(content) == [content]
+
+    def test_linear_time_on_large_content(self):
+        """测试大内容分批为线性耗时"""
+        notifier = WeWorkNotifier(webhook_url="mock_url", max_bytes=4000)
+        content = notifier.render_content(
+            build_large_report(groups=50, titles_per_group=200), mode="daily"
+        )
+
+        start_time = time.perf_counter()
+        batches = notifier._split_into_batches(content)
+        duration = time.perf_counter() - start_time
+
+        assert len(batches) > 100
+        assert duration < 1.0
+
+
 def main():
     """主测试流程"""
     logger.info("=" * 70)
@@ -205,3 +306,82 @@ def main():
 
 if __name__ == "__main__":
     sys.exit(main())
+
+
+class TestCancelledSection:
+    """超时取消平台展示测试类"""
+
+    @pytest.mark.parametrize(
+        "notifier",
+        [
+            FeishuNotifier(webhook_url="mock_url"),
+            DingTalkNotifier(webhook_url="mock_url"),
+            WeWorkNotifier(webhook_url="mock_url"),
+            TelegramNotifier(bot_token="mock_token", chat_id="mock_chat_id"),
+        ],
+    )
+    def test_cancelled_listed_separately(self, notifier):
+        """测试超时取消的平台与失败平台分开展示"""
+        report_data = build_large_report(groups=1, titles_per_group=1)
+        report_data["failed_ids"] = ["dead"]
+        report_data["cancelled_ids"] = ["slow"]
+
+        content = notifier.render_content(report_data, mode="daily")
+
+        failed_at = content.index("数据获取失败的平台")
+        cancelled_at = content.index("抓取超时未完成的平台")
+        assert failed_at < content.index("dead") < cancelled_at
+        assert "slow" in content[cancelled_at:]
+
+    def test_channel_formatting(self):
+        """测试各渠道共用平台区域的渲染，只有分隔线和强调格式不同"""
+        report_data = build_large_report(groups=1, titles_per_group=1)
+        report_data["failed_ids"] = ["dead"]
+        report_data["cancelled_ids"] = ["slow"]
+
+        feishu = FeishuNotifier(webhook_url="mock_url").render_content(report_data)
+        dingtalk = DingTalkNotifier(webhook_url="mock_url").render_content(report_data)
+        telegram = TelegramNotifier(
+            bot_token="mock_token", chat_id="mock_chat_id"
+        ).render_content(report_data)
+
+        assert "  • <font color='red'>dead</font>\n" in feishu
+        assert "  • <font color='grey'>slow</font>\n" in feishu
+        assert "\n---\n\n⏱️ **抓取超时未完成的平台：**\n\n  • **slow**\n" in dingtalk
+        assert "⚠️ <b>数据获取失败的平台：</b>\n\n  • <b>dead</b>\n" in telegram
+
+
+class TestStaleSection:
+    """使用缓存数据平台展示测试类"""
+
+    @pytest.mark.parametrize(
+        "notifier",
+        [
+            FeishuNotifier(webhook_url="mock_url"),
+            DingTalkNotifier(webhook_url="mock_url"),
+            WeWorkNotifier(webhook_url="mock_url"),
+            TelegramNotifier(bot_token="mock_token", chat_id="mock_chat_id"),
+        ],
+    )
+    def test_stale_listed_with_age(self, notifier):
+        """测试使用缓存数据的平台单独展示并附带缓存时长"""
+        report_data = build_large_report(groups=1, titles_per_group=1)
+        report_data["stale_ages"] = {"weibo": 754.0}
+
+        content = notifier.render_content(report_data, mode="daily")
+
+        stale_at = content.index("使用缓存数据的平台")
+        assert "weibo" in content[stale_at:]
+        assert "12 分钟前" in content[stale_at:]
+
+    def test_channel_formatting(self):
+        """测试缓存数据平台与其他平台区域共用渲染，缓存时长跟在平台ID之后"""
+        report_data = build_large_report(groups=1, titles_per_group=1)
+        report_data["stale_ages"] = {"weibo": 754.0}
+
+        feishu = FeishuNotifier(webhook_url="mock_url").render_content(report_data)
+        wework = WeWorkNotifier(webhook_url="mock_url").render_content(report_data)
+
+        assert "  • <font color='grey'>weibo（12 分钟前）</font>\n" in feishu
+        assert "\n---\n\n🕒 **抓取失败、使用缓存数据的平台：**\n\n" in wework
+        assert "  • **weibo**（12 分钟前）\n" in wework
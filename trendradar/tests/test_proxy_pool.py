@@ -0,0 +1,238 @@
+"""
+测试代理池模块
+"""
+
+import asyncio
+import socket
+
+import pytest
+from aiohttp import web
+
+from trendradar.notifiers import FeishuNotifier, NotificationDispatcher
+from trendradar.utils.exceptions import ConfigError
+from trendradar.utils.metrics import RunMetrics
+from trendradar.utils.proxy_pool import ProxyPool
+from trendradar.utils.validator import ConfigValidator
+
+from .bench.standin import NewsnowStandIn, fixed_latency
+
+A = "http://127.0.0.1:10086"
+B = "http://127.0.0.1:10087"
+
+# 只能经代理访问的目标地址
+TARGET = "http://newsnow.invalid/api/s"
+
+
+def dead_proxy() -> str:
+    """返回一个没有服务监听的代理地址"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+class ProxyStandIn(NewsnowStandIn):
+    """本地 HTTP 代理模拟服务：直接应答经它转发的抓取请求和推送请求"""
+
+    def __init__(self, **kwargs):
+        super().__init__(item_count=1, **kwargs)
+        # 经代理转发的推送请求 [(目标主机, 路径)]
+        self.posts = []
+
+    @property
+    def proxy_url(self) -> str:
+        """代理地址"""
+        return f"http://127.0.0.1:{self.port}"
+
+    async def handle_post(self, request: web.Request) -> web.Response:
+        self.posts.append((request.host, request.path))
+        return web.json_response({"code": 0})
+
+    def build_app(self) -> web.Application:
+        app = super().build_app()
+        app.router.add_post("/{tail:.*}", self.handle_post)
+        return app
+
+
+@pytest.fixture
+def proxy_server(newsnow):
+    """本地 HTTP 代理模拟服务"""
+    return newsnow(ProxyStandIn)
+
+
+class TestProxyPool:
+    """代理池测试类"""
+
+    def test_concurrency_cap(self):
+        """测试每个代理的并发不超过上限，满员时改用其他代理"""
+        pool = ProxyPool([{"url": A, "max_concurrency": 2}, B], max_concurrency=1)
+        picked = [pool.acquire_sync() for _ in range(3)]
+        assert sorted(picked) == [A, A, B]
+
+        pool.release(B, True)
+        assert pool.acquire_sync() == B
+
+    @pytest.mark.asyncio
+    async def test_acquire_waits_for_release(self):
+        """测试所有代理都满员时等待，释放后被唤醒"""
+        pool = ProxyPool([A], max_concurrency=1)
+        assert await pool.acquire() == A
+
+        waiter = asyncio.ensure_future(pool.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+
+        pool.release(A, True)
+        assert await asyncio.wait_for(waiter, 1) == A
+
+    def test_pinned_proxy(self):
+        """测试固定代理优先，被剔除后改用其他代理"""
+        pool = ProxyPool([A, B], pins={"weibo": B}, failure_threshold=1)
+        assert pool.acquire_sync("weibo") == B
+        assert pool.acquire_sync("baidu") == A
+
+        pool.release(B, False)
+        assert pool.acquire_sync("weibo") == A
+
+    def test_eviction_and_recovery(self, clock):
+        """测试连续失败后剔除，到期后重新放行"""
+        pool = ProxyPool(
+            [A, B], pins={"weibo": A}, failure_threshold=2, eviction=60, clock=clock
+        )
+        for _ in range(2):
+            pool.release(pool.acquire_sync("weibo"), False)
+        assert pool.summary()[A]["evicted"]
+        assert pool.acquire_sync() == B
+        pool.release(B, True)
+
+        clock.now += 61
+        assert not pool.summary()[A]["evicted"]
+        # 健康度仍低于 B，只有 B 满员时才会用到 A
+        assert pool.proxies[A].health < pool.proxies[B].health
+        assert pool.acquire_sync() == B
+
+    def test_all_evicted_still_uses_proxy(self):
+        """测试所有代理都被剔除时仍经代理请求，不会直连"""
+        pool = ProxyPool([A], failure_threshold=1)
+        pool.release(pool.acquire_sync(), False)
+        assert pool.acquire_sync() == A
+
+    def test_cancelled_request_keeps_health(self):
+        """测试被取消的请求不影响健康度"""
+        pool = ProxyPool([A])
+        pool.release(pool.acquire_sync(), None)
+        assert pool.proxies[A].health == 1.0
+        assert pool.proxies[A].in_flight == 0
+
+    def test_from_config(self):
+        """测试未启用代理时不创建，未配置代理列表时使用 default_proxy"""
+        assert ProxyPool.from_config({"USE_PROXY": False, "DEFAULT_PROXY": A}) is None
+
+        pool = ProxyPool.from_config({"USE_PROXY": True, "DEFAULT_PROXY": A})
+        assert list(pool.proxies) == [A]
+
+        pool = ProxyPool.from_config(
+            {
+                "USE_PROXY": True,
+                "DEFAULT_PROXY": A,
+                "PROXY_POOL": {"PROXIES": [B], "MAX_CONCURRENCY": 2},
+            }
+        )
+        assert list(pool.proxies) == [B]
+        assert pool.proxies[B].max_concurrency == 2
+
+
+class TestFetchThroughPool:
+    """经代理池抓取和推送的测试类"""
+
+    @pytest.mark.asyncio
+    async def test_async_evicts_dead_proxy(self, proxy_server, make_fetcher):
+        """测试异步抓取在代理失效时换用其他代理，失效代理被剔除"""
+        live = proxy_server.proxy_url
+        dead = dead_proxy()
+        pool = ProxyPool([dead, live], failure_threshold=1)
+
+        fetcher = make_fetcher(TARGET, max_retries=2, proxy_pool=pool)
+
+        with RunMetrics() as metrics:
+            results, failed = await asyncio.wait_for(fetcher.fetch_all_async(), 2)
+
+        assert len(results) == 4
+        assert failed == []
+        hosts = {headers["Host"] for headers in proxy_server.last_headers.values()}
+        assert hosts == {"newsnow.invalid"}
+        summary = metrics.to_dict()["extra"]["proxy_pool"]
+        assert summary[dead]["evicted"]
+        assert summary[live]["requests"] == 4
+
+    @pytest.mark.asyncio
+    async def test_async_respects_cap(self, newsnow, make_fetcher):
+        """测试限流器允许的并发高于代理上限时，代理上的并发不超过上限"""
+        proxy_server = newsnow(ProxyStandIn, latency=fixed_latency(0.05))
+        live = proxy_server.proxy_url
+        pool = ProxyPool([live], max_concurrency=2)
+
+        results, failed = await make_fetcher(
+            TARGET, [f"p{i}" for i in range(6)], max_retries=2, proxy_pool=pool
+        ).fetch_all_async()
+
+        assert len(results) == 6
+        assert proxy_server.peak_in_flight == 2
+        assert pool.proxies[live].in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_sync_evicts_dead_proxy(self, proxy_server, make_fetcher):
+        """测试同步抓取同样经代理池请求"""
+        live = proxy_server.proxy_url
+        dead = dead_proxy()
+        pool = ProxyPool([dead, live], failure_threshold=1)
+        fetcher = make_fetcher(TARGET, max_retries=2, proxy_pool=pool)
+        loop = asyncio.get_running_loop()
+
+        results, failed = await asyncio.wait_for(
+            loop.run_in_executor(None, fetcher.fetch_all_sync), 5
+        )
+
+        assert len(results) == 4
+        assert pool.summary()[dead]["evicted"]
+        assert pool.proxies[live].in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_notification_shares_pool(self, proxy_server):
+        """测试推送和抓取共享代理池，渠道可以固定代理"""
+        live = proxy_server.proxy_url
+        dead = dead_proxy()
+        pool = ProxyPool([dead, live], pins={"feishu": live})
+        dispatcher = NotificationDispatcher(
+            [FeishuNotifier(webhook_url="http://hook.invalid/feishu")], proxy_pool=pool
+        )
+        dispatcher.notifiers[0].render_content = lambda *args: "测试内容"
+
+        results = await dispatcher.dispatch_async({}, "测试报告")
+
+        assert results["Feishu"]["success"]
+        assert proxy_server.posts == [("hook.invalid", "/feishu")]
+        assert pool.proxies[live].requests == 1
+        assert pool.proxies[dead].requests == 0
+
+
+class TestProxyPoolConfig:
+    """代理池配置验证测试类"""
+
+    def test_invalid_proxy_url(self, sample_config):
+        """测试代理地址格式错误时报错"""
+        sample_config["PROXY_POOL"] = {"PROXIES": ["socks5://127.0.0.1:1080"]}
+        with pytest.raises(ConfigError):
+            ConfigValidator().validate(sample_config)
+
+    def test_unknown_pin(self, sample_config):
+        """测试固定代理不在代理池中时报错"""
+        sample_config["PROXY_POOL"] = {"PROXIES": [A], "PINS": {"weibo": B}}
+        with pytest.raises(ConfigError):
+            ConfigValidator().validate(sample_config)
+
+    def test_invalid_cap(self, sample_config):
+        """测试单个代理的并发上限不是正整数时报错"""
+        sample_config["PROXY_POOL"] = {"PROXIES": [{"url": A, "max_concurrency": 0}]}
+        with pytest.raises(ConfigError):
+            ConfigValidator().validate(sample_config)
@@ -0,0 +1,197 @@
+"""
+测试自适应限流模块
+"""
+
+import asyncio
+
+import pytest
+
+from trendradar.utils.exceptions import ConfigError
+from trendradar.utils.rate_limiter import (
+    AimdWindow,
+    HostLimiter,
+    RateLimiter,
+    TokenBucket,
+)
+from trendradar.utils.validator import ConfigValidator
+
+from .bench.standin import fixed_latency
+
+PLATFORM_IDS = [f"p{i}" for i in range(12)]
+
+
+class TestTokenBucket:
+    """令牌桶测试类"""
+
+    def test_burst_then_paced(self, clock):
+        """测试突发额度用完后按速率排队"""
+        bucket = TokenBucket(rate=2, burst=2, clock=clock)
+
+        assert [bucket.reserve() for _ in range(4)] == [0, 0, 0.5, 1.0]
+
+        clock.now += 2.0
+        assert bucket.reserve() == 0
+
+    def test_zero_rate_is_unlimited(self):
+        """测试速率为 0 时不限速"""
+        bucket = TokenBucket(rate=0, burst=1)
+        assert all(bucket.reserve() == 0 for _ in range(100))
+
+
+class TestAimdWindow:
+    """AIMD 并发窗口测试类"""
+
+    @pytest.mark.asyncio
+    async def test_waits_when_full(self):
+        """测试窗口已满时等待，释放后放行"""
+        window = AimdWindow(limit=1, minimum=1, maximum=4)
+        epoch = await window.acquire()
+
+        waiter = asyncio.ensure_future(window.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        window.release(epoch, throttled=False)
+        await asyncio.wait_for(waiter, 1)
+        assert window.in_flight == 1
+
+    @pytest.mark.asyncio
+    async def test_decrease_once_per_epoch(self):
+        """测试同一批请求过载只收缩一次，成功时逐步放宽"""
+        window = AimdWindow(limit=8, minimum=1, maximum=8)
+        epochs = [await window.acquire() for _ in range(4)]
+
+        for epoch in epochs:
+            window.release(epoch, throttled=True)
+        assert window.limit == 4
+
+        epoch = await window.acquire()
+        window.release(epoch, throttled=True)
+        assert window.limit == 2
+
+        for _ in range(4):
+            window.release(await window.acquire(), throttled=False)
+        assert 3 < window.limit < 4
+
+    @pytest.mark.asyncio
+    async def test_bounds(self):
+        """测试窗口不超出上下限"""
+        window = AimdWindow(limit=2, minimum=2, maximum=3)
+        for _ in range(3):
+            window.release(await window.acquire(), throttled=True)
+        assert window.limit == 2
+
+        for _ in range(20):
+            window.release(await window.acquire(), throttled=False)
+        assert window.limit == 3
+
+
+class TestRateLimiter:
+    """限流器测试类"""
+
+    def test_hosts_are_independent(self):
+        """测试不同主机使用不同的限流器"""
+        limiter = RateLimiter()
+        a = limiter.for_url("https://a.example.com/api/s?id=1")
+        assert limiter.for_url("https://a.example.com/api/s?id=2") is a
+        assert limiter.for_url("https://b.example.com/api/s") is not a
+
+    @pytest.mark.asyncio
+    async def test_throttle_shrinks_rate(self):
+        """测试过载时速率和并发一起收缩"""
+        host = HostLimiter("a", 10, 1, 10, 4, 1, 8)
+        epoch = await host.acquire()
+        host.release(epoch, throttled=True)
+        assert (host.rate, host.concurrency, host.throttled) == (5, 2, 1)
+
+    def test_state_round_trip(self, tmp_path):
+        """测试保存后新的限流器从上次的值开始"""
+        state_path = str(tmp_path / "state" / "rate_limits.json")
+        limiter = RateLimiter(state_path=state_path)
+        host = limiter.for_host("a.example.com")
+        host.bucket.rate = 2.5
+        host.window.limit = 3.0
+        limiter.save()
+
+        restarted = RateLimiter(state_path=state_path)
+        assert restarted.load()
+        restored = restarted.for_host("a.example.com")
+        assert (restored.rate, restored.concurrency) == (2.5, 3.0)
+        assert restarted.for_host("b.example.com").concurrency == 5
+
+    def test_invalid_state_is_ignored(self, tmp_path):
+        """测试状态文件损坏时从初始值开始"""
+        state_path = tmp_path / "rate_limits.json"
+        state_path.write_text('{"version": 1, "hosts": {"a": {}}}', encoding="utf-8")
+
+        limiter = RateLimiter(state_path=str(state_path))
+        assert not limiter.load()
+        assert limiter.for_host("a").concurrency == 5
+
+    def test_from_config(self):
+        """测试根据配置创建"""
+        limiter = RateLimiter.from_config(
+            {"RATE_LIMIT": {"REQUESTS_PER_SECOND": 0, "MAX_CONCURRENCY": 3}}
+        )
+        host = limiter.for_host("a")
+        assert host.rate == 0
+        assert host.concurrency == 3
+
+
+class TestFetcherRateLimit:
+    """抓取器限流测试类"""
+
+    @pytest.fixture
+    def overloaded_server(self, newsnow):
+        """上游容量为 2 的模拟服务，并发超出时返回 429"""
+        return newsnow(item_count=1, latency=fixed_latency(0.02), capacity=2)
+
+    @pytest.mark.asyncio
+    async def test_backs_off_on_429(self, overloaded_server, make_fetcher):
+        """测试上游返回 429 后并发窗口收缩，重试后全部成功"""
+        limiter = RateLimiter(
+            requests_per_second=0, initial_concurrency=8, max_concurrency=8
+        )
+        fetcher = make_fetcher(
+            overloaded_server.url, PLATFORM_IDS, max_retries=5, rate_limiter=limiter
+        )
+
+        results, failed = await fetcher.fetch_all_async()
+
+        host = limiter.for_url(overloaded_server.url)
+        assert failed == []
+        assert overloaded_server.throttled > 0
+        assert host.throttled == overloaded_server.throttled
+        assert host.window.epoch >= 1
+
+    @pytest.mark.asyncio
+    async def test_window_bounds_concurrency(self, overloaded_server, make_fetcher):
+        """测试从保存的安全窗口开始时不超出上游容量"""
+        limiter = RateLimiter(
+            requests_per_second=0, initial_concurrency=2, max_concurrency=2
+        )
+        fetcher = make_fetcher(
+            overloaded_server.url, PLATFORM_IDS, max_retries=5, rate_limiter=limiter
+        )
+
+        results, failed = await fetcher.fetch_all_async()
+
+        assert len(results) == 12
+        assert overloaded_server.throttled == 0
+        assert overloaded_server.peak_in_flight == 2
+
+
+class TestRateLimitConfig:
+    """限流配置验证测试类"""
+
+    def test_invalid_concurrency_bounds(self, sample_config):
+        """测试并发上下限顺序错误时报错"""
+        sample_config["RATE_LIMIT"] = {"MIN_CONCURRENCY": 4, "MAX_CONCURRENCY": 2}
+        with pytest.raises(ConfigError):
+            ConfigValidator().validate(sample_config)
+
+    def test_non_numeric_value(self, sample_config):
+        """测试非数字取值报错"""
+        sample_config["RATE_LIMIT"] = {"BURST": "10"}
+        with pytest.raises(ConfigError):
+            ConfigValidator().validate(sample_config)
@@ -0,0 +1,249 @@
+"""
+测试标题记录模块
+"""
+
+import gc
+import tracemalloc
+from typing import Any, Callable
+
+import pytest
+
+from trendradar.core.analyzer import process_source_data
+from trendradar.core.matcher import calculate_news_weight, count_word_frequency
+from trendradar.core.records import (
+    MatchedTitle,
+    TitleAccumulator,
+    TitleRecord,
+    TitleResult,
+)
+
+PLATFORM_COUNT = 30
+TITLE_COUNT = 50
+SNAPSHOT_COUNT = 12
+
+
+def build_day():
+    """按模拟的当日快照合并出 all_results 和 title_info"""
+    all_results, title_info = {}, {}
+    for snapshot in range(SNAPSHOT_COUNT):
+        time_info = f"{8 + snapshot // 2:02d}时{snapshot % 2 * 30:02d}分"
+        for p in range(PLATFORM_COUNT):
+            # 每次快照榜单下移两条，已有标题的排名随之变化
+            title_data = {
+                f"平台{p} 标题{n}": {
+                    "ranks": [n - snapshot * 2 + 1],
+                    "url": f"https://example.com/{p}/{n}",
+                    "mobileUrl": "",
+                }
+                for n in range(snapshot * 2, snapshot * 2 + TITLE_COUNT)
+            }
+            process_source_data(f"p{p}", title_data, time_info, all_results, title_info)
+    return all_results, title_info
+
+
+def traced_size(build: Callable[[], Any]) -> int:
+    """build 返回的对象新分配的内存（字节）"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        size = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del result
+    return size
+
+
+class TestTitleRecord:
+    """标题记录测试类"""
+
+    def test_dict_compatible(self):
+        """测试记录可以按字典方式读写"""
+        record = TitleRecord("08时00分", "09时00分", 2, [1, 3], "https://a")
+        assert record["count"] == 2
+        assert record.get("mobileUrl") == ""
+        assert record.get("is_new", False) is False
+        assert "ranks" in record
+        assert dict(record.items())["first_time"] == "08时00分"
+        assert record == TitleRecord.from_dict(record.to_dict())
+
+        record["count"] += 1
+        assert record.count == 3
+        with pytest.raises(KeyError):
+            record["weight"]
+        with pytest.raises(KeyError):
+            record["keys"] = 1
+
+        # copy 返回字典，推送时可以添加字段
+        copied = record.copy()
+        copied["is_new"] = False
+        assert isinstance(copied, dict)
+
+    def test_list_round_trip(self):
+        """测试状态文件使用的列表格式可以还原，格式错误时报错"""
+        record = TitleRecord("08时00分", "08时00分", 1, [2], "", "https://m")
+        assert TitleRecord.from_list(record.to_list()) == record
+        with pytest.raises(ValueError):
+            TitleRecord.from_list(["08时00分", "08时00分", "1", [2], "", ""])
+
+    def test_matched_title_reads_record(self):
+        """测试匹配结果直接读取标题记录的字段"""
+        record = TitleRecord("08时00分", "09时00分", 2, [1, 3], "https://a")
+        matched = MatchedTitle("标题", "baidu", "百度热搜", record, 12.5)
+        assert matched["ranks"] is record.ranks
+        assert matched.get("first_time") == "08时00分"
+        assert matched.to_dict()["weight"] == 12.5
+        assert set(matched.keys()) == {
+            "title",
+            "source_id",
+            "source_name",
+            "ranks",
+            "count",
+            "first_time",
+            "last_time",
+            "url",
+            "mobileUrl",
+            "weight",
+        }
+
+    def test_read_only_fields(self):
+        """测试按名写入只读字段时抛出 TypeError，可写字段正常写入"""
+        record = TitleRecord("08时00分", "09时00分", 2, [1, 3], "https://a")
+        matched = MatchedTitle("标题", "baidu", "百度热搜", record, 12.5)
+        for key in ("count", "ranks", "first_time"):
+            with pytest.raises(TypeError, match=key):
+                matched[key] = None
+        matched["weight"] = 3.0
+        assert matched.weight == 3.0
+
+        accumulator = TitleAccumulator("08时00分", [2])
+        result = TitleResult(accumulator)
+        for rec in (accumulator, result):
+            with pytest.raises(TypeError, match="ranks"):
+                rec["ranks"] = [1]
+        accumulator["url"] = "https://b"
+        assert result["url"] == "https://b"
+
+
+class TestTitleAccumulator:
+    """标题累计记录测试类"""
+
+    def test_ranks_ordered_set(self):
+        """测试排名去重并保持首次出现顺序，计数器与排名一致"""
+        record = TitleAccumulator("08时00分", [5, 3, 5])
+        for snapshot in range(20):
+            record.observe("09时00分", [snapshot % 12 + 1])
+
+        assert record.ranks == [5, 3, 1, 2, 4, 6, 7, 8, 9, 10, 11, 12]
+        assert record._rank_bits == sum(1 << rank for rank in record.ranks)
+        assert (record.min_rank, record.max_rank) == (1, 12)
+        assert record.rank_sum == sum(record.ranks)
+        assert record.count == 21
+
+    def test_state_round_trip(self):
+        """测试状态文件格式可以还原累计记录"""
+        record = TitleAccumulator("08时00分", [2], "", "https://m")
+        record.observe("08时30分", [4, 2], "https://a")
+
+        restored = TitleAccumulator.from_list(record.to_list())
+
+        assert restored == record
+        assert restored.rank_sum == 6
+        with pytest.raises(ValueError):
+            TitleAccumulator.from_list(["08时00分"])
+
+
+class TestProcessSourceData:
+    """标题合并测试类"""
+
+    def test_accumulates_in_place(self):
+        """测试合并时原地更新累计记录，all_results 读取同一记录，不修改传入的快照数据"""
+        all_results, title_info = {}, {}
+        first = {"标题": {"ranks": [1], "url": "", "mobileUrl": ""}}
+        process_source_data("baidu", first, "08时00分", all_results, title_info)
+        record = title_info["baidu"]["标题"]
+        assert all_results["baidu"]["标题"].record is record
+
+        moved = {"标题": {"ranks": [3, 1], "url": "https://a", "mobileUrl": ""}}
+        process_source_data("baidu", moved, "09时00分", all_results, title_info)
+
+        assert title_info["baidu"]["标题"] is record
+        assert all_results["baidu"]["标题"] == {
+            "ranks": [1, 3],
+            "url": "https://a",
+            "mobileUrl": "",
+        }
+        assert first["标题"]["ranks"] == [1]
+        assert moved["标题"]["ranks"] == [3, 1]
+        assert record.to_dict() == {
+            "first_time": "08时00分",
+            "last_time": "09时00分",
+            "count": 2,
+            "ranks": [1, 3],
+            "url": "https://a",
+            "mobileUrl": "",
+        }
+
+    def test_weight_matches_rank_list(self):
+        """测试用计数器计算的权重与逐个排名计算的结果完全相同"""
+        cases = [[1, 2, 3], [4, 12], [11, 15], [3, 30, 7], [10]]
+        for ranks in cases:
+            record = TitleAccumulator("08时00分", ranks)
+            record.observe("08时30分", [])
+            as_dict = record.to_dict()
+            for threshold in (3, 5, 10):
+                assert calculate_news_weight(
+                    record, rank_threshold=threshold
+                ) == calculate_news_weight(as_dict, rank_threshold=threshold)
+
+
+class TestMemoryUsage:
+    """内存占用对比测试类：与原来每条标题一个字典的结构比较"""
+
+    def test_title_info_savings(self):
+        """测试累计记录和视图的内存占用不到原来两个字典的六成
+
+        原来 all_results 和 title_info 中各有一个字典，
+        现在是一个累计记录和一个读取它的 TitleResult 视图
+        """
+        _, title_info = build_day()
+
+        record_size = traced_size(
+            lambda: {
+                source_id: {
+                    title: TitleResult(TitleAccumulator.from_list(record.to_list()))
+                    for title, record in titles.items()
+                }
+                for source_id, titles in title_info.items()
+            }
+        )
+        dict_size = traced_size(
+            lambda: {
+                source_id: {
+                    title: (
+                        dict(record.to_dict(), ranks=list(record.ranks)),
+                        {"ranks": record.ranks, "url": record.url, "mobileUrl": ""},
+                    )
+                    for title, record in titles.items()
+                }
+                for source_id, titles in title_info.items()
+            }
+        )
+
+        assert record_size < dict_size * 0.6
+
+    def test_matched_news_savings(self):
+        """测试匹配结果引用标题记录后内存占用不到字典的一半"""
+        all_results, title_info = build_day()
+        id_to_name = {source_id: source_id for source_id in all_results}
+
+        matched = traced_size(
+            lambda: count_word_frequency(all_results, [], [], id_to_name, title_info)
+        )
+        matched_news = count_word_frequency(all_results, [], [], id_to_name, title_info)
+        as_dicts = traced_size(lambda: [news.to_dict() for news in matched_news])
+
+        assert len(matched_news) == sum(len(titles) for titles in all_results.values())
+        # 匹配过程本身的临时分配也计入记录一侧
+        assert matched < as_dicts * 0.5
@@ -0,0 +1,146 @@
+"""
+测试进程内定时调度模块
+"""
+
+import threading
+from datetime import datetime
+
+import pytest
+import pytz
+
+from trendradar.utils import scheduler as scheduler_module
+from trendradar.utils.exceptions import ConfigError
+from trendradar.utils.scheduler import CronSchedule, CronScheduler
+
+
+class TestCronSchedule:
+    """cron 表达式解析测试类"""
+
+    def test_every_thirty_minutes(self):
+        """测试 */30 间隔"""
+        schedule = CronSchedule("*/30 * * * *")
+        assert schedule.minutes == {0, 30}
+        assert schedule.next_after(datetime(2025, 1, 1, 8, 0)) == datetime(
+            2025, 1, 1, 8, 30
+        )
+        assert schedule.next_after(datetime(2025, 1, 1, 8, 45, 12)) == datetime(
+            2025, 1, 1, 9, 0
+        )
+
+    def test_next_is_strictly_later(self):
+        """测试恰好在触发点时返回下一个触发点"""
+        schedule = CronSchedule("0 * * * *")
+        assert schedule.next_after(datetime(2025, 1, 1, 8, 0)) == datetime(
+            2025, 1, 1, 9, 0
+        )
+
+    def test_ranges_lists_and_steps(self):
+        """测试范围、列表和带步长的范围"""
+        schedule = CronSchedule("5,10-12 8-20/4 * * *")
+        assert schedule.minutes == {5, 10, 11, 12}
+        assert schedule.hours == {8, 12, 16, 20}
+        assert schedule.next_after(datetime(2025, 1, 1, 20, 12)) == datetime(
+            2025, 1, 2, 8, 5
+        )
+
+    def test_weekday_and_sunday_alias(self):
+        """测试星期字段，7 与 0 都表示周日"""
+        schedule = CronSchedule("0 9 * * 7")
+        assert schedule.weekdays == {0}
+        # 2025-01-01 为周三，下一个周日为 01-05
+        assert schedule.next_after(datetime(2025, 1, 1)) == datetime(2025, 1, 5, 9, 0)
+
+    def test_day_or_weekday(self):
+        """测试日和周同时受限时取并集"""
+        schedule = CronSchedule("0 0 15 * 1")
+        # 2025-01-06 为周一，早于 15 号
+        assert schedule.next_after(datetime(2025, 1, 1)) == datetime(2025, 1, 6)
+        assert schedule.next_after(datetime(2025, 1, 13)) == datetime(2025, 1, 15)
+
+    def test_month_rollover(self):
+        """测试跨月、跨年"""
+        schedule = CronSchedule("0 0 1 1 *")
+        assert schedule.next_after(datetime(2025, 3, 10)) == datetime(2026, 1, 1)
+
+    def test_alias(self):
+        """测试 @hourly 等别名"""
+        schedule = CronSchedule("@hourly")
+        assert schedule.next_after(datetime(2025, 1, 1, 8, 15)) == datetime(
+            2025, 1, 1, 9, 0
+        )
+
+    @pytest.mark.parametrize(
+        "expression",
+        ["*/30 * * *", "60 * * * *", "*/0 * * * *", "a * * * *", "5-1 * * * *"],
+    )
+    def test_invalid_expression(self, expression):
+        """测试非法表达式"""
+        with pytest.raises(ConfigError):
+            CronSchedule(expression)
+
+    def test_never_fires(self):
+        """测试永远不会触发的表达式"""
+        with pytest.raises(ConfigError):
+            CronSchedule("0 0 30 2 *").next_after(datetime(2025, 1, 1))
+
+
+class TestCronScheduler:
+    """定时调度器测试类"""
+
+    def test_run_immediately_and_stop(self):
+        """测试立即运行一次，stop 后退出"""
+        runs = []
+        scheduler = None
+
+        def job():
+            runs.append(1)
+            scheduler.stop()
+
+        scheduler = CronScheduler("0 0 1 1 *", job)
+        scheduler.run_forever(run_immediately=True)
+        assert runs == [1]
+
+    def test_stop_interrupts_wait(self):
+        """测试等待下次触发时可以被 stop 打断"""
+        scheduler = CronScheduler("0 0 1 1 *", lambda: None)
+        thread = threading.Thread(target=scheduler.run_forever)
+        thread.start()
+        scheduler.stop()
+        thread.join(timeout=2)
+        assert not thread.is_alive()
+
+    def test_job_error_does_not_stop_scheduler(self):
+        """测试任务异常不会中断调度"""
+        runs = []
+        now = [datetime(2025, 1, 1, 8, 0, 59, 990000)]
+        scheduler = None
+
+        def job():
+            runs.append(1)
+            now[0] = now[0].replace(minute=now[0].minute + 1)
+            if len(runs) >= 3:
+                scheduler.stop()
+            raise RuntimeError("boom")
+
+        scheduler = CronScheduler("* * * * *", job)
+        scheduler.run_forever(now_func=lambda: now[0])
+        assert len(runs) == 3
+
+    def test_default_clock_is_beijing_time(self, monkeypatch):
+        """测试默认按北京时间计算触发时间"""
+        beijing = pytz.timezone("Asia/Shanghai")
+        calls = []
+
+        def now():
+            calls.append(1)
+            return beijing.localize(datetime(2025, 1, 1, 8, 0, 59, 990000))
+
+        monkeypatch.setattr(scheduler_module, "get_beijing_time", now)
+        scheduler = None
+
+        def job():
+            scheduler.stop()
+
+        scheduler = CronScheduler("* * * * *", job)
+        scheduler.run_forever()
+        assert calls
@@ -0,0 +1,200 @@
+"""
+测试当日已见标题索引模块
+"""
+
+import os
+
+import pytest
+
+from trendradar.core import seen_index as seen_index_module
+from trendradar.core import storage
+from trendradar.core.analyzer import detect_latest_new_titles
+from trendradar.core.seen_index import SeenTitleIndex
+from trendradar.core.storage import parse_file_titles, save_titles_to_file
+from trendradar.utils.time_utils import format_date_folder
+
+DATE_FOLDER = "2025年10月08日"
+
+
+def write_snapshot(txt_dir, name, platforms):
+    """写入一个快照文件 platforms: {platform_id: [title, ...]}"""
+    txt_dir.mkdir(parents=True, exist_ok=True)
+    lines = []
+    for platform_id, titles in platforms.items():
+        lines.append(f"{platform_id} | {platform_id.upper()}")
+        for rank, title in enumerate(titles, 1):
+            lines.append(f"{rank}. {title} [URL:https://example.com/{title}]")
+        lines.append("")
+    (txt_dir / f"{name}.txt").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def full_scan(txt_dir, current_platform_ids=None):
+    """旧实现：重新解析全部历史快照后与最新快照比较"""
+    files = sorted(f for f in txt_dir.iterdir() if f.suffix == ".txt")
+    if len(files) < 2:
+        return {}
+
+    historical = {}
+    for file_path in files[:-1]:
+        titles_by_id, _ = parse_file_titles(file_path)
+        for source_id, title_data in titles_by_id.items():
+            historical.setdefault(source_id, set()).update(title_data)
+
+    latest, _ = parse_file_titles(files[-1])
+    new_titles = {}
+    for source_id, title_data in latest.items():
+        if current_platform_ids is not None and source_id not in current_platform_ids:
+            continue
+        source_new = {
+            title: data
+            for title, data in title_data.items()
+            if title not in historical.get(source_id, set())
+        }
+        if source_new:
+            new_titles[source_id] = source_new
+    return new_titles
+
+
+SNAPSHOTS = [
+    ("08时00分", {"baidu": ["A", "B"], "weibo": ["C"]}),
+    ("08时05分", {"baidu": ["B", "D", "A"]}),
+    ("08时10分", {"weibo": ["C", "E"], "baidu": ["D", "F", "A"]}),
+]
+
+
+@pytest.fixture
+def output_dir(tmp_path):
+    return tmp_path / "output"
+
+
+@pytest.fixture
+def txt_dir(output_dir):
+    return output_dir / DATE_FOLDER / "txt"
+
+
+class TestSeenTitleIndex:
+    """已见标题索引测试类"""
+
+    def test_matches_full_scan_after_each_snapshot(self, output_dir, txt_dir):
+        """测试每写入一个快照后的检测结果与全量扫描一致"""
+        index = SeenTitleIndex(DATE_FOLDER, str(output_dir))
+        for name, platforms in SNAPSHOTS:
+            write_snapshot(txt_dir, name, platforms)
+            assert index.refresh() == 1
+            for platform_ids in (None, ["baidu"], ["weibo"]):
+                assert index.new_titles(platform_ids) == full_scan(
+                    txt_dir, platform_ids
+                )
+
+        assert index.new_titles() == {
+            "weibo": {
+                "E": {"ranks": [2], "url": "https://example.com/E", "mobileUrl": ""}
+            },
+            "baidu": {
+                "F": {"ranks": [2], "url": "https://example.com/F", "mobileUrl": ""}
+            },
+        }
+
+    def test_single_snapshot_has_no_new_titles(self, output_dir, txt_dir):
+        """测试只有一个快照时不检测新增"""
+        write_snapshot(txt_dir, "08时00分", {"baidu": ["A"]})
+        index = SeenTitleIndex(DATE_FOLDER, str(output_dir))
+        index.refresh()
+        assert index.new_titles() == {}
+
+    def test_survives_restart(self, output_dir, txt_dir):
+        """测试重启后加载状态，只索引新增快照"""
+        for name, platforms in SNAPSHOTS[:2]:
+            write_snapshot(txt_dir, name, platforms)
+        index = SeenTitleIndex(DATE_FOLDER, str(output_dir))
+        index.refresh()
+        index.save()
+
+        write_snapshot(txt_dir, *SNAPSHOTS[2])
+        restarted = SeenTitleIndex(DATE_FOLDER, str(output_dir))
+        assert restarted.load()
+        assert restarted.refresh() == 1
+        assert restarted.new_titles() == full_scan(txt_dir)
+
+    def test_rewritten_snapshot_triggers_rebuild(self, output_dir, txt_dir):
+        """测试已索引的快照被改写时从快照重建"""
+        for name, platforms in SNAPSHOTS:
+            write_snapshot(txt_dir, name, platforms)
+        index = SeenTitleIndex(DATE_FOLDER, str(output_dir))
+        index.refresh()
+
+        write_snapshot(txt_dir, "08时00分", {"baidu": ["F"]})
+        stat = (txt_dir / "08时00分.txt").stat()
+        os.utime(txt_dir / "08时00分.txt", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+
+        assert index.refresh() == 3
+        assert index.new_titles() == full_scan(txt_dir)
+        assert "F" not in index.new_titles().get("baidu", {})
+
+    def test_invalid_state_is_ignored(self, output_dir):
+        """测试状态文件损坏或日期不符时加载失败"""
+        index = SeenTitleIndex(DATE_FOLDER, str(output_dir))
+        index.state_path.parent.mkdir(parents=True)
+        index.state_path.write_text("{broken", encoding="utf-8")
+        assert not index.load()
+
+        other_day = SeenTitleIndex("2025年10月09日", str(output_dir))
+        other_day.save()
+        other_day.state_path.replace(index.state_path)
+        assert not index.load()
+
+    def test_hash_collision_checks_exact_title(self, output_dir, txt_dir, monkeypatch):
+        """测试哈希碰撞的新标题仍被识别为新增，重启后结果不变"""
+        monkeypatch.setattr(seen_index_module, "hash_title", lambda title: 1)
+        write_snapshot(txt_dir, "08时00分", {"baidu": ["A"]})
+        write_snapshot(txt_dir, "08时05分", {"baidu": ["A", "B", "C"]})
+
+        index = SeenTitleIndex(DATE_FOLDER, str(output_dir))
+        index.refresh()
+        assert set(index.new_titles()["baidu"]) == {"B", "C"}
+        assert index.new_titles() == full_scan(txt_dir)
+
+        index.save()
+        write_snapshot(txt_dir, "08时10分", {"baidu": ["B", "D"]})
+        restarted = SeenTitleIndex(DATE_FOLDER, str(output_dir))
+        assert restarted.load()
+        assert restarted.refresh() == 1
+        assert set(restarted.new_titles()["baidu"]) == {"D"}
+        assert restarted.new_titles() == full_scan(txt_dir)
+
+
+class TestDetectLatestNewTitles:
+    """基于索引的新增检测测试类"""
+
+    def test_save_updates_index_and_detect(self, tmp_path, monkeypatch):
+        """测试写入快照时更新索引，新增检测结果与全量扫描一致"""
+        monkeypatch.chdir(tmp_path)
+        index = SeenTitleIndex()
+        for name, platforms in SNAPSHOTS:
+            monkeypatch.setattr(storage, "format_time_filename", lambda t=name: t)
+            results = {
+                platform_id: {
+                    title: {"ranks": [rank], "url": "", "mobileUrl": ""}
+                    for rank, title in enumerate(titles, 1)
+                }
+                for platform_id, titles in platforms.items()
+            }
+            save_titles_to_file(results, {}, [], seen_index=index)
+            assert index.latest_snapshot == f"{name}.txt"
+
+        txt_dir = tmp_path / "output" / format_date_folder() / "txt"
+        assert index.state_path.exists()
+        assert detect_latest_new_titles(seen_index=index) == full_scan(txt_dir)
+        # 不传索引时从状态文件加载
+        assert detect_latest_new_titles(["baidu"]) == full_scan(txt_dir, ["baidu"])
+
+    def test_stale_index_rolls_over(self, tmp_path, monkeypatch):
+        """测试跨天后不复用前一天的索引"""
+        monkeypatch.chdir(tmp_path)
+        stale = SeenTitleIndex("2000年01月01日")
+        txt_dir = tmp_path / "output" / format_date_folder() / "txt"
+        write_snapshot(txt_dir, "08时00分", {"baidu": ["A"]})
+        write_snapshot(txt_dir, "08时05分", {"baidu": ["A", "B"]})
+
+        assert detect_latest_new_titles(seen_index=stale) == full_scan(txt_dir)
+        assert stale.applied_files == {}
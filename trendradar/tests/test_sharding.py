@@ -0,0 +1,296 @@
+"""
+测试分片抓取模块
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from collections import Counter
+from pathlib import Path
+
+import pytest
+import yaml
+
+from trendradar.core.sharding import ShardRun, select_shard, shard_of
+from trendradar.core.storage import parse_snapshot_file
+from trendradar.utils.exceptions import ConfigError, FetchError
+from trendradar.utils.metrics import RunMetrics
+from trendradar.utils.validator import ConfigValidator
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+PLATFORMS = [
+    {"id": pid, "name": pid}
+    for pid in ("baidu", "weibo", "zhihu", "toutiao", "douyin", "tieba")
+]
+
+TITLES = {"标题A": {"ranks": [1], "url": "", "mobileUrl": ""}}
+
+
+def platform_ids(index: int, count: int = 3):
+    """分片负责的平台ID"""
+    return [p["id"] for p in select_shard(PLATFORMS, index, count)]
+
+
+@pytest.fixture
+def api_server(newsnow):
+    """本地 API 模拟服务，每个平台返回一条标题"""
+    return newsnow(item_count=1)
+
+
+class TestShardAssignment:
+    """分片分配测试类"""
+
+    def test_every_platform_in_one_shard(self):
+        """测试每个平台恰好属于一个分片，并保持配置顺序"""
+        shards = [platform_ids(i) for i in range(3)]
+        assert sorted(sum(shards, [])) == sorted(p["id"] for p in PLATFORMS)
+        assert all(shards)
+        assert shards[2] == ["baidu", "weibo", "douyin"]
+
+    def test_stable_across_processes(self):
+        """测试不同进程（不同的哈希盐）得到相同的分配"""
+        code = (
+            "from trendradar.core.sharding import shard_of;"
+            "print([shard_of(p, 3) for p in ('baidu', 'weibo', 'zhihu')])"
+        )
+        outputs = {
+            subprocess.run(
+                [sys.executable, "-c", code],
+                cwd=PROJECT_ROOT,
+                env={**os.environ, "PYTHONHASHSEED": seed},
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+            for seed in ("1", "2")
+        }
+        assert outputs == {str([shard_of(p, 3) for p in ("baidu", "weibo", "zhihu")])}
+
+
+class TestShardMerge:
+    """分片合并测试类"""
+
+    def write_shard(self, shard_run: ShardRun, index: int, written_at: float = 1.0):
+        """写入一个所有平台都成功的分片"""
+        ids = platform_ids(index)
+        results = {pid: TITLES for pid in ids}
+        return shard_run.write(index, ids, results, [], [], [], {}, written_at)
+
+    def test_merge_matches_single_node(self, tmp_path):
+        """测试合并结果与单节点抓取相同，按平台配置顺序排列"""
+        shard_run = ShardRun("run", 3, str(tmp_path))
+        for index in range(3):
+            self.write_shard(shard_run, index)
+
+        with RunMetrics() as metrics:
+            results, id_to_name, failed, unchanged, cancelled, stale = shard_run.merge(
+                PLATFORMS
+            )
+
+        assert list(results) == [p["id"] for p in PLATFORMS]
+        assert id_to_name == {p["id"]: p["name"] for p in PLATFORMS}
+        assert (failed, unchanged, cancelled, stale) == ([], [], [], {})
+        assert metrics.to_dict()["extra"]["shards"]["merged"] == [0, 1, 2]
+
+    def test_statuses_preserved(self, tmp_path):
+        """测试失败、未变化、取消和缓存数据的平台原样合并"""
+        shard_run = ShardRun("run", 3, str(tmp_path))
+        self.write_shard(shard_run, 0)
+        self.write_shard(shard_run, 1)
+        shard_run.write(
+            2,
+            ["baidu", "weibo", "douyin"],
+            {"baidu": TITLES},
+            ["weibo"],
+            [],
+            ["douyin"],
+            {"baidu": 90.0},
+        )
+
+        results, _, failed, _, cancelled, stale = shard_run.merge(PLATFORMS)
+
+        assert "baidu" in results
+        assert failed == ["weibo"]
+        assert cancelled == ["douyin"]
+        assert stale == {"baidu": 90.0}
+
+    def test_missing_shard(self, tmp_path):
+        """测试缺失分片负责的平台按失败处理"""
+        shard_run = ShardRun("run", 3, str(tmp_path))
+        self.write_shard(shard_run, 0)
+        self.write_shard(shard_run, 1)
+
+        results, _, failed, _, _, _ = shard_run.merge(PLATFORMS)
+
+        assert failed == platform_ids(2)
+        assert set(results) == set(platform_ids(0) + platform_ids(1))
+        assert shard_run.report["missing"] == [2]
+        assert shard_run.report["uncovered"] == []
+
+    def test_duplicate_shard_keeps_latest(self, tmp_path):
+        """测试同一分片有多份输出时使用最后写入的一份"""
+        shard_run = ShardRun("run", 3, str(tmp_path))
+        for index in range(3):
+            self.write_shard(shard_run, index)
+        # 模拟另一个节点较早写入的同一分片
+        first = next(shard_run.path.glob("shard-0-of-3.*.json"))
+        first.rename(first.with_name("shard-0-of-3.other-node.json"))
+        newer = dict(TITLES, 标题B={"ranks": [2], "url": "", "mobileUrl": ""})
+        ids = platform_ids(0)
+        shard_run.write(0, ids, {pid: newer for pid in ids}, [], [], [], {}, 2.0)
+
+        results, _, _, _, _, _ = shard_run.merge(PLATFORMS)
+
+        assert all(results[pid] == newer for pid in ids)
+        assert shard_run.report["duplicates"] == {"0": 2}
+
+    def test_invalid_and_mismatched_shards_ignored(self, tmp_path):
+        """测试格式错误或分片总数不一致的文件被忽略"""
+        shard_run = ShardRun("run", 3, str(tmp_path))
+        self.write_shard(shard_run, 0)
+        ShardRun("run", 2, str(tmp_path)).write(1, ["toutiao"], {}, [], [], [], {})
+        (shard_run.path / "shard-2-of-3.broken.json").write_text("{", encoding="utf-8")
+
+        shard_run.merge(PLATFORMS)
+
+        assert shard_run.report["merged"] == [0]
+        assert shard_run.report["missing"] == [1, 2]
+
+    def test_no_shards(self, tmp_path):
+        """测试没有任何分片输出时报错"""
+        with pytest.raises(FetchError):
+            ShardRun("run", 3, str(tmp_path)).merge(PLATFORMS)
+
+    def test_latest_run(self, tmp_path):
+        """测试按运行ID找到最近一次运行"""
+        assert ShardRun.latest(3, str(tmp_path / "none")) is None
+        for run_id in ("20250101-0800", "20250101-0830"):
+            ShardRun(run_id, 3, str(tmp_path)).write(0, [], {}, [], [], [], {})
+        assert ShardRun.latest(3, str(tmp_path)).run_id == "20250101-0830"
+
+
+class TestShardedRun:
+    """多进程分片运行测试类：在同一台机器上以独立进程模拟多个工作节点"""
+
+    def write_config(self, tmp_path: Path, api_url: str) -> Path:
+        """写入请求本地服务、关闭推送的配置文件"""
+        with open(PROJECT_ROOT / "config" / "config.yaml", encoding="utf-8") as f:
+            config = yaml.safe_load(f)
+        config["crawler"]["api_endpoints"] = [api_url]
+        config["notification"]["enable_notification"] = False
+        config["platforms"] = PLATFORMS
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(yaml.safe_dump(config, allow_unicode=True), "utf-8")
+        return config_path
+
+    def start(self, cwd: Path, env: dict, *args) -> subprocess.Popen:
+        """在独立工作目录中启动 main.py，模拟一个节点"""
+        cwd.mkdir(parents=True, exist_ok=True)
+        return subprocess.Popen(
+            [sys.executable, str(PROJECT_ROOT / "main.py"), *args],
+            cwd=cwd,
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+
+    def make_env(self, config_path: Path, shard_dir: Path, **shard) -> dict:
+        """节点环境变量，去掉会影响运行的外部配置"""
+        env = {
+            key: value
+            for key, value in os.environ.items()
+            if not key.endswith(("_WEBHOOK_URL", "_BOT_TOKEN", "_CHAT_ID"))
+            and key not in ("GITHUB_ACTIONS", "STORAGE_BACKEND")
+        }
+        env.update(
+            CONFIG_PATH=str(config_path),
+            FREQUENCY_WORDS_PATH=str(PROJECT_ROOT / "config" / "frequency_words.txt"),
+            SHARD_COUNT="3",
+            SHARD_RUN_ID="test-run",
+            SHARD_DIR=str(shard_dir),
+            **shard,
+        )
+        return env
+
+    @pytest.mark.asyncio
+    async def test_workers_then_merge(self, api_server, tmp_path):
+        """测试多个工作进程各抓取一个分片，汇总后写入包含全部平台的快照"""
+        config_path = self.write_config(tmp_path, api_server.url)
+        shard_dir = tmp_path / "shards"
+        loop = asyncio.get_running_loop()
+
+        def run_all(processes):
+            outputs = [proc.communicate(timeout=60)[0] for proc in processes]
+            for proc, output in zip(processes, outputs):
+                assert proc.returncode == 0, output
+            return outputs
+
+        # 分片 1 被两个节点重复执行
+        workers = [
+            self.start(
+                tmp_path / f"worker{n}",
+                self.make_env(config_path, shard_dir, SHARD_INDEX=str(index)),
+            )
+            for n, index in enumerate((0, 1, 2, 1))
+        ]
+        await loop.run_in_executor(None, run_all, workers)
+
+        assert api_server.platform_requests == Counter(
+            [p["id"] for p in PLATFORMS] + platform_ids(1)
+        )
+        # 工作节点只写分片输出，不写快照
+        assert not list((tmp_path / "worker0" / "output").glob("*/txt/*.txt"))
+        assert len(list((shard_dir / "test-run").glob("shard-*.json"))) == 4
+
+        coordinator = self.start(
+            tmp_path / "coordinator",
+            self.make_env(config_path, shard_dir),
+            "--merge-shards",
+        )
+        await loop.run_in_executor(None, run_all, [coordinator])
+
+        output = tmp_path / "coordinator" / "output"
+        snapshots = list(output.glob("*/txt/*.txt"))
+        assert len(snapshots) == 1
+        titles, _, _, _ = parse_snapshot_file(snapshots[0])
+        assert list(titles) == [p["id"] for p in PLATFORMS]
+        item = api_server.items("zhihu")[0]
+        assert titles["zhihu"] == {
+            item["title"]: {
+                "ranks": [1],
+                "url": item["url"],
+                "mobileUrl": item["mobileUrl"],
+            }
+        }
+
+        metrics_file = next((output / "metrics").glob("*.jsonl"))
+        shards = json.loads(metrics_file.read_text("utf-8"))["extra"]["shards"]
+        assert shards["merged"] == [0, 1, 2]
+        assert shards["duplicates"] == {"1": 2}
+        assert shards["missing"] == []
+
+
+class TestShardingConfig:
+    """分片配置验证测试类"""
+
+    def test_index_out_of_range(self, sample_config):
+        """测试分片序号超出分片总数时报错"""
+        sample_config["SHARDING"] = {"COUNT": 3, "INDEX": 3}
+        with pytest.raises(ConfigError):
+            ConfigValidator().validate(sample_config)
+
+    def test_invalid_count(self, sample_config):
+        """测试分片总数不是正整数时报错（如环境变量无法解析为整数）"""
+        sample_config["SHARDING"] = {"COUNT": "three", "INDEX": 0}
+        with pytest.raises(ConfigError):
+            ConfigValidator().validate(sample_config)
+
+    def test_invalid_run_id(self, sample_config):
+        """测试运行ID不是合法目录名时报错"""
+        sample_config["SHARDING"] = {"COUNT": 2, "INDEX": 0, "RUN_ID": "../run"}
+        with pytest.raises(ConfigError):
+            ConfigValidator().validate(sample_config)
@@ -0,0 +1,248 @@
+"""
+测试 SQLite 快照存储模块
+"""
+
+import pytest
+
+from trendradar.core import snapshot_store as snapshot_store_module
+from trendradar.core import storage
+from trendradar.core.aggregate import DayAggregate
+from trendradar.core.analyzer import detect_latest_new_titles
+from trendradar.core.snapshot_store import SnapshotStore, hash_title
+from trendradar.core.storage import read_all_today_titles, save_titles_to_file
+from trendradar.utils.time_utils import format_date_folder
+
+DATE_FOLDER = "2025年10月08日"
+
+
+def make_results(platforms):
+    """platforms: {platform_id: [title, ...]}，排名按顺序从 1 开始"""
+    return {
+        platform_id: {
+            title: {
+                "ranks": [rank],
+                "url": f"https://example.com/{rank}",
+                "mobileUrl": "",
+            }
+            for rank, title in enumerate(titles, 1)
+        }
+        for platform_id, titles in platforms.items()
+    }
+
+
+ID_TO_NAME = {"baidu": "百度热搜", "weibo": "微博"}
+
+SNAPSHOTS = [
+    ("08时00分", {"baidu": ["A", "B"], "weibo": ["C"]}, []),
+    ("08时05分", {"baidu": ["B", "D", "A"]}, ["weibo"]),
+    ("08时10分", {"weibo": ["C", "E"], "baidu": ["D", "F"]}, []),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SnapshotStore(output_dir=str(tmp_path / "output"))
+    yield store
+    store.close()
+
+
+class TestSnapshotStore:
+    """SQLite 快照存储测试类"""
+
+    def test_wal_and_indexes(self, store):
+        """测试 WAL 模式与索引"""
+        assert store.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        indexes = {
+            row[0]
+            for row in store.conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'"
+            )
+        }
+        assert "idx_observations_platform_title" in indexes
+        assert "idx_snapshots_created_at" in indexes
+
+    def test_round_trip_titles_that_break_txt(self, store):
+        """测试 txt 格式无法正确解析的标题可以原样保存"""
+        titles = ["1. 开头像排名", "标题 [URL:假的] 结尾", "普通 [MOBILE:x] 标题"]
+        results = make_results({"baidu": titles})
+
+        snapshot_id = store.save_snapshot(
+            results, ID_TO_NAME, [], date_folder=DATE_FOLDER, time_info="08时00分"
+        )
+        titles_by_id, id_to_name = store.load_snapshot(snapshot_id)
+
+        assert list(titles_by_id["baidu"]) == titles
+        assert titles_by_id["baidu"]["标题 [URL:假的] 结尾"] == {
+            "ranks": [2],
+            "url": "https://example.com/2",
+            "mobileUrl": "",
+        }
+        assert id_to_name == {"baidu": "百度热搜"}
+
+    def test_platform_status_and_replace(self, store):
+        """测试记录失败平台，同一时间的快照被替换"""
+        store.save_snapshot(
+            make_results({"baidu": ["A"]}),
+            ID_TO_NAME,
+            ["weibo"],
+            date_folder=DATE_FOLDER,
+            time_info="08时00分",
+        )
+        snapshot_id = store.save_snapshot(
+            make_results({"baidu": ["B"]}),
+            ID_TO_NAME,
+            [],
+            date_folder=DATE_FOLDER,
+            time_info="08时00分",
+        )
+
+        assert store.list_snapshots(DATE_FOLDER) == [(snapshot_id, "08时00分")]
+        titles_by_id, _ = store.load_snapshot(snapshot_id)
+        assert list(titles_by_id["baidu"]) == ["B"]
+        # 被替换快照的观测记录随之删除
+        assert (
+            store.conn.execute("SELECT COUNT(*) FROM observations").fetchone()[0] == 1
+        )
+
+        store.save_snapshot(
+            {}, ID_TO_NAME, ["weibo"], date_folder=DATE_FOLDER, time_info="08时05分"
+        )
+        statuses = store.conn.execute(
+            "SELECT platform_id, status FROM snapshot_platforms sp "
+            "JOIN snapshots s ON s.id = sp.snapshot_id WHERE s.time_info = '08时05分'"
+        ).fetchall()
+        assert statuses == [("weibo", "failed")]
+
+    def test_detect_uses_title_index(self, store):
+        """测试新增检测使用 (platform_id, title_hash) 索引"""
+        plan = store.conn.execute(
+            "EXPLAIN QUERY PLAN SELECT 1 FROM observations "
+            "WHERE platform_id = ? AND title_hash = ?",
+            ("baidu", hash_title("A")),
+        ).fetchall()
+        assert any("idx_observations_platform_title" in row[-1] for row in plan)
+
+
+class TestSqliteBackendEquivalence:
+    """SQLite 与 txt 存储结果一致性测试类"""
+
+    @pytest.fixture
+    def saved(self, tmp_path, monkeypatch):
+        """同时写入数据库和 txt，返回 store"""
+        monkeypatch.chdir(tmp_path)
+        store = SnapshotStore()
+        for time_info, platforms, failed in SNAPSHOTS:
+            monkeypatch.setattr(storage, "format_time_filename", lambda t=time_info: t)
+            monkeypatch.setattr(
+                snapshot_store_module, "format_time_filename", lambda t=time_info: t
+            )
+            save_titles_to_file(
+                make_results(platforms), ID_TO_NAME, failed, store=store
+            )
+        yield store
+        store.close()
+
+    def test_aggregate_matches_txt(self, saved):
+        """测试当日聚合结果一致"""
+        date_folder = format_date_folder()
+        txt_aggregate = DayAggregate(date_folder)
+        sqlite_aggregate = DayAggregate(date_folder, store=saved)
+
+        assert txt_aggregate.refresh() == 3
+        assert sqlite_aggregate.refresh() == 3
+        assert sqlite_aggregate.view() == txt_aggregate.view()
+        assert sqlite_aggregate.refresh() == 0
+
+    def test_read_all_today_titles_matches_txt(self, saved):
+        """测试 read_all_today_titles 结果一致"""
+        txt_view = read_all_today_titles(["baidu"])
+        sqlite_view = read_all_today_titles(["baidu"], store=saved)
+        assert sqlite_view == txt_view
+
+    def test_state_backend_mismatch_rebuilds(self, saved):
+        """测试状态文件来自另一种存储后端时重建"""
+        txt_aggregate = DayAggregate()
+        txt_aggregate.refresh()
+        txt_aggregate.save()
+
+        sqlite_aggregate = DayAggregate(store=saved)
+        assert not sqlite_aggregate.load()
+
+    def test_detect_new_titles_matches_txt(self, saved):
+        """测试新增检测结果一致"""
+        assert detect_latest_new_titles(store=saved) == detect_latest_new_titles()
+        assert detect_latest_new_titles(["weibo"], store=saved) == {
+            "weibo": {
+                "E": {"ranks": [2], "url": "https://example.com/2", "mobileUrl": ""}
+            }
+        }
+
+    def test_unchanged_platforms_match_txt(self, saved, monkeypatch):
+        """测试内容未变化的平台在两种存储中沿用结果一致"""
+        for module in (storage, snapshot_store_module):
+            monkeypatch.setattr(module, "format_time_filename", lambda: "08时15分")
+        save_titles_to_file(
+            make_results({"baidu": ["G"]}),
+            ID_TO_NAME,
+            [],
+            store=saved,
+            unchanged_ids=["weibo"],
+        )
+
+        txt_aggregate = DayAggregate()
+        sqlite_aggregate = DayAggregate(store=saved)
+        txt_aggregate.refresh()
+        sqlite_aggregate.refresh()
+
+        assert sqlite_aggregate.view() == txt_aggregate.view()
+        assert sqlite_aggregate.title_info["weibo"]["E"]["last_time"] == "08时15分"
+        assert detect_latest_new_titles(store=saved) == detect_latest_new_titles()
+
+    def test_sqlite_only(self, tmp_path, monkeypatch):
+        """测试关闭 txt 导出时只写数据库"""
+        monkeypatch.chdir(tmp_path)
+        store = SnapshotStore()
+        try:
+            path = save_titles_to_file(
+                make_results({"baidu": ["A"]}),
+                ID_TO_NAME,
+                [],
+                store=store,
+                export_txt=False,
+            )
+            assert path == str(store.db_path)
+            assert not (tmp_path / "output" / format_date_folder() / "txt").exists()
+            assert read_all_today_titles(store=store)[0] == {
+                "baidu": make_results({"baidu": ["A"]})["baidu"]
+            }
+        finally:
+            store.close()
+
+    def test_stale_platforms_match_txt(self, saved, monkeypatch):
+        """测试使用缓存数据的平台在两种存储中都不计入次数、不参与新增检测"""
+        for module in (storage, snapshot_store_module):
+            monkeypatch.setattr(module, "format_time_filename", lambda: "08时15分")
+        save_titles_to_file(
+            make_results({"baidu": ["G"], "weibo": ["C", "E", "H"]}),
+            ID_TO_NAME,
+            [],
+            store=saved,
+            stale_ids=["weibo"],
+        )
+
+        txt_aggregate = DayAggregate()
+        sqlite_aggregate = DayAggregate(store=saved)
+        txt_aggregate.refresh()
+        sqlite_aggregate.refresh()
+
+        assert sqlite_aggregate.view() == txt_aggregate.view()
+        assert saved.stale_platforms(
+            saved.list_snapshots(format_date_folder())[-1][0]
+        ) == ["weibo"]
+        weibo = sqlite_aggregate.title_info["weibo"]
+        assert weibo["C"]["count"] == 2
+        assert weibo["E"]["last_time"] == "08时10分"
+        # 缓存中当日尚未出现过的标题补入结果，不计为新增
+        assert weibo["H"]["count"] == 1
+        assert detect_latest_new_titles(store=saved) == detect_latest_new_titles()
+        assert set(detect_latest_new_titles(store=saved)) == {"baidu"}
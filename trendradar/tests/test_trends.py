@@ -0,0 +1,255 @@
+"""
+测试排名走势模块
+"""
+
+import math
+import random
+
+import pytest
+
+from trendradar.core import trends
+from trendradar.core.aggregate import DayAggregate
+from trendradar.core.matcher import calculate_news_weight, count_word_frequency
+from trendradar.core.records import TitleRecord
+from trendradar.core.reporter import prepare_report_data, render_html_content
+from trendradar.core.trends import RankTrajectories, TitleTrend, format_trend_display
+from trendradar.utils.exceptions import ConfigError
+from trendradar.utils.validator import ConfigValidator
+
+from .test_aggregate import DATE_FOLDER, write_snapshot
+
+requires_numpy = pytest.mark.skipif(trends.np is None, reason="未安装 numpy")
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    """分别使用向量化计算和纯 Python 计算"""
+    if request.param == "numpy":
+        if trends.np is None:
+            pytest.skip("未安装 numpy")
+    else:
+        monkeypatch.setattr(trends, "np", None)
+    return request.param
+
+
+def observe_day(trajectories: RankTrajectories, snapshots):
+    """按顺序记录快照 [(时间, {标题: 排名})]，排名为 None 表示不在榜"""
+    for time_info, ranks in snapshots:
+        title_data = {
+            title: {"ranks": [rank], "url": "", "mobileUrl": ""}
+            for title, rank in ranks.items()
+            if rank is not None
+        }
+        trajectories.observe("baidu", time_info, title_data)
+
+
+def random_day(seed: int) -> RankTrajectories:
+    """随机生成的一天，包含不等的快照间隔、掉榜和回榜"""
+    rng = random.Random(seed)
+    trajectories = RankTrajectories()
+    minutes = 0
+    for _ in range(60):
+        minutes += rng.choice([5, 5, 10, 20])
+        time_info = f"{minutes // 60:02d}时{minutes % 60:02d}分"
+        for platform in ("baidu", "weibo"):
+            title_data = {
+                f"标题{n}": {"ranks": [rng.randint(1, 50)]}
+                for n in range(40)
+                if rng.random() < 0.7
+            }
+            trajectories.observe(platform, time_info, title_data)
+    return trajectories
+
+
+class TestTitleTrend:
+    """排名走势计算测试类"""
+
+    def test_known_trajectory(self, backend):
+        """测试峰值、时长、速度、加速度和回榜次数"""
+        trajectories = RankTrajectories()
+        observe_day(
+            trajectories,
+            [
+                ("08时00分", {"A": 8, "B": 20}),
+                ("08时30分", {"A": 5, "B": 20}),
+                ("09时00分", {"A": None, "B": 20}),
+                ("09时30分", {"A": 3, "B": None}),
+                ("10时00分", {"A": 1, "B": None}),
+            ],
+        )
+
+        result = trajectories.analyze(top_n=5)["baidu"]
+
+        a = result["A"]
+        assert (a.peak_rank, a.top_minutes, a.dwell_minutes) == (1, 90.0, 120.0)
+        # 最近一步 3 → 1 用时 30 分钟，上一步 8 → 5
+        assert a.velocity == 4.0
+        assert a.acceleration == pytest.approx((4.0 - 6.0) * 60 / 90)
+        assert a.reentries == 1
+        assert result["B"] == TitleTrend(20, 0.0, 90.0, 0.0, 0.0, 0)
+
+    def test_single_snapshot(self, backend):
+        """测试只有一次快照时各项为 0"""
+        trajectories = RankTrajectories()
+        observe_day(trajectories, [("08时00分", {"A": 2})])
+        assert trajectories.analyze()["baidu"]["A"] == TitleTrend(2, 0.0, 0.0, 0, 0, 0)
+
+    @requires_numpy
+    def test_backends_agree(self, monkeypatch):
+        """测试向量化计算与纯 Python 计算结果完全相同"""
+        trajectories = random_day(7)
+        vectorized = trajectories.analyze(top_n=10)
+        monkeypatch.setattr(trends, "np", None)
+        assert trajectories.analyze(top_n=10) == vectorized
+        assert sum(len(titles) for titles in vectorized.values()) == 80
+
+    def test_platform_filter(self):
+        """测试只计算指定的平台"""
+        trajectories = random_day(1)
+        assert list(trajectories.analyze(platform_ids=["weibo"])) == ["weibo"]
+
+
+class TestRankTrajectories:
+    """排名记录测试类"""
+
+    @requires_numpy
+    def test_rank_matrix(self):
+        """测试排名矩阵的行为标题、列为快照，未在榜为 NaN"""
+        trajectories = RankTrajectories()
+        observe_day(
+            trajectories,
+            [("08时00分", {"A": 3, "B": 1}), ("08时05分", {"A": 2, "B": None})],
+        )
+        # 同一标题在一次快照中出现多次时取最好的排名
+        trajectories.observe("baidu", "08时10分", {"B": {"ranks": [9, 4]}})
+
+        titles, matrix = trajectories.rank_matrix("baidu")
+
+        assert titles == ["A", "B"]
+        assert matrix.shape == (2, 3)
+        assert matrix[0, :2].tolist() == [3.0, 2.0]
+        assert math.isnan(matrix[0, 2]) and math.isnan(matrix[1, 1])
+        assert matrix[1, 2] == 4.0
+
+    def test_rank_matrix_requires_numpy(self, monkeypatch):
+        """测试未安装 numpy 时构造矩阵报错"""
+        monkeypatch.setattr(trends, "np", None)
+        trajectories = RankTrajectories()
+        observe_day(trajectories, [("08时00分", {"A": 1})])
+        with pytest.raises(RuntimeError):
+            trajectories.rank_matrix("baidu")
+
+    def test_state_round_trip(self):
+        """测试状态可以还原，格式错误时报错"""
+        trajectories = random_day(3)
+        restored = RankTrajectories.from_state(trajectories.to_state())
+        assert restored.analyze() == trajectories.analyze()
+
+        state = trajectories.to_state()
+        state["baidu"]["titles"]["标题0"] = [999, 1]
+        with pytest.raises(ValueError):
+            RankTrajectories.from_state(state)
+
+    def test_unparsable_time_ignored(self):
+        """测试无法解析时间的快照不记录"""
+        trajectories = RankTrajectories()
+        trajectories.observe("baidu", "latest", {"A": {"ranks": [1]}})
+        assert trajectories.platforms == {}
+
+
+class TestDayAggregateTrends:
+    """当日聚合状态中的排名走势测试类"""
+
+    def test_recorded_and_persisted(self, tmp_path):
+        """测试合并快照时记录排名，跨运行保存；沿用标题的平台同样记录"""
+        output_dir = str(tmp_path / "output")
+        txt_dir = tmp_path / "output" / DATE_FOLDER / "txt"
+        write_snapshot(txt_dir, "08时00分", {"baidu": ["A", "B"], "weibo": ["C"]})
+        write_snapshot(txt_dir, "08时05分", {"baidu": ["B", "A"]}, unchanged=["weibo"])
+        aggregate = DayAggregate(DATE_FOLDER, output_dir=output_dir)
+        aggregate.refresh()
+        aggregate.save()
+
+        reloaded = DayAggregate(DATE_FOLDER, output_dir=output_dir)
+        assert reloaded.load()
+        result = reloaded.trajectories.analyze()
+
+        assert result["baidu"]["A"].velocity == -12.0
+        assert result["weibo"]["C"].dwell_minutes == 10.0
+
+    def test_disabled(self, tmp_path):
+        """测试关闭后不记录；开启后已有状态缺少走势时从快照重建"""
+        output_dir = str(tmp_path / "output")
+        txt_dir = tmp_path / "output" / DATE_FOLDER / "txt"
+        write_snapshot(txt_dir, "08时00分", {"baidu": ["A"]})
+        aggregate = DayAggregate(DATE_FOLDER, output_dir=output_dir, track_trends=False)
+        aggregate.refresh()
+        aggregate.save()
+        assert aggregate.trajectories is None
+
+        enabled = DayAggregate(DATE_FOLDER, output_dir=output_dir)
+        assert not enabled.load()
+        assert enabled.refresh() == 1
+        assert "A" in enabled.trajectories.analyze()["baidu"]
+
+
+class TestTrendWeightAndReport:
+    """排名走势参与排序和报告测试类"""
+
+    RECORD = TitleRecord("08时00分", "09时00分", 3, [12, 8, 4])
+
+    TREND = TitleTrend(4, 30.0, 90.0, 8.0, 2.0, 1)
+
+    def test_weight_unchanged_by_default(self):
+        """测试未配置趋势权重时权重与不使用走势时相同"""
+        weight_config = {
+            "RANK_WEIGHT": 0.6,
+            "FREQUENCY_WEIGHT": 0.3,
+            "HOTNESS_WEIGHT": 0.1,
+        }
+        assert calculate_news_weight(
+            self.RECORD, weight_config=weight_config, trend=self.TREND
+        ) == calculate_news_weight(self.RECORD, weight_config=weight_config)
+
+        rising = dict(weight_config, TREND_WEIGHT=0.5)
+        assert (
+            calculate_news_weight(self.RECORD, weight_config=rising, trend=self.TREND)
+            == calculate_news_weight(self.RECORD, weight_config=weight_config) + 40.0
+        )
+
+    def test_report_shows_trend(self):
+        """测试匹配结果带有走势，HTML 报告中显示"""
+        results = {"baidu": {"标题": {"ranks": [4], "url": "", "mobileUrl": ""}}}
+        matched = count_word_frequency(
+            results,
+            [],
+            [],
+            {"baidu": "百度热搜"},
+            {"baidu": {"标题": self.RECORD}},
+            trends={"baidu": {"标题": self.TREND}},
+        )
+        assert matched[0].trend == self.TREND
+
+        stats = [{"word": "热点新闻", "count": 1, "titles": matched}]
+        report_data = prepare_report_data(stats, mode="incremental")
+        html = render_html_content(report_data, 1)
+
+        assert format_trend_display(self.TREND) in html
+        assert "↑8.0名/时" in html
+        assert "回榜 1 次" in html
+
+
+class TestTrendConfig:
+    """排名走势配置验证测试类"""
+
+    def test_invalid_top_n(self, sample_config):
+        """测试前 N 名不是正整数时报错"""
+        sample_config["TREND"] = {"ENABLED": True, "TOP_N": 0}
+        with pytest.raises(ConfigError):
+            ConfigValidator().validate(sample_config)
+
+    def test_invalid_trend_weight(self, sample_config):
+        """测试趋势权重超出 0-1 时报错"""
+        sample_config["WEIGHT_CONFIG"]["TREND_WEIGHT"] = 2
+        with pytest.raises(ConfigError):
+            ConfigValidator().validate(sample_config)
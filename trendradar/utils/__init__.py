@@ -16,8 +16,13 @@ from .file_utils import (
     get_config_path,
     get_output_path,
     get_project_root,
+    load_state,
+    write_state_atomic,
 )
 from .logger import get_logger, init_app_logger, setup_logger
+from .proxy_pool import ProxyPool
+from .rate_limiter import RateLimiter
+from .scheduler import CronSchedule, CronScheduler
 from .time_utils import (
     format_date_folder,
     format_time_display,
@@ -40,6 +45,8 @@ __all__ = [
     "clean_title",
     "get_project_root",
     "get_config_path",
+    "load_state",
+    "write_state_atomic",
     # config
     "load_config",
     "load_frequency_words",
@@ -47,6 +54,13 @@ __all__ = [
     "setup_logger",
     "get_logger",
     "init_app_logger",
+    # rate_limiter
+    "RateLimiter",
+    # proxy_pool
+    "ProxyPool",
+    # scheduler
+    "CronSchedule",
+    "CronScheduler",
     # exceptions
     "TrendRadarError",
     "ConfigError",
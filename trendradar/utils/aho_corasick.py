@@ -0,0 +1,82 @@
+"""
+Aho-Corasick 多模式匹配自动机
+
+一次扫描文本即可找出所有命中的模式串
+"""
+
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+
+class AhoCorasick:
+    """Aho-Corasick 自动机
+
+    模式串在构建时分配从 0 开始的编号，查询返回命中的编号集合。
+    匹配语义与 ``pattern in text`` 完全一致（包括空串总是命中）
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        """构建自动机
+
+        Args:
+            patterns: 模式串列表，编号为其在列表中的下标
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+        self.pattern_count = 0
+
+        pending_output: List[Set[int]] = [set()]
+
+        for pattern_id, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    pending_output.append(set())
+                state = next_state
+            pending_output[state].add(pattern_id)
+            self.pattern_count = pattern_id + 1
+
+        # BFS 构建失败指针，并把失败链上的输出合并到当前节点
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail_state = self._fail[state]
+                while fail_state and char not in self._goto[fail_state]:
+                    fail_state = self._fail[fail_state]
+                self._fail[next_state] = self._goto[fail_state].get(char, 0)
+                pending_output[next_state] |= pending_output[self._fail[next_state]]
+
+        self._output = [tuple(sorted(ids)) for ids in pending_output]
+        # 空模式串匹配任意文本
+        self._always: FrozenSet[int] = frozenset(self._output[0])
+
+    def find_all(self, text: str) -> Set[int]:
+        """查找文本中命中的所有模式串
+
+        Args:
+            text: 待匹配文本
+
+        Returns:
+            命中的模式串编号集合
+        """
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+
+        hits = set(self._always)
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                hits.update(output[state])
+        return hits
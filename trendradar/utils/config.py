@@ -4,7 +4,7 @@
 
 import os
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 
 import yaml
 
@@ -38,6 +38,25 @@ def load_config(config_path: Optional[str] = None) -> Dict:
     return config
 
 
+def _env_int(name: str, default: Any) -> Any:
+    """读取整数环境变量
+
+    Args:
+        name: 环境变量名
+        default: 未设置时的默认值
+
+    Returns:
+        整数；无法解析时原样返回字符串，由配置验证报错
+    """
+    value = os.environ.get(name, "").strip()
+    if not value:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
 def _build_config_dict(config_data: Dict) -> Dict:
     """构建配置字典
 
@@ -47,6 +66,14 @@ def _build_config_dict(config_data: Dict) -> Dict:
     Returns:
         处理后的配置字典
     """
+    rate_limit = config_data["crawler"].get("rate_limit") or {}
+    circuit_breaker = config_data["crawler"].get("circuit_breaker") or {}
+    hedging = config_data["crawler"].get("hedging") or {}
+    proxy_pool = config_data["crawler"].get("proxy_pool") or {}
+    stale_fallback = config_data["crawler"].get("stale_fallback") or {}
+    sharding = config_data["crawler"].get("sharding") or {}
+    trend = config_data.get("trend") or {}
+
     config = {
         # 应用配置
         "VERSION_CHECK_URL": config_data["app"]["version_check_url"],
@@ -57,15 +84,62 @@ def _build_config_dict(config_data: Dict) -> Dict:
         "REQUEST_INTERVAL": config_data["crawler"]["request_interval"],
         "USE_PROXY": config_data["crawler"]["use_proxy"],
         "DEFAULT_PROXY": config_data["crawler"]["default_proxy"],
+        "PROXY_POOL": {
+            "PROXIES": proxy_pool.get("proxies") or [],
+            "PINS": proxy_pool.get("pins") or {},
+            "MAX_CONCURRENCY": proxy_pool.get("max_concurrency", 4),
+            "FAILURE_THRESHOLD": proxy_pool.get("failure_threshold", 3),
+            "EVICTION": proxy_pool.get("eviction_seconds", 600),
+        },
         "ENABLE_CRAWLER": config_data["crawler"]["enable_crawler"],
         "ENABLE_ASYNC": config_data["crawler"].get(
             "enable_async", True
         ),  # 新增异步开关
+        "FETCH_DEADLINE": config_data["crawler"].get("fetch_deadline", 0),
+        "API_ENDPOINTS": config_data["crawler"].get("api_endpoints") or [],
+        "RATE_LIMIT": {
+            "REQUESTS_PER_SECOND": rate_limit.get("requests_per_second", 10),
+            "MIN_REQUESTS_PER_SECOND": rate_limit.get("min_requests_per_second", 1),
+            "BURST": rate_limit.get("burst", 10),
+            "INITIAL_CONCURRENCY": rate_limit.get("initial_concurrency", 5),
+            "MIN_CONCURRENCY": rate_limit.get("min_concurrency", 1),
+            "MAX_CONCURRENCY": rate_limit.get("max_concurrency", 10),
+        },
+        "CIRCUIT_BREAKER": {
+            "ENABLED": circuit_breaker.get("enabled", True),
+            "FAILURE_THRESHOLD": circuit_breaker.get("failure_threshold", 3),
+            "COOLDOWN": circuit_breaker.get("cooldown_seconds", 600),
+            "MAX_COOLDOWN": circuit_breaker.get("max_cooldown_seconds", 21600),
+        },
+        "STALE_FALLBACK": {
+            "ENABLED": stale_fallback.get("enabled", True),
+            "MAX_STALENESS": stale_fallback.get("max_staleness_seconds", 3600),
+        },
+        # 分片配置（环境变量优先）
+        "SHARDING": {
+            "COUNT": _env_int("SHARD_COUNT", sharding.get("count", 1)),
+            "INDEX": _env_int("SHARD_INDEX", sharding.get("index", 0)),
+            "RUN_ID": os.environ.get("SHARD_RUN_ID", "").strip()
+            or sharding.get("run_id")
+            or "",
+            "DIR": os.environ.get("SHARD_DIR", "").strip()
+            or sharding.get("output_dir")
+            or "",
+        },
+        "HEDGING": {
+            "ENABLED": hedging.get("enabled", False),
+            "PERCENTILE": hedging.get("percentile", 95),
+            "MIN_SAMPLES": hedging.get("min_samples", 10),
+            "MIN_DELAY": hedging.get("min_delay_seconds", 0.2),
+            "BUDGET_RATIO": hedging.get("budget_ratio", 0.1),
+        },
         # 报告配置（支持新旧两种格式，优先使用旧格式保持向后兼容）
         "REPORT_MODE": config_data.get("REPORT_MODE")
         or config_data.get("report", {}).get("mode", "daily"),
         "RANK_THRESHOLD": config_data.get("RANK_THRESHOLD")
         or config_data.get("report", {}).get("rank_threshold", 10),
+        "MAX_NEWS": config_data.get("MAX_NEWS")
+        or config_data.get("report", {}).get("max_news", 0),
         # 通知配置
         "ENABLE_NOTIFICATION": config_data["notification"]["enable_notification"],
         "MESSAGE_BATCH_SIZE": config_data["notification"]["message_batch_size"],
@@ -105,9 +179,19 @@ def _build_config_dict(config_data: Dict) -> Dict:
                 "frequency_weight", 0.3
             ),
             "HOTNESS_WEIGHT": config_data.get("weight", {}).get("hotness_weight", 0.1),
+            "TREND_WEIGHT": config_data.get("weight", {}).get("trend_weight", 0),
+        },
+        # 排名走势配置
+        "TREND": {
+            "ENABLED": trend.get("enabled", True),
+            "TOP_N": trend.get("top_n", 10),
         },
         # 平台配置
         "PLATFORMS": config_data["platforms"],
+        # 存储配置（环境变量优先）
+        "STORAGE_BACKEND": os.environ.get("STORAGE_BACKEND", "").strip()
+        or config_data.get("storage", {}).get("backend", "txt"),
+        "STORAGE_EXPORT_TXT": config_data.get("storage", {}).get("export_txt", True),
     }
 
     # Webhook 配置（环境变量优先）
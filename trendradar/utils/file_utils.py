@@ -2,12 +2,17 @@
 文件操作工具函数
 """
 
+import json
+import os
 import re
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Optional, Union
 
+from .logger import get_logger
 from .time_utils import format_date_folder
 
+logger = get_logger(__name__)
+
 
 def ensure_directory_exists(directory: str) -> None:
     """确保目录存在，不存在则创建
@@ -98,3 +103,57 @@ def html_escape(text: str) -> str:
         .replace('"', "&quot;")
         .replace("'", "&#x27;")
     )
+
+
+def load_state(path: Union[str, Path], version: int) -> Dict[str, Any]:
+    """读取带版本号的 JSON 状态文件
+
+    Args:
+        path: 状态文件路径
+        version: 期望的状态格式版本
+
+    Returns:
+        状态字典
+
+    Raises:
+        OSError: 文件无法读取
+        ValueError: 内容不是 JSON 对象或版本不匹配
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+
+    if not isinstance(state, dict):
+        raise ValueError("状态文件格式错误")
+    if state.get("version") != version:
+        raise ValueError(f"状态版本不匹配: {state.get('version')}")
+    return state
+
+
+def write_state_atomic(path: Union[str, Path], state: Dict[str, Any]) -> bool:
+    """原子写入 JSON 状态文件
+
+    先写入同目录下的临时文件再替换，中断时原文件保持完整；
+    写入失败时删除临时文件并记录警告，状态文件只是缓存，不影响调用方本次结果
+
+    Args:
+        path: 状态文件路径
+        state: 可 JSON 序列化的状态字典
+
+    Returns:
+        是否写入成功
+    """
+    path = Path(path)
+    tmp_path = path.with_suffix(".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning(f"保存状态文件 {path} 失败: {e}")
+        try:
+            tmp_path.unlink()
+        except OSError:
+            pass
+        return False
+    return True
@@ -0,0 +1,208 @@
+"""
+运行指标模块
+
+以上下文管理器的形式记录各阶段的耗时、CPU 时间和阶段结束时的常驻内存，
+运行结束时记录一次进程内存峰值，每次运行追加一行 JSON 到 output/metrics/<日期>.jsonl
+"""
+
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from .logger import get_logger
+from .time_utils import get_beijing_time
+
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块
+    resource = None
+
+logger = get_logger(__name__)
+
+# 当前运行的指标记录器，异步任务创建时会继承，
+# 线程池任务需通过 contextvars.copy_context() 传递
+_current_metrics: ContextVar[Optional["RunMetrics"]] = ContextVar(
+    "trendradar_run_metrics", default=None
+)
+
+
+def get_peak_rss_kb() -> Optional[int]:
+    """获取进程启动以来的内存峰值（KB），平台不支持时返回 None
+
+    峰值只增不减，常驻模式下会累积多次运行，不能反映单个阶段的内存
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 单位为字节，Linux 为 KB
+    if sys.platform == "darwin":
+        peak //= 1024
+    return int(peak)
+
+
+def get_current_rss_kb() -> Optional[int]:
+    """获取进程当前的常驻内存（KB），只支持 Linux，其他平台返回 None"""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            resident_pages = int(f.read().split()[1])
+        page_size = os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+    return resident_pages * page_size // 1024
+
+
+class RunMetrics:
+    """单次运行的指标记录器
+
+    用法::
+
+        with RunMetrics() as metrics:
+            with span("fetch"):
+                ...
+        metrics.write()
+    """
+
+    def __init__(self):
+        self.started_at = get_beijing_time()
+        self.status = "running"
+        self.spans: List[Dict] = []
+        # 阶段耗时以外的运行状态，如熔断器状态
+        self.extra: Dict[str, Any] = {}
+        self.wall = 0.0
+        self.cpu = 0.0
+        # 运行结束时的进程内存峰值（进程启动以来，不是本次运行）
+        self.process_peak_rss_kb: Optional[int] = None
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self._token = None
+
+    def __enter__(self) -> "RunMetrics":
+        self._token = _current_metrics.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.finish("error" if exc_type else "ok")
+        if self._token is not None:
+            _current_metrics.reset(self._token)
+            self._token = None
+
+    @contextmanager
+    def span(self, name: str, cpu: bool = True, **labels) -> Iterator[None]:
+        """记录一个阶段，阶段结束时记录进程当前的常驻内存（rss_kb）
+
+        Args:
+            name: 阶段名称
+            cpu: 是否记录 CPU 时间；并发执行的异步任务共享进程 CPU 时间，应关闭
+            **labels: 附加标签，如 platform、channel
+        """
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time() if cpu else None
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            record = {
+                "name": name,
+                "wall": round(time.perf_counter() - wall_start, 6),
+            }
+            if cpu_start is not None:
+                record["cpu"] = round(time.process_time() - cpu_start, 6)
+            rss = get_current_rss_kb()
+            if rss is not None:
+                record["rss_kb"] = rss
+            if labels:
+                record["labels"] = labels
+            if error:
+                record["error"] = True
+            self.spans.append(record)
+
+    def finish(self, status: str = "ok") -> None:
+        """结束运行并记录总耗时"""
+        self.status = status
+        self.wall = time.perf_counter() - self._wall_start
+        self.cpu = time.process_time() - self._cpu_start
+        self.process_peak_rss_kb = get_peak_rss_kb()
+
+    def to_dict(self) -> Dict:
+        """转换为可序列化的字典"""
+        return {
+            "started_at": self.started_at.isoformat(),
+            "status": self.status,
+            "wall": round(self.wall, 6),
+            "cpu": round(self.cpu, 6),
+            "process_peak_rss_kb": self.process_peak_rss_kb,
+            "spans": self.spans,
+            "extra": self.extra,
+        }
+
+    def stage_totals(self) -> Dict[str, float]:
+        """按阶段名称汇总耗时"""
+        totals: Dict[str, float] = {}
+        for record in self.spans:
+            totals[record["name"]] = totals.get(record["name"], 0.0) + record["wall"]
+        return totals
+
+    def write(self, output_dir: str = "output") -> Optional[Path]:
+        """追加写入当日指标文件
+
+        Args:
+            output_dir: 输出根目录
+
+        Returns:
+            指标文件路径，写入失败时返回 None
+        """
+        metrics_dir = Path(output_dir) / "metrics"
+        file_path = metrics_dir / f"{self.started_at.strftime('%Y-%m-%d')}.jsonl"
+        try:
+            metrics_dir.mkdir(parents=True, exist_ok=True)
+            line = json.dumps(self.to_dict(), ensure_ascii=False)
+            with open(file_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        except Exception as e:
+            # 指标只用于诊断，写入失败不影响运行结果
+            logger.warning(f"写入运行指标失败: {e}")
+            return None
+        return file_path
+
+
+def record(key: str, value: Any) -> None:
+    """在当前运行的指标记录器中记录一项运行状态，没有记录器时不做任何事
+
+    Args:
+        key: 状态名称
+        value: 可 JSON 序列化的值
+    """
+    metrics = _current_metrics.get()
+    if metrics is not None:
+        metrics.extra[key] = value
+
+
+def get_current_metrics() -> Optional[RunMetrics]:
+    """获取当前运行的指标记录器"""
+    return _current_metrics.get()
+
+
+@contextmanager
+def span(name: str, cpu: bool = True, **labels) -> Iterator[None]:
+    """在当前运行的指标记录器中记录一个阶段，没有记录器时不做任何事
+
+    Args:
+        name: 阶段名称
+        cpu: 是否记录 CPU 时间
+        **labels: 附加标签
+    """
+    metrics = _current_metrics.get()
+    if metrics is None:
+        yield
+        return
+
+    with metrics.span(name, cpu=cpu, **labels):
+        yield
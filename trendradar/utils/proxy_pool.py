@@ -0,0 +1,236 @@
+"""
+代理池模块
+
+在多个代理之间分配请求：每个代理有独立的并发上限，
+按健康度（请求成功率的滑动平均）选择代理，连续失败的代理被暂时剔除。
+抓取和推送共享同一个代理池，异步任务和线程都可以申请代理
+"""
+
+import asyncio
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Union
+
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class Proxy:
+    """单个代理的并发占用和健康状态"""
+
+    def __init__(self, url: str, max_concurrency: int):
+        """初始化代理状态
+
+        Args:
+            url: 代理地址
+            max_concurrency: 并发上限
+        """
+        self.url = url
+        self.max_concurrency = max(1, max_concurrency)
+        self.in_flight = 0
+        # 请求成功率的滑动平均，1 表示完全健康
+        self.health = 1.0
+        self.failures = 0
+        # 剔除截止时间（单调时钟），0 表示未被剔除
+        self.evicted_until = 0.0
+        self.requests = 0
+
+    @property
+    def load(self) -> float:
+        """并发占用比例"""
+        return self.in_flight / self.max_concurrency
+
+
+class ProxyPool:
+    """代理池
+
+    平台或推送渠道可以固定使用某个代理（pins），
+    固定的代理被剔除时改用池中其他代理。
+    连续失败 failure_threshold 次的代理剔除 eviction 秒，
+    到期后重新放行，再次失败立即重新剔除；
+    所有代理都被剔除时仍从中选择，避免请求绕过代理直连
+    """
+
+    def __init__(
+        self,
+        proxies: List[Union[str, Dict]],
+        pins: Optional[Dict[str, str]] = None,
+        max_concurrency: int = 4,
+        failure_threshold: int = 3,
+        eviction: float = 600.0,
+        alpha: float = 0.2,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """初始化代理池
+
+        Args:
+            proxies: 代理列表，元素为代理地址或 {"url": ..., "max_concurrency": ...}
+            pins: {平台 ID 或推送渠道名: 代理地址}
+            max_concurrency: 未单独设置时每个代理的并发上限
+            failure_threshold: 连续失败多少次后剔除
+            eviction: 剔除时长（秒）
+            alpha: 健康度滑动平均中最新一次请求的权重
+            clock: 单调时钟
+        """
+        if not proxies:
+            raise ValueError("代理列表不能为空")
+        self.proxies: Dict[str, Proxy] = {}
+        for entry in proxies:
+            if isinstance(entry, str):
+                entry = {"url": entry}
+            url = entry["url"]
+            self.proxies[url] = Proxy(
+                url, entry.get("max_concurrency", max_concurrency)
+            )
+        self.pins = dict(pins or {})
+        self.failure_threshold = max(1, failure_threshold)
+        self.eviction = eviction
+        self.alpha = alpha
+        self._clock = clock
+        # 抓取线程、事件循环都会申请和释放代理
+        self._lock = threading.Lock()
+        # 等待空闲名额的唤醒回调
+        self._waiters: List[Callable[[], None]] = []
+
+    @classmethod
+    def from_config(cls, config: Dict) -> Optional["ProxyPool"]:
+        """根据配置字典创建代理池
+
+        Args:
+            config: 配置字典，读取 USE_PROXY、DEFAULT_PROXY 和 PROXY_POOL
+
+        Returns:
+            代理池实例，未启用代理时返回 None；
+            proxy_pool.proxies 为空时只包含 default_proxy
+        """
+        if not config.get("USE_PROXY"):
+            return None
+        pool_config = config.get("PROXY_POOL", {})
+        proxies = pool_config.get("PROXIES") or []
+        if not proxies and config.get("DEFAULT_PROXY"):
+            proxies = [config["DEFAULT_PROXY"]]
+        if not proxies:
+            return None
+        return cls(
+            proxies,
+            pins=pool_config.get("PINS"),
+            max_concurrency=pool_config.get("MAX_CONCURRENCY", 4),
+            failure_threshold=pool_config.get("FAILURE_THRESHOLD", 3),
+            eviction=pool_config.get("EVICTION", 600),
+        )
+
+    def _alive(self, proxy: Proxy, now: float) -> bool:
+        return proxy.evicted_until <= now
+
+    def _pick(self, key: Optional[str]) -> Optional[Proxy]:
+        """选择有空闲名额的代理并占用，需持有锁
+
+        Returns:
+            代理，所有候选代理都已满时返回 None
+        """
+        now = self._clock()
+        pinned = self.proxies.get(self.pins.get(key, "")) if key else None
+        if pinned is not None and self._alive(pinned, now):
+            candidates = [pinned]
+        else:
+            candidates = [p for p in self.proxies.values() if self._alive(p, now)]
+            if not candidates:
+                candidates = list(self.proxies.values())
+
+        free = [p for p in candidates if p.in_flight < p.max_concurrency]
+        if not free:
+            return None
+        # 健康度优先，其次负载较低的；max 在相同时返回靠前的代理
+        proxy = max(free, key=lambda p: (round(p.health, 2), -p.load))
+        proxy.in_flight += 1
+        proxy.requests += 1
+        return proxy
+
+    async def acquire(self, key: Optional[str] = None) -> str:
+        """在事件循环中申请代理，所有候选代理都已满时等待
+
+        Args:
+            key: 平台 ID 或推送渠道名，用于匹配固定代理
+
+        Returns:
+            代理地址，用完后必须调用 release
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                proxy = self._pick(key)
+                if proxy is not None:
+                    return proxy.url
+                waiter = loop.create_future()
+                self._waiters.append(
+                    lambda: loop.call_soon_threadsafe(_resolve, waiter)
+                )
+            await waiter
+
+    def acquire_sync(self, key: Optional[str] = None) -> str:
+        """在线程中申请代理，所有候选代理都已满时阻塞
+
+        Args:
+            key: 平台 ID 或推送渠道名，用于匹配固定代理
+
+        Returns:
+            代理地址，用完后必须调用 release
+        """
+        while True:
+            with self._lock:
+                proxy = self._pick(key)
+                if proxy is not None:
+                    return proxy.url
+                event = threading.Event()
+                self._waiters.append(event.set)
+            event.wait()
+
+    def release(self, url: str, ok: Optional[bool]) -> None:
+        """释放代理并更新健康度
+
+        Args:
+            url: acquire 返回的代理地址
+            ok: 经代理的请求是否成功到达目标（收到任何 HTTP 响应即为成功），
+                None 表示请求被取消，不更新健康度
+        """
+        with self._lock:
+            proxy = self.proxies[url]
+            proxy.in_flight -= 1
+            if ok:
+                proxy.failures = 0
+                proxy.health += self.alpha * (1 - proxy.health)
+            elif ok is not None:
+                proxy.failures += 1
+                proxy.health -= self.alpha * proxy.health
+                if proxy.failures >= self.failure_threshold:
+                    proxy.evicted_until = self._clock() + self.eviction
+                    logger.warning(
+                        f"代理 {url} 连续失败 {proxy.failures} 次，剔除 {self.eviction:.0f} 秒"
+                    )
+            # 唤醒所有等待者重新选择，剔除后等待固定代理的请求也能改用其他代理
+            waiters, self._waiters = self._waiters, []
+        for wake in waiters:
+            try:
+                wake()
+            except RuntimeError:
+                # 等待者所在的事件循环已关闭
+                pass
+
+    def summary(self) -> Dict[str, Dict]:
+        """各代理的请求数、健康度和剔除状态，写入运行指标"""
+        now = self._clock()
+        return {
+            url: {
+                "requests": proxy.requests,
+                "health": round(proxy.health, 3),
+                "evicted": not self._alive(proxy, now),
+            }
+            for url, proxy in self.proxies.items()
+        }
+
+
+def _resolve(waiter: asyncio.Future) -> None:
+    """唤醒事件循环中的等待者"""
+    if not waiter.done():
+        waiter.set_result(None)
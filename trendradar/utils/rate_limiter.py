@@ -0,0 +1,396 @@
+"""
+自适应限流模块
+
+按上游主机限制请求速率（令牌桶）和并发数（AIMD 窗口）：
+请求成功时缓慢放宽，遇到 429、5xx 或超时时减半，
+窗口和速率保存在状态文件中，下次运行从上次的安全值开始
+"""
+
+import asyncio
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from .file_utils import load_state, write_state_atomic
+from .logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def is_throttle_status(status_code: int) -> bool:
+    """HTTP 状态码是否表示上游过载（429 或 5xx）"""
+    return status_code == 429 or status_code >= 500
+
+
+class TokenBucket:
+    """令牌桶
+
+    令牌按 rate 个/秒补充，最多累积 burst 个。取令牌不会失败，
+    令牌不足时返回需要等待的秒数（余额记为负数），
+    因此并发的请求按取令牌的先后依次放行。取令牌加锁，可在多个线程间共享
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数，小于等于 0 表示不限速
+            burst: 令牌桶容量
+            clock: 单调时钟
+        """
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self._clock = clock
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """取一个令牌
+
+        Returns:
+            需要等待的秒数，0 表示可以立即发送
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        with self._lock:
+            now = self._clock()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class AimdWindow:
+    """AIMD 并发窗口
+
+    每个成功请求使窗口增加 1/窗口，即每轮增加 1；
+    过载时窗口乘以 decrease。同一批并发请求中只有第一个过载响应
+    会触发收缩（以 epoch 区分），避免一次拥塞让窗口连续减半多次
+    """
+
+    def __init__(
+        self,
+        limit: float,
+        minimum: float,
+        maximum: float,
+        decrease: float = 0.5,
+    ):
+        """初始化并发窗口
+
+        Args:
+            limit: 初始窗口
+            minimum: 窗口下限
+            maximum: 窗口上限
+            decrease: 收缩系数
+        """
+        self.minimum = max(1.0, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = min(self.maximum, max(self.minimum, limit))
+        self.decrease = decrease
+        self.in_flight = 0
+        self.epoch = 0
+        self._waiters: List[asyncio.Future] = []
+
+    @property
+    def available(self) -> bool:
+        """是否还有空闲的并发名额"""
+        return self.in_flight < int(self.limit)
+
+    async def acquire(self) -> int:
+        """占用一个并发名额，窗口已满时等待
+
+        Returns:
+            占用时的 epoch，释放时原样传回
+        """
+        while not self.available:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except BaseException:
+                # 被唤醒后又被取消时，把名额让给下一个等待者
+                self._wake()
+                raise
+            finally:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+        self.in_flight += 1
+        return self.epoch
+
+    def release(self, epoch: int, throttled: Optional[bool]) -> None:
+        """释放并发名额并根据请求结果调整窗口
+
+        Args:
+            epoch: acquire 返回的 epoch
+            throttled: 上游是否过载，None 表示请求被取消，不调整窗口
+        """
+        self.in_flight -= 1
+        if throttled:
+            # 收缩之后才发出的请求再次过载时才继续收缩
+            if epoch == self.epoch:
+                self.limit = max(self.minimum, self.limit * self.decrease)
+                self.epoch += 1
+        elif throttled is not None:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        self._wake()
+
+    def _wake(self) -> None:
+        """按窗口空闲数唤醒等待者"""
+        free = int(self.limit) - self.in_flight
+        for waiter in self._waiters[:free]:
+            if not waiter.done():
+                waiter.set_result(None)
+
+
+class HostLimiter:
+    """单个上游主机的限流器
+
+    令牌桶速率与并发窗口同步调整：过载时一起收缩，成功时一起放宽
+    """
+
+    def __init__(
+        self,
+        host: str,
+        max_rate: float,
+        min_rate: float,
+        burst: float,
+        concurrency: float,
+        min_concurrency: float,
+        max_concurrency: float,
+        rate: Optional[float] = None,
+    ):
+        """初始化主机限流器
+
+        Args:
+            host: 主机名
+            max_rate: 速率上限（请求/秒），小于等于 0 表示不限速
+            min_rate: 速率下限
+            burst: 令牌桶容量
+            concurrency: 初始并发窗口
+            min_concurrency: 并发窗口下限
+            max_concurrency: 并发窗口上限
+            rate: 初始速率，默认为速率上限
+        """
+        self.host = host
+        self.max_rate = max_rate
+        self.min_rate = min(min_rate, max_rate)
+        if rate is None or max_rate <= 0:
+            rate = max_rate
+        self.bucket = TokenBucket(min(max_rate, max(self.min_rate, rate)), burst)
+        self.window = AimdWindow(concurrency, min_concurrency, max_concurrency)
+        self.throttled = 0
+
+    @property
+    def rate(self) -> float:
+        """当前速率（请求/秒）"""
+        return self.bucket.rate
+
+    @property
+    def concurrency(self) -> float:
+        """当前并发窗口"""
+        return self.window.limit
+
+    async def acquire(self) -> int:
+        """等待并发名额和令牌
+
+        Returns:
+            并发窗口的 epoch，释放时传回
+        """
+        epoch = await self.window.acquire()
+        delay = self.bucket.reserve()
+        if delay > 0:
+            try:
+                await asyncio.sleep(delay)
+            except BaseException:
+                self.window.release(epoch, throttled=None)
+                raise
+        return epoch
+
+    def pace(self) -> None:
+        """阻塞等待令牌，供线程池中的同步抓取在每次请求前调用
+
+        同步模式的并发由线程池大小限定，这里只控制请求速率
+        """
+        delay = self.bucket.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def release(self, epoch: int, throttled: Optional[bool]) -> None:
+        """释放并发名额并调整速率和窗口
+
+        Args:
+            epoch: acquire 返回的 epoch
+            throttled: 上游是否过载（429、5xx 或超时），None 表示请求被取消，
+                不调整速率和窗口
+        """
+        shrink = throttled and epoch == self.window.epoch
+        self.window.release(epoch, throttled)
+        if throttled:
+            self.throttled += 1
+
+        if throttled is None or self.max_rate <= 0:
+            return
+        if throttled:
+            if shrink:
+                self.bucket.rate = max(
+                    self.min_rate, self.bucket.rate * self.window.decrease
+                )
+        else:
+            self.bucket.rate = min(self.max_rate, self.bucket.rate + 1 / self.rate)
+
+    def to_state(self) -> Dict[str, float]:
+        """导出需要跨运行保存的状态"""
+        return {
+            "rate": round(self.rate, 3),
+            "concurrency": round(self.concurrency, 3),
+        }
+
+
+class RateLimiter:
+    """按上游主机分组的自适应限流器"""
+
+    # 状态文件格式版本，格式变化时递增以丢弃旧状态
+    STATE_VERSION = 1
+
+    DEFAULT_STATE_PATH = "output/state/rate_limits.json"
+
+    def __init__(
+        self,
+        requests_per_second: float = 10.0,
+        min_requests_per_second: float = 1.0,
+        burst: float = 10.0,
+        initial_concurrency: float = 5.0,
+        min_concurrency: float = 1.0,
+        max_concurrency: float = 10.0,
+        state_path: Optional[str] = None,
+    ):
+        """初始化限流器
+
+        Args:
+            requests_per_second: 每个主机的速率上限，小于等于 0 表示不限速
+            min_requests_per_second: 每个主机的速率下限
+            burst: 令牌桶容量
+            initial_concurrency: 没有历史状态时的并发窗口
+            min_concurrency: 并发窗口下限
+            max_concurrency: 并发窗口上限，也是连接池的每主机连接上限
+            state_path: 状态文件路径，默认为 output/state/rate_limits.json
+        """
+        self.requests_per_second = requests_per_second
+        self.min_requests_per_second = min_requests_per_second
+        self.burst = burst
+        self.initial_concurrency = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.state_path = Path(state_path or self.DEFAULT_STATE_PATH)
+        self.hosts: Dict[str, HostLimiter] = {}
+        # 上次运行保存的状态，主机首次出现时使用
+        self._saved: Dict[str, Dict[str, float]] = {}
+
+    @classmethod
+    def from_config(
+        cls, config: Dict, state_path: Optional[str] = None
+    ) -> "RateLimiter":
+        """根据配置字典创建限流器
+
+        Args:
+            config: 配置字典，读取其中的 RATE_LIMIT 部分
+            state_path: 状态文件路径
+
+        Returns:
+            限流器实例
+        """
+        rate_limit = config.get("RATE_LIMIT", {})
+        return cls(
+            requests_per_second=rate_limit.get("REQUESTS_PER_SECOND", 10.0),
+            min_requests_per_second=rate_limit.get("MIN_REQUESTS_PER_SECOND", 1.0),
+            burst=rate_limit.get("BURST", 10.0),
+            initial_concurrency=rate_limit.get("INITIAL_CONCURRENCY", 5.0),
+            min_concurrency=rate_limit.get("MIN_CONCURRENCY", 1.0),
+            max_concurrency=rate_limit.get("MAX_CONCURRENCY", 10.0),
+            state_path=state_path,
+        )
+
+    def for_host(self, host: str) -> HostLimiter:
+        """获取主机的限流器，首次出现时从保存的状态恢复"""
+        limiter = self.hosts.get(host)
+        if limiter is None:
+            saved = self._saved.get(host, {})
+            limiter = HostLimiter(
+                host,
+                max_rate=self.requests_per_second,
+                min_rate=self.min_requests_per_second,
+                burst=self.burst,
+                concurrency=saved.get("concurrency", self.initial_concurrency),
+                min_concurrency=self.min_concurrency,
+                max_concurrency=self.max_concurrency,
+                rate=saved.get("rate"),
+            )
+            self.hosts[host] = limiter
+        return limiter
+
+    def for_url(self, url: str) -> HostLimiter:
+        """获取 URL 所属主机的限流器"""
+        return self.for_host(urlsplit(url).netloc)
+
+    def load(self) -> bool:
+        """从状态文件加载各主机上次的速率和并发窗口
+
+        Returns:
+            是否加载成功，失败时所有主机从初始值开始
+        """
+        if not self.state_path.exists():
+            return False
+
+        try:
+            state = load_state(self.state_path, self.STATE_VERSION)
+            hosts = state["hosts"]
+            if not isinstance(hosts, dict):
+                raise ValueError("状态字段类型错误")
+            saved = {
+                host: {
+                    "rate": float(entry["rate"]),
+                    "concurrency": float(entry["concurrency"]),
+                }
+                for host, entry in hosts.items()
+            }
+
+        except Exception as e:
+            logger.warning(f"限流状态无效，使用初始值: {e}")
+            self._saved = {}
+            return False
+
+        self._saved = saved
+        # 已创建的主机限流器不受影响，只作用于之后首次出现的主机
+        return True
+
+    def save(self) -> None:
+        """原子写入状态文件"""
+        hosts = dict(self._saved)
+        for host, limiter in self.hosts.items():
+            hosts[host] = limiter.to_state()
+        state = {"version": self.STATE_VERSION, "hosts": hosts}
+
+        # 写入失败只会让下次运行从初始值开始
+        write_state_atomic(self.state_path, state)
+
+    def summary(self) -> str:
+        """各主机当前速率和并发窗口的摘要"""
+        return ", ".join(
+            f"{host}: {limiter.rate:.1f}/s 并发 {limiter.concurrency:.1f}"
+            f"（过载 {limiter.throttled} 次）"
+            for host, limiter in self.hosts.items()
+        )
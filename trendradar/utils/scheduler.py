@@ -0,0 +1,242 @@
+"""
+进程内定时调度模块
+
+解析与 crontab 兼容的 5 段表达式，在常驻进程中按计划执行任务。
+与快照时间、报告时间一致，表达式按北京时间计算，与容器的本地时区无关
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, FrozenSet, Optional
+
+from .exceptions import ConfigError
+from .logger import get_logger
+from .time_utils import get_beijing_time
+
+logger = get_logger(__name__)
+
+# 常用别名
+_ALIASES = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+# (名称, 最小值, 最大值)
+_FIELDS = (
+    ("minute", 0, 59),
+    ("hour", 0, 23),
+    ("day", 1, 31),
+    ("month", 1, 12),
+    ("weekday", 0, 7),
+)
+
+
+def _parse_field(field: str, min_value: int, max_value: int) -> FrozenSet[int]:
+    """解析单个 cron 字段
+
+    支持 ``*``、``*/n``、``a``、``a-b``、``a-b/n`` 以及逗号分隔的组合
+
+    Args:
+        field: 字段文本
+        min_value: 允许的最小值
+        max_value: 允许的最大值
+
+    Returns:
+        字段允许的取值集合
+
+    Raises:
+        ValueError: 字段格式错误
+    """
+    values = set()
+    for part in field.split(","):
+        step = 1
+        if "/" in part:
+            part, step_str = part.split("/", 1)
+            step = int(step_str)
+            if step <= 0:
+                raise ValueError(f"步长必须为正数: {step_str}")
+
+        if part == "*":
+            start, end = min_value, max_value
+        elif "-" in part:
+            start_str, end_str = part.split("-", 1)
+            start, end = int(start_str), int(end_str)
+        else:
+            start = int(part)
+            # "a/n" 表示从 a 开始到最大值
+            end = max_value if step > 1 else start
+
+        if start < min_value or end > max_value or start > end:
+            raise ValueError(f"取值超出范围 {min_value}-{max_value}: {field}")
+
+        values.update(range(start, end + 1, step))
+
+    return frozenset(values)
+
+
+class CronSchedule:
+    """crontab 表达式（分 时 日 月 周）
+
+    日和周同时受限时按 cron 语义取并集
+    """
+
+    def __init__(self, expression: str):
+        """解析表达式
+
+        Args:
+            expression: cron 表达式，如 ``*/30 * * * *``
+
+        Raises:
+            ConfigError: 表达式格式错误
+        """
+        self.expression = expression.strip()
+        normalized = _ALIASES.get(self.expression, self.expression)
+        parts = normalized.split()
+
+        if len(parts) != 5:
+            raise ConfigError(
+                f"cron 表达式必须包含 5 个字段: {expression}",
+                "格式为: 分 时 日 月 周，例如 */30 * * * *",
+            )
+
+        try:
+            fields = [
+                _parse_field(part, min_value, max_value)
+                for part, (_, min_value, max_value) in zip(parts, _FIELDS)
+            ]
+        except ValueError as e:
+            raise ConfigError(
+                f"cron 表达式格式错误: {expression} ({e})",
+                "请检查 CRON_SCHEDULE 环境变量",
+            )
+
+        self.minutes, self.hours, self.days, self.months, weekdays = fields
+        # 周日既可以写 0 也可以写 7
+        self.weekdays = frozenset(d % 7 for d in weekdays)
+        self._day_restricted = parts[2] != "*"
+        self._weekday_restricted = parts[4] != "*"
+
+    def _day_matches(self, dt: datetime) -> bool:
+        """判断日期是否满足日/周字段"""
+        day_ok = dt.day in self.days
+        # datetime.weekday(): 周一为 0；cron: 周日为 0
+        weekday_ok = (dt.weekday() + 1) % 7 in self.weekdays
+
+        if self._day_restricted and self._weekday_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def next_after(self, dt: datetime) -> datetime:
+        """计算严格晚于 dt 的下一次触发时间
+
+        Args:
+            dt: 起始时间
+
+        Returns:
+            下一次触发时间（秒和微秒为 0）
+        """
+        candidate = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        # 最多向后搜索 5 年，避免 2 月 30 日这类永不触发的表达式死循环
+        limit = candidate + timedelta(days=366 * 5)
+
+        while candidate <= limit:
+            if candidate.month not in self.months:
+                year = candidate.year + candidate.month // 12
+                month = candidate.month % 12 + 1
+                candidate = candidate.replace(
+                    year=year, month=month, day=1, hour=0, minute=0
+                )
+                continue
+
+            if not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+
+            if candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+                continue
+
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+
+            return candidate
+
+        raise ConfigError(
+            f"cron 表达式永远不会触发: {self.expression}",
+            "请检查日期和月份的组合是否有效",
+        )
+
+
+class CronScheduler:
+    """常驻进程内的定时调度器
+
+    任务在调度线程中串行执行，运行超时错过的触发点会被跳过，
+    因此同一任务不会重叠执行
+    """
+
+    def __init__(self, expression: str, job: Callable[[], None]):
+        """初始化调度器
+
+        Args:
+            expression: cron 表达式
+            job: 每次触发时执行的任务
+        """
+        self.schedule = CronSchedule(expression)
+        self.job = job
+        self._stop_event = threading.Event()
+
+    @property
+    def stopped(self) -> bool:
+        """是否已请求停止"""
+        return self._stop_event.is_set()
+
+    def stop(self) -> None:
+        """请求停止（当前任务执行完后退出）"""
+        self._stop_event.set()
+
+    def _run_job(self) -> None:
+        """执行一次任务，异常不会中断调度"""
+        try:
+            self.job()
+        except Exception as e:
+            logger.error(f"定时任务执行失败: {e}", exc_info=True)
+
+    def run_forever(
+        self,
+        run_immediately: bool = False,
+        now_func: Optional[Callable[[], datetime]] = None,
+    ) -> None:
+        """阻塞运行，直到调用 stop()
+
+        Args:
+            run_immediately: 启动时是否立即执行一次
+            now_func: 获取当前时间的函数（便于测试），默认为北京时间
+        """
+        now_func = now_func or get_beijing_time
+
+        if run_immediately and not self.stopped:
+            self._run_job()
+
+        while not self.stopped:
+            now = now_func()
+            next_run = self.schedule.next_after(now)
+            wait_seconds = (next_run - now).total_seconds()
+            logger.info(f"⏰ 下次执行: {next_run.strftime('%Y-%m-%d %H:%M')}")
+
+            if self._stop_event.wait(timeout=max(wait_seconds, 0)):
+                break
+
+            started = time.monotonic()
+            self._run_job()
+            duration = time.monotonic() - started
+
+            missed_until = now_func()
+            if self.schedule.next_after(next_run) <= missed_until:
+                logger.warning(f"本次执行耗时 {duration:.1f}秒，已跳过期间错过的触发点")
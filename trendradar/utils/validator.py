@@ -21,6 +21,9 @@ class ConfigValidator:
     # 报告模式选项
     VALID_REPORT_MODES = ["daily", "incremental", "current"]
 
+    # 存储后端选项
+    VALID_STORAGE_BACKENDS = ["txt", "sqlite"]
+
     def validate(self, config: Dict) -> None:
         """验证配置文件完整性和正确性
 
@@ -37,6 +40,16 @@ class ConfigValidator:
         self._validate_platforms(config)
         self._validate_report_mode(config)
         self._validate_webhooks(config)
+        self._validate_storage(config)
+        self._validate_api_endpoints(config)
+        self._validate_fetch_deadline(config)
+        self._validate_rate_limit(config)
+        self._validate_circuit_breaker(config)
+        self._validate_hedging(config)
+        self._validate_proxy_pool(config)
+        self._validate_stale_fallback(config)
+        self._validate_sharding(config)
+        self._validate_trend(config)
 
         logger.info("配置验证通过")
 
@@ -154,6 +167,13 @@ class ConfigValidator:
                 )
             platform_ids.add(platform_id)
 
+            priority = platform.get("priority", 0)
+            if type(priority) is not int:
+                raise ConfigError(
+                    f"平台 {platform_id} 的 priority 必须是整数，当前为: {priority!r}",
+                    "priority 越大越先抓取，不设置时为 0",
+                )
+
     def _validate_report_mode(self, config: Dict) -> None:
         """验证报告模式
 
@@ -161,7 +181,7 @@ class ConfigValidator:
             config: 配置字典
 
         Raises:
-            ConfigError: 报告模式无效
+            ConfigError: 报告模式无效或最多显示条数不是非负整数
         """
         report_mode = config.get("REPORT_MODE")
 
@@ -176,6 +196,293 @@ class ConfigValidator:
                 f"有效选项: {', '.join(self.VALID_REPORT_MODES)}",
             )
 
+        max_news = config.get("MAX_NEWS", 0)
+        if type(max_news) is not int or max_news < 0:
+            raise ConfigError(
+                f"MAX_NEWS 必须是非负整数，当前为: {max_news!r}",
+                "请检查 config.yaml 中 MAX_NEWS（0 表示不限制）",
+            )
+
+    def _validate_storage(self, config: Dict) -> None:
+        """验证存储后端
+
+        Args:
+            config: 配置字典
+
+        Raises:
+            ConfigError: 存储后端无效
+        """
+        backend = config.get("STORAGE_BACKEND", "txt")
+
+        if backend not in self.VALID_STORAGE_BACKENDS:
+            raise ConfigError(
+                f"无效的存储后端: {backend}",
+                f"有效选项: {', '.join(self.VALID_STORAGE_BACKENDS)}",
+            )
+
+    def _validate_fetch_deadline(self, config: Dict) -> None:
+        """验证整体抓取时限
+
+        Args:
+            config: 配置字典
+
+        Raises:
+            ConfigError: 抓取时限无效
+        """
+        deadline = config.get("FETCH_DEADLINE", 0)
+        if type(deadline) not in (int, float) or deadline < 0:
+            raise ConfigError(
+                f"抓取时限 fetch_deadline 必须是非负数，当前为: {deadline!r}",
+                "请检查 config.yaml 中 crawler.fetch_deadline，0 表示不限时",
+            )
+
+    def _validate_api_endpoints(self, config: Dict) -> None:
+        """验证 API 端点列表
+
+        Args:
+            config: 配置字典
+
+        Raises:
+            ConfigError: 端点地址格式错误
+        """
+        endpoints = config.get("API_ENDPOINTS", [])
+        if not isinstance(endpoints, list):
+            raise ConfigError(
+                f"api_endpoints 必须是列表，当前为: {endpoints!r}",
+                "请检查 config.yaml 中 crawler.api_endpoints",
+            )
+
+        for url in endpoints:
+            if not isinstance(url, str) or not url.startswith(("http://", "https://")):
+                raise ConfigError(
+                    f"API 端点地址格式错误: {url!r}",
+                    "API 端点地址必须以 http:// 或 https:// 开头",
+                )
+        if len(set(endpoints)) != len(endpoints):
+            raise ConfigError(
+                "api_endpoints 中有重复的地址",
+                "请检查 config.yaml 中 crawler.api_endpoints",
+            )
+
+    def _validate_rate_limit(self, config: Dict) -> None:
+        """验证限流配置
+
+        Args:
+            config: 配置字典
+
+        Raises:
+            ConfigError: 限流配置错误
+        """
+        rate_limit = config.get("RATE_LIMIT", {})
+
+        for key, value in rate_limit.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ConfigError(
+                    f"限流配置 {key.lower()} 必须是数字，当前为: {value!r}",
+                    "请检查 config.yaml 中 crawler.rate_limit 的数值类型",
+                )
+            if value < 0:
+                raise ConfigError(
+                    f"限流配置 {key.lower()} 不能为负数，当前为: {value}",
+                    "请检查 config.yaml 中 crawler.rate_limit 的取值",
+                )
+
+        minimum = rate_limit.get("MIN_CONCURRENCY", 1)
+        initial = rate_limit.get("INITIAL_CONCURRENCY", minimum)
+        maximum = rate_limit.get("MAX_CONCURRENCY", initial)
+        if not 1 <= minimum <= initial <= maximum:
+            raise ConfigError(
+                f"并发配置无效: min={minimum}, initial={initial}, max={maximum}",
+                "需满足 1 <= min_concurrency <= initial_concurrency <= max_concurrency",
+            )
+
+    def _validate_circuit_breaker(self, config: Dict) -> None:
+        """验证熔断配置
+
+        Args:
+            config: 配置字典
+
+        Raises:
+            ConfigError: 熔断配置错误
+        """
+        breaker = config.get("CIRCUIT_BREAKER", {})
+
+        threshold = breaker.get("FAILURE_THRESHOLD", 3)
+        if type(threshold) is not int or threshold < 1:
+            raise ConfigError(
+                f"熔断阈值 failure_threshold 必须是正整数，当前为: {threshold!r}",
+                "请检查 config.yaml 中 crawler.circuit_breaker.failure_threshold",
+            )
+
+        for key in ("COOLDOWN", "MAX_COOLDOWN"):
+            value = breaker.get(key, 0)
+            if type(value) not in (int, float) or value < 0:
+                raise ConfigError(
+                    f"熔断冷却时间 {key.lower()}_seconds 必须是非负数，当前为: {value!r}",
+                    "请检查 config.yaml 中 crawler.circuit_breaker 的冷却时间",
+                )
+
+    def _validate_hedging(self, config: Dict) -> None:
+        """验证对冲请求配置
+
+        Args:
+            config: 配置字典
+
+        Raises:
+            ConfigError: 对冲配置错误
+        """
+        hedging = config.get("HEDGING", {})
+
+        pct = hedging.get("PERCENTILE", 95)
+        if type(pct) not in (int, float) or not 0 < pct <= 100:
+            raise ConfigError(
+                f"对冲分位数 percentile 必须在 (0, 100] 之间，当前为: {pct!r}",
+                "请检查 config.yaml 中 crawler.hedging.percentile",
+            )
+
+        min_samples = hedging.get("MIN_SAMPLES", 10)
+        if type(min_samples) is not int or min_samples < 1:
+            raise ConfigError(
+                f"对冲样本数 min_samples 必须是正整数，当前为: {min_samples!r}",
+                "请检查 config.yaml 中 crawler.hedging.min_samples",
+            )
+
+        for key in ("MIN_DELAY", "BUDGET_RATIO"):
+            value = hedging.get(key, 0)
+            if type(value) not in (int, float) or value < 0:
+                raise ConfigError(
+                    f"对冲配置 {key.lower()} 必须是非负数，当前为: {value!r}",
+                    "请检查 config.yaml 中 crawler.hedging 的取值",
+                )
+
+    def _validate_proxy_pool(self, config: Dict) -> None:
+        """验证代理池配置
+
+        Args:
+            config: 配置字典
+
+        Raises:
+            ConfigError: 代理池配置错误
+        """
+        pool = config.get("PROXY_POOL", {})
+
+        urls = []
+        for entry in pool.get("PROXIES", []):
+            url = entry.get("url") if isinstance(entry, dict) else entry
+            if not isinstance(url, str) or not url.startswith(("http://", "https://")):
+                raise ConfigError(
+                    f"代理地址格式错误: {url!r}",
+                    "aiohttp 只支持 HTTP 代理，代理地址必须以 http:// 或 https:// 开头",
+                )
+            if isinstance(entry, dict):
+                limit = entry.get("max_concurrency", 1)
+                if type(limit) is not int or limit < 1:
+                    raise ConfigError(
+                        f"代理 {url} 的 max_concurrency 必须是正整数，当前为: {limit!r}",
+                        "请检查 config.yaml 中 crawler.proxy_pool.proxies",
+                    )
+            urls.append(url)
+        if len(set(urls)) != len(urls):
+            raise ConfigError(
+                "proxy_pool.proxies 中有重复的地址",
+                "请检查 config.yaml 中 crawler.proxy_pool.proxies",
+            )
+
+        # 未配置代理列表时池中只有 default_proxy
+        known = urls or [config.get("DEFAULT_PROXY")]
+        for key, url in pool.get("PINS", {}).items():
+            if url not in known:
+                raise ConfigError(
+                    f"{key} 固定使用的代理 {url!r} 不在代理池中",
+                    "pins 中的代理地址必须出现在 crawler.proxy_pool.proxies 中",
+                )
+
+        for key in ("MAX_CONCURRENCY", "FAILURE_THRESHOLD"):
+            value = pool.get(key, 1)
+            if type(value) is not int or value < 1:
+                raise ConfigError(
+                    f"代理池配置 {key.lower()} 必须是正整数，当前为: {value!r}",
+                    "请检查 config.yaml 中 crawler.proxy_pool 的取值",
+                )
+
+        eviction = pool.get("EVICTION", 600)
+        if type(eviction) not in (int, float) or eviction < 0:
+            raise ConfigError(
+                f"代理剔除时长 eviction_seconds 必须是非负数，当前为: {eviction!r}",
+                "请检查 config.yaml 中 crawler.proxy_pool.eviction_seconds",
+            )
+
+    def _validate_stale_fallback(self, config: Dict) -> None:
+        """验证缓存数据回退配置
+
+        Args:
+            config: 配置字典
+
+        Raises:
+            ConfigError: 最长使用时间不是非负数
+        """
+        max_staleness = config.get("STALE_FALLBACK", {}).get("MAX_STALENESS", 3600)
+        if type(max_staleness) not in (int, float) or max_staleness < 0:
+            raise ConfigError(
+                f"max_staleness_seconds 必须是非负数，当前为: {max_staleness!r}",
+                "请检查 config.yaml 中 crawler.stale_fallback.max_staleness_seconds",
+            )
+
+    def _validate_sharding(self, config: Dict) -> None:
+        """验证分片抓取配置
+
+        Args:
+            config: 配置字典
+
+        Raises:
+            ConfigError: 分片总数不是正整数、分片序号超出范围或运行ID不是合法目录名
+        """
+        sharding = config.get("SHARDING", {})
+        count = sharding.get("COUNT", 1)
+        index = sharding.get("INDEX", 0)
+        run_id = sharding.get("RUN_ID", "")
+
+        if type(count) is not int or count < 1:
+            raise ConfigError(
+                f"分片总数必须是正整数，当前为: {count!r}",
+                "请检查环境变量 SHARD_COUNT 或 config.yaml 中 crawler.sharding.count",
+            )
+        if type(index) is not int or not 0 <= index < count:
+            raise ConfigError(
+                f"分片序号必须在 0 到 {count - 1} 之间，当前为: {index!r}",
+                "请检查环境变量 SHARD_INDEX 或 config.yaml 中 crawler.sharding.index",
+            )
+        if not isinstance(run_id, str) or (
+            "/" in run_id or "\\" in run_id or run_id in (".", "..")
+        ):
+            raise ConfigError(
+                f"分片运行ID必须是合法的目录名，当前为: {run_id!r}",
+                "请检查环境变量 SHARD_RUN_ID 或 config.yaml 中 crawler.sharding.run_id",
+            )
+
+    def _validate_trend(self, config: Dict) -> None:
+        """验证排名走势配置
+
+        Args:
+            config: 配置字典
+
+        Raises:
+            ConfigError: 前 N 名不是正整数或趋势权重不在 0-1 之间
+        """
+        top_n = config.get("TREND", {}).get("TOP_N", 10)
+        if type(top_n) is not int or top_n < 1:
+            raise ConfigError(
+                f"top_n 必须是正整数，当前为: {top_n!r}",
+                "请检查 config.yaml 中 trend.top_n",
+            )
+
+        trend_weight = config.get("WEIGHT_CONFIG", {}).get("TREND_WEIGHT", 0)
+        if type(trend_weight) not in (int, float) or not 0 <= trend_weight <= 1:
+            raise ConfigError(
+                f"趋势权重 TREND_WEIGHT 必须在 0-1 之间，当前为: {trend_weight!r}",
+                "请检查 config.yaml 中 weight.trend_weight",
+            )
+
     def _validate_webhooks(self, config: Dict) -> None:
         """验证 Webhook URL 格式
 